@@ -0,0 +1,54 @@
+"""Add import_job table for background bulk imports
+
+Revision ID: 20261018_000001
+Revises: 20260116_hq_learning
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000001"
+down_revision: Union[str, None] = "20260116_hq_learning"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_job",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("company_id", sa.String(), sa.ForeignKey("company.id"), nullable=False, index=True),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.Column("entity_type", sa.String(), nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False, server_default="PENDING"),
+        sa.Column("total_rows", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("processed_rows", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("successful", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("skipped", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("errors", sa.JSON(), nullable=True),
+        sa.Column("warnings", sa.JSON(), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+    # Duplicate resolution looks drivers up by email/phone/CDL within a tenant
+    op.create_index("ix_driver_company_email", "driver", ["company_id", "email"])
+    op.create_index("ix_driver_company_phone", "driver", ["company_id", "phone"])
+    op.create_index("ix_driver_company_cdl_number", "driver", ["company_id", "cdl_number"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_driver_company_cdl_number", table_name="driver")
+    op.drop_index("ix_driver_company_phone", table_name="driver")
+    op.drop_index("ix_driver_company_email", table_name="driver")
+    op.drop_table("import_job")
@@ -0,0 +1,39 @@
+"""Add drayage_exposure_snapshot table for nightly demurrage exposure
+
+Revision ID: 20261018_000002
+Revises: 20261018_000001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000002"
+down_revision: Union[str, None] = "20261018_000001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "drayage_exposure_snapshot",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("company_id", sa.String(36), sa.ForeignKey("company.id"), nullable=False, index=True),
+        sa.Column("snapshot_date", sa.Date(), nullable=False),
+        sa.Column("container_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("incurring_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_today", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("total_tomorrow", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("summary", sa.JSON(), nullable=True),
+        sa.Column("containers", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("company_id", "snapshot_date", name="uq_exposure_snapshot_company_date"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("drayage_exposure_snapshot")
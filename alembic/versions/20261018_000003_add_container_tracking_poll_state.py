@@ -0,0 +1,35 @@
+"""Add adaptive polling state to container_tracking
+
+Revision ID: 20261018_000003
+Revises: 20261018_000002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000003"
+down_revision: Union[str, None] = "20261018_000002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("container_tracking", sa.Column("last_changed_at", sa.DateTime(), nullable=True))
+    op.add_column(
+        "container_tracking",
+        sa.Column("unchanged_polls", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column("container_tracking", sa.Column("next_poll_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_container_tracking_next_poll_at", "container_tracking", ["next_poll_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_container_tracking_next_poll_at", table_name="container_tracking")
+    op.drop_column("container_tracking", "next_poll_at")
+    op.drop_column("container_tracking", "unchanged_polls")
+    op.drop_column("container_tracking", "last_changed_at")
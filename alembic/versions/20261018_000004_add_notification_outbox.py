@@ -0,0 +1,48 @@
+"""Add notification_outbox table for durable notification delivery
+
+Revision ID: 20261018_000004
+Revises: 20261018_000003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000004"
+down_revision: Union[str, None] = "20261018_000003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("company_id", sa.String(), sa.ForeignKey("company.id"), nullable=False, index=True),
+        sa.Column("rule_id", sa.String(), sa.ForeignKey("automationrule.id"), nullable=True, index=True),
+        sa.Column("channel", sa.String(), nullable=False),
+        sa.Column("recipient", sa.String(), nullable=False),
+        sa.Column("subject", sa.String(), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False, server_default="PENDING"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_notification_outbox_status_next_attempt",
+        "notification_outbox",
+        ["status", "next_attempt_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notification_outbox_status_next_attempt", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
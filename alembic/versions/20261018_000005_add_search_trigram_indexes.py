@@ -0,0 +1,58 @@
+"""Add pg_trgm GIN indexes for global search
+
+Revision ID: 20261018_000005
+Revises: 20261018_000004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000005"
+down_revision: Union[str, None] = "20261018_000004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Columns SearchService matches with lower(col) LIKE '%q%' (keep in sync with search_service.py)
+SEARCH_COLUMNS = {
+    "freight_load": ("load_number", "customer_name", "commodity"),
+    "driver": ("first_name", "last_name", "email", "phone", "cdl_number"),
+    "fleet_equipment": ("unit_number", "vin", "make", "model"),
+    "accounting_customer": ("name", "primary_contact_email", "primary_contact_phone"),
+}
+
+
+def _index_name(table: str, column: str) -> str:
+    return f"ix_{table}_{column}_trgm"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        # SQLite (tests) keeps sequential LIKE scans
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY can't run inside the migration transaction; avoids locking writes on large tables
+    with op.get_context().autocommit_block():
+        for table, columns in SEARCH_COLUMNS.items():
+            for column in columns:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {_index_name(table, column)} "
+                    f"ON {table} USING gin (lower({column}) gin_trgm_ops)"
+                )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        for table, columns in SEARCH_COLUMNS.items():
+            for column in columns:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {_index_name(table, column)}")
@@ -0,0 +1,51 @@
+"""Add document_sequence counters for invoice/load numbering
+
+Revision ID: 20261018_000006
+Revises: 20261018_000005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000006"
+down_revision: Union[str, None] = "20261018_000005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_sequence",
+        sa.Column("company_id", sa.String(), sa.ForeignKey("company.id"), primary_key=True),
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("last_value", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+    # Carry over the counters previously kept on the company row
+    op.execute(
+        "INSERT INTO document_sequence (company_id, name, last_value) "
+        "SELECT id, 'invoice', last_invoice_number FROM company"
+    )
+    op.execute(
+        "INSERT INTO document_sequence (company_id, name, last_value) "
+        "SELECT id, 'load', last_load_number FROM company"
+    )
+
+
+def downgrade() -> None:
+    # Copy counters back so numbering continues where it left off
+    op.execute(
+        "UPDATE company SET last_invoice_number = COALESCE((SELECT last_value FROM document_sequence "
+        "WHERE document_sequence.company_id = company.id AND name = 'invoice'), last_invoice_number)"
+    )
+    op.execute(
+        "UPDATE company SET last_load_number = COALESCE((SELECT last_value FROM document_sequence "
+        "WHERE document_sequence.company_id = company.id AND name = 'load'), last_load_number)"
+    )
+    op.drop_table("document_sequence")
@@ -0,0 +1,49 @@
+"""Add webhook_event inbox for asynchronous webhook processing
+
+Revision ID: 20261018_000007
+Revises: 20261018_000006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000007"
+down_revision: Union[str, None] = "20261018_000006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_event",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("provider", sa.String(), nullable=False),
+        sa.Column("idempotency_key", sa.String(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=True),
+        sa.Column("company_id", sa.String(), nullable=True, index=True),
+        sa.Column("company_integration_id", sa.String(), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False, server_default="PENDING"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("provider", "idempotency_key", name="uq_webhook_event_provider_key"),
+    )
+    op.create_index(
+        "ix_webhook_event_status_next_attempt",
+        "webhook_event",
+        ["status", "next_attempt_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhook_event_status_next_attempt", table_name="webhook_event")
+    op.drop_table("webhook_event")
@@ -0,0 +1,29 @@
+"""Index freight_load_stop by scheduled time for the dispatch calendar window
+
+Revision ID: 20261018_000008
+Revises: 20261018_000007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000008"
+down_revision: Union[str, None] = "20261018_000007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_freight_load_stop_scheduled_at_load_id",
+        "freight_load_stop",
+        ["scheduled_at", "load_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_freight_load_stop_scheduled_at_load_id", table_name="freight_load_stop")
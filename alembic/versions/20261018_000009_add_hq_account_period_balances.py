@@ -0,0 +1,78 @@
+"""Add HQ account period balances and period-close snapshots
+
+Revision ID: 20261018_000009
+Revises: 20261018_000008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000009"
+down_revision: Union[str, None] = "20261018_000008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "hq_account_period_balance",
+        sa.Column("account_id", sa.String(36), sa.ForeignKey("hq_chart_of_accounts.id"), primary_key=True),
+        sa.Column("period_date", sa.Date(), primary_key=True),
+        sa.Column("tenant_id", sa.String(36), primary_key=True, server_default=""),
+        sa.Column("debit_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("credit_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_hq_apb_period_date", "hq_account_period_balance", ["period_date"])
+
+    op.create_table(
+        "hq_account_period_snapshot",
+        sa.Column("account_id", sa.String(36), sa.ForeignKey("hq_chart_of_accounts.id"), primary_key=True),
+        sa.Column("period_end", sa.Date(), primary_key=True),
+        sa.Column("debit_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("credit_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("closed_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_hq_aps_period_end", "hq_account_period_snapshot", ["period_end"])
+
+    # Every entry that was ever posted counts, including posted entries voided
+    # later (their reversing entries are posted too) - the same set
+    # current_balance was built from
+    op.execute(
+        """
+        INSERT INTO hq_account_period_balance (account_id, period_date, tenant_id, debit_total, credit_total)
+        SELECT account_id, period_date, tenant_id, SUM(debit_amount), SUM(credit_amount)
+        FROM (
+            SELECT gle.debit_account_id AS account_id,
+                   CAST(je.transaction_date AS DATE) AS period_date,
+                   COALESCE(gle.tenant_id, je.tenant_id, '') AS tenant_id,
+                   gle.amount AS debit_amount,
+                   0 AS credit_amount
+            FROM hq_general_ledger_entry gle
+            JOIN hq_journal_entry je ON je.id = gle.journal_entry_id
+            WHERE je.posted_at IS NOT NULL AND gle.debit_account_id IS NOT NULL
+            UNION ALL
+            SELECT gle.credit_account_id,
+                   CAST(je.transaction_date AS DATE),
+                   COALESCE(gle.tenant_id, je.tenant_id, ''),
+                   0,
+                   gle.amount
+            FROM hq_general_ledger_entry gle
+            JOIN hq_journal_entry je ON je.id = gle.journal_entry_id
+            WHERE je.posted_at IS NOT NULL AND gle.credit_account_id IS NOT NULL
+        ) AS posted
+        GROUP BY account_id, period_date, tenant_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_hq_aps_period_end", table_name="hq_account_period_snapshot")
+    op.drop_table("hq_account_period_snapshot")
+    op.drop_index("ix_hq_apb_period_date", table_name="hq_account_period_balance")
+    op.drop_table("hq_account_period_balance")
@@ -0,0 +1,80 @@
+"""Link accounting invoices to customers, add due dates and the AR aging index
+
+Revision ID: 20261018_000010
+Revises: 20261018_000009
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000010"
+down_revision: Union[str, None] = "20261018_000009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("accounting_invoice", sa.Column("customer_id", sa.String(), nullable=True))
+    op.add_column("accounting_invoice", sa.Column("due_date", sa.Date(), nullable=True))
+    op.create_foreign_key(
+        "fk_accounting_invoice_customer_id",
+        "accounting_invoice",
+        "accounting_customer",
+        ["customer_id"],
+        ["id"],
+    )
+    op.create_index("ix_accounting_invoice_customer_id", "accounting_invoice", ["customer_id"])
+
+    # Existing invoices: customer by the load's customer name, due date from that customer's terms
+    op.execute(
+        """
+        UPDATE accounting_invoice AS inv
+        SET customer_id = (
+            SELECT c.id
+            FROM freight_load l
+            JOIN accounting_customer c
+              ON c.company_id = inv.company_id AND lower(c.name) = lower(trim(l.customer_name))
+            WHERE l.id = inv.load_id
+            ORDER BY c.is_active DESC, c.created_at ASC
+            LIMIT 1
+        )
+        WHERE inv.load_id IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE accounting_invoice AS inv
+        SET due_date = inv.invoice_date + COALESCE(
+            (
+                SELECT CASE
+                    WHEN upper(c.payment_terms) = 'DUE_ON_RECEIPT' THEN 0
+                    WHEN upper(c.payment_terms) ~ '^NET[_ ]?[0-9]+$'
+                        THEN CAST(substring(upper(c.payment_terms) FROM '[0-9]+') AS INTEGER)
+                END
+                FROM accounting_customer c
+                WHERE c.id = inv.customer_id
+            ),
+            30
+        )
+        """
+    )
+
+    op.create_index(
+        "ix_accounting_invoice_company_status_due",
+        "accounting_invoice",
+        ["company_id", "status", "due_date"],
+        postgresql_include=["customer_id", "total"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_accounting_invoice_company_status_due", table_name="accounting_invoice")
+    op.drop_index("ix_accounting_invoice_customer_id", table_name="accounting_invoice")
+    op.drop_constraint("fk_accounting_invoice_customer_id", "accounting_invoice", type_="foreignkey")
+    op.drop_column("accounting_invoice", "due_date")
+    op.drop_column("accounting_invoice", "customer_id")
@@ -0,0 +1,37 @@
+"""Add geocode_cache for forward and reverse geocoding answers
+
+Revision ID: 20261018_000011
+Revises: 20261018_000010
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000011"
+down_revision: Union[str, None] = "20261018_000010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "geocode_cache",
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("lookup_key", sa.String(), nullable=False),
+        sa.Column("latitude", sa.Float(), nullable=False),
+        sa.Column("longitude", sa.Float(), nullable=False),
+        sa.Column("formatted_address", sa.Text(), nullable=True),
+        sa.Column("provider", sa.String(length=32), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("kind", "lookup_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("geocode_cache")
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import time
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
@@ -8,7 +9,6 @@ from app.core.config import get_settings
 from app.core.db import AsyncSessionFactory
 from app.services.automation import AutomationService
 from app.services.automation_evaluator import AutomationEvaluator
-from app.services.company import CompanyService
 from app.services.notifications import build_channel_registry
 from app.services.port.port_service import PortService
 from app.background.motive_sync_jobs import (
@@ -23,61 +23,35 @@ logger = logging.getLogger(__name__)
 
 
 def check_presence_idle_users() -> None:
-    """Check for idle users and auto-set them to away/offline.
+    """Sweep idle channel presence that no running process tracks.
 
-    Runs every minute to detect:
-    - 5 min idle -> away (if not manually set)
-    - 30 min idle -> offline
+    Live connections are moved online -> away (5 min) -> offline (30 min) by
+    the in-process presence engine; this catches rows left behind by
+    restarted workers. Runs every presence_sweep_interval_minutes.
 
     NOTE: This is a sync wrapper that runs the async implementation.
     """
     import asyncio
 
     async def _check_presence_idle_users_async():
-        from sqlalchemy import select, distinct
-        from app.models.collaboration import Presence
-        from app.services.presence import PresenceService
-        from app.websocket.hub import channel_hub
+        from app.services.presence import PresenceService, broadcast_presence_changes
 
         async with AsyncSessionFactory() as session:
             try:
-                # Get all distinct channel_ids with active presence records
-                result = await session.execute(
-                    select(distinct(Presence.channel_id)).where(
-                        Presence.status.in_(["online", "away"])
-                    )
-                )
-                channel_ids = [row[0] for row in result.fetchall()]
-
-                if not channel_ids:
-                    return
-
-                presence_service = PresenceService(session)
-
-                for channel_id in channel_ids:
+                changed = await PresenceService(session).sweep_idle_users()
+                for channel_id, states in changed.items():
                     try:
-                        changed = await presence_service.check_idle_users(channel_id)
-                        if changed:
-                            # Broadcast presence update to channel
-                            await channel_hub.broadcast(
-                                channel_id,
-                                {
-                                    "type": "presence",
-                                    "data": [
-                                        state.model_dump()
-                                        for state in await presence_service.current_presence(channel_id)
-                                    ],
-                                },
-                            )
-                            logger.debug(
-                                "presence_idle_update",
-                                extra={"channel_id": channel_id, "updated_users": len(changed)},
-                            )
+                        await broadcast_presence_changes(channel_id, states)
                     except Exception as exc:
                         logger.warning(
-                            "presence_idle_check_failed",
+                            "presence_idle_broadcast_failed",
                             extra={"channel_id": channel_id, "error": str(exc)},
                         )
+                if changed:
+                    logger.debug(
+                        "presence_idle_update",
+                        extra={"channels": len(changed), "updated_users": sum(len(s) for s in changed.values())},
+                    )
             except Exception as exc:
                 logger.exception("presence_idle_job_failed", extra={"error": str(exc)})
 
@@ -93,18 +67,17 @@ def check_presence_idle_users() -> None:
 
 
 def check_hq_presence_idle() -> None:
-    """Check for idle HQ employees and auto-set them to away/offline.
+    """Sweep idle HQ presence that no running process tracks.
 
-    Runs every minute to detect:
-    - 5 min idle -> away (if not manually set)
-    - 30 min idle -> offline
+    Active employees are moved to away/offline by the in-process presence
+    engine; this catches rows left behind by restarted workers.
 
     NOTE: This is a sync wrapper that runs the async implementation.
     """
     import asyncio
 
     async def _check_hq_presence_idle_async():
-        from app.services.hq_presence import HQPresenceService
+        from app.services.hq_presence import HQ_SCOPE, HQPresenceService, broadcast_hq_presence_changes
 
         async with AsyncSessionFactory() as session:
             try:
@@ -112,6 +85,7 @@ def check_hq_presence_idle() -> None:
                 changed = await presence_service.check_idle_employees()
 
                 if changed:
+                    await broadcast_hq_presence_changes(HQ_SCOPE, changed)
                     logger.debug(
                         "hq_presence_idle_update",
                         extra={"updated_employees": len(changed)},
@@ -172,26 +146,70 @@ automation_scheduler = AsyncIOScheduler()
 
 
 async def run_automation_cycle() -> None:
+    started = time.monotonic()
     async with AsyncSessionFactory() as session:
-        company_service = CompanyService(session)
-        companies = await company_service.list_active()
         channels = build_channel_registry()
         evaluator = AutomationEvaluator(session, channels)
+        try:
+            results = await evaluator.evaluate_all()
+        except Exception as exc:  # pragma: no cover - defensive logging
+            logger.exception("Automation evaluation failed", extra={"error": str(exc)})
+            return
 
-        for company in companies:
-            try:
-                result = await evaluator.evaluate_company(company.id)
+        for company_id, result in results.items():
+            if result.sent or result.failed:
                 logger.info(
-                    "automation_cycle",
+                    "automation_cycle_company",
                     extra={
-                        "company_id": company.id,
-                        "company_name": company.name,
+                        "company_id": company_id,
                         "sent": len(result.sent),
+                        "failed": len(result.failed),
                         "skipped": len(result.skipped),
                     },
                 )
-            except Exception as exc:  # pragma: no cover - defensive logging
-                logger.exception("Automation evaluation failed", extra={"company_id": company.id, "error": str(exc)})
+        logger.info(
+            "automation_cycle",
+            extra={
+                "companies": len(results),
+                "sent": sum(len(r.sent) for r in results.values()),
+                "failed": sum(len(r.failed) for r in results.values()),
+                "skipped": sum(len(r.skipped) for r in results.values()),
+                "duration_ms": int((time.monotonic() - started) * 1000),
+            },
+        )
+
+
+async def deliver_pending_notifications() -> None:
+    """Retry outbox notifications that failed transiently or were interrupted by a restart."""
+    from app.services.notification_outbox import NotificationOutboxService
+
+    async with AsyncSessionFactory() as session:
+        try:
+            await NotificationOutboxService(session, build_channel_registry()).deliver_pending()
+        except Exception as exc:
+            logger.exception("Notification outbox delivery failed", extra={"error": str(exc)})
+
+
+async def process_webhook_inbox() -> None:
+    """Process webhook events that are due for retry or were left behind by a restart."""
+    from app.services.webhook_inbox import WebhookInboxWorker
+
+    try:
+        await WebhookInboxWorker().drain()
+    except Exception as exc:
+        logger.exception("Webhook inbox processing failed", extra={"error": str(exc)})
+
+
+async def purge_webhook_inbox() -> None:
+    """Delete processed webhook events past their retention window."""
+    from app.services.webhook_inbox import purge_processed_events
+
+    try:
+        removed = await purge_processed_events()
+        if any(removed.values()):
+            logger.info("webhook_inbox_purged", extra={"removed": removed})
+    except Exception as exc:
+        logger.exception("Webhook inbox purge failed", extra={"error": str(exc)})
 
 
 async def cleanup_completed_load_tracking() -> None:
@@ -229,6 +247,53 @@ async def cleanup_completed_load_tracking() -> None:
             logger.exception("Container tracking cleanup job failed", extra={"error": str(exc)})
 
 
+async def poll_container_tracking() -> None:
+    """Refresh tracked containers on active loads, most LFD-critical first."""
+    from app.services.port.tracking_poller import ContainerTrackingPoller
+
+    async with AsyncSessionFactory() as session:
+        try:
+            stats = await ContainerTrackingPoller(session).run_cycle()
+            if stats.due:
+                logger.info("container_tracking_poll", extra=stats.to_dict())
+        except Exception as exc:
+            logger.exception("Container tracking poll failed", extra={"error": str(exc)})
+
+
+async def snapshot_demurrage_exposure() -> None:
+    """Snapshot demurrage / per diem exposure for every tenant with open containers."""
+    from app.services.drayage.exposure_service import DemurrageExposureEngine
+
+    async with AsyncSessionFactory() as session:
+        try:
+            engine = DemurrageExposureEngine(session)
+            exposures = await engine.compute_all()
+            written = await engine.store_snapshots(exposures.values())
+            logger.info(
+                "demurrage_exposure_snapshot",
+                extra={
+                    "tenants": written,
+                    "containers": sum(len(e.containers) for e in exposures.values()),
+                },
+            )
+        except Exception as exc:
+            logger.exception("Demurrage exposure snapshot job failed", extra={"error": str(exc)})
+
+
+async def close_gl_periods() -> None:
+    """Snapshot HQ account balances for every month that has ended since the last close."""
+    from app.services.hq_general_ledger import GeneralLedgerManager
+
+    async with AsyncSessionFactory() as session:
+        try:
+            closed = await GeneralLedgerManager(session).close_completed_periods()
+            await session.commit()
+            if closed:
+                logger.info("gl_periods_closed", extra={"periods": [p.isoformat() for p in closed]})
+        except Exception as exc:
+            logger.exception("GL period close job failed", extra={"error": str(exc)})
+
+
 async def run_lead_import_pipeline() -> None:
     """
     Run the FMCSA lead import pipeline (no AI processing).
@@ -412,8 +477,18 @@ def start_scheduler() -> None:
         return
 
     automation_scheduler.add_job(run_automation_cycle, "interval", minutes=settings.automation_interval_minutes, id="run_automation_cycle", replace_existing=True, max_instances=1, coalesce=True)
+    automation_scheduler.add_job(deliver_pending_notifications, "interval", minutes=1, id="deliver_pending_notifications", replace_existing=True, max_instances=1, coalesce=True)
+    automation_scheduler.add_job(process_webhook_inbox, "interval", minutes=1, id="process_webhook_inbox", replace_existing=True, max_instances=1, coalesce=True)
+    # Purge processed webhook inbox rows daily at 2:30 AM
+    automation_scheduler.add_job(purge_webhook_inbox, "cron", hour=2, minute=30, id="purge_webhook_inbox", replace_existing=True, max_instances=1, coalesce=True)
     # Run cleanup job daily at 2 AM
     automation_scheduler.add_job(cleanup_completed_load_tracking, "cron", hour=2, minute=0, id="cleanup_completed_load_tracking", replace_existing=True, max_instances=1, coalesce=True)
+    # Adaptive container tracking poller
+    automation_scheduler.add_job(poll_container_tracking, "interval", minutes=settings.port_tracking_poll_interval_minutes, id="poll_container_tracking", replace_existing=True, max_instances=1, coalesce=True)
+    # Nightly demurrage / per diem exposure snapshot at 1:30 AM
+    automation_scheduler.add_job(snapshot_demurrage_exposure, "cron", hour=1, minute=30, id="snapshot_demurrage_exposure", replace_existing=True, max_instances=1, coalesce=True)
+    # Close finished months in the HQ general ledger at 0:45 AM
+    automation_scheduler.add_job(close_gl_periods, "cron", hour=0, minute=45, id="close_gl_periods", replace_existing=True, max_instances=1, coalesce=True)
     # Motive sync jobs
     automation_scheduler.add_job(sync_motive_integrations, "interval", minutes=15, id="sync_motive_integrations", replace_existing=True, max_instances=1, coalesce=True)
     automation_scheduler.add_job(sync_motive_vehicles_job, "interval", minutes=15, id="sync_motive_vehicles_job", replace_existing=True, max_instances=1, coalesce=True)
@@ -427,9 +502,9 @@ def start_scheduler() -> None:
     # Run immediately on startup (after 10 seconds to let app initialize)
     automation_scheduler.add_job(run_lead_import_pipeline, "date", run_date=None, id="startup-lead-import", replace_existing=True)
 
-    # Presence auto-away jobs - run every minute to check for idle users
-    automation_scheduler.add_job(check_presence_idle_users, "interval", minutes=1, id="check_presence_idle_users", replace_existing=True, max_instances=1, coalesce=True)
-    automation_scheduler.add_job(check_hq_presence_idle, "interval", minutes=1, id="check_hq_presence_idle", replace_existing=True, max_instances=1, coalesce=True)
+    # Presence idle sweeps - live users are handled by the in-process presence engine
+    automation_scheduler.add_job(check_presence_idle_users, "interval", minutes=settings.presence_sweep_interval_minutes, id="check_presence_idle_users", replace_existing=True, max_instances=1, coalesce=True)
+    automation_scheduler.add_job(check_hq_presence_idle, "interval", minutes=settings.presence_sweep_interval_minutes, id="check_hq_presence_idle", replace_existing=True, max_instances=1, coalesce=True)
     # Presence cleanup - run daily at 3 AM to remove orphaned records
     automation_scheduler.add_job(cleanup_orphaned_presence, "cron", hour=3, minute=0, id="cleanup_orphaned_presence", replace_existing=True, max_instances=1, coalesce=True)
 
@@ -56,6 +56,8 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 60 * 12
 
     automation_interval_minutes: int = 30
+    automation_send_concurrency: int = 10  # Concurrent notification sends per channel
+    automation_send_rate_per_second: float = 10.0  # Max notification sends per second per channel
 
     smtp_host: Optional[str] = None
     smtp_port: int = 587
@@ -65,6 +67,13 @@ class Settings(BaseSettings):
     sms_twilio_auth_token: Optional[str] = None
     sms_twilio_from_number: Optional[str] = None
     slack_webhook_url: Optional[str] = None
+    smtp_pool_size: int = 2  # Persistent SMTP sessions shared by all email sends
+    smtp_max_messages_per_connection: int = 100  # Re-login after this many messages on one session
+    smtp_idle_timeout_seconds: int = 60  # Reconnect sessions idle longer than this
+    notification_provider_concurrency: int = 10  # Concurrent requests per HTTP provider (Twilio, Slack)
+    notification_inline_retries: int = 2  # Immediate retries for transient send failures
+    notification_max_attempts: int = 5  # Attempts before an outbox row is marked FAILED
+    notification_retry_base_seconds: int = 60  # Outbox retry delay, doubled per attempt
 
     # AI OCR Configuration
     enable_ai_ocr: bool = True
@@ -74,6 +83,15 @@ class Settings(BaseSettings):
     openai_api_key: Optional[str] = None
     groq_api_key: Optional[str] = None
 
+    # Document rendering (PDF rasterization / text extraction process pool)
+    document_render_workers: int = 2  # Processes dedicated to PyMuPDF/pdfplumber work
+    document_render_max_pages: int = 4  # Pages sent to vision models for scanned PDFs
+    document_render_dpi: int = 200  # Starting DPI, lowered adaptively to fit the payload budget
+    document_render_max_image_bytes: int = 1_500_000  # Per-page encoded image budget
+    document_render_cache_size: int = 256  # Cached documents (text + rendered pages)
+    document_render_cache_max_bytes: int = 64_000_000  # Memory budget for those cached payloads, per worker
+    pay_stub_job_batch_size: int = 50  # Settlements rendered and uploaded per batch (one progress update each)
+
     # Grok AI Configuration (for HQ AI Task Manager - Oracle/Sentinel/Nexus agents)
     # Uses OpenAI-compatible API format with Llama 4
     grok_api_key: Optional[str] = None  # Set GROK_API_KEY in .env
@@ -121,11 +139,70 @@ class Settings(BaseSettings):
     plaid_secret: Optional[str] = None
     plaid_environment: str = "sandbox"  # sandbox, development, or production
     plaid_encryption_key: Optional[str] = None  # Generate with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
+    plaid_sync_threads: int = 4  # Threads running blocking Plaid SDK calls
+    plaid_sync_concurrency: int = 4  # Items synced at once in a bulk sync
+    plaid_sync_page_size: int = 500  # Transactions per /transactions/sync page (Plaid max 500)
+
+    # Document Numbering
+    invoice_number_lease_size: int = 1  # Keep 1: invoice numbers must be gap-free
+    load_number_lease_size: int = 20  # Load numbers a worker reserves at once (1 = gap-free)
+
+    # Load Matching
+    driver_feature_ttl_seconds: int = 3600  # Rebuild matching features at least hourly (incident decay)
+
+    # HQ Dashboard
+    hq_mrr_cache_ttl_seconds: int = 300  # Platform MRR totals cached per worker between invalidations
+
+    # Audit Log
+    audit_sink_batch_size: int = 200  # Audit rows per bulk INSERT
+    audit_sink_flush_ms: int = 500  # Max time a queued audit row waits for its batch
+    audit_sink_max_queue: int = 10000  # Queued audit rows before new ones are dropped
+
+    # Presence
+    presence_flush_interval_seconds: int = 5  # Batch heartbeat/idle writes to the DB this often
+    presence_sweep_interval_minutes: int = 10  # DB sweep for idle presence no worker tracks
+
+    # Webhook Inbox
+    webhook_worker_concurrency: int = 8  # Inbox events processed at once
+    webhook_max_attempts: int = 8  # Attempts before an inbox event is marked FAILED
+    webhook_retry_base_seconds: int = 30  # Inbox retry delay, doubled per attempt
+    webhook_body_dedupe_window_seconds: int = 60  # Redelivery window for events keyed on the body hash
+    webhook_retention_days: int = 14  # DONE inbox rows are purged after this many days
+    webhook_failed_retention_days: int = 90  # FAILED rows are kept longer for inspection
+
+    # Outbound HTTP (third-party integrations)
+    outbound_http_timeout_seconds: float = 30.0  # Default request timeout
+    outbound_http_max_connections: int = 20  # Connections per provider pool
+    outbound_http_max_keepalive: int = 10  # Idle keep-alive connections kept per provider pool
+    outbound_http_keepalive_expiry_seconds: float = 60.0  # Close idle connections after this long
+    outbound_http_concurrency: int = 10  # In-flight requests per provider (unless overridden)
+    outbound_http_rate_per_second: float = 0.0  # Request pacing per provider, 0 = unpaced (unless overridden)
+    outbound_http_max_retries: int = 2  # Retries for transient failures
+    outbound_http_retry_base_seconds: float = 0.5  # Retry backoff base, doubled per attempt (full jitter)
+    outbound_http_retry_max_seconds: float = 10.0  # Cap on a single retry delay, including Retry-After
+
+    # Geocoding Cache
+    geocode_cache_size: int = 20000  # Entries kept in the per-worker LRU in front of geocode_cache
+    geocode_cache_ttl_days: int = 90  # Re-geocode cached answers older than this
+    geocode_reverse_precision: int = 4  # Decimal places of the lat/lng cell for reverse lookups (~11 m)
+    geocode_batch_concurrency: int = 8  # Upstream geocoder calls in flight during a batch
+
+    # Load Board Search
+    loadboard_provider_timeout_seconds: float = 8.0  # Deadline per board in an aggregated search
+    loadboard_search_cache_ttl_seconds: int = 120  # Reuse a board's answer for the same lane this long
+
+    # Payroll Preview
+    payroll_preview_concurrency: int = 4  # Companies previewed at once in a multi-company preview
 
     # Port Integration Configuration
     port_tracking_cache_ttl_seconds: int = 300  # 5 minutes cache for container tracking
     port_api_rate_limit_per_minute: int = 60  # Default rate limit per port API
     port_tracking_cleanup_interval_hours: int = 24  # How often to run cleanup job
+    port_tracking_poll_interval_minutes: int = 5  # How often the adaptive tracking poller runs
+    port_tracking_max_per_cycle: int = 200  # Containers polled per cycle (most urgent first)
+    port_tracking_terminal_concurrency: int = 2  # Concurrent requests per terminal
+    port_adapter_idle_ttl_seconds: int = 1800  # Drop cached adapters (and their sessions) after 30 min idle
+    port_adapter_registry_size: int = 256  # Max live adapters kept across tenants/ports
 
     # Port Houston (Navis) API Credentials - FreightOps internal use only
     # Note: These are NOT used for tenant integrations. Each tenant must purchase
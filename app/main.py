@@ -245,6 +245,9 @@ async def lifespan(_: FastAPI):
 
     asyncio.create_task(initialize_database())
 
+    from app.services.outbound_http import outbound
+    outbound.start()
+
     try:
         start_scheduler()
         logger.info("Background scheduler started")
@@ -288,6 +291,25 @@ async def lifespan(_: FastAPI):
     yield
 
     shutdown_scheduler()
+
+    from app.services.document_rendering import shutdown_render_pool
+    shutdown_render_pool()
+
+    from app.services.plaid_sync import shutdown_plaid_pool
+    shutdown_plaid_pool()
+
+    from app.services.port.adapter_registry import close_adapter_registry
+    await close_adapter_registry()
+
+    from app.services.notifications import close_notification_channels
+    await close_notification_channels()
+
+    from app.services.outbound_http import outbound
+    await outbound.close()
+
+    from app.services.audit_sink import audit_sink
+    await audit_sink.close()
+
     logger.info("Application shutdown initiated")
 
 
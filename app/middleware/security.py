@@ -14,12 +14,12 @@ import time
 import uuid
 import logging
 from datetime import datetime, timedelta
-from typing import Callable, Optional
+from typing import List, Optional, Tuple
 from collections import defaultdict
 
-from fastapi import FastAPI, Request, Response, status
+from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -142,59 +142,150 @@ class AccountLockoutManager:
 # SECURITY HEADERS MIDDLEWARE
 # =============================================================================
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+# Plain ASGI middleware: BaseHTTPMiddleware runs every request through an extra
+# task and re-wraps the response body stream, which costs latency on every call
+# and breaks streaming responses. These only touch the http.response.start
+# message.
+
+CONTENT_SECURITY_POLICY = (
+    "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
+    "style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; "
+    "connect-src 'self' https:; frame-ancestors 'none';"
+)
+
+
+def _security_headers() -> List[Tuple[bytes, bytes]]:
+    headers = [
+        ("X-Frame-Options", "DENY"),
+        ("X-Content-Type-Options", "nosniff"),
+        ("X-XSS-Protection", "1; mode=block"),
+        ("Referrer-Policy", "strict-origin-when-cross-origin"),
+        ("Permissions-Policy", "geolocation=(), microphone=(), camera=()"),
+    ]
+    if os.getenv("ENVIRONMENT") == "production":
+        headers.append(("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload"))
+    headers.append(("Content-Security-Policy", CONTENT_SECURITY_POLICY))
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+
+class SecurityHeadersMiddleware:
     """Adds OWASP-recommended security headers."""
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.headers = _security_headers()  # Computed once, appended as-is to every response
+        self.header_names = frozenset(name for name, _ in self.headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        if os.getenv("ENVIRONMENT") == "production":
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains; preload"
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                names = self.header_names
+                message["headers"] = [
+                    header for header in message.get("headers", ()) if header[0].lower() not in names
+                ] + self.headers
+            await send(message)
 
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
-            "style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; "
-            "connect-src 'self' https:; frame-ancestors 'none';"
-        )
-        return response
+        await self.app(scope, receive, send_with_headers)
 
 
 # =============================================================================
 # AUDIT LOGGING MIDDLEWARE
 # =============================================================================
 
-class AuditLoggingMiddleware(BaseHTTPMiddleware):
-    """Logs all requests for security auditing."""
+class AuditLoggingMiddleware:
+    """Logs all requests for security auditing.
 
-    SECURITY_PATHS = {"/auth/", "/hq/auth/", "/banking/", "/payroll/"}
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        request_id = str(uuid.uuid4())[:8]
-        start_time = time.time()
-        request.state.request_id = request_id
-        client_ip = get_client_ip(request)
-        path = request.url.path
+    Writes and failed requests on security paths are also recorded in the
+    audit log through the batched audit sink, so they cost a queue append
+    rather than an INSERT.
+    """
 
+    SECURITY_PATHS = {"/auth/", "/hq/auth/", "/banking/", "/payroll/"}
+    READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        # Routers are mounted under /api; match both forms in one startswith call
+        self.security_prefixes = tuple(self.SECURITY_PATHS) + tuple(f"/api{p}" for p in self.SECURITY_PATHS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = os.urandom(4).hex()
+        start_time = time.perf_counter()
+        scope.setdefault("state", {})["request_id"] = request_id
+        response_status = 0
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                message["headers"] = [
+                    header for header in message.get("headers", ()) if header[0].lower() != b"x-request-id"
+                ] + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        path = scope["path"]
         try:
-            response = await call_next(request)
-            duration_ms = int((time.time() - start_time) * 1000)
-
-            if response.status_code >= 500:
-                logger.error(f"[{request_id}] {request.method} {path} -> {response.status_code} ({duration_ms}ms) IP={client_ip}")
-            elif response.status_code >= 400 or any(path.startswith(sp) for sp in self.SECURITY_PATHS):
-                logger.warning(f"[{request_id}] {request.method} {path} -> {response.status_code} ({duration_ms}ms) IP={client_ip}")
-
-            response.headers["X-Request-ID"] = request_id
-            return response
+            await self.app(scope, receive, send_with_request_id)
         except Exception as e:
-            logger.error(f"[{request_id}] {request.method} {path} -> ERROR IP={client_ip} error={str(e)}")
+            client_ip = get_client_ip(Request(scope))
+            logger.error(f"[{request_id}] {scope['method']} {path} -> ERROR IP={client_ip} error={str(e)}")
+            if path.startswith(self.security_prefixes):
+                self._audit(scope, request_id, 500, start_time, client_ip, str(e))
             raise
 
+        is_security_path = path.startswith(self.security_prefixes)
+        if response_status >= 400 or is_security_path:
+            duration_ms = int((time.perf_counter() - start_time) * 1000)
+            client_ip = get_client_ip(Request(scope))
+            line = f"[{request_id}] {scope['method']} {path} -> {response_status} ({duration_ms}ms) IP={client_ip}"
+            if response_status >= 500:
+                logger.error(line)
+            else:
+                logger.warning(line)
+            if is_security_path and (response_status >= 400 or scope["method"] not in self.READ_METHODS):
+                self._audit(scope, request_id, response_status, start_time, client_ip)
+
+    def _audit(
+        self,
+        scope: Scope,
+        request_id: str,
+        response_status: int,
+        start_time: float,
+        client_ip: str,
+        error: Optional[str] = None,
+    ) -> None:
+        from app.services.audit_sink import audit_sink
+
+        user_agent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"user-agent":
+                user_agent = value.decode("latin-1")[:512]
+                break
+        try:
+            audit_sink.submit(
+                event_type="http.request",
+                action=f"{scope['method']} {scope['path']}",
+                ip_address=client_ip,
+                user_agent=user_agent,
+                request_id=request_id,
+                status="success" if response_status < 400 else "failure",
+                metadata={
+                    "status_code": response_status,
+                    "duration_ms": int((time.perf_counter() - start_time) * 1000),
+                },
+                error_message=error,
+            )
+        except Exception as exc:
+            logger.warning(f"[{request_id}] audit sink unavailable: {exc}")
+
 
 # =============================================================================
 # ERROR REPORTING SERVICE
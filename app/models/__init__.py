@@ -1,10 +1,10 @@
 """SQLAlchemy models for FreightOps backend v2."""
 
 from app.models.automation import AutomationRule  # noqa: F401
-from app.models.company import Company  # noqa: F401
+from app.models.company import Company, DocumentSequence  # noqa: F401
 from app.models.driver import Driver, DriverIncident, DriverTraining, DriverDocument  # noqa: F401
 from app.models.fuel import FuelTransaction, JurisdictionRollup  # noqa: F401
-from app.models.notification import NotificationLog  # noqa: F401
+from app.models.notification import NotificationLog, NotificationOutbox  # noqa: F401
 from app.models.user_notification import UserNotification  # noqa: F401
 from app.models.load import Load, LoadStop  # noqa: F401
 from app.models.load_accessorial import LoadAccessorial  # noqa: F401
@@ -14,6 +14,10 @@ from app.models.factoring import FactoringProvider, FactoringTransaction  # noqa
 from app.models.banking import BankingAccount, BankingCard, BankingCustomer, BankingTransaction  # noqa: F401
 from app.models.collaboration import Channel, Message, Presence  # noqa: F401
 from app.models.document import DocumentProcessingJob  # noqa: F401
+from app.models.import_job import ImportJob  # noqa: F401
+from app.models.webhook_event import WebhookEvent  # noqa: F401
+from app.models.geocode_cache import GeocodeCacheEntry  # noqa: F401
+from app.models.pay_stub_job import PayStubJob  # noqa: F401
 from app.models.ai_usage import AIUsageLog, AIUsageQuota  # noqa: F401
 from app.models.ai_chat import AIConversation, AIMessage, AIContext  # noqa: F401
 from app.models.ai_task import AITask, AIToolExecution, AILearning  # noqa: F401
@@ -94,6 +98,7 @@ from app.models.hq_hr import (  # noqa: F401
 # HQ General Ledger Models
 from app.models.hq_general_ledger import (  # noqa: F401
     HQChartOfAccounts, HQJournalEntry, HQGeneralLedgerEntry,
+    HQAccountPeriodBalance, HQAccountPeriodSnapshot,
     HQUsageLog, HQRecurringBilling,
     AccountType, AccountSubtype, JournalEntryStatus,
     UsageMetricType, BillingFrequency,
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, JSON, Numeric, String, func
+from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Index, JSON, Numeric, String, func
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -10,9 +10,11 @@ class Invoice(Base):
     id = Column(String, primary_key=True)
     company_id = Column(String, ForeignKey("company.id"), nullable=False, index=True)
     load_id = Column(String, ForeignKey("freight_load.id"), nullable=True, index=True)
+    customer_id = Column(String, ForeignKey("accounting_customer.id"), nullable=True, index=True)
 
     invoice_number = Column(String, nullable=False, unique=True)
     invoice_date = Column(Date, nullable=False)
+    due_date = Column(Date, nullable=True)  # invoice_date plus the customer's payment terms
     status = Column(String, nullable=False, default="draft")
     subtotal = Column(Numeric(12, 2), nullable=False)
     tax = Column(Numeric(12, 2), nullable=False, default=0)
@@ -25,6 +27,18 @@ class Invoice(Base):
 
     company = relationship("Company")
     load = relationship("Load")
+    customer = relationship("Customer")
+
+    __table_args__ = (
+        # AR aging: open invoices of a company by due date, customer and total read from the index
+        Index(
+            "ix_accounting_invoice_company_status_due",
+            "company_id",
+            "status",
+            "due_date",
+            postgresql_include=["customer_id", "total"],
+        ),
+    )
 
 
 class LedgerEntry(Base):
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, func
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -67,3 +67,18 @@ class Company(Base):
     # Factoring
     factoring_providers = relationship("FactoringProvider", back_populates="company", cascade="all, delete-orphan")
 
+
+class DocumentSequence(Base):
+    """
+    Per-company document number counters (invoice, load, ...).
+
+    One small row per (company, sequence) bumped with UPDATE ... RETURNING, so
+    numbering never locks the company row and sequences don't block each other.
+    """
+
+    __tablename__ = "document_sequence"
+
+    company_id = Column(String, ForeignKey("company.id"), primary_key=True)
+    name = Column(String, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
@@ -9,11 +9,12 @@ Extends FreightOps for container drayage operations:
 - Port terminal configurations
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
 from sqlalchemy import (
     Column,
     String,
+    Date,
     DateTime,
     ForeignKey,
     Float,
@@ -571,3 +572,36 @@ class DrayageEvent(Base):
     __table_args__ = (
         Index("ix_event_container_type", "container_id", "event_type"),
     )
+
+
+# ==================== EXPOSURE SNAPSHOT ====================
+
+
+class DrayageExposureSnapshot(Base):
+    """
+    Nightly precomputed demurrage / per diem exposure for a tenant.
+
+    Holds today's accrued charges and tomorrow's projection across every open
+    container so dispatchers can see "what will we owe tomorrow" without
+    recomputing the whole portfolio.
+    """
+
+    __tablename__ = "drayage_exposure_snapshot"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    company_id: Mapped[str] = mapped_column(String(36), ForeignKey("company.id"), index=True)
+    snapshot_date: Mapped[date] = mapped_column(Date)
+
+    container_count: Mapped[int] = mapped_column(Integer, default=0)
+    incurring_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_today: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
+    total_tomorrow: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
+
+    summary: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # By port / warning level
+    containers: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)  # Per-container exposure rows
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("company_id", "snapshot_date", name="uq_exposure_snapshot_company_date"),
+    )
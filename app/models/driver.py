@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, JSON, String, func
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Index, JSON, String, func
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
 
 
 class Driver(Base):
+    __table_args__ = (
+        # Bulk import duplicate resolution (email / phone / CDL per tenant)
+        Index("ix_driver_company_email", "company_id", "email"),
+        Index("ix_driver_company_phone", "company_id", "phone"),
+        Index("ix_driver_company_cdl_number", "company_id", "cdl_number"),
+    )
+
     id = Column(String, primary_key=True)
     company_id = Column(String, ForeignKey("company.id"), nullable=False, index=True)
     user_id = Column(String, ForeignKey("user.id"), nullable=True, index=True)
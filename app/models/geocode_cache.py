@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, Float, String, Text, func
+
+from app.models.base import Base
+
+
+class GeocodeCacheEntry(Base):
+    """Cached geocoder answer: a normalized address (forward) or a quantized lat/lng cell (reverse)."""
+
+    __tablename__ = "geocode_cache"
+
+    kind = Column(String(16), primary_key=True)  # forward, reverse
+    lookup_key = Column(String, primary_key=True)  # Normalized address, or "lat,lng" rounded to the cell
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    formatted_address = Column(Text, nullable=True)
+    provider = Column(String(32), nullable=False, default="google")
+    refreshed_at = Column(DateTime, nullable=False, server_default=func.now())
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -12,6 +12,7 @@ from decimal import Decimal
 
 from sqlalchemy import (
     Column,
+    Date,
     DateTime,
     Enum,
     ForeignKey,
@@ -248,6 +249,59 @@ class HQGeneralLedgerEntry(Base):
     )
 
 
+# ============================================================================
+# Account Balances (what the financial reports read instead of the ledger)
+# ============================================================================
+
+class HQAccountPeriodBalance(Base):
+    """
+    Posted activity per account, day and tenant.
+
+    Maintained in the same transaction that posts a journal entry (a void posts
+    its reversing entry, so it lands here too). Reports sum these rows instead
+    of re-aggregating hq_general_ledger_entry.
+    """
+
+    __tablename__ = "hq_account_period_balance"
+
+    account_id = Column(String(36), ForeignKey("hq_chart_of_accounts.id"), primary_key=True)
+    period_date = Column(Date, primary_key=True)  # Transaction date of the journal entries
+    tenant_id = Column(String(36), primary_key=True, default="")  # "" when not attributed to a tenant
+
+    debit_total = Column(Numeric(14, 2), default=0, nullable=False)
+    credit_total = Column(Numeric(14, 2), default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_hq_apb_period_date", "period_date"),
+    )
+
+
+class HQAccountPeriodSnapshot(Base):
+    """
+    Cumulative account totals at the end of a closed period (month).
+
+    A balance as of any date is the latest snapshot on or before it plus the
+    daily activity after it. Entries posted later into a closed period adjust
+    the snapshots from that period on.
+    """
+
+    __tablename__ = "hq_account_period_snapshot"
+
+    account_id = Column(String(36), ForeignKey("hq_chart_of_accounts.id"), primary_key=True)
+    period_end = Column(Date, primary_key=True)  # Last day of the closed month
+
+    debit_total = Column(Numeric(14, 2), default=0, nullable=False)
+    credit_total = Column(Numeric(14, 2), default=0, nullable=False)
+
+    closed_at = Column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_hq_aps_period_end", "period_end"),
+    )
+
+
 # ============================================================================
 # Usage Logs (The "Meter" for dynamic billing)
 # ============================================================================
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, Text, func
+
+from app.models.base import Base
+
+
+class ImportJob(Base):
+    """Background bulk import (drivers, equipment, loads) with progress counters for polling."""
+
+    __tablename__ = "import_job"
+
+    id = Column(String, primary_key=True)
+    company_id = Column(String, ForeignKey("company.id"), nullable=False, index=True)
+    user_id = Column(String, nullable=True)
+
+    entity_type = Column(String, nullable=False)  # drivers, equipment, loads
+    filename = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="PENDING")  # PENDING, RUNNING, COMPLETED, FAILED
+
+    total_rows = Column(Integer, nullable=False, default=0)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    successful = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+
+    errors = Column(JSON, nullable=True)  # First N row errors
+    warnings = Column(JSON, nullable=True)  # First N warnings
+    error_message = Column(Text, nullable=True)  # Fatal error (job-level)
+
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, JSON, Numeric, String, func
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, JSON, Numeric, String, func
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -86,6 +86,10 @@ class Load(Base):
 
 class LoadStop(Base):
     __tablename__ = "freight_load_stop"
+    __table_args__ = (
+        # Dispatch calendar window scans
+        Index("ix_freight_load_stop_scheduled_at_load_id", "scheduled_at", "load_id"),
+    )
 
     id = Column(String, primary_key=True)
     load_id = Column(String, ForeignKey("freight_load.id"), nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, String, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -17,3 +17,26 @@ class NotificationLog(Base):
     company = relationship("Company")
     rule = relationship("AutomationRule")
 
+
+
+class NotificationOutbox(Base):
+    """Durable queue of outbound notifications - rows survive restarts until delivered or given up."""
+
+    __tablename__ = "notification_outbox"
+
+    id = Column(String, primary_key=True)
+    company_id = Column(String, ForeignKey("company.id"), nullable=False, index=True)
+    rule_id = Column(String, ForeignKey("automationrule.id"), nullable=True, index=True)
+    channel = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="PENDING")  # PENDING, SENDING, SENT, FAILED
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),)
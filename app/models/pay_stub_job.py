@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, JSON, String, Text, func
+
+from app.models.base import Base
+
+
+class PayStubJob(Base):
+    """Background pay-stub PDF generation for a settlement period, with progress counters for polling."""
+
+    __tablename__ = "pay_stub_job"
+
+    id = Column(String, primary_key=True)
+    company_id = Column(String, ForeignKey("company.id"), nullable=False, index=True)
+    user_id = Column(String, nullable=True)
+
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    status = Column(String, nullable=False, default="PENDING")  # PENDING, RUNNING, COMPLETED, FAILED
+
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    rendered = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)  # Content hash matched the stored stub
+    failed = Column(Integer, nullable=False, default=0)
+
+    errors = Column(JSON, nullable=True)  # First N per-settlement errors
+    error_message = Column(Text, nullable=True)  # Fatal error (job-level)
+
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
@@ -90,6 +90,11 @@ class ContainerTracking(Base):
     
     # Metadata
     raw_data = Column(JSON, nullable=True)  # Raw response from port API
+
+    # Adaptive polling state (see app/services/port/tracking_poller.py)
+    last_changed_at = Column(DateTime, nullable=True)  # Last poll that changed status/holds/dates
+    unchanged_polls = Column(Integer, nullable=False, default=0)  # Consecutive polls with no change
+    next_poll_at = Column(DateTime, nullable=True, index=True)  # Null = poll on next cycle
     last_updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
     
     created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, String, Text, UniqueConstraint, func
+
+from app.models.base import Base
+
+
+class WebhookEvent(Base):
+    """Inbound provider webhook, stored before acknowledging and processed asynchronously."""
+
+    __tablename__ = "webhook_event"
+
+    id = Column(String, primary_key=True)
+    provider = Column(String, nullable=False)  # motive, synctera, plaid, stripe
+    idempotency_key = Column(String, nullable=False)  # Provider event id, or a hash of the raw body and receive window
+    event_type = Column(String, nullable=True)
+    company_id = Column(String, nullable=True, index=True)
+    company_integration_id = Column(String, nullable=True)
+    payload = Column(JSON, nullable=False)
+
+    status = Column(String, nullable=False, default="PENDING")  # PENDING, PROCESSING, DONE, FAILED
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    processed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("provider", "idempotency_key", name="uq_webhook_event_provider_key"),
+        Index("ix_webhook_event_status_next_attempt", "status", "next_attempt_at"),
+    )
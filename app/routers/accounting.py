@@ -1,6 +1,7 @@
+from datetime import date
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
@@ -96,7 +97,10 @@ async def create_invoice(
     services: tuple[LedgerService, InvoiceService, SettlementService, AccountingReportService, CustomerService] = Depends(_accounting_services),
 ) -> InvoiceResponse:
     _, invoice_service, _, _, _ = services
-    invoice = await invoice_service.create_invoice(company_id, payload)
+    try:
+        invoice = await invoice_service.create_invoice(company_id, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
     return InvoiceResponse.model_validate(invoice)
 
 
@@ -137,12 +141,15 @@ async def get_basic_report(
 # Customer endpoints
 @router.get("/customers/summary", response_model=CustomersSummaryResponse)
 async def get_customers_summary(
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    as_of: date | None = Query(None, description="Age receivables as of this date (default today)"),
     company_id: str = Depends(_company_id),
     services: tuple[LedgerService, InvoiceService, SettlementService, AccountingReportService, CustomerService] = Depends(_accounting_services),
 ) -> CustomersSummaryResponse:
-    """Get summary of all customers with metrics."""
+    """Get summary of all customers with metrics and a page of customers with AR aging."""
     _, _, _, _, customer_service = services
-    return await customer_service.get_customers_summary(company_id)
+    return await customer_service.get_customers_summary(company_id, limit=limit, offset=offset, as_of=as_of)
 
 
 @router.get("/customers", response_model=List[CustomerResponse])
@@ -160,13 +167,14 @@ async def list_customers(
 @router.get("/customers/{customer_id}/summary", response_model=CustomerSummary)
 async def get_customer_summary(
     customer_id: str,
+    as_of: date | None = Query(None, description="Age receivables as of this date (default today)"),
     company_id: str = Depends(_company_id),
     services: tuple[LedgerService, InvoiceService, SettlementService, AccountingReportService, CustomerService] = Depends(_accounting_services),
 ) -> CustomerSummary:
     """Get customer summary with outstanding amounts."""
     _, _, _, _, customer_service = services
     try:
-        return await customer_service.get_customer_summary(company_id, customer_id)
+        return await customer_service.get_customer_summary(company_id, customer_id, as_of)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
 
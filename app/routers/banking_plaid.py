@@ -4,13 +4,14 @@ Banking Plaid Integration API Endpoints
 Handles connecting external bank accounts via Plaid.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.core.db import get_db
+from app.services import plaid_sync
 from app.services.plaid_service import PlaidService
 
 
@@ -56,6 +57,21 @@ class SyncTransactionsResponse(BaseModel):
     has_more: bool
 
 
+class ItemSyncResult(BaseModel):
+    """Result of syncing one Plaid item in a bulk sync."""
+    status: str  # synced or failed
+    added: int = 0
+    modified: int = 0
+    removed: int = 0
+    pages: int = 0
+    error: Optional[str] = None
+
+
+class SyncAllTransactionsResponse(BaseModel):
+    """Bulk transaction sync response, keyed by Plaid item ID."""
+    items: Dict[str, ItemSyncResult]
+
+
 class ConnectedBankResponse(BaseModel):
     """Connected bank info."""
     id: str
@@ -198,6 +214,21 @@ async def sync_transactions(
         )
 
 
+@router.post("/sync-transactions", response_model=SyncAllTransactionsResponse)
+async def sync_all_transactions(
+    current_user=Depends(deps.get_current_user),
+):
+    """
+    Sync transactions for every bank the company has connected.
+
+    Items sync concurrently; an item that fails is reported in its entry
+    instead of failing the whole request.
+    """
+    service = PlaidService()
+    items = await plaid_sync.sync_company(service, current_user.company_id)
+    return {"items": items}
+
+
 @router.get("/connected-banks", response_model=List[ConnectedBankResponse])
 async def get_connected_banks(
     current_user=Depends(deps.get_current_user),
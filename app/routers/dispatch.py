@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.core.db import get_db
 from app.schemas.dispatch import DispatchCalendarResponse, DispatchFiltersResponse
-from app.schemas.matching import MatchingResponse
+from app.schemas.matching import BatchMatchingRequest, BatchMatchingResponse, MatchingResponse
 from app.services.dispatch import DispatchService
 from app.services.matching import MatchingService
 
@@ -21,16 +24,27 @@ async def _company_id(current_user=Depends(deps.get_current_user)) -> str:
 
 @router.get("/calendar", response_model=DispatchCalendarResponse)
 async def get_calendar(
-    company_id: str = Depends(_company_id), service: DispatchService = Depends(_dispatch_service)
+    start: datetime = Query(..., description="Window start (inclusive)"),
+    end: datetime = Query(..., description="Window end (exclusive)"),
+    company_id: str = Depends(_company_id),
+    service: DispatchService = Depends(_dispatch_service),
 ) -> DispatchCalendarResponse:
-    return await service.calendar(company_id)
+    try:
+        return await service.calendar(company_id, start, end)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
 
 @router.get("/filters", response_model=DispatchFiltersResponse)
 async def get_filters(
-    company_id: str = Depends(_company_id), service: DispatchService = Depends(_dispatch_service)
+    start: Optional[datetime] = Query(None, description="Only count loads on the calendar from here"),
+    end: Optional[datetime] = Query(None, description="Only count loads on the calendar until here"),
+    company_id: str = Depends(_company_id),
+    service: DispatchService = Depends(_dispatch_service),
 ) -> DispatchFiltersResponse:
-    return await service.filters(company_id)
+    if (start is None) != (end is None) or (start is not None and end <= start):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Give both start and end, with end after start")
+    return await service.filters(company_id, start, end)
 
 
 @router.get("/loads/{load_id}/matching", response_model=MatchingResponse)
@@ -46,3 +60,16 @@ async def match_load(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
 
 
+
+
+@router.post("/matching/batch", response_model=BatchMatchingResponse)
+async def match_loads_batch(
+    payload: BatchMatchingRequest,
+    company_id: str = Depends(_company_id),
+    db: AsyncSession = Depends(get_db),
+) -> BatchMatchingResponse:
+    service = MatchingService(db)
+    try:
+        return await service.assign_batch(company_id, payload.load_ids, payload.min_score)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
@@ -5,10 +5,11 @@ Provides endpoints for container drayage operations including:
 - Container lifecycle management
 - Chassis pool configuration
 - Chassis usage tracking
+- Demurrage / per diem exposure
 - Container lookup via port APIs
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 from uuid import uuid4
 
@@ -26,6 +27,7 @@ from app.models.drayage import (
     DrayageEvent,
 )
 from app.routers.drayage.container_lookup import router as container_lookup_router
+from app.services.drayage.exposure_service import DemurrageExposureEngine
 
 # Main router that combines all drayage routes
 router = APIRouter()
@@ -643,4 +645,47 @@ async def return_chassis(
     return _chassis_usage_to_dict(usage)
 
 
+# =============================================================================
+# Exposure Endpoints
+# =============================================================================
+
+
+@router.get("/exposure", summary="Live demurrage / per diem exposure")
+async def get_exposure(
+    company_id: str = Depends(_company_id),
+    db: AsyncSession = Depends(_db),
+    as_of: Optional[date] = None,
+    limit: int = 100,
+) -> dict:
+    """Exposure for every open container, ranked by tomorrow's total."""
+    exposure = await DemurrageExposureEngine(db).compute_for_company(company_id, as_of=as_of)
+    return exposure.to_dict(limit=limit)
+
+
+@router.get("/exposure/snapshot", summary="Nightly exposure snapshot")
+async def get_exposure_snapshot(
+    company_id: str = Depends(_company_id),
+    db: AsyncSession = Depends(_db),
+    snapshot_date: Optional[date] = None,
+) -> dict:
+    """Latest nightly exposure snapshot, or the one for a specific date."""
+    snapshot = await DemurrageExposureEngine(db).latest_snapshot(company_id, snapshot_date)
+    if not snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No exposure snapshot found",
+        )
+    return {
+        "company_id": snapshot.company_id,
+        "snapshot_date": snapshot.snapshot_date.isoformat(),
+        "container_count": snapshot.container_count,
+        "incurring_count": snapshot.incurring_count,
+        "total_today": float(snapshot.total_today),
+        "total_tomorrow": float(snapshot.total_tomorrow),
+        "summary": snapshot.summary or {},
+        "containers": snapshot.containers or [],
+        "created_at": snapshot.created_at.isoformat() if snapshot.created_at else None,
+    }
+
+
 __all__ = ["router", "container_lookup_router"]
@@ -156,7 +156,9 @@ async def bulk_update_locations(
     results = await service.bulk_update_locations(company_id, payload.updates)
     return {
         "updated": results["updated"],
+        "unchanged": results["unchanged"],
         "failed": results["failed"],
+        "results": results["results"],
         "timestamp": datetime.utcnow().isoformat(),
     }
 
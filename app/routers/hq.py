@@ -1044,13 +1044,12 @@ async def calculate_tenant_mrr_endpoint(
 
 @router.post("/tenants/calculate-all-mrr", response_model=HQTenantBatchMRRResponse)
 async def calculate_all_tenant_mrr_endpoint(
-    limit: int = 100,
     current_employee: HQEmployee = Depends(require_hq_permission("manage_tenants")),
     db: AsyncSession = Depends(get_db),
 ):
     """Batch calculate MRR for all active tenants (requires admin permission)."""
     tenant_service = HQTenantService(db)
-    result = await tenant_service.calculate_all_tenant_mrr(limit=limit)
+    result = await tenant_service.calculate_all_tenant_mrr()
     return result
 
 
@@ -10,7 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.core.db import get_db
-from app.schemas.imports import ImportError, ImportResult
+from app.schemas.imports import ImportError, ImportJobResponse, ImportResult
+from app.services.bulk_import import ENTITY_TYPES, get_import_job, start_import_job
 from app.services.import_service import ImportService
 
 router = APIRouter()
@@ -337,6 +338,58 @@ async def import_loads(
         )
 
 
+@router.post("/{entity_type}/jobs", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_import_job(
+    entity_type: str,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(deps.get_current_user),
+) -> ImportJobResponse:
+    """
+    Start a background import for large files (drivers, equipment or loads).
+
+    The file is parsed and validated in a streaming fashion, duplicates are resolved
+    with one query per batch, and rows are bulk-inserted. Poll
+    GET /imports/jobs/{job_id} for progress.
+    """
+    if entity_type not in ENTITY_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid entity type: {entity_type}. Must be one of: {', '.join(ENTITY_TYPES)}",
+        )
+
+    valid_extensions = (".csv", ".xlsx", ".xls")
+    if not file.filename.lower().endswith(valid_extensions):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only CSV and Excel files are supported (.csv, .xlsx, .xls)",
+        )
+
+    file_bytes = await file.read()
+    job = await start_import_job(
+        db,
+        company_id=current_user.company_id,
+        user_id=current_user.id,
+        entity_type=entity_type,
+        file_bytes=file_bytes,
+        filename=file.filename,
+    )
+    return ImportJobResponse.model_validate(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ImportJobResponse)
+async def get_import_job_status(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    company_id: str = Depends(_company_id),
+) -> ImportJobResponse:
+    """Get progress of a background import job."""
+    job = await get_import_job(db, company_id, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+    return ImportJobResponse.model_validate(job)
+
+
 @router.get("/templates/{entity_type}")
 async def download_template(
     entity_type: str,
@@ -32,6 +32,7 @@ from app.models.integration import CompanyIntegration, Integration
 
 settings = get_settings()
 from app.models.user import User
+from app.services.outbound_http import outbound
 
 logger = logging.getLogger(__name__)
 
@@ -186,7 +187,7 @@ async def refresh_atob_token(
         )
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             response = await client.post(
                 ATOB_TOKEN_URL,
                 data={
@@ -293,7 +294,7 @@ async def oauth_callback(
     redirect_uri = f"{settings.get_api_base_url()}/integrations/atob/callback"
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             response = await client.post(
                 ATOB_TOKEN_URL,
                 data={
@@ -397,7 +398,7 @@ async def disconnect(
     # Revoke token with AtoB
     if integration.access_token:
         try:
-            async with httpx.AsyncClient() as client:
+            async with outbound.client("atob") as client:
                 await client.post(
                     f"{ATOB_API_BASE}/oauth/revoke",
                     headers={"Authorization": f"Bearer {integration.access_token}"},
@@ -469,7 +470,7 @@ async def list_cards(
     access_token = await get_valid_access_token(integration, db)
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             params = {}
             if status_filter:
                 params["status"] = status_filter
@@ -516,7 +517,7 @@ async def create_card(
     access_token = await get_valid_access_token(integration, db)
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             response = await client.post(
                 f"{ATOB_API_BASE}/cards",
                 json={
@@ -563,7 +564,7 @@ async def update_card(
     update_data = request.model_dump(exclude_none=True)
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             response = await client.patch(
                 f"{ATOB_API_BASE}/cards/{card_id}",
                 json=update_data,
@@ -600,7 +601,7 @@ async def block_card(
     access_token = await get_valid_access_token(integration, db)
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             response = await client.post(
                 f"{ATOB_API_BASE}/cards/{card_id}/block",
                 json={"reason": reason},
@@ -636,7 +637,7 @@ async def unblock_card(
     access_token = await get_valid_access_token(integration, db)
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             response = await client.post(
                 f"{ATOB_API_BASE}/cards/{card_id}/unblock",
                 headers={"Authorization": f"Bearer {access_token}"},
@@ -684,7 +685,7 @@ async def get_transactions(
     access_token = await get_valid_access_token(integration, db)
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             params = {
                 "start_date": start_date.isoformat(),
                 "end_date": end_date.isoformat(),
@@ -747,7 +748,7 @@ async def get_alerts(
     access_token = await get_valid_access_token(integration, db)
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             params = {}
             if severity:
                 params["severity"] = severity
@@ -791,7 +792,7 @@ async def resolve_alert(
     access_token = await get_valid_access_token(integration, db)
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             response = await client.post(
                 f"{ATOB_API_BASE}/alerts/{alert_id}/resolve",
                 json={"resolution_note": resolution_note},
@@ -837,7 +838,7 @@ async def configure_telematics(
     access_token = await get_valid_access_token(integration, db)
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("atob") as client:
             response = await client.post(
                 f"{ATOB_API_BASE}/telematics/configure",
                 json=config.model_dump(exclude_none=True),
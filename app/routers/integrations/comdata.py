@@ -29,6 +29,7 @@ from app.models.integration import CompanyIntegration, Integration
 
 settings = get_settings()
 from app.models.user import User
+from app.services.outbound_http import outbound
 
 logger = logging.getLogger(__name__)
 
@@ -176,7 +177,7 @@ async def connect_comdata(
 
     # Validate credentials with Comdata API
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("comdata") as client:
             # Comdata validation endpoint
             # Note: Actual endpoint requires Comdata API agreement
             response = await client.post(
@@ -330,7 +331,7 @@ async def list_cards(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("comdata") as client:
             headers = await get_comdata_auth_header(credentials)
             params = {"account_code": credentials.get("account_code")}
             if card_type:
@@ -374,7 +375,7 @@ async def get_card_details(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("comdata") as client:
             headers = await get_comdata_auth_header(credentials)
 
             response = await client.get(
@@ -423,7 +424,7 @@ async def update_card_limits(
     update_data = limits.model_dump(exclude_none=True)
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("comdata") as client:
             headers = await get_comdata_auth_header(credentials)
 
             response = await client.put(
@@ -462,7 +463,7 @@ async def block_card(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("comdata") as client:
             headers = await get_comdata_auth_header(credentials)
 
             response = await client.post(
@@ -510,7 +511,7 @@ async def get_transactions(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("comdata") as client:
             headers = await get_comdata_auth_header(credentials)
             params = {
                 "account_code": credentials.get("account_code"),
@@ -570,7 +571,7 @@ async def create_express_code(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("comdata") as client:
             headers = await get_comdata_auth_header(credentials)
 
             response = await client.post(
@@ -625,7 +626,7 @@ async def list_express_codes(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("comdata") as client:
             headers = await get_comdata_auth_header(credentials)
             params = {"account_code": credentials.get("account_code")}
             if status_filter:
@@ -666,7 +667,7 @@ async def void_express_code(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("comdata") as client:
             headers = await get_comdata_auth_header(credentials)
 
             response = await client.delete(
@@ -29,6 +29,7 @@ from app.models.integration import CompanyIntegration, Integration
 
 settings = get_settings()
 from app.models.user import User
+from app.services.outbound_http import outbound
 
 logger = logging.getLogger(__name__)
 
@@ -141,7 +142,7 @@ async def connect_efs(
 
     # Validate credentials with EFS API
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("efs") as client:
             # EFS API endpoint for validation
             # Note: Actual endpoint requires EFS API access agreement
             response = await client.post(
@@ -296,7 +297,7 @@ async def list_fuel_cards(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("efs") as client:
             response = await client.get(
                 "https://api.efsllc.com/v1/cards",
                 params={"carrier_code": credentials.get("carrier_code")},
@@ -349,7 +350,7 @@ async def update_card_limits(
         update_data["product_restrictions"] = product_restrictions
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("efs") as client:
             response = await client.put(
                 f"https://api.efsllc.com/v1/cards/{card_number}/limits",
                 json=update_data,
@@ -397,7 +398,7 @@ async def get_transactions(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("efs") as client:
             params = {
                 "carrier_code": credentials.get("carrier_code"),
                 "start_date": start_date.isoformat(),
@@ -454,7 +455,7 @@ async def create_money_code(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("efs") as client:
             response = await client.post(
                 "https://api.efsllc.com/v1/money-codes",
                 json={
@@ -503,7 +504,7 @@ async def list_money_codes(
     credentials = integration.credentials
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("efs") as client:
             params = {"carrier_code": credentials.get("carrier_code")}
             if status_filter:
                 params["status"] = status_filter
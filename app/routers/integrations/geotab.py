@@ -26,6 +26,7 @@ from app.api.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.integration import CompanyIntegration, Integration
 from app.core.config import get_settings
+from app.services.outbound_http import ProviderClient, outbound
 
 settings = get_settings()
 router = APIRouter(prefix="/integrations/geotab", tags=["integrations-geotab"])
@@ -68,7 +69,7 @@ async def connect_geotab(
         )
 
     # Authenticate to Geotab
-    async with httpx.AsyncClient() as client:
+    async with outbound.client("geotab") as client:
         try:
             response = await client.post(
                 "https://my.geotab.com/apiv1",
@@ -199,7 +200,7 @@ async def refresh_geotab_session(
             detail="Missing credentials for re-authentication. Please reconnect."
         )
 
-    async with httpx.AsyncClient() as client:
+    async with outbound.client("geotab") as client:
         try:
             response = await client.post(
                 "https://my.geotab.com/apiv1",
@@ -246,7 +247,7 @@ async def refresh_geotab_session(
 async def get_geotab_client(
     company_integration: CompanyIntegration,
     db: AsyncSession
-) -> tuple[httpx.AsyncClient, str, str]:
+) -> tuple[ProviderClient, str, str]:
     """
     Get authenticated Geotab API client.
 
@@ -265,7 +266,8 @@ async def get_geotab_client(
     server = config.get("server", "my.geotab.com")
     database = config.get("database")
 
-    client = httpx.AsyncClient(
+    client = outbound.client(
+        "geotab",
         base_url=f"https://{server}",
         timeout=30.0
     )
@@ -338,8 +340,6 @@ async def sync_geotab_vehicles(
             status_code=400,
             detail=f"Failed to sync vehicles: {e.response.text}"
         )
-    finally:
-        await client.aclose()
 
 
 @router.post("/{integration_id}/sync/drivers")
@@ -407,8 +407,6 @@ async def sync_geotab_drivers(
             status_code=400,
             detail=f"Failed to sync drivers: {e.response.text}"
         )
-    finally:
-        await client.aclose()
 
 
 @router.delete("/{integration_id}")
@@ -25,6 +25,7 @@ from app.api.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.integration import CompanyIntegration, Integration
 from app.core.config import get_settings
+from app.services.outbound_http import ProviderClient, outbound
 
 settings = get_settings()
 router = APIRouter(prefix="/integrations/gusto", tags=["integrations-gusto"])
@@ -103,7 +104,7 @@ async def gusto_oauth_callback(
     api_base_url = "https://api.gusto-demo.com" if settings.environment == "development" else "https://api.gusto.com"
 
     # Exchange code for tokens
-    async with httpx.AsyncClient() as client:
+    async with outbound.client("gusto") as client:
         try:
             response = await client.post(
                 f"{api_base_url}/oauth/token",
@@ -125,7 +126,7 @@ async def gusto_oauth_callback(
             )
 
     # Get company information
-    async with httpx.AsyncClient() as client:
+    async with outbound.client("gusto") as client:
         try:
             me_response = await client.get(
                 f"{api_base_url}/v1/me",
@@ -220,7 +221,7 @@ async def refresh_gusto_token(
 
     api_base_url = "https://api.gusto-demo.com" if settings.environment == "development" else "https://api.gusto.com"
 
-    async with httpx.AsyncClient() as client:
+    async with outbound.client("gusto") as client:
         try:
             response = await client.post(
                 f"{api_base_url}/oauth/token",
@@ -254,7 +255,7 @@ async def refresh_gusto_token(
 async def get_gusto_client(
     company_integration: CompanyIntegration,
     db: AsyncSession
-) -> httpx.AsyncClient:
+) -> ProviderClient:
     """Get authenticated Gusto API client with automatic token refresh."""
     if company_integration.token_expires_at:
         if datetime.utcnow() >= company_integration.token_expires_at - timedelta(minutes=5):
@@ -266,7 +267,8 @@ async def get_gusto_client(
 
     api_base_url = "https://api.gusto-demo.com" if settings.environment == "development" else "https://api.gusto.com"
 
-    client = httpx.AsyncClient(
+    client = outbound.client(
+        "gusto",
         base_url=f"{api_base_url}/v1",
         headers={
             "Authorization": f"Bearer {access_token}",
@@ -328,8 +330,6 @@ async def sync_gusto_employees(
             status_code=400,
             detail=f"Failed to sync employees: {e.response.text}"
         )
-    finally:
-        await client.aclose()
 
 
 @router.post("/{integration_id}/sync/payrolls")
@@ -381,8 +381,6 @@ async def sync_gusto_payrolls(
             status_code=400,
             detail=f"Failed to sync payrolls: {e.response.text}"
         )
-    finally:
-        await client.aclose()
 
 
 @router.delete("/{integration_id}")
@@ -11,6 +11,7 @@ Supported Providers:
 Key Features:
 - API key-based authentication
 - Search and import available loads
+- Aggregated search across every connected board (merged and ranked)
 - Post available trucks/capacity
 - Real-time freight matching
 - Rate analytics and market insights
@@ -18,10 +19,12 @@ Key Features:
 Authentication: API Key or OAuth depending on provider
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import httpx
+import json
 from datetime import datetime
 from typing import Literal
 
@@ -29,6 +32,8 @@ from app.api.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.integration import CompanyIntegration, Integration
 from app.core.config import get_settings
+from app.services import loadboard_search
+from app.services.outbound_http import ProviderClient
 
 settings = get_settings()
 router = APIRouter(prefix="/integrations/loadboards", tags=["integrations-loadboards"])
@@ -178,34 +183,67 @@ async def connect_loadboard(
 async def get_loadboard_client(
     company_integration: CompanyIntegration,
     provider: LoadBoardProvider
-) -> httpx.AsyncClient:
+) -> ProviderClient:
     """Get authenticated load board API client."""
     config = get_provider_config(provider)
+    return loadboard_search.loadboard_client(company_integration, provider, config["api_base_url"])
 
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
 
-    # Add authentication based on provider
-    if provider == "dat":
-        # DAT uses API Key in Authorization header
-        headers["Authorization"] = f"Bearer {company_integration.api_key}"
-    elif provider == "truckstop":
-        # Truckstop uses OAuth2 - would need to implement token exchange
-        # For now, use API key placeholder
-        headers["Authorization"] = f"Bearer {company_integration.api_key}"
-    elif provider == "123loadboard":
-        # 123LoadBoard uses API Key in custom header
-        headers["X-API-Key"] = company_integration.api_key
-
-    client = httpx.AsyncClient(
-        base_url=config["api_base_url"],
-        headers=headers,
-        timeout=30.0
-    )
+@router.post("/search/loads")
+async def search_all_loadboards(
+    search_params: dict = Body(
+        ...,
+        example={
+            "origin_city": "Dallas",
+            "origin_state": "TX",
+            "destination_city": "Los Angeles",
+            "destination_state": "CA",
+            "equipment_type": "Dry Van",
+            "max_age_hours": 24,
+            "truck_lat": 32.7767,
+            "truck_lng": -96.7970
+        }
+    ),
+    stream: bool = Query(False, description="Stream NDJSON: one line per board as it answers, then the merged list"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Search every connected load board at once.
+
+    Boards are queried concurrently, each with its own deadline; a board that
+    times out or errors is reported in `providers` instead of failing the
+    search. Loads posted on several boards are merged (see `sources`) and the
+    list is ranked by effective rate per mile (rate over loaded + deadhead
+    miles), then by deadhead. Pass truck_lat/truck_lng to compute deadhead
+    where a board doesn't return it.
+    """
+    connections = [
+        loadboard_search.LoadBoardConnection(provider, get_provider_config(provider)["api_base_url"], company_integration)
+        for provider, company_integration in await loadboard_search.connected_loadboards(db, current_user.company_id)
+    ]
+    if not connections:
+        raise HTTPException(status_code=404, detail="No load boards connected")
+
+    if not stream:
+        results = [result async for result in loadboard_search.search(connections, search_params)]
+        loads = loadboard_search.merge_results(results)
+        return {
+            "status": "success",
+            "providers": [result.as_dict() for result in results],
+            "loads": loads,
+            "total_count": len(loads),
+        }
+
+    async def ndjson():
+        results = []
+        async for result in loadboard_search.search(connections, search_params):
+            results.append(result)
+            yield json.dumps({"type": "provider", **result.as_dict(), "loads": result.loads}, default=str) + "\n"
+        loads = loadboard_search.merge_results(results)
+        yield json.dumps({"type": "merged", "loads": loads, "total_count": len(loads)}, default=str) + "\n"
 
-    return client
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 
 @router.post("/{provider}/{integration_id}/search/loads")
@@ -290,8 +328,6 @@ async def search_loads(
             "total_count": 0,
             "message": f"{provider.upper()} integration is in development mode. API credentials not yet configured."
         }
-    finally:
-        await client.aclose()
 
 
 @router.post("/{provider}/{integration_id}/post/capacity")
@@ -365,8 +401,6 @@ async def post_truck_capacity(
             "provider": provider,
             "message": f"{provider.upper()} integration is in development mode"
         }
-    finally:
-        await client.aclose()
 
 
 @router.delete("/{provider}/{integration_id}")
@@ -390,6 +424,7 @@ async def disconnect_loadboard(
 
     await db.delete(company_integration)
     await db.commit()
+    loadboard_search.invalidate_lane_cache(integration_id)
 
     config = get_provider_config(provider)
 
@@ -26,6 +26,7 @@ from app.api.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.integration import CompanyIntegration, Integration
 from app.core.config import get_settings
+from app.services.outbound_http import ProviderClient, outbound
 
 settings = get_settings()
 router = APIRouter(prefix="/integrations/xero", tags=["integrations-xero"])
@@ -102,7 +103,7 @@ async def xero_oauth_callback(
     # Exchange code for tokens
     redirect_uri = f"{settings.get_api_base_url()}/integrations/xero/callback"
 
-    async with httpx.AsyncClient() as client:
+    async with outbound.client("xero") as client:
         try:
             response = await client.post(
                 "https://identity.xero.com/connect/token",
@@ -123,7 +124,7 @@ async def xero_oauth_callback(
             )
 
     # Get tenant connections (Xero organizations)
-    async with httpx.AsyncClient() as client:
+    async with outbound.client("xero") as client:
         try:
             connections_response = await client.get(
                 "https://api.xero.com/connections",
@@ -223,7 +224,7 @@ async def refresh_xero_token(
             detail="No refresh token available. Please re-authorize."
         )
 
-    async with httpx.AsyncClient() as client:
+    async with outbound.client("xero") as client:
         try:
             response = await client.post(
                 "https://identity.xero.com/connect/token",
@@ -257,7 +258,7 @@ async def refresh_xero_token(
 async def get_xero_client(
     company_integration: CompanyIntegration,
     db: AsyncSession
-) -> httpx.AsyncClient:
+) -> ProviderClient:
     """Get authenticated Xero API client with automatic token refresh."""
     # Check if token needs refresh (refresh 5 minutes before expiry)
     if company_integration.token_expires_at:
@@ -270,7 +271,8 @@ async def get_xero_client(
 
     tenant_id = company_integration.config.get("tenant_id") if company_integration.config else None
 
-    client = httpx.AsyncClient(
+    client = outbound.client(
+        "xero",
         base_url="https://api.xero.com/api.xro/2.0",
         headers={
             "Authorization": f"Bearer {access_token}",
@@ -337,8 +339,6 @@ async def sync_xero_contacts(
             status_code=400,
             detail=f"Failed to sync contacts: {e.response.text}"
         )
-    finally:
-        await client.aclose()
 
 
 @router.post("/{integration_id}/sync/invoices")
@@ -394,8 +394,6 @@ async def sync_xero_invoices(
             status_code=400,
             detail=f"Failed to sync invoices: {e.response.text}"
         )
-    finally:
-        await client.aclose()
 
 
 @router.delete("/{integration_id}")
@@ -418,7 +416,7 @@ async def disconnect_xero(
 
     # Revoke Xero token
     if company_integration.access_token:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("xero") as client:
             try:
                 await client.post(
                     "https://identity.xero.com/connect/revocation",
@@ -3,7 +3,7 @@
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
@@ -11,9 +11,12 @@ from app.core.db import get_db
 from app.models.user import User
 from app.models.driver import Driver
 from app.services.settlements import SettlementsService
+from app.services.pay_stubs import get_pay_stub_job, start_pay_stub_job
 from app.schemas.settlements import (
     CurrentWeekSettlementResponse,
     SettlementHistoryResponse,
+    PayStubJobCreate,
+    PayStubJobResponse,
     PayStubListResponse,
     WeekSummaryResponse,
 )
@@ -184,7 +187,7 @@ async def download_pay_stub(
     if pdf_bytes is None:
         raise HTTPException(
             status_code=404,
-            detail="Pay stub not found or PDF generation not available"
+            detail="Pay stub not found"
         )
 
     return Response(
@@ -194,3 +197,50 @@ async def download_pay_stub(
             "Content-Disposition": f"attachment; filename=paystub_{settlement_id}.pdf"
         },
     )
+
+
+def _require_settlement_admin(user: User) -> None:
+    if not (user.role and user.role.upper() in ["ADMIN", "OWNER", "TENANT_ADMIN"]):
+        raise HTTPException(status_code=403, detail="Not authorized to generate pay stubs")
+
+
+@router.post("/paystubs/jobs", response_model=PayStubJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_pay_stub_job(
+    payload: PayStubJobCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Generate every driver's pay stub for a settlement period in the background.
+
+    Stubs render on the document process pool and are uploaded to storage;
+    settlements whose stub content hasn't changed since the last run are
+    skipped. Progress is pushed over the WebSocket as `pay_stub_job`
+    messages; GET /settlements/paystubs/jobs/{job_id} returns the same counters.
+    """
+    _require_settlement_admin(current_user)
+    try:
+        job = await start_pay_stub_job(
+            db,
+            company_id=current_user.company_id,
+            user_id=current_user.id,
+            period_start=payload.period_start,
+            period_end=payload.period_end,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return PayStubJobResponse.model_validate(job)
+
+
+@router.get("/paystubs/jobs/{job_id}", response_model=PayStubJobResponse)
+async def get_pay_stub_job_status(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get progress of a background pay-stub job."""
+    _require_settlement_admin(current_user)
+    job = await get_pay_stub_job(db, current_user.company_id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Pay stub job not found")
+    return PayStubJobResponse.model_validate(job)
@@ -2,19 +2,24 @@
 
 import hmac
 import hashlib
+import json
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Header, Request, status
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.core.db import get_db
 from app.core.config import get_settings
 from app.models.integration import CompanyIntegration, Integration
+from app.models.webhook_event import WebhookEvent
+from app.services.webhook_inbox import idempotency_key, kick_webhook_worker, record_webhook_event, webhook_processor
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -64,36 +69,39 @@ async def handle_synctera_webhook(
             )
 
     try:
-        payload = await request.json()
+        payload = json.loads(body)
     except Exception as e:
         logger.error(f"Failed to parse Synctera webhook: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
 
     event_type = payload.get("event_type", "")
     event_id = payload.get("id", "unknown")
-    data = payload.get("data", {})
 
     logger.info(f"Received Synctera webhook: {event_type} (id: {event_id})")
 
-    try:
-        if event_type == "BUSINESS.VERIFICATION_RESULT":
-            await _handle_synctera_business_verification(data, db)
-        elif event_type == "PERSON.VERIFICATION_RESULT":
-            await _handle_synctera_person_verification(data, db)
-        elif event_type == "ACCOUNT.STATUS_CHANGE":
-            await _handle_synctera_account_status(data, db)
-        elif event_type == "CARD.STATUS_CHANGE":
-            await _handle_synctera_card_status(data, db)
-        elif event_type.startswith("TRANSACTION."):
-            await _handle_synctera_transaction(event_type, data, db)
-        else:
-            logger.info(f"Unhandled Synctera event type: {event_type}")
+    await record_webhook_event(db, "synctera", idempotency_key(body, payload.get("id")), payload, event_type=event_type)
+    kick_webhook_worker()
+    return {"status": "ok", "event_id": event_id}
 
-        return {"status": "ok", "event_id": event_id}
 
-    except Exception as e:
-        logger.error(f"Error processing Synctera webhook {event_type}: {e}", exc_info=True)
-        return {"status": "error", "message": str(e)}
+@webhook_processor("synctera")
+async def _process_synctera_event(db: AsyncSession, event: WebhookEvent) -> None:
+    payload = event.payload
+    event_type = payload.get("event_type", "")
+    data = payload.get("data", {})
+
+    if event_type == "BUSINESS.VERIFICATION_RESULT":
+        await _handle_synctera_business_verification(data, db)
+    elif event_type == "PERSON.VERIFICATION_RESULT":
+        await _handle_synctera_person_verification(data, db)
+    elif event_type == "ACCOUNT.STATUS_CHANGE":
+        await _handle_synctera_account_status(data, db)
+    elif event_type == "CARD.STATUS_CHANGE":
+        await _handle_synctera_card_status(data, db)
+    elif event_type.startswith("TRANSACTION."):
+        await _handle_synctera_transaction(event_type, data, db)
+    else:
+        logger.info(f"Unhandled Synctera event type: {event_type}")
 
 
 async def _handle_synctera_business_verification(data: Dict[str, Any], db: AsyncSession) -> None:
@@ -223,6 +231,10 @@ async def _handle_synctera_transaction(event_type: str, data: Dict[str, Any], db
 # Plaid Banking Webhooks
 # =============================================================================
 
+# Transaction webhooks that mean "run /transactions/sync for this item"
+PLAID_SYNC_WEBHOOK_CODES = ("INITIAL_UPDATE", "HISTORICAL_UPDATE", "DEFAULT_UPDATE", "SYNC_UPDATES_AVAILABLE")
+
+
 @router.post("/plaid")
 async def handle_plaid_webhook(
     request: Request,
@@ -236,8 +248,9 @@ async def handle_plaid_webhook(
     - ITEM: Item status changes (connection issues)
     - AUTH: Auth data updates
     """
+    body = await request.body()
     try:
-        payload = await request.json()
+        payload = json.loads(body)
     except Exception as e:
         logger.error(f"Failed to parse Plaid webhook: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
@@ -248,10 +261,38 @@ async def handle_plaid_webhook(
 
     logger.info(f"Received Plaid webhook: {webhook_type}.{webhook_code} for item {item_id}")
 
+    if webhook_type == "TRANSACTIONS" and webhook_code in PLAID_SYNC_WEBHOOK_CODES and item_id:
+        # Every notification must run a sync, so sync notifications are keyed per delivery
+        # rather than deduplicated; plaid_sync.sync_item coalesces concurrent syncs of an item
+        key = f"{item_id}:{webhook_code}:{datetime.utcnow().isoformat()}:{uuid.uuid4().hex[:8]}"
+    else:
+        key = idempotency_key(body)
+    await record_webhook_event(db, "plaid", key, payload, event_type=f"{webhook_type}.{webhook_code}")
+    kick_webhook_worker()
+    return {"status": "ok"}
+
+
+@webhook_processor("plaid")
+async def _process_plaid_event(db: AsyncSession, event: WebhookEvent) -> None:
+    payload = event.payload
+    webhook_type = payload.get("webhook_type", "")
+    webhook_code = payload.get("webhook_code", "")
+    item_id = payload.get("item_id", "")
+
     if webhook_type == "TRANSACTIONS":
-        if webhook_code in ("INITIAL_UPDATE", "HISTORICAL_UPDATE", "DEFAULT_UPDATE", "SYNC_UPDATES_AVAILABLE"):
+        if webhook_code in PLAID_SYNC_WEBHOOK_CODES:
             logger.info(f"Plaid transaction update available for item {item_id}")
-            # TODO: Queue transaction sync job
+            result = await db.execute(
+                text("SELECT id FROM plaid_item WHERE item_id = :item_id AND status = 'active'"),
+                {"item_id": item_id},
+            )
+            plaid_item_id = result.scalar_one_or_none()
+            if plaid_item_id:
+                from app.services import plaid_sync
+                from app.services.plaid_service import PlaidService
+
+                # Raising leaves the event for the inbox to retry with backoff
+                await plaid_sync.sync_item(PlaidService(), plaid_item_id)
 
     elif webhook_type == "ITEM":
         if webhook_code == "ERROR":
@@ -260,8 +301,6 @@ async def handle_plaid_webhook(
         elif webhook_code == "PENDING_EXPIRATION":
             logger.warning(f"Plaid item {item_id} access token expiring")
 
-    return {"status": "ok"}
-
 
 # =============================================================================
 # Stripe Billing Webhooks
@@ -280,20 +319,29 @@ async def handle_stripe_webhook(
     if webhook_secret and stripe_signature:
         try:
             import stripe
-            event = stripe.Webhook.construct_event(body, stripe_signature, webhook_secret)
+            stripe.Webhook.construct_event(body, stripe_signature, webhook_secret)
         except Exception as e:
             logger.error(f"Stripe webhook signature verification failed: {e}")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid signature")
-    else:
-        try:
-            import json
-            event = json.loads(body)
-        except Exception:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
+
+    # The inbox stores the plain JSON body (verified events would otherwise be stripe.Event objects)
+    try:
+        event = json.loads(body)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
 
     event_type = event.get("type", "")
     logger.info(f"Received Stripe webhook: {event_type}")
 
+    await record_webhook_event(db, "stripe", idempotency_key(body, event.get("id")), event, event_type=event_type)
+    kick_webhook_worker()
+    return {"status": "ok"}
+
+
+@webhook_processor("stripe")
+async def _process_stripe_event(db: AsyncSession, event: WebhookEvent) -> None:
+    event_type = event.payload.get("type", "")
+
     # Handle billing events (implement as needed)
     if event_type == "customer.subscription.created":
         pass
@@ -306,8 +354,6 @@ async def handle_stripe_webhook(
     elif event_type == "invoice.payment_failed":
         pass
 
-    return {"status": "ok"}
-
 
 # =============================================================================
 # Motive ELD Webhooks (existing)
@@ -366,6 +412,67 @@ async def handle_motive_webhook(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to process webhook: {str(e)}")
 
 
+@dataclass(frozen=True)
+class _MotiveEndpoint:
+    integration_id: str
+    company_id: str
+    webhook_secret: Optional[str]
+
+
+# Active Motive integrations with their webhook secrets, cached for signature checks
+MOTIVE_ENDPOINTS_TTL_SECONDS = 300
+_motive_endpoints: Optional[Tuple[float, List[_MotiveEndpoint]]] = None
+
+
+async def _load_motive_endpoints(db: AsyncSession, refresh: bool = False) -> List[_MotiveEndpoint]:
+    global _motive_endpoints
+    if not refresh and _motive_endpoints and time.monotonic() - _motive_endpoints[0] < MOTIVE_ENDPOINTS_TTL_SECONDS:
+        return _motive_endpoints[1]
+
+    result = await db.execute(
+        select(CompanyIntegration.id, CompanyIntegration.company_id, CompanyIntegration.config)
+        .join(Integration)
+        .where(Integration.integration_key == "motive", CompanyIntegration.status == "active")
+        .order_by(CompanyIntegration.created_at)
+    )
+    endpoints = [
+        _MotiveEndpoint(row.id, row.company_id, (row.config or {}).get("webhook_secret"))
+        for row in result.all()
+    ]
+    _motive_endpoints = (time.monotonic(), endpoints)
+    return endpoints
+
+
+def _match_motive_signature(endpoints: List[_MotiveEndpoint], body: bytes, signature: str) -> Optional[_MotiveEndpoint]:
+    """Integration whose webhook secret signed the body (Motive uses HMAC-SHA1)."""
+    for endpoint in endpoints:
+        if not endpoint.webhook_secret:
+            continue
+        expected_signature = hmac.new(endpoint.webhook_secret.encode(), body, hashlib.sha1).hexdigest()
+        if hmac.compare_digest(signature, expected_signature):
+            return endpoint
+    return None
+
+
+async def _resolve_motive_endpoint(
+    db: AsyncSession, body: bytes, signature: Optional[str]
+) -> Optional[_MotiveEndpoint]:
+    """Integration a Motive delivery belongs to; raises 403 when the signature matches no secret."""
+    endpoints = await _load_motive_endpoints(db)
+    if signature:
+        endpoint = _match_motive_signature(endpoints, body, signature)
+        if endpoint is None:
+            # Secret may have been added or rotated since the cache was filled
+            endpoints = await _load_motive_endpoints(db, refresh=True)
+            endpoint = _match_motive_signature(endpoints, body, signature)
+        if endpoint is not None:
+            return endpoint
+        if any(e.webhook_secret for e in endpoints):
+            logger.warning("Invalid webhook signature")
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid webhook signature")
+    return endpoints[0] if endpoints else None
+
+
 @router.post("/motive")
 async def handle_motive_webhook_public(
     request: Request,
@@ -383,104 +490,88 @@ async def handle_motive_webhook_public(
     - Algorithm: HMAC-SHA1
     - Must respond within 3 seconds with 200/201 status
     - Test request payload: ["vehicle_location_updated"]
+
+    Events are stored in the webhook inbox and processed after the response.
     """
+    body = await request.body()
     try:
-        payload = await request.body()
-        payload_json = await request.json()
-        
-        # Handle test request (when webhook is enabled/updated)
-        # Motive sends ["vehicle_location_updated"] as test payload
-        if isinstance(payload_json, list) and len(payload_json) == 1 and payload_json[0] == "vehicle_location_updated":
-            logger.info("Received Motive webhook test request")
-            # Return 200 immediately for test requests
-            return {"success": True, "message": "Webhook test successful"}
-        
-        # Validate webhook signature if Motive provides one
-        # Motive uses HMAC-SHA1 (not SHA256)
-        if x_kt_webhook_signature:
-            # Find integration to get webhook secret
-            result = await db.execute(
-                select(CompanyIntegration)
-                .join(Integration)
-                .where(
-                    Integration.integration_key == "motive",
-                    CompanyIntegration.status == "active"
-                )
-            )
-            integrations = list(result.scalars().all())
-            
-            # Find integration with webhook secret
-            webhook_secret = None
-            integration = None
-            for intg in integrations:
-                if intg.config and intg.config.get("webhook_secret"):
-                    webhook_secret = intg.config.get("webhook_secret")
-                    integration = intg
-                    break
-            
-            if webhook_secret:
-                # Validate signature (Motive uses HMAC-SHA1 per documentation)
-                expected_signature = hmac.new(
-                    webhook_secret.encode(), payload, hashlib.sha1
-                ).hexdigest()
-                if not hmac.compare_digest(x_kt_webhook_signature, expected_signature):
-                    logger.warning("Invalid webhook signature")
-                    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid webhook signature")
-        
-        # Extract action from payload (Motive webhooks use "action" field)
-        action = payload_json.get("action")
-        event_type = payload_json.get("event_type") or payload_json.get("type") or action
-        event_data = payload_json
-        
-        logger.info(f"Received Motive webhook: action={action}, event_type={event_type}")
-        
-        # Find integration - use the one we found during signature validation, or find one now
-        if not integration:
-            result = await db.execute(
-                select(CompanyIntegration)
-                .join(Integration)
-                .where(
-                    Integration.integration_key == "motive",
-                    CompanyIntegration.status == "active"
-                )
-                .limit(1)
-            )
-            integration = result.scalar_one_or_none()
-        
-        if integration:
-            # Route to appropriate handler based on Motive action names
-            if action == "vehicle_location_updated" or action == "vehicle_location_received":
-                await handle_vehicle_location_event(db, integration, event_data)
-            elif action == "hos_violation_upserted":
-                await handle_hos_violation_event(db, integration, event_data)
-            elif action == "vehicle_geofence_event" or action == "asset_geofence_event":
-                await handle_geofence_event(db, integration, event_data)
-            elif action == "fault_code_opened" or action == "fault_code_closed":
-                await handle_fault_code_event(db, integration, event_data)
-            elif action == "vehicle_upserted":
-                # Vehicle created/updated - could trigger equipment sync
-                logger.info(f"Vehicle upserted: {event_data.get('id')}")
-            elif action == "user_upserted":
-                # User created/updated - could trigger driver sync
-                logger.info(f"User upserted: {event_data.get('id')}")
-            elif action == "engine_toggle_event":
-                # Engine on/off event
-                logger.info(f"Engine toggle: {event_data.get('trigger')} for vehicle {event_data.get('vehicle_id')}")
-            elif action == "driver_performance_event_created" or action == "driver_performance_event_updated":
-                # Driver performance event
-                logger.info(f"Driver performance event: {event_data.get('type')}")
-            elif action == "speeding_event_created" or action == "speeding_event_updated":
-                # Speeding event
-                logger.info(f"Speeding event for driver {event_data.get('driver_id')}")
-            else:
-                logger.info(f"Received unhandled Motive webhook action: {action}")
-        
-        return {"success": True, "message": "Webhook processed"}
+        payload_json = json.loads(body)
     except Exception as e:
-        logger.error(f"Error processing Motive webhook: {e}", exc_info=True)
+        logger.error(f"Error processing Motive webhook: {e}")
         # Return 200 to prevent Motive from retrying invalid requests
         return {"success": False, "error": str(e)}
 
+    # Handle test request (when webhook is enabled/updated)
+    # Motive sends ["vehicle_location_updated"] as test payload
+    if isinstance(payload_json, list) and len(payload_json) == 1 and payload_json[0] == "vehicle_location_updated":
+        logger.info("Received Motive webhook test request")
+        # Return 200 immediately for test requests
+        return {"success": True, "message": "Webhook test successful"}
+
+    if not isinstance(payload_json, dict):
+        logger.error("Error processing Motive webhook: unexpected payload")
+        return {"success": False, "error": "Unexpected payload"}
+
+    endpoint = await _resolve_motive_endpoint(db, body, x_kt_webhook_signature)
+
+    # Extract action from payload (Motive webhooks use "action" field)
+    action = payload_json.get("action")
+    event_type = payload_json.get("event_type") or payload_json.get("type") or action
+
+    logger.info(f"Received Motive webhook: action={action}, event_type={event_type}")
+
+    await record_webhook_event(
+        db,
+        "motive",
+        idempotency_key(body),
+        payload_json,
+        event_type=action,
+        company_id=endpoint.company_id if endpoint else None,
+        company_integration_id=endpoint.integration_id if endpoint else None,
+    )
+    kick_webhook_worker()
+    return {"success": True, "message": "Webhook received"}
+
+
+@webhook_processor("motive")
+async def _process_motive_event(db: AsyncSession, event: WebhookEvent) -> None:
+    integration = None
+    if event.company_integration_id:
+        integration = await db.get(CompanyIntegration, event.company_integration_id)
+    if not integration:
+        logger.info(f"No active Motive integration for webhook event {event.id}")
+        return
+
+    event_data = event.payload
+    action = event_data.get("action")
+
+    # Route to appropriate handler based on Motive action names
+    if action == "vehicle_location_updated" or action == "vehicle_location_received":
+        await handle_vehicle_location_event(db, integration, event_data)
+    elif action == "hos_violation_upserted":
+        await handle_hos_violation_event(db, integration, event_data)
+    elif action == "vehicle_geofence_event" or action == "asset_geofence_event":
+        await handle_geofence_event(db, integration, event_data)
+    elif action == "fault_code_opened" or action == "fault_code_closed":
+        await handle_fault_code_event(db, integration, event_data)
+    elif action == "vehicle_upserted":
+        # Vehicle created/updated - could trigger equipment sync
+        logger.info(f"Vehicle upserted: {event_data.get('id')}")
+    elif action == "user_upserted":
+        # User created/updated - could trigger driver sync
+        logger.info(f"User upserted: {event_data.get('id')}")
+    elif action == "engine_toggle_event":
+        # Engine on/off event
+        logger.info(f"Engine toggle: {event_data.get('trigger')} for vehicle {event_data.get('vehicle_id')}")
+    elif action == "driver_performance_event_created" or action == "driver_performance_event_updated":
+        # Driver performance event
+        logger.info(f"Driver performance event: {event_data.get('type')}")
+    elif action == "speeding_event_created" or action == "speeding_event_updated":
+        # Speeding event
+        logger.info(f"Speeding event for driver {event_data.get('driver_id')}")
+    else:
+        logger.info(f"Received unhandled Motive webhook action: {action}")
+
 
 @router.post("/motive/company/{integration_id}")
 async def handle_motive_webhook(
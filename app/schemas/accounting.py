@@ -48,16 +48,20 @@ class InvoiceLineItem(BaseModel):
 
 class InvoiceCreate(BaseModel):
     load_id: Optional[str] = None
+    customer_id: Optional[str] = None  # Matched from the load's customer name if not provided
     invoice_number: Optional[str] = None  # Auto-generated if not provided
     invoice_date: date
+    due_date: Optional[date] = None  # Derived from the customer's payment terms if not provided
     line_items: List[InvoiceLineItem] = Field(..., min_length=1)
     tax_rate: float = 0.0
 
 
 class InvoiceResponse(BaseModel):
     id: str
+    customer_id: Optional[str] = None
     invoice_number: str
     invoice_date: date
+    due_date: Optional[date] = None
     status: str
     subtotal: float
     tax: float
@@ -165,6 +169,14 @@ class CustomerResponse(CustomerBase):
     model_config = {"from_attributes": True}
 
 
+class ARAgingBuckets(BaseModel):
+    current: Decimal = Decimal("0")  # Not yet due
+    days_1_30: Decimal = Decimal("0")
+    days_31_60: Decimal = Decimal("0")
+    days_61_90: Decimal = Decimal("0")
+    days_over_90: Decimal = Decimal("0")
+
+
 class CustomerSummary(BaseModel):
     id: str
     name: str
@@ -173,6 +185,7 @@ class CustomerSummary(BaseModel):
     credit_limit: Optional[Decimal]
     credit_limit_used: Decimal
     status: str
+    aging: ARAgingBuckets = Field(default_factory=ARAgingBuckets)
 
     model_config = {"from_attributes": True}
 
@@ -185,6 +198,10 @@ class CustomersSummaryResponse(BaseModel):
     credit_limit_usage_percent: float
     total_credit_limit: Decimal
     used_credit_limit: Decimal
+    aging: ARAgingBuckets = Field(default_factory=ARAgingBuckets)
+    as_of: Optional[date] = None
+    limit: Optional[int] = None
+    offset: int = 0
     customers: List[CustomerSummary]
 
 
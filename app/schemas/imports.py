@@ -1,7 +1,8 @@
 """Import schemas for CSV bulk imports."""
 
+from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class ImportError(BaseModel):
@@ -81,3 +82,29 @@ class LoadImportRow(BaseModel):
     base_rate: Optional[float] = None
     reference_number: Optional[str] = None
     special_instructions: Optional[str] = None
+
+
+class ImportJobResponse(BaseModel):
+    """Background import job status for progress polling."""
+    id: str
+    entity_type: str
+    filename: str
+    status: str = Field(..., description="PENDING, RUNNING, COMPLETED or FAILED")
+    total_rows: int
+    processed_rows: int
+    successful: int
+    failed: int
+    skipped: int
+    errors: List[ImportError] = Field(default_factory=list)
+    warnings: List[str] = Field(default_factory=list)
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+    @field_validator("errors", "warnings", mode="before")
+    @classmethod
+    def _none_to_list(cls, value):
+        return value or []
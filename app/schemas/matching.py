@@ -27,3 +27,22 @@ class MatchingResponse(BaseModel):
     generated_at: datetime
     suggestions: List[MatchingSuggestion]
 
+
+
+class BatchMatchingRequest(BaseModel):
+    # Defaults to every open load without a driver
+    load_ids: Optional[List[str]] = Field(default=None, max_length=1000)
+    min_score: float = Field(default=0, ge=0, le=100)
+
+
+class BatchAssignment(BaseModel):
+    load_id: str
+    suggestion: Optional[MatchingSuggestion] = None
+    unassigned_reason: Optional[str] = None
+
+
+class BatchMatchingResponse(BaseModel):
+    generated_at: datetime
+    assignments: List[BatchAssignment]
+    assigned_count: int
+    total_score: float
@@ -2,8 +2,8 @@
 
 from datetime import date, datetime
 from decimal import Decimal
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator
 
 
 class SettlementBreakdownItem(BaseModel):
@@ -125,3 +125,34 @@ class PayStubListResponse(BaseModel):
     """List of pay stubs."""
     pay_stubs: List[PayStubResponse]
     total_count: int
+
+
+class PayStubJobCreate(BaseModel):
+    """Generate every pay stub for a settlement period."""
+    period_start: date
+    period_end: date
+
+
+class PayStubJobResponse(BaseModel):
+    """Background pay-stub job status for progress polling."""
+    id: str
+    period_start: date
+    period_end: date
+    status: str = Field(..., description="PENDING, RUNNING, COMPLETED or FAILED")
+    total: int
+    processed: int
+    rendered: int
+    unchanged: int = Field(..., description="Stubs skipped because the settlement didn't change")
+    failed: int
+    errors: List[Dict[str, str]] = Field(default_factory=list)
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+    @field_validator("errors", mode="before")
+    @classmethod
+    def _none_to_list(cls, value):
+        return value or []
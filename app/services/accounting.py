@@ -9,10 +9,11 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.accounting import Customer, Invoice, LedgerEntry, Settlement, Vendor
-from app.models.company import Company
 from app.models.load import Load
-from app.services.number_generator import NumberGenerator
+from app.services.ar_aging import company_aging, customer_aging, due_date_for, outstanding, overdue
+from app.services.document_sequence import DocumentNumberAllocator
 from app.schemas.accounting import (
+    ARAgingBuckets,
     CustomerCreate,
     CustomerResponse,
     CustomerSummary,
@@ -129,6 +130,13 @@ class InvoiceService:
             if load:
                 customer_name = load.customer_name
 
+        customer = await self._resolve_customer(company_id, payload.customer_id, customer_name)
+        if customer is not None:
+            customer_name = customer.name
+        due_date = payload.due_date or due_date_for(
+            payload.invoice_date, customer.payment_terms if customer is not None else None
+        )
+
         # Generate invoice number if not provided
         invoice_number = payload.invoice_number if payload.invoice_number else await self._generate_next_invoice_number(company_id, customer_name)
 
@@ -136,8 +144,10 @@ class InvoiceService:
             id=str(uuid.uuid4()),
             company_id=company_id,
             load_id=payload.load_id,
+            customer_id=customer.id if customer is not None else None,
             invoice_number=invoice_number,
             invoice_date=payload.invoice_date,
+            due_date=due_date,
             status="draft",
             subtotal=subtotal,
             tax=tax,
@@ -159,6 +169,27 @@ class InvoiceService:
             raise ValueError("Invoice not found")
         return invoice
 
+    async def _resolve_customer(
+        self, company_id: str, customer_id: Optional[str], customer_name: Optional[str]
+    ) -> Optional[Customer]:
+        """The invoice's customer: the one given, else the company's customer named on the load."""
+        if customer_id:
+            customer = await self.db.scalar(
+                select(Customer).where(Customer.company_id == company_id, Customer.id == customer_id)
+            )
+            if customer is None:
+                raise ValueError("Customer not found")
+            return customer
+        if not customer_name:
+            return None
+        result = await self.db.execute(
+            select(Customer)
+            .where(Customer.company_id == company_id, func.lower(Customer.name) == customer_name.strip().lower())
+            .order_by(Customer.is_active.desc(), Customer.created_at.asc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
     def _calculate_subtotal(self, line_items: List[InvoiceLineItem]) -> float:
         subtotal = 0.0
         for item in line_items:
@@ -176,42 +207,7 @@ class InvoiceService:
         Returns:
             Formatted invoice number based on company settings
         """
-        # Get and lock the company record to prevent race conditions
-        result = await self.db.execute(
-            select(Company)
-            .where(Company.id == company_id)
-            .with_for_update()
-        )
-        company = result.scalar_one_or_none()
-
-        if not company:
-            raise ValueError(f"Company {company_id} not found")
-
-        # Determine the next number based on start number and last number
-        if company.last_invoice_number == 0:
-            # First invoice - use start number
-            next_number = company.invoice_start_number or 1
-        else:
-            # Increment from last number
-            next_number = company.last_invoice_number + 1
-
-        # Update the counter
-        company.last_invoice_number = next_number
-
-        # Get the format template (use default if not set)
-        format_template = company.invoice_number_format or "INV-{YEAR}-{NUMBER:05}"
-
-        # Generate the formatted invoice number
-        invoice_number = NumberGenerator.generate(
-            format_template=format_template,
-            sequence_number=next_number,
-            customer_name=customer_name,
-        )
-
-        # Update the company record (will be committed with the invoice)
-        self.db.add(company)
-
-        return invoice_number
+        return await DocumentNumberAllocator(self.db).next_number(company_id, "invoice", customer_name)
 
     def _build_invoice_number(self) -> str:
         """Deprecated: Use _generate_next_invoice_number instead."""
@@ -454,93 +450,84 @@ class CustomerService:
         customer.status = "inactive"
         await self.db.commit()
 
-    async def get_customer_summary(self, company_id: str, customer_id: str) -> CustomerSummary:
-        """Get customer summary with outstanding amounts."""
+    async def get_customer_summary(
+        self, company_id: str, customer_id: str, as_of: Optional[date] = None
+    ) -> CustomerSummary:
+        """Get customer summary with outstanding amounts aged by due date."""
         customer = await self.get_customer(company_id, customer_id)
-
-        # Calculate outstanding from invoices
-        invoices_result = await self.db.execute(
-            select(Invoice).where(
-                Invoice.company_id == company_id,
-                Invoice.status.in_(["pending", "sent", "overdue"]),
+        as_of = as_of or date.today()
+        aging = (await customer_aging(self.db, company_id, [customer.id], as_of)).get(customer.id)
+        return self._customer_summary(customer, aging or ARAgingBuckets())
+
+    async def get_customers_summary(
+        self,
+        company_id: str,
+        limit: Optional[int] = 100,
+        offset: int = 0,
+        as_of: Optional[date] = None,
+    ) -> CustomersSummaryResponse:
+        """Get summary of all customers with metrics, and a page of active customers with their AR aging."""
+        as_of = as_of or date.today()
+
+        totals = (
+            await self.db.execute(
+                select(
+                    func.count(Customer.id),
+                    func.coalesce(func.sum(Customer.credit_limit), 0),
+                    func.coalesce(func.sum(Customer.credit_limit_used), 0),
+                ).where(Customer.company_id == company_id, Customer.is_active == True)
             )
-        )
-        # Note: Invoice model doesn't have customer_id yet, so we'll use customer name matching for now
-        # This is a temporary solution until we add customer_id to Invoice
-        invoices = list(invoices_result.scalars().all())
-        total_outstanding = sum(float(inv.total or 0) for inv in invoices)
-        overdue_amount = sum(
-            float(inv.total or 0)
-            for inv in invoices
-            if inv.status and inv.status.lower() == "overdue"
-        )
-
-        return CustomerSummary(
-            id=customer.id,
-            name=customer.name,
-            total_outstanding=total_outstanding,
-            overdue_amount=overdue_amount,
-            credit_limit=customer.credit_limit,
-            credit_limit_used=customer.credit_limit_used or 0,
-            status=customer.status,
-        )
-
-    async def get_customers_summary(self, company_id: str) -> CustomersSummaryResponse:
-        """Get summary of all customers with metrics."""
-        customers_result = await self.db.execute(
-            select(Customer).where(Customer.company_id == company_id, Customer.is_active == True)
-        )
-        customers = list(customers_result.scalars().all())
-
-        # Calculate metrics
-        active_customers = len(customers)
-        total_credit_limit = sum(float(c.credit_limit or 0) for c in customers)
-        used_credit_limit = sum(float(c.credit_limit_used or 0) for c in customers)
+        ).one()
+        active_customers = totals[0] or 0
+        total_credit_limit = float(totals[1] or 0)
+        used_credit_limit = float(totals[2] or 0)
         credit_limit_usage_percent = (
             (used_credit_limit / total_credit_limit * 100) if total_credit_limit > 0 else 0.0
         )
 
-        # Get outstanding invoices
-        invoices_result = await self.db.execute(
-            select(Invoice).where(
-                Invoice.company_id == company_id,
-                Invoice.status.in_(["pending", "sent", "overdue"]),
-            )
+        # Company-wide receivables, including invoices not matched to a customer
+        company_buckets, overdue_accounts = await company_aging(self.db, company_id, as_of)
+
+        page_query = (
+            select(Customer)
+            .where(Customer.company_id == company_id, Customer.is_active == True)
+            .order_by(Customer.name.asc(), Customer.id.asc())
+            .offset(offset)
         )
-        invoices = list(invoices_result.scalars().all())
-        total_ar = sum(float(inv.total or 0) for inv in invoices)
-        overdue_invoices = [inv for inv in invoices if inv.status and inv.status.lower() == "overdue"]
-        overdue_accounts = len(overdue_invoices)
-        overdue_amount = sum(float(inv.total or 0) for inv in overdue_invoices)
-
-        # Build customer summaries
-        customer_summaries = []
-        for customer in customers:
-            # Calculate customer-specific outstanding (simplified - would need customer_id on Invoice)
-            customer_outstanding = total_ar / active_customers if active_customers > 0 else 0
-            customer_overdue = overdue_amount / overdue_accounts if overdue_accounts > 0 else 0
-
-            customer_summaries.append(
-                CustomerSummary(
-                    id=customer.id,
-                    name=customer.name,
-                    total_outstanding=customer_outstanding,
-                    overdue_amount=customer_overdue,
-                    credit_limit=customer.credit_limit,
-                    credit_limit_used=customer.credit_limit_used or 0,
-                    status=customer.status,
-                )
-            )
+        if limit is not None:
+            page_query = page_query.limit(limit)
+        customers = list((await self.db.execute(page_query)).scalars().all())
+        aging = await customer_aging(self.db, company_id, [customer.id for customer in customers], as_of)
 
         return CustomersSummaryResponse(
             active_customers=active_customers,
-            total_ar=total_ar,
+            total_ar=outstanding(company_buckets),
             overdue_accounts=overdue_accounts,
-            overdue_amount=overdue_amount,
+            overdue_amount=overdue(company_buckets),
             credit_limit_usage_percent=credit_limit_usage_percent,
             total_credit_limit=total_credit_limit,
             used_credit_limit=used_credit_limit,
-            customers=customer_summaries,
+            aging=company_buckets,
+            as_of=as_of,
+            limit=limit,
+            offset=offset,
+            customers=[
+                self._customer_summary(customer, aging.get(customer.id, ARAgingBuckets()))
+                for customer in customers
+            ],
+        )
+
+    @staticmethod
+    def _customer_summary(customer: Customer, aging: ARAgingBuckets) -> CustomerSummary:
+        return CustomerSummary(
+            id=customer.id,
+            name=customer.name,
+            total_outstanding=outstanding(aging),
+            overdue_amount=overdue(aging),
+            credit_limit=customer.credit_limit,
+            credit_limit_used=customer.credit_limit_used or 0,
+            status=customer.status,
+            aging=aging,
         )
 
 
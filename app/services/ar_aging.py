@@ -0,0 +1,112 @@
+"""
+Accounts receivable aging.
+
+Open invoices are bucketed by days past their due date (current, 1-30,
+31-60, 61-90, 90+) with conditional sums in SQL, grouped by customer or over
+the whole company. The bucket boundaries are computed as dates up front, so
+the queries compare due_date against constants and are served from the
+(company_id, status, due_date) index without per-row date arithmetic.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.accounting import Invoice
+from app.schemas.accounting import ARAgingBuckets
+
+# Invoice statuses that count toward receivables
+OPEN_INVOICE_STATUSES = ("pending", "sent", "overdue")
+# Used when a customer has no (or unrecognised) payment terms
+DEFAULT_PAYMENT_TERM_DAYS = 30
+
+_NET_TERMS = re.compile(r"^NET[_ ]?(\d+)$")
+
+
+def payment_term_days(payment_terms: Optional[str]) -> int:
+    """Days until an invoice is due under payment terms like "NET_30" or "DUE_ON_RECEIPT"."""
+    if not payment_terms:
+        return DEFAULT_PAYMENT_TERM_DAYS
+    terms = payment_terms.strip().upper()
+    if terms == "DUE_ON_RECEIPT":
+        return 0
+    match = _NET_TERMS.match(terms)
+    return int(match.group(1)) if match else DEFAULT_PAYMENT_TERM_DAYS
+
+
+def due_date_for(invoice_date: date, payment_terms: Optional[str]) -> date:
+    return invoice_date + timedelta(days=payment_term_days(payment_terms))
+
+
+def _bucket_columns(as_of: date) -> Tuple:
+    """Conditional sums of Invoice.total per aging bucket (invoices without a due date are current)."""
+    total = func.coalesce(Invoice.total, 0)
+    boundaries = [as_of - timedelta(days=days) for days in (30, 60, 90)]
+    buckets = [
+        ("current", Invoice.due_date.is_(None) | (Invoice.due_date >= as_of)),
+        ("days_1_30", (Invoice.due_date < as_of) & (Invoice.due_date >= boundaries[0])),
+        ("days_31_60", (Invoice.due_date < boundaries[0]) & (Invoice.due_date >= boundaries[1])),
+        ("days_61_90", (Invoice.due_date < boundaries[1]) & (Invoice.due_date >= boundaries[2])),
+        ("days_over_90", Invoice.due_date < boundaries[2]),
+    ]
+    return tuple(
+        func.coalesce(func.sum(case((condition, total), else_=0)), 0).label(name)
+        for name, condition in buckets
+    )
+
+
+def _open_invoices(company_id: str):
+    return (Invoice.company_id == company_id, Invoice.status.in_(OPEN_INVOICE_STATUSES))
+
+
+def _to_buckets(row) -> ARAgingBuckets:
+    return ARAgingBuckets(
+        current=Decimal(str(row.current)),
+        days_1_30=Decimal(str(row.days_1_30)),
+        days_31_60=Decimal(str(row.days_31_60)),
+        days_61_90=Decimal(str(row.days_61_90)),
+        days_over_90=Decimal(str(row.days_over_90)),
+    )
+
+
+def outstanding(buckets: ARAgingBuckets) -> Decimal:
+    return buckets.current + overdue(buckets)
+
+
+def overdue(buckets: ARAgingBuckets) -> Decimal:
+    return buckets.days_1_30 + buckets.days_31_60 + buckets.days_61_90 + buckets.days_over_90
+
+
+async def company_aging(db: AsyncSession, company_id: str, as_of: date) -> Tuple[ARAgingBuckets, int]:
+    """Aging buckets over all of a company's open invoices, and the number of customers with an overdue balance."""
+    overdue_customer = case((Invoice.due_date < as_of, Invoice.customer_id))
+    row = (
+        await db.execute(
+            select(
+                *_bucket_columns(as_of),
+                func.count(func.distinct(overdue_customer)).label("overdue_accounts"),
+            ).where(*_open_invoices(company_id))
+        )
+    ).one()
+    return _to_buckets(row), int(row.overdue_accounts or 0)
+
+
+async def customer_aging(
+    db: AsyncSession, company_id: str, customer_ids: Iterable[str], as_of: date
+) -> Dict[str, ARAgingBuckets]:
+    """Aging buckets per customer for the given customers (customers without open invoices are omitted)."""
+    customer_ids = list(customer_ids)
+    if not customer_ids:
+        return {}
+    result = await db.execute(
+        select(Invoice.customer_id, *_bucket_columns(as_of))
+        .where(*_open_invoices(company_id), Invoice.customer_id.in_(customer_ids))
+        .group_by(Invoice.customer_id)
+    )
+    return {row.customer_id: _to_buckets(row) for row in result.all()}
@@ -0,0 +1,120 @@
+"""
+Rectangular assignment solver for batch load-to-driver matching.
+
+Maximises the total score of a rows x columns matrix where each row (load)
+gets at most one column (driver) and each column at most one row. Cells set
+to None are infeasible and are never returned.
+
+Hungarian algorithm (shortest augmenting path with potentials, O(n^2 m)) in
+plain Python. Two reductions keep it fast for a morning dispatch of hundreds
+of loads:
+
+- Each row only keeps its best `rows` feasible columns. Any optimal
+  assignment can be exchanged into one that uses these columns (at most
+  rows - 1 other rows can block them), so the result stays exact.
+- Columns no row kept are dropped before solving.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Optional, Sequence
+
+# Cost of an infeasible cell - dominates any real score (0-100), so the solver
+# first maximises the number of feasible pairs, then their total score.
+_FORBIDDEN = 1e9
+
+
+def _hungarian(cost: List[List[float]]) -> List[int]:
+    """Min-cost assignment for n rows <= m columns. Returns the column per row."""
+    n, m = len(cost), len(cost[0])
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)  # owner[j] = row (1-based) assigned to column j
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        min_v = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            row = cost[i0 - 1]
+            u_i0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if used[j]:
+                    continue
+                reduced = row[j - 1] - u_i0 - v[j]
+                if reduced < min_v[j]:
+                    min_v[j] = reduced
+                    way[j] = j0
+                if min_v[j] < delta:
+                    delta = min_v[j]
+                    j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_v[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+
+    assignment = [0] * n
+    for j in range(1, m + 1):
+        if owner[j]:
+            assignment[owner[j] - 1] = j - 1
+    return assignment
+
+
+def solve_assignment(scores: Sequence[Sequence[Optional[float]]]) -> List[Optional[int]]:
+    """
+    Maximum-score assignment. Returns, per row, the chosen column index or
+    None when the row could not be given a feasible column.
+    """
+    rows = len(scores)
+    if not rows:
+        return []
+
+    # Candidate columns: each row's top-`rows` feasible cells
+    candidates: List[Dict[int, float]] = []
+    kept: Dict[int, int] = {}
+    for row in scores:
+        feasible = ((j, s) for j, s in enumerate(row) if s is not None)
+        best = dict(heapq.nlargest(rows, feasible, key=lambda cell: cell[1]))
+        candidates.append(best)
+        for j in best:
+            kept.setdefault(j, len(kept))
+    if not kept:
+        return [None] * rows
+
+    columns = sorted(kept, key=kept.__getitem__)
+    matrix = [[-best[j] if j in best else _FORBIDDEN for j in columns] for best in candidates]
+
+    transpose = rows > len(columns)
+    if transpose:
+        matrix = [list(col) for col in zip(*matrix)]
+        by_column = _hungarian(matrix)
+        chosen: List[Optional[int]] = [None] * rows
+        for c, r in enumerate(by_column):
+            chosen[r] = c
+    else:
+        chosen = list(_hungarian(matrix))
+
+    result: List[Optional[int]] = []
+    for r, c in enumerate(chosen):
+        if c is None or columns[c] not in candidates[r]:
+            result.append(None)
+        else:
+            result.append(columns[c])
+    return result
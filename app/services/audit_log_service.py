@@ -281,6 +281,19 @@ class AuditLogService:
         await self.db.refresh(log)
         return log
 
+    @staticmethod
+    def queue_audit_log(event_type: str, action: str, **fields) -> bool:
+        """
+        Record an audit event through the batched audit sink.
+
+        For events that don't need to commit with the caller's transaction;
+        takes the same fields as create_audit_log (plus request_id). Returns
+        False if the sink's queue was full and the event was dropped.
+        """
+        from app.services.audit_sink import audit_sink
+
+        return audit_sink.submit(event_type, action, **fields)
+
     async def export_audit_logs(
         self,
         company_id: Optional[str] = None,
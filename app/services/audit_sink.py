@@ -0,0 +1,147 @@
+"""
+Asynchronous audit log sink.
+
+Callers that don't need the audit row inside their own transaction (request
+auditing in the middleware, fire-and-forget events) submit rows here instead
+of committing one INSERT each. Rows wait in a bounded queue and a single task
+bulk-inserts them every audit_sink_batch_size rows or audit_sink_flush_ms,
+whichever comes first.
+
+submit() never blocks the request: when the queue is full the row is dropped
+and counted (and the drop is logged), so a slow database can't back up
+request handling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.core.config import get_settings
+from app.core.db import AsyncSessionFactory
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class AuditSink:
+    def __init__(self, batch_size: int, flush_interval_ms: int, max_queue: int) -> None:
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(1, flush_interval_ms) / 1000
+        self.max_queue = max(1, max_queue)
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List[Dict[str, Any]] = []
+
+    def submit(
+        self,
+        event_type: str,
+        action: str,
+        user_id: Optional[str] = None,
+        user_email: Optional[str] = None,
+        company_id: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        request_id: Optional[str] = None,
+        status: str = "success",
+        metadata: Optional[dict] = None,
+        error_message: Optional[str] = None,
+    ) -> bool:
+        """Queue an audit row for the next bulk insert. Returns False if it was dropped."""
+        row = {
+            "id": str(uuid.uuid4()),
+            "timestamp": datetime.now(timezone.utc),
+            "user_id": user_id,
+            "user_email": user_email,
+            "company_id": company_id,
+            "event_type": event_type,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "request_id": request_id,
+            "status": status,
+            "extra_data": metadata,
+            "error_message": error_message,
+        }
+        queue = self._ensure_running()
+        try:
+            queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("audit_sink_queue_full", extra={"dropped": self.dropped, "event_type": event_type})
+            return False
+        return True
+
+    def _ensure_running(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._queue
+
+    async def _collect(self) -> None:
+        """Wait for one row, then collect more until the batch is full or the interval is up."""
+        queue = self._queue
+        self._batch.append(await queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(self._batch) < self.batch_size:
+            if not queue.empty():
+                self._batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        # Rows stay in self._batch until written, so close() can flush them after a cancel
+        while True:
+            await self._collect()
+            await self._write(self._batch)
+            self._batch = []
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            async with AsyncSessionFactory() as session:
+                await session.execute(insert(AuditLog), batch)
+                await session.commit()
+        except Exception as exc:
+            logger.exception("audit_sink_write_failed", extra={"rows": len(batch), "error": str(exc)})
+
+    async def close(self) -> None:
+        """Stop the writer and flush whatever is still queued (application shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        pending, self._batch = self._batch, []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for start in range(0, len(pending), self.batch_size):
+            await self._write(pending[start : start + self.batch_size])
+
+
+audit_sink = AuditSink(
+    batch_size=settings.audit_sink_batch_size,
+    flush_interval_ms=settings.audit_sink_flush_ms,
+    max_queue=settings.audit_sink_max_queue,
+)
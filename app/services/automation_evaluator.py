@@ -1,20 +1,24 @@
 from __future__ import annotations
 
-import uuid
+import logging
+from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Set, Tuple
 
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import and_, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.automation import AutomationRule
+from app.models.company import Company
 from app.models.driver import Driver, DriverIncident
 from app.models.fuel import JurisdictionRollup
 from app.models.equipment import Equipment, EquipmentMaintenanceForecast
-from app.models.notification import NotificationLog
+from app.services.notification_outbox import NotificationOutboxService, OutboxMessage
 from app.services.notifications import NotificationSender
 from app.services.automation import AutomationService
 
+logger = logging.getLogger(__name__)
+
 
 class AutomationEvaluationResult:
     def __init__(self) -> None:
@@ -29,32 +33,94 @@ class AutomationEvaluator:
         self.channels = channels
 
     async def evaluate_company(self, company_id: str, service: AutomationService | None = None) -> AutomationEvaluationResult:
-        result = AutomationEvaluationResult()
         automation_service = service or AutomationService(self.db)
         rules = await automation_service.list_rules(company_id)
+        results = await self._evaluate_rules(rules)
+        return results.get(company_id) or AutomationEvaluationResult()
+
+    async def evaluate_all(self) -> Dict[str, AutomationEvaluationResult]:
+        """
+        Evaluate every active rule of every active company in one cycle.
+
+        Triggers are resolved with one set query per trigger type across all
+        tenants, and notifications are queued in the durable outbox and sent
+        through its concurrent rate-limited pool - so cycle time tracks the
+        number of notifications rather than tenants x rules x round trips.
+        A tenant whose rules can't be evaluated gets them recorded as failed;
+        the rest of the cycle carries on.
+        """
+        result = await self.db.execute(
+            select(AutomationRule)
+            .join(Company, Company.id == AutomationRule.company_id)
+            .where(Company.isActive.is_(True), AutomationRule.is_active.is_(True))
+        )
+        return await self._evaluate_rules(list(result.scalars().all()))
+
+    async def _evaluate_rules(self, rules: List[AutomationRule]) -> Dict[str, AutomationEvaluationResult]:
+        results: Dict[str, AutomationEvaluationResult] = defaultdict(AutomationEvaluationResult)
+        if not rules:
+            return results
+
+        recipients_by_rule, failed_rules = await self._resolve_all_recipients(rules)
+        for rule in failed_rules:
+            results[rule.company_id].failed.append((rule.id, "evaluation"))
+        failed_ids = {rule.id for rule in failed_rules}
+
+        messages: List[OutboxMessage] = []
+        triggered: List[str] = []
         for rule in rules:
-            recipients = await self._resolve_recipients(company_id, rule)
+            if rule.id in failed_ids:
+                continue
+            recipients = recipients_by_rule.get(rule.id) or []
             if not recipients:
-                result.skipped.append(rule.id)
+                results[rule.company_id].skipped.append(rule.id)
                 continue
-            body = self._generate_body(rule)
-            subject = f"[FreightOps] {rule.name}"
-
-            for recipient in recipients:
-                for channel in rule.channels:
-                    sender = self.channels.get(channel)
-                    if not sender:
-                        continue
-                    outcome = await sender.send(recipient, subject, body)
-                    await self._log_delivery(company_id, rule, channel, recipient, outcome.success, outcome.detail)
-                    if outcome.success:
-                        result.sent.append((rule.id, channel))
-                    else:
-                        result.failed.append((rule.id, channel))
-
-            rule.last_triggered_at = datetime.utcnow()
+            try:
+                rule_messages = self._build_messages(rule, recipients)
+            except Exception as exc:
+                # A malformed rule (recipients, channels, context) fails alone, not the cycle
+                logger.exception(
+                    "automation_rule_failed",
+                    extra={"rule_id": rule.id, "company_id": rule.company_id, "error": str(exc)},
+                )
+                results[rule.company_id].failed.append((rule.id, "evaluation"))
+                continue
+            triggered.append(rule.id)
+            messages.extend(rule_messages)
+
+        if triggered:
+            await self.db.execute(
+                update(AutomationRule)
+                .where(AutomationRule.id.in_(triggered))
+                .values(last_triggered_at=datetime.utcnow())
+                .execution_options(synchronize_session="fetch")
+            )
+
+        # Persist before sending so a restart mid-burst doesn't lose alerts
+        outbox = NotificationOutboxService(self.db, self.channels)
+        outbox_ids = await outbox.enqueue(messages)
+        for outcome in await outbox.send_now(outbox_ids):
+            bucket = results[outcome.company_id]
+            if outcome.result.success:
+                bucket.sent.append((outcome.rule_id, outcome.channel))
+            else:
+                # Includes transient failures re-queued for the outbox job
+                bucket.failed.append((outcome.rule_id, outcome.channel))
         await self.db.commit()
-        return result
+        return results
+
+    def _build_messages(self, rule: AutomationRule, recipients: List[str]) -> List[OutboxMessage]:
+        body = self._generate_body(rule)
+        subject = f"[FreightOps] {rule.name}"
+        messages: List[OutboxMessage] = []
+        seen: Set[Tuple[str, str]] = set()
+        for recipient in recipients:
+            for channel in rule.channels or []:
+                if channel not in self.channels or (recipient, channel) in seen:
+                    continue
+                seen.add((recipient, channel))
+                messages.append(OutboxMessage(rule.company_id, channel, recipient, subject, body, rule_id=rule.id))
+        return messages
 
     def _generate_body(self, rule: AutomationRule) -> str:
         context = getattr(rule, "_context", {})
@@ -74,84 +140,167 @@ class AutomationEvaluator:
                 return "\n".join(lines)
         return f"Automation '{rule.name}' triggered for {rule.trigger}"
 
-    async def _resolve_recipients(self, company_id: str, rule: AutomationRule) -> List[str]:
+    async def _resolve_all_recipients(
+        self, rules: List[AutomationRule]
+    ) -> Tuple[Dict[str, List[str]], List[AutomationRule]]:
+        """
+        Recipients per rule id, resolved with one query per trigger type across
+        all companies, and the rules that could not be evaluated.
+
+        If a trigger's cross-tenant query fails it is retried company by company
+        (each in a savepoint), so one tenant's bad data only fails its own rules.
+        """
         today = date.today()
-        lead_days = rule.lead_time_days or 0
-        window_end = today + timedelta(days=lead_days)
-
-        if rule.trigger == "cdl_expiring":
-            return await self._drivers_with_expiration(company_id, "cdl_expiration", today, window_end)
-        if rule.trigger == "medical_card_expiring":
-            return await self._drivers_with_expiration(company_id, "medical_card_expiration", today, window_end)
-        if rule.trigger == "incident_high_severity":
-            recent = await self._recent_incidents(company_id)
-            return recent if recent else rule.recipients
-        if rule.trigger == "ifta_tax_threshold" and rule.threshold_value is not None:
-            meets = await self._jurisdiction_threshold(company_id, rule.threshold_value)
-            return rule.recipients if meets else []
-        if rule.trigger == "maintenance_overdue":
-            alerts = await self._maintenance_due_forecasts(
-                company_id=company_id,
-                lead_days=rule.lead_time_days or 0,
-                risk_threshold=rule.threshold_value,
-            )
-            if not alerts:
-                return []
-            setattr(rule, "_context", {"maintenance": alerts})
-            return rule.recipients
-        # Placeholder for permit/maintenance triggers
-        return rule.recipients
+        by_trigger: Dict[str, List[AutomationRule]] = defaultdict(list)
+        for rule in rules:
+            by_trigger[rule.trigger].append(rule)
+
+        recipients: Dict[str, List[str]] = {}
+        failed: List[AutomationRule] = []
+        for trigger, trigger_rules in by_trigger.items():
+            try:
+                async with self.db.begin_nested():
+                    recipients.update(await self._resolve_trigger(trigger, trigger_rules, today))
+                continue
+            except Exception as exc:
+                logger.warning("automation_trigger_failed", extra={"trigger": trigger, "error": str(exc)})
+
+            by_company: Dict[str, List[AutomationRule]] = defaultdict(list)
+            for rule in trigger_rules:
+                by_company[rule.company_id].append(rule)
+            for company_id, company_rules in by_company.items():
+                try:
+                    async with self.db.begin_nested():
+                        recipients.update(await self._resolve_trigger(trigger, company_rules, today))
+                except Exception as exc:
+                    logger.exception(
+                        "automation_evaluation_failed",
+                        extra={"company_id": company_id, "trigger": trigger, "error": str(exc)},
+                    )
+                    failed.extend(company_rules)
+
+        return recipients, failed
+
+    async def _resolve_trigger(
+        self, trigger: str, trigger_rules: List[AutomationRule], today: date
+    ) -> Dict[str, List[str]]:
+        """Recipients per rule id for rules sharing a trigger (one query for all their companies)."""
+        recipients: Dict[str, List[str]] = {}
+        company_ids = {rule.company_id for rule in trigger_rules}
+
+        if trigger in ("cdl_expiring", "medical_card_expiring"):
+            column = "cdl_expiration" if trigger == "cdl_expiring" else "medical_card_expiration"
+            max_lead = max(rule.lead_time_days or 0 for rule in trigger_rules)
+            expirations = await self._drivers_with_expiration(company_ids, column, today, today + timedelta(days=max_lead))
+            for rule in trigger_rules:
+                window_end = today + timedelta(days=rule.lead_time_days or 0)
+                recipients[rule.id] = [
+                    email for email, expires in expirations.get(rule.company_id, []) if expires <= window_end
+                ]
+
+        elif trigger == "incident_high_severity":
+            incidents = await self._recent_incidents(company_ids)
+            for rule in trigger_rules:
+                recipients[rule.id] = incidents.get(rule.company_id) or rule.recipients
+
+        elif trigger == "ifta_tax_threshold":
+            thresholds = [rule for rule in trigger_rules if rule.threshold_value is not None]
+            tax_due = await self._jurisdiction_tax_due({rule.company_id for rule in thresholds}) if thresholds else {}
+            for rule in trigger_rules:
+                if rule.threshold_value is None:
+                    # No threshold configured - same fallthrough as untyped triggers
+                    recipients[rule.id] = rule.recipients
+                else:
+                    meets = tax_due.get(rule.company_id, 0.0) >= float(rule.threshold_value)
+                    recipients[rule.id] = rule.recipients if meets else []
+
+        elif trigger == "maintenance_overdue":
+            max_lead = max(rule.lead_time_days or 0 for rule in trigger_rules)
+            forecasts = await self._maintenance_due_forecasts(company_ids, max_lead)
+            for rule in trigger_rules:
+                lead_days = rule.lead_time_days or 0
+                window_end = today + timedelta(days=lead_days)
+                alerts = [
+                    alert
+                    for alert in forecasts.get(rule.company_id, [])
+                    if (
+                        alert["status"] == "OVERDUE"
+                        or (
+                            lead_days > 0
+                            and alert["projected_service_date"] is not None
+                            and alert["projected_service_date"] <= window_end
+                        )
+                    )
+                    and (rule.threshold_value is None or alert["risk_score"] >= float(rule.threshold_value))
+                ]
+                if not alerts:
+                    recipients[rule.id] = []
+                    continue
+                setattr(rule, "_context", {"maintenance": alerts})
+                recipients[rule.id] = rule.recipients
+
+        else:
+            # Placeholder for permit/maintenance triggers
+            for rule in trigger_rules:
+                recipients[rule.id] = rule.recipients
+
+        return recipients
 
     async def _drivers_with_expiration(
         self,
-        company_id: str,
+        company_ids: Iterable[str],
         column: str,
         start: date,
         end: date,
-    ) -> List[str]:
+    ) -> Dict[str, List[Tuple[str, date]]]:
         exp_column = getattr(Driver, column)
         result = await self.db.execute(
-            select(Driver.email)
+            select(Driver.company_id, Driver.email, exp_column)
             .where(
-                Driver.company_id == company_id,
+                Driver.company_id.in_(list(company_ids)),
                 exp_column >= start,
                 exp_column <= end,
                 Driver.email.isnot(None),
             )
         )
-        emails = [email for email in result.scalars().all() if email]
-        return emails or []
+        expirations: Dict[str, List[Tuple[str, date]]] = defaultdict(list)
+        for company_id, email, expires in result.all():
+            if email:
+                expirations[company_id].append((email, expires))
+        return expirations
 
-    async def _recent_incidents(self, company_id: str) -> List[str]:
+    async def _recent_incidents(self, company_ids: Iterable[str]) -> Dict[str, List[str]]:
         cutoff = datetime.utcnow() - timedelta(days=1)
         result = await self.db.execute(
-            select(Driver.email)
+            select(Driver.company_id, Driver.email)
             .join(DriverIncident, DriverIncident.driver_id == Driver.id)
             .where(
-                Driver.company_id == company_id,
+                Driver.company_id.in_(list(company_ids)),
                 DriverIncident.severity == "CRITICAL",
                 DriverIncident.occurred_at >= cutoff,
                 Driver.email.isnot(None),
             )
         )
-        emails = [email for email in result.scalars().all() if email]
+        emails: Dict[str, List[str]] = defaultdict(list)
+        for company_id, email in result.all():
+            if email:
+                emails[company_id].append(email)
         return emails
 
-    async def _jurisdiction_threshold(self, company_id: str, threshold: float) -> bool:
+    async def _jurisdiction_tax_due(self, company_ids: Iterable[str]) -> Dict[str, float]:
         result = await self.db.execute(
-            select(func.coalesce(func.sum(JurisdictionRollup.tax_due), 0)).where(
-                JurisdictionRollup.company_id == company_id
-            )
+            select(JurisdictionRollup.company_id, func.coalesce(func.sum(JurisdictionRollup.tax_due), 0))
+            .where(JurisdictionRollup.company_id.in_(list(company_ids)))
+            .group_by(JurisdictionRollup.company_id)
         )
-        total_tax = result.scalar_one()
-        return float(total_tax or 0) >= threshold
+        return {company_id: float(total or 0) for company_id, total in result.all()}
 
     async def _maintenance_due_forecasts(
         self,
-        company_id: str,
+        company_ids: Iterable[str],
         lead_days: int,
-        risk_threshold: float | None,
-    ) -> List[Dict[str, object]]:
+    ) -> Dict[str, List[Dict[str, object]]]:
+        """OVERDUE forecasts plus DUE_SOON ones inside the widest lead window; rules filter further."""
         today = date.today()
         window_end = today + timedelta(days=lead_days) if lead_days > 0 else today
 
@@ -173,18 +322,15 @@ class AutomationEvaluator:
             )
             .join(Equipment, EquipmentMaintenanceForecast.equipment_id == Equipment.id)
             .where(
-                EquipmentMaintenanceForecast.company_id == company_id,
+                EquipmentMaintenanceForecast.company_id.in_(list(company_ids)),
                 or_(*status_filters),
             )
         )
 
-        if risk_threshold is not None:
-            stmt = stmt.where(EquipmentMaintenanceForecast.risk_score >= float(risk_threshold))
-
         result = await self.db.execute(stmt)
-        alerts: List[Dict[str, object]] = []
+        alerts: Dict[str, List[Dict[str, object]]] = defaultdict(list)
         for forecast, unit_number, equipment_type in result.all():
-            alerts.append(
+            alerts[forecast.company_id].append(
                 {
                     "equipment_id": forecast.equipment_id,
                     "unit_number": unit_number or "",
@@ -197,24 +343,3 @@ class AutomationEvaluator:
                 }
             )
         return alerts
-
-    async def _log_delivery(
-        self,
-        company_id: str,
-        rule: AutomationRule,
-        channel: str,
-        recipient: str,
-        success: bool,
-        detail: str,
-    ) -> None:
-        log = NotificationLog(
-            id=str(uuid.uuid4()),
-            company_id=company_id,
-            rule_id=rule.id,
-            channel=channel,
-            recipient=recipient,
-            status="sent" if success else "error",
-            detail=detail,
-        )
-        self.db.add(log)
-
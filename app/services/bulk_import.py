@@ -0,0 +1,570 @@
+"""Set-based bulk import engine for drivers, equipment and loads.
+
+Rows are streamed from the uploaded file, validated, and processed in batches:
+
+- Duplicates are resolved with ONE query per batch (emails/phones/CDLs for
+  drivers, unit numbers/VINs for equipment) instead of one query per row
+- Each batch is inserted with multi-row INSERTs (executemany / insertmanyvalues)
+  inside a savepoint; if the batch fails, rows are retried one by one so a
+  single bad row doesn't sink the batch and still gets a row-level error
+- Large files can run as a background ImportJob whose counters are updated
+  after every batch for progress polling
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionFactory
+from app.models.driver import Driver
+from app.models.equipment import Equipment
+from app.models.import_job import ImportJob
+from app.models.load import Load, LoadStop
+from app.models.worker import Worker, WorkerRole, WorkerStatus, WorkerType
+from app.schemas.imports import ImportError, ImportResult
+from app.services.import_service import ImportService
+
+logger = logging.getLogger(__name__)
+
+ENTITY_TYPES = ("drivers", "equipment", "loads")
+
+# Rows per duplicate-resolution query / insert batch
+BATCH_SIZE = 500
+# Cap on errors/warnings kept on a job row (counts are always exact)
+MAX_REPORTED_ISSUES = 200
+
+
+@dataclass
+class _PendingRecord:
+    """One source row turned into one or more INSERT values (e.g. worker + driver)."""
+
+    row: int
+    created_id: str
+    inserts: List[Tuple[Any, Dict[str, Any]]]
+
+
+@dataclass
+class ImportProgress:
+    """Running counters reported after every batch."""
+
+    total: int = 0
+    processed: int = 0
+    successful: int = 0
+    failed: int = 0
+    skipped: int = 0
+    errors: List[ImportError] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    created_ids: List[str] = field(default_factory=list)
+
+    def add_error(self, row: int, error: str) -> None:
+        self.failed += 1
+        self.errors.append(ImportError(row=row, error=error))
+
+    def add_warning(self, warning: str) -> None:
+        self.warnings.append(warning)
+
+
+ProgressCallback = Callable[[ImportProgress], Awaitable[None]]
+
+
+def _combine_date_time(day: Optional[date], time_str: Optional[str]) -> Optional[datetime]:
+    """Combine an import date with an optional HH:MM time."""
+    if not day:
+        return None
+    if time_str:
+        try:
+            time_parts = time_str.strip().split(":")
+            if len(time_parts) == 2:
+                return datetime.combine(
+                    day, datetime.min.time().replace(hour=int(time_parts[0]), minute=int(time_parts[1]))
+                )
+        except (ValueError, AttributeError):
+            pass  # Fall back to midnight on invalid time format
+    return datetime.combine(day, datetime.min.time())
+
+
+class BulkImportEngine:
+    """Streams, validates, dedups and bulk-inserts import rows in batches."""
+
+    def __init__(self, db: AsyncSession, import_service: Optional[ImportService] = None) -> None:
+        self.db = db
+        self.import_service = import_service or ImportService(db)
+
+    async def run(
+        self,
+        company_id: str,
+        entity_type: str,
+        file_bytes: bytes,
+        filename: str,
+        on_progress: Optional[ProgressCallback] = None,
+        batch_size: int = BATCH_SIZE,
+    ) -> ImportResult:
+        """Import a whole file. Commits after every batch."""
+        if entity_type not in ENTITY_TYPES:
+            raise ValueError(f"Unknown entity type: {entity_type}")
+
+        service = self.import_service
+        try:
+            rows = service.iter_rows(file_bytes, filename, entity_type=entity_type)
+            first_row = next(rows, None)
+        except Exception as e:
+            raise ValueError(f"Failed to parse file: {str(e)}")
+
+        if first_row is None:
+            return ImportResult(total=0, successful=0, failed=0, errors=[], warnings=["CSV file is empty"])
+
+        validation = service.validate_headers(list(first_row.keys()), entity_type)
+        if not validation.valid:
+            return ImportResult(
+                total=0,
+                successful=0,
+                failed=0,
+                errors=[ImportError(row=0, error=err) for err in validation.errors],
+                warnings=validation.warnings,
+            )
+
+        progress = ImportProgress()
+        schema = service.SCHEMAS[entity_type]
+        prepare = {
+            "drivers": self._prepare_drivers,
+            "equipment": self._prepare_equipment,
+            "loads": self._prepare_loads,
+        }[entity_type]
+
+        # Keys accepted earlier in this file, so in-file duplicates are caught across batches
+        seen: Dict[str, Set[str]] = {}
+
+        numbered = enumerate(itertools.chain([first_row], rows), start=1)
+        try:
+            while True:
+                batch = list(itertools.islice(numbered, batch_size))
+                if not batch:
+                    break
+
+                valid_rows = []
+                for idx, row in batch:
+                    is_valid, validation_errors, validated = service.validate_row(row, schema)
+                    if is_valid:
+                        valid_rows.append((idx, validated))
+                    else:
+                        progress.add_error(idx, "; ".join(validation_errors))
+
+                records = await prepare(company_id, valid_rows, seen, progress)
+                await self._insert_records(records, progress)
+
+                progress.processed += len(batch)
+                progress.total = max(progress.total, progress.processed)
+                if on_progress:
+                    await on_progress(progress)
+                await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            logger.exception(f"{entity_type.capitalize()} bulk import failed")
+            raise
+
+        return ImportResult(
+            total=progress.processed,
+            successful=progress.successful,
+            failed=progress.failed,
+            errors=progress.errors,
+            created_ids=progress.created_ids,
+            warnings=progress.warnings,
+        )
+
+    # ------------------------------------------------------------------
+    # Insertion
+    # ------------------------------------------------------------------
+
+    async def _insert_records(self, records: List[_PendingRecord], progress: ImportProgress) -> None:
+        """Insert a batch with multi-row INSERTs; fall back to per-row savepoints on failure."""
+        if not records:
+            return
+
+        try:
+            async with self.db.begin_nested():
+                await self._execute_inserts(records)
+        except Exception as batch_error:
+            logger.info(
+                "bulk_import_batch_fallback",
+                extra={"rows": len(records), "error": str(batch_error)},
+            )
+            for record in records:
+                try:
+                    async with self.db.begin_nested():
+                        await self._execute_inserts([record])
+                except Exception as e:
+                    progress.add_error(record.row, str(e))
+                else:
+                    progress.successful += 1
+                    progress.created_ids.append(record.created_id)
+            return
+
+        progress.successful += len(records)
+        progress.created_ids.extend(record.created_id for record in records)
+
+    async def _execute_inserts(self, records: Iterable[_PendingRecord]) -> None:
+        # Group values per model, preserving parent-before-child order (worker -> driver, load -> stop)
+        grouped: Dict[Any, List[Dict[str, Any]]] = {}
+        for record in records:
+            for model, values in record.inserts:
+                grouped.setdefault(model, []).append(values)
+        for model, values in grouped.items():
+            await self.db.execute(insert(model), values)
+
+    # ------------------------------------------------------------------
+    # Per-entity preparation (one duplicate query per batch)
+    # ------------------------------------------------------------------
+
+    async def _prepare_drivers(
+        self,
+        company_id: str,
+        valid_rows: List[Tuple[int, Any]],
+        seen: Dict[str, Set[str]],
+        progress: ImportProgress,
+    ) -> List[_PendingRecord]:
+        if not valid_rows:
+            return []
+
+        seen_emails = seen.setdefault("email", set())
+        seen_phones = seen.setdefault("phone", set())
+        seen_cdls = seen.setdefault("cdl", set())
+
+        emails = {row.email for _, row in valid_rows}
+        phones = {row.phone for _, row in valid_rows}
+        cdls = {row.license_number for _, row in valid_rows if row.license_number}
+
+        conditions = [Driver.email.in_(emails), Driver.phone.in_(phones)]
+        if cdls:
+            conditions.append(Driver.cdl_number.in_(cdls))
+        result = await self.db.execute(
+            select(Driver.email, Driver.phone, Driver.cdl_number).where(
+                Driver.company_id == company_id,
+                or_(*conditions),
+            )
+        )
+        for email, phone, cdl_number in result.all():
+            if email:
+                seen_emails.add(email)
+            if phone:
+                seen_phones.add(phone)
+            if cdl_number:
+                seen_cdls.add(cdl_number)
+
+        records = []
+        for idx, data in valid_rows:
+            if (
+                data.email in seen_emails
+                or data.phone in seen_phones
+                or (data.license_number and data.license_number in seen_cdls)
+            ):
+                progress.skipped += 1
+                progress.add_warning(f"Row {idx}: Driver with email '{data.email}' already exists (skipped)")
+                continue
+            seen_emails.add(data.email)
+            seen_phones.add(data.phone)
+            if data.license_number:
+                seen_cdls.add(data.license_number)
+
+            service = self.import_service
+            license_expiry = service._parse_date(data.license_expiry)
+            hire_date = service._parse_date(data.hire_date)
+
+            driver_metadata = {}
+            if data.pay_rate:
+                driver_metadata["pay_rate"] = data.pay_rate
+            if data.pay_type:
+                driver_metadata["pay_type"] = data.pay_type
+            if hire_date:
+                driver_metadata["hire_date"] = hire_date.isoformat()
+            for key in ("address", "city", "state", "zip", "license_state", "employment_type"):
+                value = getattr(data, key)
+                if value:
+                    driver_metadata[key] = value
+
+            # Drivers are workers in the payroll system - worker row is inserted first
+            worker_id = str(uuid.uuid4())
+            driver_id = str(uuid.uuid4())
+            records.append(
+                _PendingRecord(
+                    row=idx,
+                    created_id=driver_id,
+                    inserts=[
+                        (
+                            Worker,
+                            {
+                                "id": worker_id,
+                                "company_id": company_id,
+                                "type": WorkerType.EMPLOYEE,
+                                "role": WorkerRole.DRIVER,
+                                "first_name": data.first_name,
+                                "last_name": data.last_name,
+                                "email": data.email.lower(),
+                                "phone": data.phone,
+                                "status": WorkerStatus.ACTIVE,
+                            },
+                        ),
+                        (
+                            Driver,
+                            {
+                                "id": driver_id,
+                                "company_id": company_id,
+                                "worker_id": worker_id,
+                                "first_name": data.first_name,
+                                "last_name": data.last_name,
+                                "email": data.email,
+                                "phone": data.phone,
+                                "cdl_number": data.license_number,
+                                "cdl_expiration": license_expiry,
+                                "profile_metadata": driver_metadata or None,
+                            },
+                        ),
+                    ],
+                )
+            )
+        return records
+
+    async def _prepare_equipment(
+        self,
+        company_id: str,
+        valid_rows: List[Tuple[int, Any]],
+        seen: Dict[str, Set[str]],
+        progress: ImportProgress,
+    ) -> List[_PendingRecord]:
+        if not valid_rows:
+            return []
+
+        seen_units = seen.setdefault("unit_number", set())
+        seen_vins = seen.setdefault("vin", set())
+
+        unit_numbers = {row.unit_number for _, row in valid_rows}
+        vins = {row.vin for _, row in valid_rows if row.vin}
+
+        conditions = [Equipment.unit_number.in_(unit_numbers)]
+        if vins:
+            conditions.append(Equipment.vin.in_(vins))
+        result = await self.db.execute(
+            select(Equipment.unit_number, Equipment.vin).where(
+                Equipment.company_id == company_id,
+                or_(*conditions),
+            )
+        )
+        for unit_number, vin in result.all():
+            seen_units.add(unit_number)
+            if vin:
+                seen_vins.add(vin)
+
+        records = []
+        for idx, data in valid_rows:
+            if data.unit_number in seen_units or (data.vin and data.vin in seen_vins):
+                progress.skipped += 1
+                progress.add_warning(
+                    f"Row {idx}: Equipment with unit number '{data.unit_number}' already exists (skipped)"
+                )
+                continue
+            seen_units.add(data.unit_number)
+            if data.vin:
+                seen_vins.add(data.vin)
+
+            equipment_id = str(uuid.uuid4())
+            records.append(
+                _PendingRecord(
+                    row=idx,
+                    created_id=equipment_id,
+                    inserts=[
+                        (
+                            Equipment,
+                            {
+                                "id": equipment_id,
+                                "company_id": company_id,
+                                "unit_number": data.unit_number,
+                                "equipment_type": data.equipment_type.upper(),
+                                "status": data.status or "ACTIVE",
+                                "make": data.make,
+                                "model": data.model,
+                                "year": data.year,
+                                "vin": data.vin,
+                                "current_mileage": data.current_mileage,
+                                "gps_provider": data.gps_provider,
+                                "gps_device_id": data.gps_device_id,
+                            },
+                        )
+                    ],
+                )
+            )
+        return records
+
+    async def _prepare_loads(
+        self,
+        company_id: str,
+        valid_rows: List[Tuple[int, Any]],
+        seen: Dict[str, Set[str]],
+        progress: ImportProgress,
+    ) -> List[_PendingRecord]:
+        service = self.import_service
+        records = []
+        for idx, data in valid_rows:
+            load_id = str(uuid.uuid4())
+            load_metadata = {}
+            if data.reference_number:
+                load_metadata["reference_number"] = data.reference_number
+            if data.weight:
+                load_metadata["weight"] = data.weight
+
+            pickup_at = _combine_date_time(service._parse_date(data.pickup_date), data.pickup_time)
+            delivery_at = _combine_date_time(service._parse_date(data.delivery_date), data.delivery_time)
+
+            records.append(
+                _PendingRecord(
+                    row=idx,
+                    created_id=load_id,
+                    inserts=[
+                        (
+                            Load,
+                            {
+                                "id": load_id,
+                                "company_id": company_id,
+                                "customer_name": data.customer_name,
+                                "load_type": "FTL",  # Default to Full Truckload
+                                "commodity": data.commodity,
+                                "base_rate": data.base_rate,
+                                "notes": data.special_instructions,
+                                "status": "PLANNED",
+                                "metadata_json": load_metadata or None,
+                            },
+                        ),
+                        (
+                            LoadStop,
+                            {
+                                "id": str(uuid.uuid4()),
+                                "load_id": load_id,
+                                "sequence": 1,
+                                "stop_type": "PICKUP",
+                                "location_name": data.pickup_city,
+                                "city": data.pickup_city,
+                                "state": data.pickup_state,
+                                "postal_code": data.pickup_zip,
+                                "scheduled_at": pickup_at,
+                            },
+                        ),
+                        (
+                            LoadStop,
+                            {
+                                "id": str(uuid.uuid4()),
+                                "load_id": load_id,
+                                "sequence": 2,
+                                "stop_type": "DELIVERY",
+                                "location_name": data.delivery_city,
+                                "city": data.delivery_city,
+                                "state": data.delivery_state,
+                                "postal_code": data.delivery_zip,
+                                "scheduled_at": delivery_at,
+                            },
+                        ),
+                    ],
+                )
+            )
+        return records
+
+
+# ----------------------------------------------------------------------
+# Background jobs
+# ----------------------------------------------------------------------
+
+# Strong references so running jobs aren't garbage collected mid-flight
+_running_jobs: Set[asyncio.Task] = set()
+
+
+async def start_import_job(
+    db: AsyncSession,
+    *,
+    company_id: str,
+    entity_type: str,
+    file_bytes: bytes,
+    filename: str,
+    user_id: Optional[str] = None,
+) -> ImportJob:
+    """Create an ImportJob and run the import in the background. Returns immediately."""
+    if entity_type not in ENTITY_TYPES:
+        raise ValueError(f"Unknown entity type: {entity_type}")
+
+    job = ImportJob(
+        id=str(uuid.uuid4()),
+        company_id=company_id,
+        user_id=user_id,
+        entity_type=entity_type,
+        filename=filename,
+        status="PENDING",
+        total_rows=ImportService(db).count_rows(file_bytes, filename),
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    task = asyncio.create_task(_run_import_job(job.id, company_id, entity_type, file_bytes, filename))
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+    return job
+
+
+async def get_import_job(db: AsyncSession, company_id: str, job_id: str) -> Optional[ImportJob]:
+    result = await db.execute(
+        select(ImportJob).where(ImportJob.id == job_id, ImportJob.company_id == company_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _run_import_job(
+    job_id: str,
+    company_id: str,
+    entity_type: str,
+    file_bytes: bytes,
+    filename: str,
+) -> None:
+    async with AsyncSessionFactory() as session:
+        job = await session.get(ImportJob, job_id)
+        if not job:
+            return
+
+        job.status = "RUNNING"
+        job.started_at = datetime.utcnow()
+        await session.commit()
+
+        async def _record_progress(progress: ImportProgress) -> None:
+            # Flushed with the batch commit, so counters never run ahead of inserted rows
+            job.processed_rows = progress.processed
+            job.total_rows = max(job.total_rows or 0, progress.total)
+            job.successful = progress.successful
+            job.failed = progress.failed
+            job.skipped = progress.skipped
+            job.errors = [error.model_dump() for error in progress.errors[:MAX_REPORTED_ISSUES]]
+            job.warnings = progress.warnings[:MAX_REPORTED_ISSUES]
+
+        try:
+            result = await BulkImportEngine(session).run(
+                company_id, entity_type, file_bytes, filename, on_progress=_record_progress
+            )
+            job.status = "COMPLETED"
+            job.processed_rows = result.total
+            job.successful = result.successful
+            job.failed = result.failed
+            job.errors = [error.model_dump() for error in result.errors[:MAX_REPORTED_ISSUES]]
+            job.warnings = result.warnings[:MAX_REPORTED_ISSUES]
+        except Exception as e:
+            logger.exception("import_job_failed", extra={"job_id": job_id, "entity_type": entity_type})
+            job = await session.get(ImportJob, job_id)
+            if not job:
+                return
+            job.status = "FAILED"
+            job.error_message = str(e)
+
+        job.completed_at = datetime.utcnow()
+        await session.commit()
@@ -4,10 +4,16 @@ import base64
 import io
 import json
 import os
-from typing import Tuple
+from typing import List, Tuple
 
-import pdfplumber
-import fitz  # PyMuPDF - no external dependencies like poppler
+from app.services.document_rendering import (
+    RenderedPage,
+    cache_get,
+    cache_put,
+    document_digest,
+    extract_pdf_text,
+    render_document,
+)
 
 
 class ClaudeOCRService:
@@ -63,8 +69,16 @@ class ClaudeOCRService:
         if not self.enabled:
             raise ValueError("AI OCR not enabled. Check API key configuration.")
 
+        # Re-uploaded documents (same bytes) reuse the previous extraction
+        digest = document_digest(file_bytes)
+        cache_kind = f"ocr:{self.provider}:{self.model}:{document_type}"
+        cached = cache_get(digest, cache_kind)
+        if cached is not None:
+            parsed_data, confidence, raw_text = cached
+            return dict(parsed_data), dict(confidence), raw_text
+
         # First, try extracting text (works for most PDFs, no poppler needed)
-        raw_text = self._extract_text_fallback(file_bytes, filename)
+        raw_text = await self._extract_text_fallback(file_bytes, filename)
 
         # Build extraction prompt
         prompt = self._build_extraction_prompt(document_type)
@@ -76,6 +90,7 @@ class ClaudeOCRService:
                 print("[INFO] Sending text to Gemini for AI extraction...")
                 parsed_data, confidence = await self._call_ai_with_text(raw_text, prompt)
                 print("[INFO] Text-based AI extraction successful!")
+                cache_put(digest, cache_kind, (dict(parsed_data), dict(confidence), raw_text))
                 return parsed_data, confidence, raw_text
             except Exception as e:
                 # Text-based extraction failed - this is the real error we want to see
@@ -84,46 +99,20 @@ class ClaudeOCRService:
         # No extractable text found - this is a scanned/image-based PDF
         print("[INFO] No extractable text found in PDF - attempting image-based AI extraction")
         try:
-            image_data = await self._prepare_document(file_bytes, filename)
-            parsed_data, confidence = await self._call_claude_api(image_data, prompt)
+            pages = await self._prepare_document(file_bytes, filename)
+            parsed_data, confidence = await self._call_claude_api(pages, prompt)
+            cache_put(digest, cache_kind, (dict(parsed_data), dict(confidence), raw_text))
             return parsed_data, confidence, raw_text
         except Exception as e:
             raise ValueError(f"Image-based extraction failed: {str(e)}. The PDF may be corrupted or in an unsupported format.")
 
-    async def _prepare_document(self, file_bytes: bytes, filename: str) -> str:
-        """Convert document to base64-encoded image for AI vision processing."""
-        lower_filename = filename.lower()
-
-        if lower_filename.endswith(".pdf"):
-            # Convert PDF first page to image using PyMuPDF (no poppler required)
-            try:
-                # Open PDF with PyMuPDF
-                pdf_document = fitz.open(stream=file_bytes, filetype="pdf")
-
-                if pdf_document.page_count == 0:
-                    raise ValueError("PDF has no pages")
-
-                # Get first page
-                page = pdf_document[0]
-
-                # Render page to image (matrix for 200 DPI: 200/72 = 2.78)
-                mat = fitz.Matrix(2.78, 2.78)
-                pix = page.get_pixmap(matrix=mat)
-
-                # Convert to PNG bytes
-                img_bytes = pix.tobytes("png")
-                pdf_document.close()
-
-                return base64.standard_b64encode(img_bytes).decode('utf-8')
-            except Exception as e:
-                raise ValueError(f"Failed to convert PDF to image: {str(e)}")
-
-        elif lower_filename.endswith(('.png', '.jpg', '.jpeg', '.webp')):
-            # Already an image
-            return base64.standard_b64encode(file_bytes).decode('utf-8')
+    async def _prepare_document(self, file_bytes: bytes, filename: str) -> List[RenderedPage]:
+        """Convert document to base64-encoded page images for AI vision processing.
 
-        else:
-            raise ValueError(f"Unsupported file type: {filename}")
+        Rendering runs in the document process pool (PyMuPDF, no poppler required),
+        covering the first few pages with DPI/JPEG quality adapted to the payload budget.
+        """
+        return await render_document(file_bytes, filename)
 
     def _build_extraction_prompt(self, document_type: str) -> str:
         """Build prompt for Claude based on document type."""
@@ -193,14 +182,14 @@ Return ONLY valid JSON with confidence scores."""
         else:
             return f"Extract all relevant freight/logistics information from this {document_type} document as JSON."
 
-    async def _call_claude_api(self, image_base64: str, prompt: str) -> Tuple[dict, dict]:
+    async def _call_claude_api(self, pages: List[RenderedPage], prompt: str) -> Tuple[dict, dict]:
         """Call AI API for vision-based extraction (routes to appropriate provider)."""
         if self.provider == "gemini":
-            return await self._call_gemini_api(image_base64, prompt)
+            return await self._call_gemini_api(pages, prompt)
         elif self.provider == "claude":
-            return await self._call_claude_direct(image_base64, prompt)
+            return await self._call_claude_direct(pages, prompt)
         elif self.provider == "openai":
-            return await self._call_openai_api(image_base64, prompt)
+            return await self._call_openai_api(pages, prompt)
         else:
             raise ValueError(f"Unknown AI provider: {self.provider}")
 
@@ -215,7 +204,7 @@ Return ONLY valid JSON with confidence scores."""
         else:
             raise ValueError(f"Unknown AI provider: {self.provider}")
 
-    async def _call_gemini_api(self, image_base64: str, prompt: str) -> Tuple[dict, dict]:
+    async def _call_gemini_api(self, pages: List[RenderedPage], prompt: str) -> Tuple[dict, dict]:
         """Call Google Gemini API for vision-based extraction (40x cheaper than Claude)."""
         try:
             import google.generativeai as genai
@@ -225,19 +214,15 @@ Return ONLY valid JSON with confidence scores."""
         genai.configure(api_key=self.gemini_api_key)
 
         try:
-            # Convert base64 to bytes for Gemini
-            import base64 as b64
-            image_bytes = b64.b64decode(image_base64)
-
             # Create model
             model = genai.GenerativeModel(self.model)
 
-            # Prepare content
+            # Prepare content - one image per rendered page
             from PIL import Image
-            image = Image.open(io.BytesIO(image_bytes))
+            images = [Image.open(io.BytesIO(base64.b64decode(page.data))) for page in pages]
 
             # Generate content
-            response = model.generate_content([prompt, image])
+            response = model.generate_content([prompt, *images])
 
             # Parse response
             response_text = response.text
@@ -264,7 +249,7 @@ Return ONLY valid JSON with confidence scores."""
         except Exception as e:
             raise ValueError(f"Gemini API error: {str(e)}")
 
-    async def _call_claude_direct(self, image_base64: str, prompt: str) -> Tuple[dict, dict]:
+    async def _call_claude_direct(self, pages: List[RenderedPage], prompt: str) -> Tuple[dict, dict]:
         """Call Claude API directly."""
         try:
             import anthropic
@@ -281,14 +266,17 @@ Return ONLY valid JSON with confidence scores."""
                     {
                         "role": "user",
                         "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "image/png",
-                                    "data": image_base64,
-                                },
-                            },
+                            *(
+                                {
+                                    "type": "image",
+                                    "source": {
+                                        "type": "base64",
+                                        "media_type": page.media_type,
+                                        "data": page.data,
+                                    },
+                                }
+                                for page in pages
+                            ),
                             {
                                 "type": "text",
                                 "text": prompt,
@@ -322,7 +310,7 @@ Return ONLY valid JSON with confidence scores."""
         except Exception as e:
             raise ValueError(f"Claude API error: {str(e)}")
 
-    async def _call_openai_api(self, image_base64: str, prompt: str) -> Tuple[dict, dict]:
+    async def _call_openai_api(self, pages: List[RenderedPage], prompt: str) -> Tuple[dict, dict]:
         """Call OpenAI GPT-4o-mini API."""
         try:
             from openai import OpenAI
@@ -342,12 +330,15 @@ Return ONLY valid JSON with confidence scores."""
                                 "type": "text",
                                 "text": prompt
                             },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{image_base64}"
+                            *(
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": f"data:{page.media_type};base64,{page.data}"
+                                    }
                                 }
-                            }
+                                for page in pages
+                            ),
                         ],
                     }
                 ],
@@ -512,21 +503,11 @@ Return ONLY valid JSON with confidence scores."""
         except Exception as e:
             raise ValueError(f"OpenAI text extraction error: {str(e)}")
 
-    def _extract_text_fallback(self, file_bytes: bytes, filename: str) -> str:
-        """Fallback text extraction using pdfplumber (non-AI)."""
+    async def _extract_text_fallback(self, file_bytes: bytes, filename: str) -> str:
+        """Fallback text extraction using pdfplumber (non-AI), run in the document process pool."""
         lower_filename = filename.lower()
 
         if lower_filename.endswith(".pdf"):
-            try:
-                text_parts = []
-                with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
-                full_text = "\n".join(text_parts)
-                return full_text if full_text.strip() else "No text extracted from PDF."
-            except Exception as e:
-                return f"PDF extraction error: {str(e)}"
+            return await extract_pdf_text(file_bytes)
 
         return "No text extraction available for this file type."
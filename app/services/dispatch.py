@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-from collections import Counter
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import and_, func, select, union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.models.load import Load, LoadStop
 from app.models.driver import Driver
@@ -17,21 +15,42 @@ from app.schemas.dispatch import (
     DispatchFiltersResponse,
     DriverAvailability,
 )
+from app.utils.interval_tree import IntervalTree
+
+# Estimated time on site for a stop with a scheduled time
+SCHEDULED_STOP_DURATION = timedelta(hours=1)
+# Stops without a schedule are placed at the load's creation time with a longer estimate
+UNSCHEDULED_STOP_DURATION = timedelta(hours=2)
+# Longest window the calendar serves in one request
+MAX_CALENDAR_WINDOW = timedelta(days=62)
+
+_STOP_COLUMNS = (
+    LoadStop.id.label("stop_id"),
+    LoadStop.sequence,
+    LoadStop.stop_type,
+    LoadStop.location_name,
+    LoadStop.city,
+    LoadStop.state,
+    LoadStop.scheduled_at,
+    Load.id.label("load_id"),
+    Load.customer_name,
+    Load.status,
+    Load.metadata_json,
+    Load.created_at,
+)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Stop and load timestamps are stored as naive UTC
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
 class DispatchService:
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
-    async def _load_with_stops(self, company_id: str) -> List[Load]:
-        result = await self.db.execute(
-            select(Load)
-            .where(Load.company_id == company_id)
-            .options(selectinload(Load.stops))
-            .order_by(Load.created_at.desc())
-        )
-        return list(result.scalars().all())
-
     async def _get_drivers(self, company_id: str) -> dict[str, Driver]:
         """Fetch all drivers for the company and return as a dict keyed by driver_id."""
         result = await self.db.execute(
@@ -40,135 +59,188 @@ class DispatchService:
         drivers = list(result.scalars().all())
         return {driver.id: driver for driver in drivers}
 
-    def _get_load_driver_id(self, load: Load) -> Optional[str]:
+    def _get_load_driver_id(self, load) -> Optional[str]:
         """Extract driver_id from load metadata."""
         if not load.metadata_json:
             return None
         return load.metadata_json.get("assigned_driver_id")
 
-    def _get_load_reference(self, load: Load) -> str:
+    def _get_load_reference(self, load) -> str:
         """Get load reference from metadata or use customer name + ID."""
         if load.metadata_json and "reference" in load.metadata_json:
             return str(load.metadata_json["reference"])
         # Generate a reference from customer name and load ID
         customer_prefix = load.customer_name[:4].upper() if load.customer_name else "LOAD"
-        return f"{customer_prefix}-{load.id[:8].upper()}"
+        return f"{customer_prefix}-{load.load_id[:8].upper()}"
+
+    @staticmethod
+    def _window_conditions(company_id: str, start: datetime, end: datetime):
+        """WHERE clauses for stops whose calendar slot overlaps [start, end), scheduled and unscheduled.
+
+        Scheduled stops are found through the (scheduled_at, load_id) index;
+        unscheduled ones are placed at the load's creation time, so only loads
+        created around the window are looked at for those.
+        """
+        scheduled = and_(
+            LoadStop.scheduled_at > start - SCHEDULED_STOP_DURATION,
+            LoadStop.scheduled_at < end,
+            Load.company_id == company_id,
+        )
+        unscheduled = and_(
+            Load.company_id == company_id,
+            Load.created_at > start - UNSCHEDULED_STOP_DURATION,
+            Load.created_at < end,
+            LoadStop.scheduled_at.is_(None),
+        )
+        return scheduled, unscheduled
+
+    def _window_load_ids(self, company_id: str, start: datetime, end: datetime):
+        scheduled, unscheduled = self._window_conditions(company_id, start, end)
+        return union(
+            select(LoadStop.load_id).join(Load, Load.id == LoadStop.load_id).where(scheduled),
+            select(LoadStop.load_id).join(Load, Load.id == LoadStop.load_id).where(unscheduled),
+        )
+
+    async def _stops_in_window(self, company_id: str, start: datetime, end: datetime) -> list:
+        """Stop rows whose calendar slot overlaps [start, end)."""
+        rows = []
+        # Two queries rather than an OR so each can use its own index
+        for condition in self._window_conditions(company_id, start, end):
+            result = await self.db.execute(
+                select(*_STOP_COLUMNS).join(Load, Load.id == LoadStop.load_id).where(condition)
+            )
+            rows.extend(result.all())
+        return rows
+
+    @staticmethod
+    def _availability(
+        driver: Driver, tree: IntervalTree, window_start: datetime, window_end: datetime, now: datetime
+    ) -> DriverAvailability:
+        """Availability of one driver from the tree of their stop slots (valued by load) in the window."""
+        status = "AVAILABLE"
+        if len(tree):
+            # A driver's own stops on one load don't conflict with each other
+            overlapping_loads = any(a[2] != b[2] for a, b in tree.conflicts())
+            status = "CONFLICT" if overlapping_loads else "ASSIGNED"
+
+        # Free from now (or the window start) until the next slot, skipping past slots in progress
+        available_from = max(now, window_start)
+        busy = tree.at(available_from)
+        while busy:
+            available_from = max(slot_end for _, slot_end, _ in busy)
+            busy = tree.at(available_from)
+        upcoming = tree.overlapping(available_from, window_end)
+        available_until = min((slot_start for slot_start, _, _ in upcoming), default=None)
+
+        return DriverAvailability(
+            driver_id=driver.id,
+            driver_name=f"{driver.first_name} {driver.last_name}".strip(),
+            available_from=available_from,
+            available_until=available_until,
+            status=status,
+        )
+
+    async def calendar(self, company_id: str, start: datetime, end: datetime) -> DispatchCalendarResponse:
+        start, end = _naive_utc(start), _naive_utc(end)
+        if end <= start:
+            raise ValueError("Calendar window end must be after start")
+        if end - start > MAX_CALENDAR_WINDOW:
+            raise ValueError(f"Calendar window can't exceed {MAX_CALENDAR_WINDOW.days} days")
 
-    async def calendar(self, company_id: str) -> DispatchCalendarResponse:
-        loads = await self._load_with_stops(company_id)
+        rows = await self._stops_in_window(company_id, start, end)
         drivers = await self._get_drivers(company_id)
 
         entries: List[DispatchCalendarEntry] = []
-        availability_map: dict[str, DriverAvailability] = {}
+        slots: Dict[str, List[Tuple[datetime, datetime, str]]] = {}
 
-        for load in loads:
-            driver_id = self._get_load_driver_id(load)
+        for row in rows:
+            driver_id = self._get_load_driver_id(row)
             truck_id = None
-            if load.metadata_json:
-                truck_id = load.metadata_json.get("assigned_truck_id")
-
-            for stop in load.stops:
-                # Use scheduled_at if available, otherwise use created_at
-                start_time = stop.scheduled_at
-                if start_time is None:
-                    start_time = load.created_at
-                if start_time is None:
-                    start_time = datetime.utcnow()
-
-                # Calculate end_time based on scheduled_at or estimate
-                end_time = stop.scheduled_at
-                if end_time is None:
-                    # Estimate 2 hours for the stop if no scheduled end time
-                    end_time = start_time + timedelta(hours=2)
-                else:
-                    # If scheduled_at exists, add estimated duration
-                    end_time = end_time + timedelta(hours=1)
-
-                entries.append(
-                    DispatchCalendarEntry(
-                        load_id=load.id,
-                        stop_id=stop.id,
-                        reference=self._get_load_reference(load),
-                        customer_name=load.customer_name,
-                        driver_id=driver_id,
-                        truck_id=truck_id,
-                        stop_sequence=stop.sequence,
-                        location_name=stop.location_name,
-                        city=stop.city,
-                        state=stop.state,
-                        start_time=start_time,
-                        end_time=end_time,
-                        status=load.status or "draft",
-                        is_pickup=stop.stop_type.lower().startswith("pick") if stop.stop_type else False,
-                    )
+            if row.metadata_json:
+                truck_id = row.metadata_json.get("assigned_truck_id")
+
+            if row.scheduled_at is not None:
+                start_time = row.scheduled_at
+                end_time = start_time + SCHEDULED_STOP_DURATION
+            else:
+                start_time = row.created_at or datetime.utcnow()
+                end_time = start_time + UNSCHEDULED_STOP_DURATION
+
+            entries.append(
+                DispatchCalendarEntry(
+                    load_id=row.load_id,
+                    stop_id=row.stop_id,
+                    reference=self._get_load_reference(row),
+                    customer_name=row.customer_name,
+                    driver_id=driver_id,
+                    truck_id=truck_id,
+                    stop_sequence=row.sequence,
+                    location_name=row.location_name,
+                    city=row.city,
+                    state=row.state,
+                    start_time=start_time,
+                    end_time=end_time,
+                    status=row.status or "draft",
+                    is_pickup=row.stop_type.lower().startswith("pick") if row.stop_type else False,
                 )
-
-            # Build driver availability from assigned drivers
+            )
             if driver_id and driver_id in drivers:
-                driver = drivers[driver_id]
-                if driver_id not in availability_map:
-                    # Determine driver status based on assignments
-                    status = "ASSIGNED" if driver_id else "AVAILABLE"
-                    availability_map[driver_id] = DriverAvailability(
-                        driver_id=driver.id,
-                        driver_name=f"{driver.first_name} {driver.last_name}".strip(),
-                        available_from=datetime.utcnow(),
-                        available_until=None,
-                        status=status,
-                    )
-
-        # Also include all drivers (not just assigned ones) for the scheduler
-        for driver_id, driver in drivers.items():
-            if driver_id not in availability_map:
-                availability_map[driver_id] = DriverAvailability(
-                    driver_id=driver.id,
-                    driver_name=f"{driver.first_name} {driver.last_name}".strip(),
-                    available_from=datetime.utcnow(),
-                    available_until=None,
-                    status="AVAILABLE",
-                )
+                slots.setdefault(driver_id, []).append((start_time, end_time, row.load_id))
 
-        driver_availability = list(availability_map.values())
+        entries.sort(key=lambda entry: (entry.start_time, entry.load_id, entry.stop_sequence))
+
+        now = datetime.utcnow()
+        driver_availability = [
+            self._availability(driver, IntervalTree(slots.get(driver_id, [])), start, end, now)
+            for driver_id, driver in drivers.items()
+        ]
 
         return DispatchCalendarResponse(
             entries=entries,
             driver_availability=driver_availability,
-            generated_at=datetime.utcnow(),
+            generated_at=now,
         )
 
-    async def filters(self, company_id: str) -> DispatchFiltersResponse:
-        loads = await self._load_with_stops(company_id)
-        drivers = await self._get_drivers(company_id)
-
-        status_counter: Counter[str] = Counter()
-        customer_counter: Counter[str] = Counter()
-        driver_counter: Counter[str] = Counter()
-
-        for load in loads:
-            # Count statuses
-            status = load.status or "draft"
-            status_counter[status] += 1
-
-            # Count customers
-            customer_counter[load.customer_name] += 1
+    async def filters(
+        self, company_id: str, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> DispatchFiltersResponse:
+        """Facet counts over the company's loads, or only those on the calendar for [start, end)."""
+        start, end = _naive_utc(start), _naive_utc(end)
+        conditions = [Load.company_id == company_id]
+        if start is not None and end is not None:
+            conditions.append(Load.id.in_(self._window_load_ids(company_id, start, end)))
+        scope = and_(*conditions)
+
+        load_status = func.coalesce(Load.status, "draft")
+        status_rows = await self.db.execute(
+            select(load_status, func.count()).where(scope).group_by(load_status)
+        )
+        customer_rows = await self.db.execute(
+            select(Load.customer_name, func.count()).where(scope).group_by(Load.customer_name)
+        )
+        assigned_driver = Load.metadata_json["assigned_driver_id"].as_string()
+        driver_rows = await self.db.execute(
+            select(Driver.first_name, Driver.last_name, func.count())
+            .select_from(Load)
+            .join(Driver, and_(Driver.id == assigned_driver, Driver.company_id == company_id))
+            .where(scope)
+            .group_by(Driver.id, Driver.first_name, Driver.last_name)
+        )
 
-            # Count drivers
-            driver_id = self._get_load_driver_id(load)
-            if driver_id and driver_id in drivers:
-                driver = drivers[driver_id]
-                driver_name = f"{driver.first_name} {driver.last_name}".strip()
-                driver_counter[driver_name] += 1
+        driver_counts: Dict[str, int] = {}
+        for first_name, last_name, count in driver_rows.all():
+            # Drivers sharing a name are one option, as before
+            name = f"{first_name} {last_name}".strip()
+            driver_counts[name] = driver_counts.get(name, 0) + count
 
-        def to_options(counter: Counter[str]) -> List[DispatchFilterOption]:
+        def to_options(counts) -> List[DispatchFilterOption]:
             return [
                 DispatchFilterOption(label=key, value=key, count=value)
-                for key, value in sorted(counter.items(), key=lambda item: item[0])
+                for key, value in sorted(counts, key=lambda item: item[0])
             ]
 
         return DispatchFiltersResponse(
-            statuses=to_options(status_counter),
-            customers=to_options(customer_counter),
-            drivers=to_options(driver_counter),
+            statuses=to_options(status_rows.all()),
+            customers=to_options(customer_rows.all()),
+            drivers=to_options(driver_counts.items()),
         )
-
-
@@ -1,13 +1,11 @@
 from __future__ import annotations
 
-import io
 import os
 import re
 import uuid
 from datetime import datetime
 from typing import Tuple, Optional, Dict, List, Any
 
-import pdfplumber
 from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -15,6 +13,7 @@ from app.models.document import DocumentProcessingJob
 from app.schemas.document import DocumentProcessingJobResponse
 from app.services.ai_usage import AIUsageService
 from app.services.claude_ocr import ClaudeOCRService
+from app.services.document_rendering import extract_pdf_text
 
 
 class DocumentProcessingService:
@@ -180,7 +179,7 @@ class DocumentProcessingService:
                 except Exception as e:
                     # Claude failed, fall back to regex
                     errors = {"claude_error": str(e)}
-                    raw_text = self._extract_text(file_bytes, filename)
+                    raw_text = await self._extract_text(file_bytes, filename)
                     parsed_payload, confidence = self._parse_rate_confirmation(raw_text)
                     extraction_method = "regex_fallback"
 
@@ -194,7 +193,7 @@ class DocumentProcessingService:
                     )
             else:
                 # Quota exceeded, use free regex method
-                raw_text = self._extract_text(file_bytes, filename)
+                raw_text = await self._extract_text(file_bytes, filename)
                 parsed_payload, confidence = self._parse_rate_confirmation(raw_text)
                 extraction_method = "regex_quota_exceeded"
                 errors = {"quota": quota_message}
@@ -209,7 +208,7 @@ class DocumentProcessingService:
                 )
         else:
             # AI disabled or not configured, use regex
-            raw_text = self._extract_text(file_bytes, filename)
+            raw_text = await self._extract_text(file_bytes, filename)
             parsed_payload, confidence = self._parse_rate_confirmation(raw_text)
 
         # Add metadata about extraction method
@@ -279,7 +278,7 @@ class DocumentProcessingService:
 
                 except Exception as e:
                     # Claude failed, fall back to regex
-                    raw_text = self._extract_text(file_bytes, filename)
+                    raw_text = await self._extract_text(file_bytes, filename)
                     parsed_payload, confidence = self._parse_rate_confirmation(raw_text)
                     extraction_method = "regex_fallback"
 
@@ -292,7 +291,7 @@ class DocumentProcessingService:
                     )
             else:
                 # Quota exceeded, use free regex method
-                raw_text = self._extract_text(file_bytes, filename)
+                raw_text = await self._extract_text(file_bytes, filename)
                 parsed_payload, confidence = self._parse_rate_confirmation(raw_text)
                 extraction_method = "regex_quota_exceeded"
 
@@ -316,7 +315,7 @@ class DocumentProcessingService:
                 }
         else:
             # AI disabled or not configured, use regex
-            raw_text = self._extract_text(file_bytes, filename)
+            raw_text = await self._extract_text(file_bytes, filename)
             parsed_payload, confidence = self._parse_rate_confirmation(raw_text)
 
         return {
@@ -327,13 +326,13 @@ class DocumentProcessingService:
             "extractionMethod": extraction_method,
         }
 
-    def _extract_text(self, file_bytes: bytes, filename: str) -> str:
+    async def _extract_text(self, file_bytes: bytes, filename: str) -> str:
         """Extract text from file based on type."""
         lower_filename = filename.lower()
 
         # Handle PDF files
         if lower_filename.endswith(".pdf"):
-            return self._extract_pdf_text(file_bytes)
+            return await self._extract_pdf_text(file_bytes)
 
         # Handle plain text files
         try:
@@ -341,20 +340,9 @@ class DocumentProcessingService:
         except Exception:
             return "No text extracted."
 
-    def _extract_pdf_text(self, file_bytes: bytes) -> str:
-        """Extract text from PDF using pdfplumber."""
-        try:
-            text_parts = []
-            with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-
-            full_text = "\n".join(text_parts)
-            return full_text if full_text.strip() else "No text extracted from PDF."
-        except Exception as e:
-            return f"PDF extraction error: {str(e)}"
+    async def _extract_pdf_text(self, file_bytes: bytes) -> str:
+        """Extract text from PDF using pdfplumber in the document process pool."""
+        return await extract_pdf_text(file_bytes)
 
     def _parse_rate_confirmation(self, raw_text: str) -> Tuple[dict, dict]:
         """
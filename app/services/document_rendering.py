@@ -0,0 +1,311 @@
+"""
+Off-loop document rendering and text extraction.
+
+PyMuPDF rasterization and pdfplumber text extraction are CPU bound and hold the
+GIL, so running them inline on the event loop stalls every other request on the
+worker. This module runs them in a bounded process pool:
+
+- Text extraction is split into page ranges, one per pool worker, so each
+  worker parses the document once and the bytes cross IPC once per worker
+- Scanned PDFs are rasterized page by page with adaptive DPI / JPEG quality so
+  each page fits the vision payload budget
+- Results are cached by document content hash, so a re-uploaded rate
+  confirmation skips extraction entirely
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import io
+import logging
+import math
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Quality / DPI ladder walked until a page fits the payload budget
+_JPEG_QUALITIES = (85, 70, 55)
+_DPI_STEPS = (1.0, 0.75, 0.55)
+
+NO_TEXT_MARKER = "No text extracted from PDF."
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    """A single page encoded for a vision model."""
+
+    page_number: int
+    media_type: str
+    data: str  # base64
+    dpi: int
+    size_bytes: int
+
+
+# ---------------------------------------------------------------------------
+# Worker functions (run inside the process pool - must be module level)
+# ---------------------------------------------------------------------------
+
+
+def _page_count(file_bytes: bytes) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def _extract_pages_text(file_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop), parsing the document once."""
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(file_bytes), pages=list(range(start + 1, stop + 1))) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+def _render_page(file_bytes: bytes, page_index: int, dpi: int, max_bytes: int) -> Tuple[str, bytes, int]:
+    """Rasterize one page, stepping JPEG quality then DPI down until it fits max_bytes."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        page = doc[page_index]
+        encoded = b""
+        used_dpi = dpi
+        for scale in _DPI_STEPS:
+            used_dpi = max(72, int(dpi * scale))
+            zoom = used_dpi / 72
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            for quality in _JPEG_QUALITIES:
+                encoded = pix.tobytes("jpg", jpg_quality=quality)
+                if len(encoded) <= max_bytes:
+                    return "image/jpeg", encoded, used_dpi
+        # Smallest rendition we could produce - let the provider decide
+        return "image/jpeg", encoded, used_dpi
+
+
+def _shrink_image(file_bytes: bytes, max_bytes: int) -> Tuple[str, bytes]:
+    """Re-encode an uploaded image as JPEG when it exceeds the payload budget."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(file_bytes))
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    encoded = b""
+    for scale in _DPI_STEPS:
+        candidate = image
+        if scale < 1.0:
+            candidate = image.resize((max(1, int(image.width * scale)), max(1, int(image.height * scale))))
+        for quality in _JPEG_QUALITIES:
+            buffer = io.BytesIO()
+            candidate.save(buffer, format="JPEG", quality=quality, optimize=True)
+            encoded = buffer.getvalue()
+            if len(encoded) <= max_bytes:
+                return "image/jpeg", encoded
+    return "image/jpeg", encoded
+
+
+# ---------------------------------------------------------------------------
+# Pool + cache management
+# ---------------------------------------------------------------------------
+
+_executor: Optional[ProcessPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_cache: "OrderedDict[Tuple[str, str], Tuple[Any, int]]" = OrderedDict()  # key -> (value, size in bytes)
+_cache_bytes = 0
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Forking a multithreaded server can copy held locks into the child; use a clean worker process
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _executor = ProcessPoolExecutor(
+            max_workers=max(1, settings.document_render_workers),
+            mp_context=multiprocessing.get_context(method),
+        )
+    return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Bound in-flight submissions so a bulk intake can't queue unbounded PDF bytes
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(max(1, settings.document_render_workers) * 2)
+    return _semaphore
+
+
+def shutdown_render_pool() -> None:
+    """Shut down the render process pool (called on application shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(func, *args):
+    loop = asyncio.get_running_loop()
+    async with _get_semaphore():
+        return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+async def run_in_render_pool(func, *args):
+    """Run a module-level function (e.g. another PDF renderer) on the shared render pool."""
+    return await _run(func, *args)
+
+
+def document_digest(file_bytes: bytes) -> str:
+    """Content hash used as the cache key for a document."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def _payload_size(value: Any) -> int:
+    """Approximate memory held by a cached value (the text / image payloads dominate)."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, RenderedPage):
+        return len(value.data)
+    if isinstance(value, dict):
+        return sum(_payload_size(k) + _payload_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_size(item) for item in value)
+    return 64
+
+
+def cache_get(digest: str, kind: str) -> Any:
+    key = (digest, kind)
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key][0]
+    return None
+
+
+def cache_put(digest: str, kind: str, value: Any) -> None:
+    """Cache a value, evicting least recently used entries past the entry count or byte budget."""
+    global _cache_bytes
+    key = (digest, kind)
+    size = _payload_size(value)
+    if key in _cache:
+        _cache_bytes -= _cache.pop(key)[1]
+    if size > settings.document_render_cache_max_bytes:
+        return  # Would evict everything else for one entry
+    _cache[key] = (value, size)
+    _cache_bytes += size
+    while _cache and (
+        len(_cache) > settings.document_render_cache_size or _cache_bytes > settings.document_render_cache_max_bytes
+    ):
+        _cache_bytes -= _cache.popitem(last=False)[1][1]
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+async def extract_pdf_text(file_bytes: bytes) -> str:
+    """Extract text from every page of a PDF, one pool task per page range."""
+    digest = document_digest(file_bytes)
+    cached = cache_get(digest, "text")
+    if cached is not None:
+        return cached
+
+    try:
+        page_count = await _run(_page_count, file_bytes)
+        chunk = max(1, math.ceil(page_count / max(1, settings.document_render_workers)))
+        chunks = await asyncio.gather(
+            *(
+                _run(_extract_pages_text, file_bytes, start, min(start + chunk, page_count))
+                for start in range(0, page_count, chunk)
+            )
+        )
+    except Exception as e:
+        # Errors are not cached - a transient pool failure shouldn't stick
+        return f"PDF extraction error: {str(e)}"
+
+    full_text = "\n".join(text for texts in chunks for text in texts if text)
+    result = full_text if full_text.strip() else NO_TEXT_MARKER
+    cache_put(digest, "text", result)
+    return result
+
+
+async def render_document(
+    file_bytes: bytes,
+    filename: str,
+    max_pages: Optional[int] = None,
+) -> List[RenderedPage]:
+    """
+    Encode a document as base64 images for vision extraction.
+
+    PDFs are rasterized page by page (up to max_pages) concurrently in the
+    process pool; images are passed through, re-encoded only when they exceed
+    the per-page payload budget.
+    """
+    lower_filename = filename.lower()
+    max_bytes = settings.document_render_max_image_bytes
+    digest = document_digest(file_bytes)
+
+    if lower_filename.endswith(".pdf"):
+        max_pages = max_pages or settings.document_render_max_pages
+        dpi = settings.document_render_dpi
+        cache_kind = f"render:{max_pages}:{dpi}:{max_bytes}"
+        cached = cache_get(digest, cache_kind)
+        if cached is not None:
+            return cached
+
+        try:
+            page_count = await _run(_page_count, file_bytes)
+        except Exception as e:
+            raise ValueError(f"Failed to convert PDF to image: {str(e)}")
+        if page_count == 0:
+            raise ValueError("PDF has no pages")
+
+        indexes = range(min(page_count, max_pages))
+        try:
+            renders = await asyncio.gather(
+                *(_run(_render_page, file_bytes, index, dpi, max_bytes) for index in indexes)
+            )
+        except Exception as e:
+            raise ValueError(f"Failed to convert PDF to image: {str(e)}")
+
+        pages = [
+            RenderedPage(
+                page_number=index + 1,
+                media_type=media_type,
+                data=base64.standard_b64encode(encoded).decode("utf-8"),
+                dpi=used_dpi,
+                size_bytes=len(encoded),
+            )
+            for index, (media_type, encoded, used_dpi) in zip(indexes, renders)
+        ]
+        logger.debug(
+            "document_rendered",
+            extra={"pages": len(pages), "page_count": page_count, "bytes": sum(p.size_bytes for p in pages)},
+        )
+        cache_put(digest, cache_kind, pages)
+        return pages
+
+    if lower_filename.endswith((".png", ".jpg", ".jpeg", ".webp")):
+        if len(file_bytes) <= max_bytes:
+            extension = lower_filename.rsplit(".", 1)[-1]
+            media_type = "image/jpeg" if extension in ("jpg", "jpeg") else f"image/{extension}"
+            encoded = file_bytes
+        else:
+            media_type, encoded = await _run(_shrink_image, file_bytes, max_bytes)
+        return [
+            RenderedPage(
+                page_number=1,
+                media_type=media_type,
+                data=base64.standard_b64encode(encoded).decode("utf-8"),
+                dpi=0,
+                size_bytes=len(encoded),
+            )
+        ]
+
+    raise ValueError(f"Unsupported file type: {filename}")
@@ -0,0 +1,158 @@
+"""
+Document number allocation (invoice / load numbers).
+
+Counters live in document_sequence, one row per (company, sequence), bumped
+with a single UPDATE ... RETURNING - the company row is never locked, and
+invoices and loads don't queue behind each other.
+
+Two modes per sequence, chosen by its lease size setting:
+
+- Gap-free (lease size 1): the bump runs in the caller's transaction, so a
+  rolled-back document gives its number back. Concurrent documents of the
+  same sequence wait on that one counter row until the caller commits -
+  the price of gap-free numbering, which invoices need.
+- Leased (lease size > 1): a worker reserves a block of numbers in its own
+  short transaction and hands them out from memory. No lock is held across
+  the caller's transaction; numbers can have gaps (unused block tail on
+  restart, rolled-back documents) and interleave across workers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.company import Company, DocumentSequence
+from app.services.number_generator import NumberGenerator
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class SequenceSpec:
+    name: str
+    format_column: str
+    start_column: str
+    legacy_last_column: str  # Counter formerly kept on the company row
+    default_format: str
+    lease_setting: str
+
+
+SEQUENCES: Dict[str, SequenceSpec] = {
+    "invoice": SequenceSpec(
+        "invoice",
+        "invoice_number_format",
+        "invoice_start_number",
+        "last_invoice_number",
+        "INV-{YEAR}-{NUMBER:05}",
+        "invoice_number_lease_size",
+    ),
+    "load": SequenceSpec(
+        "load",
+        "load_number_format",
+        "load_start_number",
+        "last_load_number",
+        "LOAD-{YEAR}-{NUMBER:05}",
+        "load_number_lease_size",
+    ),
+}
+
+# Leased blocks per (company, sequence): [next value, last value]
+_blocks: Dict[Tuple[str, str], List[int]] = {}
+_block_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+
+async def _ensure_row(db: AsyncSession, company_id: str, name: str, seed: int) -> None:
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+    values = {"company_id": company_id, "name": name, "last_value": seed}
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        await db.execute(insert(DocumentSequence).values(**values))
+        return
+    await db.execute(
+        dialect_insert(DocumentSequence).values(**values).on_conflict_do_nothing(index_elements=["company_id", "name"])
+    )
+
+
+async def _reserve(db: AsyncSession, company_id: str, spec: SequenceSpec, start: int, seed: int, count: int) -> int:
+    """Atomically reserve `count` numbers; returns the last one. The first number ever is `start`."""
+    stmt = (
+        update(DocumentSequence)
+        .where(DocumentSequence.company_id == company_id, DocumentSequence.name == spec.name)
+        .values(
+            last_value=case((DocumentSequence.last_value == 0, start - 1), else_=DocumentSequence.last_value) + count
+        )
+        .returning(DocumentSequence.last_value)
+        .execution_options(synchronize_session=False)
+    )
+    value = (await db.execute(stmt)).scalar_one_or_none()
+    if value is None:
+        # Companies created after the counters migration get their row on first use
+        await _ensure_row(db, company_id, spec.name, seed)
+        value = (await db.execute(stmt)).scalar_one()
+    return value
+
+
+class DocumentNumberAllocator:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def next_number(self, company_id: str, sequence: str, customer_name: Optional[str] = None) -> str:
+        """Next formatted document number for the company (e.g. INV-2026-00042)."""
+        spec = SEQUENCES[sequence]
+        result = await self.db.execute(
+            select(
+                getattr(Company, spec.format_column),
+                getattr(Company, spec.start_column),
+                getattr(Company, spec.legacy_last_column),
+            ).where(Company.id == company_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise ValueError(f"Company {company_id} not found")
+        format_template, start, legacy_last = row
+        start = start or 1
+        seed = legacy_last or 0
+
+        lease_size = max(1, getattr(settings, spec.lease_setting))
+        if lease_size > 1:
+            value = await self._leased(company_id, spec, start, seed, lease_size)
+        else:
+            value = await _reserve(self.db, company_id, spec, start, seed, 1)
+
+        return NumberGenerator.generate(
+            format_template=format_template or spec.default_format,
+            sequence_number=value,
+            customer_name=customer_name,
+        )
+
+    async def _leased(self, company_id: str, spec: SequenceSpec, start: int, seed: int, size: int) -> int:
+        key = (company_id, spec.name)
+        lock = _block_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            block = _blocks.get(key)
+            if block is None or block[0] > block[1]:
+                last = await self._lease_block(company_id, spec, start, seed, size)
+                block = [last - size + 1, last]
+                _blocks[key] = block
+            value = block[0]
+            block[0] += 1
+            return value
+
+    async def _lease_block(self, company_id: str, spec: SequenceSpec, start: int, seed: int, size: int) -> int:
+        if self.db.bind is None or self.db.bind.dialect.name == "sqlite":
+            # SQLite (tests) has one writer anyway - a second connection would just wait on the caller
+            return await _reserve(self.db, company_id, spec, start, seed, size)
+        # Own short transaction: the counter row is locked only for this statement
+        async with AsyncSession(bind=self.db.bind, expire_on_commit=False) as session:
+            last = await _reserve(session, company_id, spec, start, seed, size)
+            await session.commit()
+        return last
@@ -19,6 +19,11 @@ from app.services.drayage.demurrage_service import (
     FreeTimeRules,
     calculate_demurrage,
 )
+from app.services.drayage.exposure_service import (
+    DemurrageExposureEngine,
+    ContainerExposure,
+    TenantExposure,
+)
 
 __all__ = [
     # Container Lookup via Port APIs
@@ -30,4 +35,8 @@ __all__ = [
     "DemurrageCalculation",
     "FreeTimeRules",
     "calculate_demurrage",
+    # Portfolio Exposure
+    "DemurrageExposureEngine",
+    "ContainerExposure",
+    "TenantExposure",
 ]
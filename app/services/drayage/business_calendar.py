@@ -0,0 +1,157 @@
+"""
+Port business-day calendars.
+
+Closed-form equivalents of numpy's busday_count / busday_offset: weekdays are
+counted with week arithmetic and holidays with a binary search over a sorted
+list, so counting free time or chargeable days is O(log holidays) per
+container instead of walking the calendar one day at a time.
+
+Holiday calendars are generated per year (no hardcoded year lists to expire):
+- US: federal holidays
+- ILWU: US federal + West Coast longshore holidays (LA/LB, Oakland, Seattle/Tacoma)
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Tuple
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th (1-based) weekday of a month; n=-1 for the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    next_month = date(year + (month // 12), month % 12 + 1, 1)
+    last = next_month - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+@lru_cache(maxsize=256)
+def us_federal_holidays(year: int) -> FrozenSet[date]:
+    """US federal holidays for a year (actual dates, not observed shifts)."""
+    return frozenset({
+        date(year, 1, 1),              # New Year's Day
+        _nth_weekday(year, 1, 0, 3),   # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),   # Presidents' Day
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        date(year, 6, 19),             # Juneteenth
+        date(year, 7, 4),              # Independence Day
+        _nth_weekday(year, 9, 0, 1),   # Labor Day
+        _nth_weekday(year, 10, 0, 2),  # Columbus Day
+        date(year, 11, 11),            # Veterans Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        date(year, 12, 25),            # Christmas
+    })
+
+
+@lru_cache(maxsize=256)
+def ilwu_holidays(year: int) -> FrozenSet[date]:
+    """West Coast longshore (ILWU) terminal closures."""
+    return us_federal_holidays(year) | frozenset({
+        date(year, 7, 5),   # Bloody Thursday
+        date(year, 7, 28),  # Harry Bridges Day
+    })
+
+
+HOLIDAY_CALENDARS = {
+    "US": us_federal_holidays,
+    "ILWU": ilwu_holidays,
+}
+
+
+def _weekdays_between(start: date, end: date) -> int:
+    """Number of Mon-Fri days in [start, end)."""
+    days = (end - start).days
+    if days <= 0:
+        return 0
+    full_weeks, remainder = divmod(days, 7)
+    count = full_weeks * 5
+    first_weekday = start.weekday()
+    for offset in range(remainder):
+        if (first_weekday + offset) % 7 < 5:
+            count += 1
+    return count
+
+
+class BusinessCalendar:
+    """
+    Business-day arithmetic for one holiday calendar and free-time counting rules.
+
+    Holidays are materialized lazily per year as dates are queried.
+    """
+
+    def __init__(self, calendar: str = "US", weekend_counts: bool = False, holiday_counts: bool = False) -> None:
+        self.calendar = calendar if calendar in HOLIDAY_CALENDARS else "US"
+        self.weekend_counts = weekend_counts
+        self.holiday_counts = holiday_counts
+        self._years: set[int] = set()
+        # Sorted non-business holidays (excluding ones already skipped as weekends)
+        self._holidays: List[date] = []
+
+    def _ensure_years(self, first_year: int, last_year: int) -> None:
+        if self.holiday_counts:
+            return
+        missing = [year for year in range(first_year, last_year + 1) if year not in self._years]
+        if not missing:
+            return
+        generator = HOLIDAY_CALENDARS[self.calendar]
+        added = [
+            day
+            for year in missing
+            for day in generator(year)
+            if self.weekend_counts or day.weekday() < 5
+        ]
+        self._years.update(missing)
+        self._holidays = sorted(set(self._holidays).union(added))
+
+    def is_business_day(self, day: date) -> bool:
+        if not self.weekend_counts and day.weekday() >= 5:
+            return False
+        if self.holiday_counts:
+            return True
+        self._ensure_years(day.year, day.year)
+        index = bisect_left(self._holidays, day)
+        return not (index < len(self._holidays) and self._holidays[index] == day)
+
+    def busday_count(self, start: date, end: date) -> int:
+        """Business days in [start, end) - same convention as numpy.busday_count."""
+        if end <= start:
+            return 0
+        total = (end - start).days if self.weekend_counts else _weekdays_between(start, end)
+        if self.holiday_counts:
+            return total
+        self._ensure_years(start.year, end.year)
+        return total - (bisect_left(self._holidays, end) - bisect_left(self._holidays, start))
+
+    def busday_offset(self, start: date, days: int) -> date:
+        """The `days`-th business day strictly after `start` (start itself when days <= 0)."""
+        if days <= 0:
+            return start
+        first = start + timedelta(days=1)
+        # Upper bound: grow until enough business days fit, then binary search the first hit
+        span = days + days // 2 + 7
+        while self.busday_count(first, first + timedelta(days=span)) < days:
+            span *= 2
+        low, high = 0, span - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self.busday_count(first, first + timedelta(days=middle + 1)) >= days:
+                high = middle
+            else:
+                low = middle + 1
+        return first + timedelta(days=low)
+
+
+_calendars: Dict[Tuple[str, bool, bool], BusinessCalendar] = {}
+
+
+def get_calendar(calendar: str = "US", weekend_counts: bool = False, holiday_counts: bool = False) -> BusinessCalendar:
+    """Shared calendar instance per (calendar, counting rules)."""
+    key = (calendar, weekend_counts, holiday_counts)
+    if key not in _calendars:
+        _calendars[key] = BusinessCalendar(calendar, weekend_counts, holiday_counts)
+    return _calendars[key]
+
@@ -12,11 +12,13 @@ Key terms:
 """
 
 import logging
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field
 from enum import Enum
 
+from app.services.drayage.business_calendar import BusinessCalendar, get_calendar
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +37,7 @@ class FreeTimeRules:
     per_diem_free_days: int = 4
     weekend_counts: bool = False
     holiday_counts: bool = False
+    holiday_calendar: str = "US"  # US (federal) or ILWU (West Coast longshore)
 
     demurrage_rates: Dict[str, float] = field(default_factory=lambda: {
         "days_1_5": 150.00,
@@ -112,8 +115,8 @@ class DemurrageCalculation:
 # Default free time rules by port
 PORT_FREE_TIME_RULES: Dict[str, FreeTimeRules] = {
     "USHOU": FreeTimeRules(port_free_days=4, weekend_counts=False),
-    "USLAX": FreeTimeRules(port_free_days=4, weekend_counts=False),
-    "USLGB": FreeTimeRules(port_free_days=4, weekend_counts=False),
+    "USLAX": FreeTimeRules(port_free_days=4, weekend_counts=False, holiday_calendar="ILWU"),
+    "USLGB": FreeTimeRules(port_free_days=4, weekend_counts=False, holiday_calendar="ILWU"),
     "USNYC": FreeTimeRules(port_free_days=4, weekend_counts=False),
     "USEWR": FreeTimeRules(port_free_days=4, weekend_counts=False),
     "USSAV": FreeTimeRules(port_free_days=5, weekend_counts=False),
@@ -140,51 +143,26 @@ class DemurrageService:
         print(f"Total charges: ${calc.total_amount}")
     """
 
-    # US Federal Holidays
-    US_HOLIDAYS_2024 = [
-        date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19),
-        date(2024, 5, 27), date(2024, 6, 19), date(2024, 7, 4),
-        date(2024, 9, 2), date(2024, 10, 14), date(2024, 11, 11),
-        date(2024, 11, 28), date(2024, 12, 25),
-    ]
-
-    US_HOLIDAYS_2025 = [
-        date(2025, 1, 1), date(2025, 1, 20), date(2025, 2, 17),
-        date(2025, 5, 26), date(2025, 6, 19), date(2025, 7, 4),
-        date(2025, 9, 1), date(2025, 10, 13), date(2025, 11, 11),
-        date(2025, 11, 27), date(2025, 12, 25),
-    ]
-
-    def __init__(self):
-        self.holidays = set(self.US_HOLIDAYS_2024 + self.US_HOLIDAYS_2025)
-
     def get_free_time_rules(self, port_code: str) -> FreeTimeRules:
         """Get free time rules for a port."""
         return PORT_FREE_TIME_RULES.get(port_code.upper(), FreeTimeRules())
 
+    def get_calendar(self, rules: FreeTimeRules) -> BusinessCalendar:
+        """Business-day calendar for a set of free time rules."""
+        return get_calendar(rules.holiday_calendar, rules.weekend_counts, rules.holiday_counts)
+
     def calculate_last_free_day(
         self,
         discharge_date: datetime,
         free_days: int,
         weekend_counts: bool = False,
         holiday_counts: bool = False,
+        holiday_calendar: str = "US",
     ) -> datetime:
         """Calculate Last Free Day from discharge date."""
-        current_date = discharge_date.date()
-        days_counted = 0
-
-        while days_counted < free_days:
-            current_date += timedelta(days=1)
-
-            if not weekend_counts and current_date.weekday() >= 5:
-                continue
-
-            if not holiday_counts and current_date in self.holidays:
-                continue
-
-            days_counted += 1
-
-        return datetime.combine(current_date, datetime.min.time())
+        calendar = get_calendar(holiday_calendar, weekend_counts, holiday_counts)
+        lfd = calendar.busday_offset(discharge_date.date(), free_days)
+        return datetime.combine(lfd, datetime.min.time())
 
     def count_chargeable_days(
         self,
@@ -192,29 +170,14 @@ class DemurrageService:
         end_date: datetime,
         weekend_counts: bool = False,
         holiday_counts: bool = False,
+        holiday_calendar: str = "US",
     ) -> int:
-        """Count chargeable days between two dates."""
+        """Count chargeable days between two dates (both inclusive)."""
         if end_date <= start_date:
             return 0
 
-        current_date = start_date.date()
-        end = end_date.date()
-        days = 0
-
-        while current_date <= end:
-            is_weekend = current_date.weekday() >= 5
-            is_holiday = current_date in self.holidays
-
-            if is_weekend and not weekend_counts:
-                pass
-            elif is_holiday and not holiday_counts:
-                pass
-            else:
-                days += 1
-
-            current_date += timedelta(days=1)
-
-        return days
+        calendar = get_calendar(holiday_calendar, weekend_counts, holiday_counts)
+        return calendar.busday_count(start_date.date(), end_date.date() + timedelta(days=1))
 
     def calculate_tiered_charges(
         self,
@@ -318,6 +281,7 @@ class DemurrageService:
                 free_days=rules.port_free_days,
                 weekend_counts=rules.weekend_counts,
                 holiday_counts=rules.holiday_counts,
+                holiday_calendar=rules.holiday_calendar,
             )
 
         calc.last_free_day = last_free_day
@@ -346,6 +310,7 @@ class DemurrageService:
                 end_date=demurrage_end,
                 weekend_counts=rules.weekend_counts,
                 holiday_counts=rules.holiday_counts,
+                holiday_calendar=rules.holiday_calendar,
             )
 
             calc.demurrage_amount, calc.demurrage_breakdown = self.calculate_tiered_charges(
@@ -360,6 +325,7 @@ class DemurrageService:
                 free_days=rules.per_diem_free_days,
                 weekend_counts=rules.weekend_counts,
                 holiday_counts=rules.holiday_counts,
+                holiday_calendar=rules.holiday_calendar,
             )
 
             per_diem_end = empty_return_date or today
@@ -370,6 +336,7 @@ class DemurrageService:
                     end_date=per_diem_end,
                     weekend_counts=rules.weekend_counts,
                     holiday_counts=rules.holiday_counts,
+                    holiday_calendar=rules.holiday_calendar,
                 )
 
                 calc.per_diem_amount, calc.per_diem_breakdown = self.calculate_tiered_charges(
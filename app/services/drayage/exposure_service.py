@@ -0,0 +1,283 @@
+"""
+Portfolio-wide demurrage / per diem exposure.
+
+Computes LFD, chargeable days and tiered charges for every open container of a
+tenant (or of all tenants, for the nightly snapshot) in a single pass over a
+column-only query. Calendar math goes through the shared BusinessCalendar, so
+each container costs a handful of binary searches instead of a day-by-day walk.
+
+Usage:
+    engine = DemurrageExposureEngine(db)
+    exposure = await engine.compute_for_company(company_id)
+    print(exposure.total_tomorrow - exposure.total_today)
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.drayage import DrayageContainer, DrayageExposureSnapshot
+from app.services.drayage.demurrage_service import DemurrageService, FreeTimeRules
+
+logger = logging.getLogger(__name__)
+
+# Containers in these statuses no longer accrue demurrage or per diem
+CLOSED_CONTAINER_STATUSES = ("RETURNED", "CANCELLED")
+
+_EXPOSURE_COLUMNS = (
+    DrayageContainer.id,
+    DrayageContainer.company_id,
+    DrayageContainer.load_id,
+    DrayageContainer.container_number,
+    DrayageContainer.port_code,
+    DrayageContainer.terminal_code,
+    DrayageContainer.status,
+    DrayageContainer.discharge_date,
+    DrayageContainer.last_free_day,
+    DrayageContainer.outgate_at,
+    DrayageContainer.return_actual_at,
+    DrayageContainer.ingate_at,
+)
+
+
+@dataclass
+class ContainerExposure:
+    """Exposure for one container as of a date, plus tomorrow's projection."""
+    container_id: str
+    container_number: str
+    port_code: Optional[str]
+    terminal_code: Optional[str]
+    status: str
+    load_id: Optional[str]
+    last_free_day: Optional[date]
+    days_until_lfd: Optional[int]
+    warning_level: str
+    demurrage_days: int = 0
+    demurrage_amount: float = 0.0
+    per_diem_days: int = 0
+    per_diem_amount: float = 0.0
+    total_today: float = 0.0
+    total_tomorrow: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "container_id": self.container_id,
+            "container_number": self.container_number,
+            "port_code": self.port_code,
+            "terminal_code": self.terminal_code,
+            "status": self.status,
+            "load_id": self.load_id,
+            "last_free_day": self.last_free_day.isoformat() if self.last_free_day else None,
+            "days_until_lfd": self.days_until_lfd,
+            "warning_level": self.warning_level,
+            "demurrage_days": self.demurrage_days,
+            "demurrage_amount": self.demurrage_amount,
+            "per_diem_days": self.per_diem_days,
+            "per_diem_amount": self.per_diem_amount,
+            "total_today": self.total_today,
+            "total_tomorrow": self.total_tomorrow,
+            "tomorrow_increase": round(self.total_tomorrow - self.total_today, 2),
+        }
+
+
+@dataclass
+class TenantExposure:
+    """Aggregated exposure for a tenant."""
+    company_id: str
+    as_of: date
+    containers: List[ContainerExposure] = field(default_factory=list)
+
+    @property
+    def total_today(self) -> float:
+        return round(sum(c.total_today for c in self.containers), 2)
+
+    @property
+    def total_tomorrow(self) -> float:
+        return round(sum(c.total_tomorrow for c in self.containers), 2)
+
+    @property
+    def incurring_count(self) -> int:
+        return sum(1 for c in self.containers if c.total_today > 0)
+
+    def summary(self) -> Dict[str, Any]:
+        by_port: Dict[str, Dict[str, float]] = defaultdict(lambda: {"containers": 0, "total_today": 0.0, "total_tomorrow": 0.0})
+        by_warning: Dict[str, int] = defaultdict(int)
+        for c in self.containers:
+            port = by_port[c.port_code or "UNKNOWN"]
+            port["containers"] += 1
+            port["total_today"] = round(port["total_today"] + c.total_today, 2)
+            port["total_tomorrow"] = round(port["total_tomorrow"] + c.total_tomorrow, 2)
+            by_warning[c.warning_level] += 1
+        return {"by_port": dict(by_port), "by_warning_level": dict(by_warning)}
+
+    def to_dict(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        ranked = sorted(self.containers, key=lambda c: (c.total_tomorrow, -(c.days_until_lfd or 0)), reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return {
+            "company_id": self.company_id,
+            "as_of": self.as_of.isoformat(),
+            "container_count": len(self.containers),
+            "incurring_count": self.incurring_count,
+            "total_today": self.total_today,
+            "total_tomorrow": self.total_tomorrow,
+            "tomorrow_increase": round(self.total_tomorrow - self.total_today, 2),
+            **self.summary(),
+            "containers": [c.to_dict() for c in ranked],
+        }
+
+
+class DemurrageExposureEngine:
+    """Computes demurrage / per diem exposure across every open container."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.demurrage = DemurrageService()
+        self._rules: Dict[str, FreeTimeRules] = {}
+
+    def _rules_for(self, port_code: Optional[str]) -> FreeTimeRules:
+        key = (port_code or "").upper()
+        if key not in self._rules:
+            self._rules[key] = self.demurrage.get_free_time_rules(key)
+        return self._rules[key]
+
+    async def compute_for_company(self, company_id: str, as_of: Optional[date] = None) -> TenantExposure:
+        """Exposure for one tenant's open containers."""
+        as_of = as_of or datetime.utcnow().date()
+        result = await self.db.execute(
+            select(*_EXPOSURE_COLUMNS).where(
+                DrayageContainer.company_id == company_id,
+                DrayageContainer.status.notin_(CLOSED_CONTAINER_STATUSES),
+            )
+        )
+        exposure = TenantExposure(company_id=company_id, as_of=as_of)
+        exposure.containers = [c for c in (self._compute_row(row, as_of) for row in result.all()) if c]
+        return exposure
+
+    async def compute_all(self, as_of: Optional[date] = None) -> Dict[str, TenantExposure]:
+        """Exposure for every tenant with open containers - one query, one pass."""
+        as_of = as_of or datetime.utcnow().date()
+        result = await self.db.execute(
+            select(*_EXPOSURE_COLUMNS).where(DrayageContainer.status.notin_(CLOSED_CONTAINER_STATUSES))
+        )
+        tenants: Dict[str, TenantExposure] = {}
+        for row in result.all():
+            container = self._compute_row(row, as_of)
+            if not container:
+                continue
+            tenant = tenants.get(row.company_id)
+            if tenant is None:
+                tenant = tenants[row.company_id] = TenantExposure(company_id=row.company_id, as_of=as_of)
+            tenant.containers.append(container)
+        return tenants
+
+    def _compute_row(self, row: Any, as_of: date) -> Optional[ContainerExposure]:
+        rules = self._rules_for(row.port_code)
+        calendar = self.demurrage.get_calendar(rules)
+
+        lfd: Optional[date] = row.last_free_day.date() if row.last_free_day else None
+        if lfd is None and row.discharge_date:
+            lfd = calendar.busday_offset(row.discharge_date.date(), rules.port_free_days)
+        if lfd is None:
+            # Not discharged yet and no LFD from the port - nothing can accrue
+            return None
+
+        outgate = row.outgate_at.date() if row.outgate_at else None
+        returned_at = row.return_actual_at or row.ingate_at
+        returned = returned_at.date() if returned_at else None
+
+        days_until_lfd = (lfd - as_of).days
+        if outgate:
+            warning_level = "none"
+        elif days_until_lfd < 0:
+            warning_level = "overdue"
+        elif days_until_lfd <= 1:
+            warning_level = "urgent"
+        elif days_until_lfd <= 3:
+            warning_level = "warning"
+        else:
+            warning_level = "none"
+
+        per_diem_start = calendar.busday_offset(outgate, rules.per_diem_free_days) if outgate else None
+
+        def _charges(on: date) -> tuple[int, float, int, float]:
+            # Demurrage: business days after LFD through outgate (or `on` while still at the port)
+            demurrage_end = min(outgate, on) if outgate else on
+            demurrage_days = calendar.busday_count(lfd + timedelta(days=1), demurrage_end + timedelta(days=1))
+            demurrage_amount, _ = self.demurrage.calculate_tiered_charges(demurrage_days, rules.demurrage_rates)
+
+            per_diem_days, per_diem_amount = 0, 0.0
+            if per_diem_start and on > per_diem_start:
+                per_diem_end = min(returned, on) if returned else on
+                per_diem_days = calendar.busday_count(per_diem_start + timedelta(days=1), per_diem_end + timedelta(days=1))
+                per_diem_amount, _ = self.demurrage.calculate_tiered_charges(per_diem_days, rules.per_diem_rates)
+            return demurrage_days, demurrage_amount, per_diem_days, per_diem_amount
+
+        demurrage_days, demurrage_amount, per_diem_days, per_diem_amount = _charges(as_of)
+        _, demurrage_tomorrow, _, per_diem_tomorrow = _charges(as_of + timedelta(days=1))
+
+        return ContainerExposure(
+            container_id=row.id,
+            container_number=row.container_number,
+            port_code=row.port_code,
+            terminal_code=row.terminal_code,
+            status=row.status,
+            load_id=row.load_id,
+            last_free_day=lfd,
+            days_until_lfd=days_until_lfd,
+            warning_level=warning_level,
+            demurrage_days=demurrage_days,
+            demurrage_amount=demurrage_amount,
+            per_diem_days=per_diem_days,
+            per_diem_amount=per_diem_amount,
+            total_today=round(demurrage_amount + per_diem_amount, 2),
+            total_tomorrow=round(demurrage_tomorrow + per_diem_tomorrow, 2),
+        )
+
+    async def store_snapshots(self, exposures: Iterable[TenantExposure]) -> int:
+        """Replace the snapshots for each tenant's as_of date. Returns rows written."""
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "company_id": exposure.company_id,
+                "snapshot_date": exposure.as_of,
+                "container_count": len(exposure.containers),
+                "incurring_count": exposure.incurring_count,
+                "total_today": exposure.total_today,
+                "total_tomorrow": exposure.total_tomorrow,
+                "summary": exposure.summary(),
+                "containers": exposure.to_dict()["containers"],
+            }
+            for exposure in exposures
+        ]
+        if not rows:
+            return 0
+
+        for snapshot_date in {row["snapshot_date"] for row in rows}:
+            await self.db.execute(
+                delete(DrayageExposureSnapshot).where(
+                    DrayageExposureSnapshot.snapshot_date == snapshot_date,
+                    DrayageExposureSnapshot.company_id.in_(
+                        [row["company_id"] for row in rows if row["snapshot_date"] == snapshot_date]
+                    ),
+                )
+            )
+        await self.db.execute(DrayageExposureSnapshot.__table__.insert(), rows)
+        await self.db.commit()
+        return len(rows)
+
+    async def latest_snapshot(
+        self, company_id: str, snapshot_date: Optional[date] = None
+    ) -> Optional[DrayageExposureSnapshot]:
+        query = select(DrayageExposureSnapshot).where(DrayageExposureSnapshot.company_id == company_id)
+        if snapshot_date:
+            query = query.where(DrayageExposureSnapshot.snapshot_date == snapshot_date)
+        query = query.order_by(DrayageExposureSnapshot.snapshot_date.desc()).limit(1)
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
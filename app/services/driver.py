@@ -18,6 +18,7 @@ logger = logging.getLogger(__name__)
 from app.models.driver import Driver, DriverDocument, DriverIncident, DriverTraining
 from app.models.user import User
 from app.models.worker import Worker, WorkerType, WorkerRole, WorkerStatus
+from app.services.driver_features import invalidate_driver_features
 from app.services.email import EmailService
 from app.services.event_dispatcher import emit_event, EventType
 from app.schemas.driver import (
@@ -270,6 +271,7 @@ class DriverService:
         )
         self.db.add(incident)
         await self.db.commit()
+        invalidate_driver_features(company_id)
         await self.db.refresh(incident)
         return DriverIncidentResponse.model_validate(incident)
 
@@ -0,0 +1,200 @@
+"""
+Per-company driver feature store for load matching.
+
+Matching used to load every Driver with all incidents and recompute everything
+per request. The store keeps, per company, column arrays of the driver
+features the scorer needs:
+
+- base score (baseline + compliance / rating / experience terms)
+- incident risk, decayed and summed per driver once at build time
+- skill bitsets against a per-company skill index
+
+A snapshot is reused while a cheap watermark query (driver count / last update,
+incident count / last insert) is unchanged and the snapshot is younger than
+driver_feature_ttl_seconds (so incident decay never drifts far). Services that
+change drivers or incidents can also invalidate a company explicitly.
+"""
+
+from __future__ import annotations
+
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.driver import Driver, DriverIncident
+
+settings = get_settings()
+
+BASELINE_SCORE = 50.0
+SEVERITY_PENALTY = {"LOW": 2, "MEDIUM": 5, "HIGH": 10, "CRITICAL": 15}
+DEFAULT_SEVERITY_PENALTY = 5
+
+
+def compliance_bonus(compliance_score: float) -> float:
+    return (compliance_score - 0.5) * 20
+
+
+def rating_bonus(average_rating: float) -> float:
+    return (average_rating - 4) * 10
+
+
+def experience_bonus(total_completed_loads: float) -> float:
+    return min(total_completed_loads, 500) / 25
+
+
+def incident_penalty(severity: str, occurred_at: Optional[datetime], now: datetime) -> float:
+    months_ago = (now - occurred_at).days / 30 if occurred_at else 12
+    decay = max(0.2, 1 - months_ago / 24)
+    return SEVERITY_PENALTY.get((severity or "").upper(), DEFAULT_SEVERITY_PENALTY) * decay
+
+
+@dataclass
+class DriverFeatures:
+    """Column-oriented driver features for one company (index i = one driver)."""
+
+    company_id: str
+    built_at: float
+    watermark: Tuple
+    ids: List[str] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    truck_ids: List[Optional[str]] = field(default_factory=list)
+    available_at: List[Optional[str]] = field(default_factory=list)
+    compliance: List[Optional[float]] = field(default_factory=list)
+    rating: List[Optional[float]] = field(default_factory=list)
+    completed: List[Optional[float]] = field(default_factory=list)
+    base_score: array = field(default_factory=lambda: array("d"))
+    incident_risk: array = field(default_factory=lambda: array("d"))
+    skill_bits: List[int] = field(default_factory=list)
+    skill_index: Dict[str, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def skills_mask(self, skills: Sequence[str]) -> int:
+        """Bitmask for a set of skills; skills no driver has get no bit (they can never match)."""
+        mask = 0
+        for skill in skills:
+            bit = self.skill_index.get(skill)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def skills_for(self, bits: int) -> List[str]:
+        return sorted(skill for skill, bit in self.skill_index.items() if bits >> bit & 1)
+
+
+_store: Dict[str, DriverFeatures] = {}
+
+
+def invalidate_driver_features(company_id: str) -> None:
+    """Drop a company's snapshot so the next matching request rebuilds it."""
+    _store.pop(company_id, None)
+
+
+async def _watermark(db: AsyncSession, company_id: str) -> Tuple:
+    drivers = (
+        await db.execute(
+            select(func.count(Driver.id), func.max(Driver.updated_at)).where(Driver.company_id == company_id)
+        )
+    ).one()
+    incidents = (
+        await db.execute(
+            select(func.count(DriverIncident.id), func.max(DriverIncident.created_at))
+            .join(Driver, Driver.id == DriverIncident.driver_id)
+            .where(Driver.company_id == company_id)
+        )
+    ).one()
+    return (drivers[0], drivers[1], incidents[0], incidents[1])
+
+
+async def _build(db: AsyncSession, company_id: str, watermark: Tuple) -> DriverFeatures:
+    now = datetime.utcnow()
+    features = DriverFeatures(company_id=company_id, built_at=time.monotonic(), watermark=watermark)
+
+    incident_rows = await db.execute(
+        select(DriverIncident.driver_id, DriverIncident.severity, DriverIncident.occurred_at)
+        .join(Driver, Driver.id == DriverIncident.driver_id)
+        .where(Driver.company_id == company_id)
+    )
+    risk: Dict[str, float] = {}
+    for driver_id, severity, occurred_at in incident_rows.all():
+        risk[driver_id] = risk.get(driver_id, 0.0) + incident_penalty(severity, occurred_at, now)
+
+    driver_rows = await db.execute(
+        select(
+            Driver.id,
+            Driver.first_name,
+            Driver.last_name,
+            Driver.compliance_score,
+            Driver.average_rating,
+            Driver.total_completed_loads,
+            Driver.preference_profile,
+            Driver.profile_metadata,
+        ).where(Driver.company_id == company_id)
+    )
+    for row in driver_rows.all():
+        preference = row.preference_profile or {}
+        metadata = row.profile_metadata or {}
+
+        base = BASELINE_SCORE
+        if row.compliance_score is not None:
+            base += compliance_bonus(row.compliance_score)
+        if row.average_rating is not None:
+            base += rating_bonus(row.average_rating)
+        if row.total_completed_loads:
+            base += experience_bonus(row.total_completed_loads)
+
+        bits = 0
+        for skill in preference.get("skills") or []:
+            bit = features.skill_index.setdefault(skill, len(features.skill_index))
+            bits |= 1 << bit
+
+        features.ids.append(row.id)
+        features.names.append(f"{row.first_name} {row.last_name}".strip())
+        features.truck_ids.append(metadata.get("assigned_truck_id") if isinstance(metadata, dict) else None)
+        features.available_at.append(preference.get("available_at"))
+        features.compliance.append(row.compliance_score)
+        features.rating.append(row.average_rating)
+        features.completed.append(row.total_completed_loads)
+        features.base_score.append(base)
+        features.incident_risk.append(risk.get(row.id, 0.0))
+        features.skill_bits.append(bits)
+
+    return features
+
+
+async def get_driver_features(db: AsyncSession, company_id: str) -> DriverFeatures:
+    """Current feature snapshot for a company, rebuilt when drivers/incidents changed or it aged out."""
+    watermark = await _watermark(db, company_id)
+    cached = _store.get(company_id)
+    if (
+        cached is not None
+        and cached.watermark == watermark
+        and time.monotonic() - cached.built_at < settings.driver_feature_ttl_seconds
+    ):
+        return cached
+
+    features = await _build(db, company_id, watermark)
+    _store[company_id] = features
+    return features
+
+
+def available_from(features: DriverFeatures, index: int) -> Optional[datetime]:
+    """Availability the driver declared in their preference profile, if any."""
+    availability = features.available_at[index]
+    if availability:
+        try:
+            return datetime.fromisoformat(availability)
+        except ValueError:
+            pass
+    return None
+
+
+def eta_for(features: DriverFeatures, index: int) -> datetime:
+    return available_from(features, index) or datetime.utcnow() + timedelta(hours=4)
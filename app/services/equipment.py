@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import math
 import uuid
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Sequence
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import Float, Integer, String, bindparam, cast, column, delete, func, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -44,6 +45,19 @@ DEFAULT_MAINTENANCE_INTERVAL_DAYS = 180
 DEFAULT_MAINTENANCE_INTERVAL_MILES = 20000
 SOON_THRESHOLD_DAYS = 14
 SOON_THRESHOLD_MILES = 1000
+# Bulk location pushes: ignore GPS jitter, but refresh the position at least this often
+LOCATION_MIN_MOVE_METERS = 50.0
+LOCATION_HEARTBEAT_SECONDS = 300
+LOCATION_UPDATE_CHUNK = 5000
+
+
+def _distance_meters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle (haversine) distance."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * 6_371_000 * math.asin(math.sqrt(a))
 
 SERVICE_INTERVALS: Dict[str, Dict[str, int]] = {
     "PM_A": {"days": 90, "miles": 10000},
@@ -423,58 +437,170 @@ class EquipmentService:
         self,
         company_id: str,
         updates: List[EquipmentLocationUpdate],
-    ) -> Dict[str, int]:
-        """Bulk update locations for multiple equipment units."""
-        updated = 0
-        failed = 0
-
-        for update in updates:
-            try:
-                # Find equipment by ID, unit number, or ELD device ID
-                equipment = None
-                if update.equipment_id:
-                    result = await self.db.execute(
-                        select(Equipment).where(
-                            Equipment.company_id == company_id,
-                            Equipment.id == update.equipment_id,
-                        )
-                    )
-                    equipment = result.scalar_one_or_none()
-                elif update.unit_number:
-                    result = await self.db.execute(
-                        select(Equipment).where(
-                            Equipment.company_id == company_id,
-                            Equipment.unit_number == update.unit_number,
-                        )
-                    )
-                    equipment = result.scalar_one_or_none()
-                elif update.eld_device_id:
-                    result = await self.db.execute(
-                        select(Equipment).where(
-                            Equipment.company_id == company_id,
-                            Equipment.eld_device_id == update.eld_device_id,
-                        )
-                    )
-                    equipment = result.scalar_one_or_none()
-
-                if equipment:
-                    equipment.current_lat = update.lat
-                    equipment.current_lng = update.lng
-                    equipment.current_city = update.city
-                    equipment.current_state = update.state
-                    equipment.heading = update.heading
-                    equipment.speed_mph = update.speed_mph
-                    equipment.last_location_update = datetime.utcnow()
-                    if update.odometer is not None:
-                        equipment.current_mileage = update.odometer
-                    updated += 1
-                else:
-                    failed += 1
-            except Exception:
-                failed += 1
+    ) -> Dict[str, Any]:
+        """
+        Bulk update locations for multiple equipment units.
+
+        Identifiers are resolved with at most one IN query each (id, unit
+        number, ELD device id) and all changes are written with one UPDATE.
+        Units that moved less than LOCATION_MIN_MOVE_METERS, with no new
+        odometer reading and a position refreshed within
+        LOCATION_HEARTBEAT_SECONDS, are left untouched. When a unit appears
+        more than once, the last update in the batch wins.
+        """
+        results: List[Dict[str, Any]] = [
+            {"index": index, "equipment_id": None, "status": "not_found"} for index in range(len(updates))
+        ]
+        units = await self._resolve_location_targets(company_id, updates)
+
+        # Last update per unit wins
+        latest: Dict[str, int] = {}
+        by_unit_number = {unit["unit_number"]: unit for unit in units.values() if unit["unit_number"]}
+        by_eld_device = {unit["eld_device_id"]: unit for unit in units.values() if unit["eld_device_id"]}
+        for index, item in enumerate(updates):
+            # Same precedence as before: id, then unit number, then ELD device id
+            if item.equipment_id:
+                unit = units.get(item.equipment_id)
+            elif item.unit_number:
+                unit = by_unit_number.get(item.unit_number)
+            else:
+                unit = by_eld_device.get(item.eld_device_id) if item.eld_device_id else None
+            if unit is None:
+                continue
+            results[index]["equipment_id"] = unit["id"]
+            if unit["id"] in latest:
+                results[latest[unit["id"]]]["status"] = "superseded"
+            latest[unit["id"]] = index
+
+        now = datetime.utcnow()
+        rows: List[Dict[str, Any]] = []
+        for equipment_id, index in latest.items():
+            item = updates[index]
+            if not self._location_changed(units[equipment_id], item, now):
+                results[index]["status"] = "unchanged"
+                continue
+            results[index]["status"] = "updated"
+            rows.append(
+                {
+                    "id": equipment_id,
+                    "lat": item.lat,
+                    "lng": item.lng,
+                    "city": item.city,
+                    "state": item.state,
+                    "heading": item.heading,
+                    "speed_mph": item.speed_mph,
+                    "odometer": item.odometer,
+                }
+            )
 
+        if rows:
+            await self._apply_location_rows(company_id, rows, now)
         await self.db.commit()
-        return {"updated": updated, "failed": failed}
+
+        counts = {status: 0 for status in ("updated", "unchanged", "superseded", "not_found")}
+        for result in results:
+            counts[result["status"]] += 1
+        return {
+            "updated": counts["updated"],
+            "unchanged": counts["unchanged"] + counts["superseded"],
+            "failed": counts["not_found"],
+            "results": results,
+        }
+
+    async def _resolve_location_targets(
+        self, company_id: str, updates: Sequence[EquipmentLocationUpdate]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Current position of every unit the batch refers to, keyed by equipment id."""
+        lookups = (
+            (Equipment.id, {u.equipment_id for u in updates if u.equipment_id}),
+            (Equipment.unit_number, {u.unit_number for u in updates if not u.equipment_id and u.unit_number}),
+            (
+                Equipment.eld_device_id,
+                {u.eld_device_id for u in updates if not u.equipment_id and not u.unit_number and u.eld_device_id},
+            ),
+        )
+        units: Dict[str, Dict[str, Any]] = {}
+        for lookup_column, keys in lookups:
+            if not keys:
+                continue
+            result = await self.db.execute(
+                select(
+                    Equipment.id,
+                    Equipment.unit_number,
+                    Equipment.eld_device_id,
+                    Equipment.current_lat,
+                    Equipment.current_lng,
+                    Equipment.current_mileage,
+                    Equipment.last_location_update,
+                ).where(Equipment.company_id == company_id, lookup_column.in_(keys))
+            )
+            for row in result.mappings().all():
+                units[row["id"]] = dict(row)
+        return units
+
+    @staticmethod
+    def _location_changed(unit: Dict[str, Any], item: EquipmentLocationUpdate, now: datetime) -> bool:
+        if unit["current_lat"] is None or unit["current_lng"] is None or unit["last_location_update"] is None:
+            return True
+        if item.odometer is not None and item.odometer != unit["current_mileage"]:
+            return True
+        if (now - unit["last_location_update"]).total_seconds() >= LOCATION_HEARTBEAT_SECONDS:
+            return True
+        moved = _distance_meters(unit["current_lat"], unit["current_lng"], item.lat, item.lng)
+        return moved >= LOCATION_MIN_MOVE_METERS
+
+    async def _apply_location_rows(self, company_id: str, rows: List[Dict[str, Any]], now: datetime) -> None:
+        if self.db.bind is not None and self.db.bind.dialect.name == "postgresql":
+            # UPDATE fleet_equipment ... FROM (VALUES ...), chunked to stay under the bind parameter limit
+            for start in range(0, len(rows), LOCATION_UPDATE_CHUNK):
+                await self._apply_location_chunk(company_id, rows[start : start + LOCATION_UPDATE_CHUNK], now)
+            return
+
+        # Other dialects (SQLite in tests): one executemany UPDATE by primary key
+        table = Equipment.__table__
+        await self.db.execute(
+            update(table)
+            .where(table.c.company_id == company_id, table.c.id == bindparam("b_id"))
+            .values(
+                current_lat=bindparam("b_lat"),
+                current_lng=bindparam("b_lng"),
+                current_city=bindparam("b_city"),
+                current_state=bindparam("b_state"),
+                heading=bindparam("b_heading"),
+                speed_mph=bindparam("b_speed_mph"),
+                current_mileage=func.coalesce(bindparam("b_odometer", type_=Integer), table.c.current_mileage),
+                last_location_update=now,
+            ),
+            [{f"b_{key}": value for key, value in row.items()} for row in rows],
+        )
+
+    async def _apply_location_chunk(self, company_id: str, rows: List[Dict[str, Any]], now: datetime) -> None:
+        incoming = values(
+            column("id", String),
+            column("lat", Float),
+            column("lng", Float),
+            column("city", String),
+            column("state", String),
+            column("heading", Float),
+            column("speed_mph", Float),
+            column("odometer", Integer),
+            name="incoming",
+        ).data([tuple(row.values()) for row in rows])
+        await self.db.execute(
+            update(Equipment)
+            .where(Equipment.company_id == company_id, Equipment.id == incoming.c.id)
+            .values(
+                current_lat=incoming.c.lat,
+                current_lng=incoming.c.lng,
+                current_city=cast(incoming.c.city, String),
+                current_state=cast(incoming.c.state, String),
+                heading=cast(incoming.c.heading, Float),
+                speed_mph=cast(incoming.c.speed_mph, Float),
+                current_mileage=func.coalesce(cast(incoming.c.odometer, Integer), Equipment.current_mileage),
+                last_location_update=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
 
     async def get_equipment_with_locations(self, company_id: str) -> List[EquipmentResponse]:
         """Get all equipment that has live location data."""
@@ -68,6 +68,9 @@ class EventType(str, Enum):
     NOTIFICATION_CREATED = "notification.created"
     NOTIFICATION_BROADCAST = "notification.broadcast"
 
+    # Settlement events
+    PAY_STUB_JOB_PROGRESS = "settlement.pay_stub_job_progress"
+
 
 @dataclass
 class Event:
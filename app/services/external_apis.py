@@ -8,10 +8,12 @@ Real integrations for:
 """
 
 import os
-import httpx
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+from app.services.geocode_cache import GeocodeResult, geocode_cache
+from app.services.outbound_http import outbound
+
 
 class WeatherAPI:
     """OpenWeatherMap API integration for real weather data."""
@@ -40,7 +42,7 @@ class WeatherAPI:
         """
         location = f"{city},{state},{country}" if state else f"{city},{country}"
 
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("openweathermap") as client:
             response = await client.get(
                 f"{self.base_url}/weather",
                 params={
@@ -70,7 +72,7 @@ class WeatherAPI:
         """Get 5-day forecast."""
         location = f"{city},{state},{country}" if state else f"{city},{country}"
 
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("openweathermap") as client:
             response = await client.get(
                 f"{self.base_url}/forecast",
                 params={
@@ -136,7 +138,7 @@ class TrafficAPI:
         origin = f"{origin_lat},{origin_lon}"
         destination = f"{dest_lat},{dest_lon}" if dest_lat and dest_lon else origin
 
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("google_maps") as client:
             response = await client.get(
                 f"{self.base_url}/directions/json",
                 params={
@@ -186,12 +188,39 @@ class TrafficAPI:
 
     async def geocode_address(self, address: str) -> Tuple[float, float]:
         """
-        Convert address to latitude/longitude.
+        Convert address to latitude/longitude (cached, see geocode_cache).
 
         Returns:
             (latitude, longitude)
         """
-        async with httpx.AsyncClient() as client:
+        result = await geocode_cache.geocode(address, lambda: self._fetch_geocode(address))
+        return result.latitude, result.longitude
+
+    async def geocode_addresses(self, addresses: List[str]) -> Dict[str, Optional[Tuple[float, float]]]:
+        """
+        Batch geocoding for imports: duplicates and cached addresses cost no API call.
+
+        Returns:
+            {address: (latitude, longitude), or None if it couldn't be geocoded}
+        """
+        results = await geocode_cache.geocode_many(addresses, self._fetch_geocode)
+        return {
+            address: (result.latitude, result.longitude) if result is not None else None
+            for address, result in results.items()
+        }
+
+    async def reverse_geocode(self, lat: float, lon: float) -> str:
+        """
+        Convert latitude/longitude to address (cached per ~11 m cell, see geocode_cache).
+
+        Returns:
+            "123 Main St, Chicago, IL 60601, USA"
+        """
+        result = await geocode_cache.reverse(lat, lon, lambda: self._fetch_reverse_geocode(lat, lon))
+        return result.formatted_address
+
+    async def _fetch_geocode(self, address: str) -> GeocodeResult:
+        async with outbound.client("google_maps") as client:
             response = await client.get(
                 f"{self.base_url}/geocode/json",
                 params={
@@ -209,17 +238,12 @@ class TrafficAPI:
             if data['status'] != 'OK':
                 raise Exception(f"Geocoding error: {data['status']}")
 
-            location = data['results'][0]['geometry']['location']
-            return location['lat'], location['lng']
-
-    async def reverse_geocode(self, lat: float, lon: float) -> str:
-        """
-        Convert latitude/longitude to address.
+            result = data['results'][0]
+            location = result['geometry']['location']
+            return GeocodeResult(location['lat'], location['lng'], result.get('formatted_address'))
 
-        Returns:
-            "123 Main St, Chicago, IL 60601, USA"
-        """
-        async with httpx.AsyncClient() as client:
+    async def _fetch_reverse_geocode(self, lat: float, lon: float) -> GeocodeResult:
+        async with outbound.client("google_maps") as client:
             response = await client.get(
                 f"{self.base_url}/geocode/json",
                 params={
@@ -237,7 +261,7 @@ class TrafficAPI:
             if data['status'] != 'OK':
                 raise Exception(f"Reverse geocoding error: {data['status']}")
 
-            return data['results'][0]['formatted_address']
+            return GeocodeResult(lat, lon, data['results'][0]['formatted_address'])
 
 
 class ProductionAPIManager:
@@ -296,6 +320,13 @@ class ProductionAPIManager:
         except Exception as e:
             raise Exception(f"Failed to geocode: {str(e)}")
 
+    async def geocode_many(self, addresses: List[str]) -> Dict[str, Optional[Tuple[float, float]]]:
+        """Geocode a batch of addresses (e.g. an import); unresolvable ones map to None."""
+        if not self.traffic_api:
+            raise Exception("Geocoding API not configured. Set GOOGLE_MAPS_API_KEY environment variable.")
+
+        return await self.traffic_api.geocode_addresses(addresses)
+
     async def reverse_geocode(self, lat: float, lon: float) -> str:
         """Reverse geocode coordinates."""
         if not self.traffic_api:
@@ -0,0 +1,311 @@
+"""
+Geocode cache.
+
+Load stops, locations and driver pings keep geocoding the same warehouses,
+ports and yards. Answers are cached by key:
+
+- forward lookups by normalized address (case, whitespace and punctuation
+  folded), so "123 Main St., Chicago IL" and "123 main st, chicago il" share
+  an entry;
+- reverse lookups by a lat/lng cell (coordinates rounded to
+  geocode_reverse_precision decimals), so pings from the same yard share one.
+
+A per-worker LRU sits in front of the geocode_cache table; entries older than
+geocode_cache_ttl_days are fetched again. Concurrent lookups of the same key
+share one upstream call, and geocode_many() answers a whole import with one
+SELECT, bounded upstream concurrency for the misses and one bulk upsert.
+
+The cache is best-effort: a database error is logged and the lookup falls
+through to the geocoder. Upstream errors are not cached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.db import AsyncSessionFactory
+from app.models.geocode_cache import GeocodeCacheEntry
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FORWARD = "forward"
+REVERSE = "reverse"
+# Keys per SELECT when loading a batch from the table
+_LOAD_CHUNK = 500
+
+_PUNCTUATION = re.compile(r"[.#;]+")
+_SEPARATOR = re.compile(r"\s*,\s*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class GeocodeResult:
+    latitude: float
+    longitude: float
+    formatted_address: Optional[str] = None
+
+
+CacheKey = Tuple[str, str]
+Fetch = Callable[[], Awaitable[GeocodeResult]]
+
+
+def normalize_address(address: str) -> str:
+    text = _PUNCTUATION.sub(" ", address.lower())
+    text = _SEPARATOR.sub(", ", text)
+    return _WHITESPACE.sub(" ", text).strip(" ,")
+
+
+def reverse_key(latitude: float, longitude: float) -> str:
+    precision = settings.geocode_reverse_precision
+    return f"{latitude:.{precision}f},{longitude:.{precision}f}"
+
+
+class GeocodeCache:
+    def __init__(self, size: int, ttl: timedelta) -> None:
+        self.size = max(1, size)
+        self.ttl = ttl
+        self._memory: "OrderedDict[CacheKey, Tuple[GeocodeResult, datetime]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+
+    # -- public API ---------------------------------------------------------
+
+    async def geocode(self, address: str, fetch: Fetch) -> GeocodeResult:
+        """Coordinates for an address; fetch() asks the geocoder on a miss."""
+        return await self._lookup((FORWARD, normalize_address(address)), fetch)
+
+    async def reverse(self, latitude: float, longitude: float, fetch: Fetch) -> GeocodeResult:
+        """Address for a point, shared by every point in the same cell."""
+        return await self._lookup((REVERSE, reverse_key(latitude, longitude)), fetch)
+
+    async def geocode_many(
+        self, addresses: Iterable[str], fetch: Callable[[str], Awaitable[GeocodeResult]]
+    ) -> Dict[str, Optional[GeocodeResult]]:
+        """
+        Geocode a batch (e.g. an import), keyed by the addresses given.
+
+        Duplicate addresses are looked up once; addresses the geocoder can't
+        resolve map to None instead of failing the batch.
+        """
+        by_key: Dict[CacheKey, List[str]] = {}
+        for address in addresses:
+            if address and address.strip():
+                by_key.setdefault((FORWARD, normalize_address(address)), []).append(address)
+
+        found: Dict[CacheKey, GeocodeResult] = {}
+        pending: List[CacheKey] = []
+        for key in by_key:
+            cached = self._memory_get(key)
+            if cached is not None:
+                found[key] = cached
+            else:
+                pending.append(key)
+
+        waiting = {key: self._inflight[key] for key in pending if key in self._inflight}
+        owned = [key for key in pending if key not in waiting]
+        futures = self._claim(owned)
+        try:
+            loaded = await self._load(owned)
+            for key, result in loaded.items():
+                self._resolve(key, result, futures)
+                found[key] = result
+
+            misses = [key for key in owned if key not in loaded]
+            semaphore = asyncio.Semaphore(max(1, settings.geocode_batch_concurrency))
+
+            async def fetch_one(key: CacheKey) -> Optional[GeocodeResult]:
+                async with semaphore:
+                    try:
+                        return await fetch(by_key[key][0])
+                    except Exception as exc:
+                        self._fail(key, exc, futures)
+                        return None
+
+            fetched = await asyncio.gather(*(fetch_one(key) for key in misses))
+            stored = [(key, result) for key, result in zip(misses, fetched) if result is not None]
+            await self._store(stored)
+            for key, result in stored:
+                self._resolve(key, result, futures)
+                found[key] = result
+        finally:
+            self._release(owned, futures, RuntimeError("Geocode batch aborted"))
+
+        for key, future in waiting.items():
+            try:
+                found[key] = await asyncio.shield(future)
+            except Exception:
+                pass
+
+        return {address: found.get(key) for key, originals in by_key.items() for address in originals}
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    # -- single lookups -----------------------------------------------------
+
+    async def _lookup(self, key: CacheKey, fetch: Fetch) -> GeocodeResult:
+        cached = self._memory_get(key)
+        if cached is not None:
+            return cached
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        futures = self._claim([key])
+        try:
+            result = (await self._load([key])).get(key)
+            if result is None:
+                try:
+                    result = await fetch()
+                except Exception as exc:
+                    self._fail(key, exc, futures)
+                    raise
+                await self._store([(key, result)])
+            self._resolve(key, result, futures)
+            return result
+        finally:
+            self._release([key], futures, RuntimeError("Geocode lookup aborted"))
+
+    # -- request coalescing -------------------------------------------------
+
+    def _claim(self, keys: Sequence[CacheKey]) -> Dict[CacheKey, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in keys}
+        self._inflight.update(futures)
+        return futures
+
+    def _resolve(self, key: CacheKey, result: GeocodeResult, futures: Dict[CacheKey, asyncio.Future]) -> None:
+        self._memory_put(key, result)
+        future = futures.get(key)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    @staticmethod
+    def _fail(key: CacheKey, exc: BaseException, futures: Dict[CacheKey, asyncio.Future]) -> None:
+        future = futures.get(key)
+        if future is not None and not future.done():
+            future.set_exception(exc)
+            future.exception()  # Waiters re-raise it; don't warn when there are none
+
+    def _release(self, keys: Sequence[CacheKey], futures: Dict[CacheKey, asyncio.Future], exc: BaseException) -> None:
+        for key in keys:
+            self._fail(key, exc, futures)
+            if self._inflight.get(key) is futures.get(key):
+                del self._inflight[key]
+
+    # -- memory tier --------------------------------------------------------
+
+    def _memory_get(self, key: CacheKey) -> Optional[GeocodeResult]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        result, refreshed_at = entry
+        if datetime.utcnow() - refreshed_at > self.ttl:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return result
+
+    def _memory_put(self, key: CacheKey, result: GeocodeResult, refreshed_at: Optional[datetime] = None) -> None:
+        self._memory[key] = (result, refreshed_at or datetime.utcnow())
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+
+    # -- table tier ---------------------------------------------------------
+
+    async def _load(self, keys: Sequence[CacheKey]) -> Dict[CacheKey, GeocodeResult]:
+        if not keys:
+            return {}
+        fresh_after = datetime.utcnow() - self.ttl
+        loaded: Dict[CacheKey, GeocodeResult] = {}
+        try:
+            async with AsyncSessionFactory() as db:
+                for start in range(0, len(keys), _LOAD_CHUNK):
+                    chunk = keys[start:start + _LOAD_CHUNK]
+                    by_kind: Dict[str, List[str]] = {}
+                    for kind, lookup_key in chunk:
+                        by_kind.setdefault(kind, []).append(lookup_key)
+                    rows = await db.execute(
+                        select(GeocodeCacheEntry).where(
+                            GeocodeCacheEntry.refreshed_at >= fresh_after,
+                            or_(
+                                *(
+                                    and_(GeocodeCacheEntry.kind == kind, GeocodeCacheEntry.lookup_key.in_(lookup_keys))
+                                    for kind, lookup_keys in by_kind.items()
+                                )
+                            ),
+                        )
+                    )
+                    for entry in rows.scalars():
+                        key = (entry.kind, entry.lookup_key)
+                        loaded[key] = GeocodeResult(entry.latitude, entry.longitude, entry.formatted_address)
+                        self._memory_put(key, loaded[key], entry.refreshed_at)
+        except Exception:
+            logger.warning("geocode_cache_load_failed", extra={"keys": len(keys)}, exc_info=True)
+        return loaded
+
+    async def _store(self, results: Sequence[Tuple[CacheKey, GeocodeResult]]) -> None:
+        if not results:
+            return
+        now = datetime.utcnow()
+        rows = [
+            {
+                "kind": kind,
+                "lookup_key": lookup_key,
+                "latitude": result.latitude,
+                "longitude": result.longitude,
+                "formatted_address": result.formatted_address,
+                "provider": "google",
+                "refreshed_at": now,
+                "created_at": now,
+            }
+            for (kind, lookup_key), result in results
+        ]
+        try:
+            async with AsyncSessionFactory() as db:
+                await _upsert(db, rows)
+                await db.commit()
+        except Exception:
+            logger.warning("geocode_cache_store_failed", extra={"rows": len(rows)}, exc_info=True)
+
+
+async def _upsert(db: AsyncSession, rows: List[Dict]) -> None:
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        for row in rows:
+            await db.merge(GeocodeCacheEntry(**row))
+        return
+
+    stmt = dialect_insert(GeocodeCacheEntry)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["kind", "lookup_key"],
+        set_={
+            "latitude": stmt.excluded.latitude,
+            "longitude": stmt.excluded.longitude,
+            "formatted_address": stmt.excluded.formatted_address,
+            "provider": stmt.excluded.provider,
+            "refreshed_at": stmt.excluded.refreshed_at,
+        },
+    )
+    await db.execute(stmt, rows)
+
+
+geocode_cache = GeocodeCache(
+    size=settings.geocode_cache_size,
+    ttl=timedelta(days=settings.geocode_cache_ttl_days),
+)
@@ -7,7 +7,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import List, Optional, Tuple
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -24,6 +24,12 @@ from app.models.hq_payout import HQPayout, PayoutStatus
 from app.models.hq_system_module import HQSystemModule, ModuleStatus
 from app.models.hq_banking import HQFraudAlert, HQBankingAuditLog, FraudAlertSeverity, FraudAlertStatus, BankingAuditAction
 from app.models.banking import BankingCustomer, BankingAccount, BankingCard
+from app.services.hq_mrr import (
+    compute_tenant_mrr,
+    get_company_subscription_mrr,
+    invalidate_platform_mrr,
+    refresh_all_tenant_mrr,
+)
 from app.schemas.hq import (
     HQLoginRequest,
     HQSessionUser,
@@ -485,6 +491,7 @@ class HQTenantService:
         self.db.add(tenant)
 
         await self.db.commit()
+        invalidate_platform_mrr()
 
         # Reload with relationships
         result = await self.db.execute(
@@ -516,6 +523,7 @@ class HQTenantService:
             tenant.assigned_sales_rep_id = payload.assigned_sales_rep_id
 
         await self.db.commit()
+        invalidate_platform_mrr()
         await self.db.refresh(tenant)
         return tenant
 
@@ -526,6 +534,7 @@ class HQTenantService:
             raise ValueError("Tenant not found")
         tenant.status = TenantStatus.SUSPENDED
         await self.db.commit()
+        invalidate_platform_mrr()
         await self.db.refresh(tenant)
         return tenant
 
@@ -537,6 +546,7 @@ class HQTenantService:
         tenant.status = TenantStatus.ACTIVE
         tenant.subscription_started_at = datetime.utcnow()
         await self.db.commit()
+        invalidate_platform_mrr()
         await self.db.refresh(tenant)
         return tenant
 
@@ -554,44 +564,15 @@ class HQTenantService:
         - Add-on services revenue
         - Usage-based revenue (if applicable)
         """
-        from app.models.hq_subscription import HQSubscription
-        from decimal import Decimal
-
-        # Get tenant
         tenant = await self.db.get(HQTenant, tenant_id)
         if not tenant:
             raise ValueError(f"Tenant {tenant_id} not found")
 
-        # Initialize MRR components
-        subscription_mrr = Decimal("0.00")
-        fintech_mrr = Decimal("0.00")
+        # 1-2. Base subscription and fintech MRR (same formula as the batch engine)
+        components = await compute_tenant_mrr(self.db, tenant_id)
+        subscription_mrr = components.subscription_mrr
+        fintech_mrr = components.fintech_mrr
         addon_mrr = Decimal("0.00")
-        total_mrr = Decimal("0.00")
-
-        # 1. Base Subscription MRR
-        result = await self.db.execute(
-            select(HQSubscription)
-            .where(HQSubscription.tenant_id == tenant_id)
-            .where(HQSubscription.status.in_(["active", "trialing"]))
-        )
-        subscription = result.scalar_one_or_none()
-
-        if subscription:
-            # Use monthly_rate from subscription
-            subscription_mrr = subscription.monthly_rate or Decimal("0.00")
-
-        # 2. Fintech Revenue Estimate
-        # Banking: Estimate based on deposit volume * take rate
-        if tenant.banking_status == "ACCOUNT_OPENED" and tenant.total_deposits_mtd:
-            # Example: 0.25% take rate on deposits
-            banking_take_rate = tenant.fintech_take_rate or Decimal("0.0025")
-            fintech_mrr += (tenant.total_deposits_mtd * banking_take_rate)
-
-        # Payroll: Estimate based on active employees
-        if tenant.payroll_status == "ACTIVE" and tenant.active_employees_paid:
-            # Example: $5 per employee per month
-            payroll_per_employee = Decimal("5.00")
-            fintech_mrr += (Decimal(str(tenant.active_employees_paid)) * payroll_per_employee)
 
         # 3. Total MRR
         total_mrr = subscription_mrr + fintech_mrr + addon_mrr
@@ -599,6 +580,7 @@ class HQTenantService:
         # 4. Update tenant MRR field
         tenant.mrr_amount = total_mrr
         await self.db.commit()
+        invalidate_platform_mrr()
 
         # 5. Calculate additional metrics
         # Annual Contract Value (ACV)
@@ -626,44 +608,22 @@ class HQTenantService:
             "calculatedAt": datetime.utcnow().isoformat()
         }
 
-    async def calculate_all_tenant_mrr(self, limit: int = 100) -> dict:
+    async def calculate_all_tenant_mrr(self) -> dict:
         """
-        Batch calculate MRR for all active tenants.
+        Batch calculate MRR for all active and trial tenants.
 
         Master Spec Module 2: Run this periodically (e.g., nightly) to update
-        all tenant MRR values for reporting and churn prediction.
+        all tenant MRR values for reporting and churn prediction. Set-based:
+        one UPDATE for every tenant plus one query for the platform totals.
         """
-        from app.models.hq_tenant import TenantStatus
-
-        # Get active tenants
-        result = await self.db.execute(
-            select(HQTenant)
-            .where(HQTenant.status.in_([TenantStatus.ACTIVE, TenantStatus.TRIAL]))
-            .limit(limit)
-        )
-        tenants = result.scalars().all()
-
-        calculated_count = 0
-        errors = []
-        total_platform_mrr = Decimal("0.00")
-
-        for tenant in tenants:
-            try:
-                result = await self.calculate_mrr(tenant.id)
-                calculated_count += 1
-                total_platform_mrr += Decimal(str(result["mrr"]["totalMrr"]))
-            except Exception as e:
-                errors.append({
-                    "tenantId": tenant.id,
-                    "companyName": tenant.company.name if tenant.company else "Unknown",
-                    "error": str(e)
-                })
+        platform = await refresh_all_tenant_mrr(self.db)
+        await self.db.commit()
 
         return {
             "success": True,
-            "totalCalculated": calculated_count,
-            "totalPlatformMrr": float(total_platform_mrr),
-            "errors": errors
+            "totalCalculated": platform.tenant_count,
+            "totalPlatformMrr": float(platform.total_mrr),
+            "errors": []
         }
 
     async def update_fintech_metrics(
@@ -1102,41 +1062,24 @@ class HQDashboardService:
         """Get dashboard metrics."""
         from datetime import timedelta
         from app.models.company import Company
-        from app.models.billing import Subscription
 
-        # Total tenants (companies)
-        total_result = await self.db.execute(select(func.count(Company.id)))
-        total_tenants = total_result.scalar() or 0
-
-        # Active tenants (isActive = True)
-        active_result = await self.db.execute(
-            select(func.count(Company.id)).where(Company.isActive == True)
-        )
-        active_tenants = active_result.scalar() or 0
-
-        # Trial tenants (subscriptionPlan = 'free' or 'starter')
-        trial_result = await self.db.execute(
-            select(func.count(Company.id)).where(
-                and_(Company.isActive == True, Company.subscriptionPlan.in_(["free", "starter"]))
+        # Tenant (company) counts in one pass
+        trial_plan = and_(Company.isActive == True, Company.subscriptionPlan.in_(["free", "starter"]))
+        tenant_row = (
+            await self.db.execute(
+                select(
+                    func.count(Company.id),
+                    func.coalesce(func.sum(case((Company.isActive == True, 1), else_=0)), 0),
+                    func.coalesce(func.sum(case((trial_plan, 1), else_=0)), 0),
+                    func.coalesce(func.sum(case((Company.isActive == False, 1), else_=0)), 0),
+                )
             )
-        )
-        trial_tenants = trial_result.scalar() or 0
-
-        # Churned tenants (isActive = False)
-        churned_result = await self.db.execute(
-            select(func.count(Company.id)).where(Company.isActive == False)
-        )
-        churned_tenants = churned_result.scalar() or 0
+        ).one()
+        total_tenants, active_tenants, trial_tenants, churned_tenants = (int(value or 0) for value in tenant_row)
 
-        # MRR (sum from Subscription table for active companies)
+        # MRR: billing subscriptions of active companies (cached between dashboard loads)
         try:
-            mrr_result = await self.db.execute(
-                select(func.coalesce(func.sum(Subscription.total_monthly_cost), 0))
-                .select_from(Subscription)
-                .join(Company, Company.id == Subscription.company_id)
-                .where(Company.isActive == True)
-            )
-            mrr = Decimal(str(mrr_result.scalar() or 0))
+            mrr = await get_company_subscription_mrr(self.db)
         except Exception:
             mrr = Decimal("0")
 
@@ -1152,64 +1095,47 @@ class HQDashboardService:
         total_credits_outstanding = Decimal("0")
         hq_employee_count = 0
 
-        # Try to get HQ-specific metrics (tables may not exist)
-        try:
-            pending_payouts_result = await self.db.execute(
-                select(
-                    func.count(HQPayout.id),
-                    func.coalesce(func.sum(HQPayout.amount), 0)
-                ).where(HQPayout.status == PayoutStatus.PENDING)
-            )
-            pending_row = pending_payouts_result.one()
-            pending_payouts_count = pending_row[0] or 0
-            pending_payouts_amount = Decimal(str(pending_row[1] or 0))
-        except Exception:
-            pass
-
+        # Try to get HQ-specific metrics (tables may not exist), one round trip
         try:
-            open_contracts_result = await self.db.execute(
-                select(func.count(HQContract.id)).where(HQContract.status == ContractStatus.ACTIVE)
+            now = datetime.utcnow()
+            expiring = and_(
+                HQContract.end_date <= now + timedelta(days=30),
+                HQContract.end_date >= now,
             )
-            open_contracts = open_contracts_result.scalar() or 0
-
-            expiring_result = await self.db.execute(
-                select(func.count(HQContract.id)).where(
-                    and_(
-                        HQContract.status == ContractStatus.ACTIVE,
-                        HQContract.end_date <= datetime.utcnow() + timedelta(days=30),
-                        HQContract.end_date >= datetime.utcnow(),
+            row = (
+                await self.db.execute(
+                    select(
+                        select(func.count(HQPayout.id))
+                        .where(HQPayout.status == PayoutStatus.PENDING)
+                        .scalar_subquery(),
+                        select(func.coalesce(func.sum(HQPayout.amount), 0))
+                        .where(HQPayout.status == PayoutStatus.PENDING)
+                        .scalar_subquery(),
+                        select(func.count(HQContract.id))
+                        .where(HQContract.status == ContractStatus.ACTIVE)
+                        .scalar_subquery(),
+                        select(func.coalesce(func.sum(case((expiring, 1), else_=0)), 0))
+                        .where(HQContract.status == ContractStatus.ACTIVE)
+                        .scalar_subquery(),
+                        select(func.count(HQQuote.id))
+                        .where(HQQuote.status.in_([QuoteStatus.DRAFT, QuoteStatus.SENT]))
+                        .scalar_subquery(),
+                        select(func.coalesce(func.sum(HQCredit.remaining_amount), 0))
+                        .where(HQCredit.status == CreditStatus.APPROVED)
+                        .scalar_subquery(),
+                        select(func.count(HQEmployee.id))
+                        .where(HQEmployee.is_active == True)
+                        .scalar_subquery(),
                     )
                 )
-            )
-            expiring_contracts = expiring_result.scalar() or 0
-        except Exception:
-            pass
-
-        try:
-            pending_quotes_result = await self.db.execute(
-                select(func.count(HQQuote.id)).where(
-                    HQQuote.status.in_([QuoteStatus.DRAFT, QuoteStatus.SENT])
-                )
-            )
-            pending_quotes = pending_quotes_result.scalar() or 0
-        except Exception:
-            pass
-
-        try:
-            credits_result = await self.db.execute(
-                select(func.coalesce(func.sum(HQCredit.remaining_amount), 0)).where(
-                    HQCredit.status == CreditStatus.APPROVED
-                )
-            )
-            total_credits_outstanding = Decimal(str(credits_result.scalar() or 0))
-        except Exception:
-            pass
-
-        try:
-            employee_result = await self.db.execute(
-                select(func.count(HQEmployee.id)).where(HQEmployee.is_active == True)
-            )
-            hq_employee_count = employee_result.scalar() or 0
+            ).one()
+            pending_payouts_count = row[0] or 0
+            pending_payouts_amount = Decimal(str(row[1] or 0))
+            open_contracts = row[2] or 0
+            expiring_contracts = int(row[3] or 0)
+            pending_quotes = row[4] or 0
+            total_credits_outstanding = Decimal(str(row[5] or 0))
+            hq_employee_count = row[6] or 0
         except Exception:
             pass
 
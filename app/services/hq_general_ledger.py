@@ -6,17 +6,22 @@ Follows GAAP double-entry bookkeeping: Debits always equal Credits.
 
 from __future__ import annotations
 
+import calendar
 import uuid
 from dataclasses import dataclass, field
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
 from typing import List, Optional, Dict, Any, Tuple
 import logging
 
-from sqlalchemy import select, func, and_, or_, case, text
+from sqlalchemy import Table, bindparam, insert, select, func, and_, or_, case, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.models.company import Company
 from app.models.hq_general_ledger import (
+    HQAccountPeriodBalance,
+    HQAccountPeriodSnapshot,
     HQChartOfAccounts,
     HQJournalEntry,
     HQGeneralLedgerEntry,
@@ -28,9 +33,33 @@ from app.models.hq_general_ledger import (
     UsageMetricType,
     BillingFrequency,
 )
+from app.models.hq_tenant import HQTenant
 
 logger = logging.getLogger(__name__)
 
+# Assets and Expenses have normal debit balances
+# Liabilities, Equity, and Revenue have normal credit balances
+DEBIT_NORMAL_TYPES = (AccountType.ASSET, AccountType.EXPENSE, AccountType.COST_OF_REVENUE)
+
+# (debit total, credit total) per account id
+Totals = Dict[str, Tuple[Decimal, Decimal]]
+
+_add_to_current_balance = (
+    update(HQChartOfAccounts.__table__)
+    .where(HQChartOfAccounts.__table__.c.id == bindparam("b_id"))
+    .values(current_balance=HQChartOfAccounts.__table__.c.current_balance + bindparam("b_delta"))
+)
+
+
+def _normal_balance(account_type: AccountType, debits: Decimal, credits: Decimal) -> Decimal:
+    if account_type in DEBIT_NORMAL_TYPES:
+        return debits - credits
+    return credits - debits
+
+
+def _month_end(day: date) -> date:
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
 
 # ============================================================================
 # Data Classes for Clean Interface
@@ -214,7 +243,7 @@ class GeneralLedgerManager:
             raise ValueError("Cannot post a voided entry")
 
         # Update account balances
-        await self._update_account_balances(journal_entry_id)
+        await self._update_account_balances(entry)
 
         # Mark as posted
         entry.status = JournalEntryStatus.POSTED
@@ -479,117 +508,33 @@ class GeneralLedgerManager:
         include_tenant_breakdown: bool = False,
     ) -> ProfitLossReport:
         """
-        Generate a Profit & Loss report for the specified period.
-
-        This is the SQL query Atlas uses to generate the Monthly P&L Report.
-        """
-        # Revenue accounts (4000-4999)
-        revenue_query = """
-            SELECT
-                coa.account_number,
-                coa.account_name,
-                COALESCE(SUM(
-                    CASE WHEN gle.credit_account_id IS NOT NULL THEN gle.amount
-                         WHEN gle.debit_account_id IS NOT NULL THEN -gle.amount
-                         ELSE 0 END
-                ), 0) as balance
-            FROM hq_chart_of_accounts coa
-            LEFT JOIN hq_general_ledger_entry gle ON (
-                gle.credit_account_id = coa.id OR gle.debit_account_id = coa.id
-            )
-            LEFT JOIN hq_journal_entry je ON gle.journal_entry_id = je.id
-            WHERE coa.account_type = 'revenue'
-              AND je.status = 'posted'
-              AND je.transaction_date >= :start_date
-              AND je.transaction_date <= :end_date
-              {tenant_filter}
-            GROUP BY coa.id, coa.account_number, coa.account_name
-            ORDER BY coa.account_number
-        """
+        Generate a Profit & Loss report for the specified period (both dates inclusive).
 
-        # COGS accounts (5000-5999)
-        cogs_query = """
-            SELECT
-                coa.account_number,
-                coa.account_name,
-                COALESCE(SUM(
-                    CASE WHEN gle.debit_account_id IS NOT NULL THEN gle.amount
-                         WHEN gle.credit_account_id IS NOT NULL THEN -gle.amount
-                         ELSE 0 END
-                ), 0) as balance
-            FROM hq_chart_of_accounts coa
-            LEFT JOIN hq_general_ledger_entry gle ON (
-                gle.credit_account_id = coa.id OR gle.debit_account_id = coa.id
-            )
-            LEFT JOIN hq_journal_entry je ON gle.journal_entry_id = je.id
-            WHERE coa.account_type = 'cost_of_revenue'
-              AND je.status = 'posted'
-              AND je.transaction_date >= :start_date
-              AND je.transaction_date <= :end_date
-              {tenant_filter}
-            GROUP BY coa.id, coa.account_number, coa.account_name
-            ORDER BY coa.account_number
+        This is the query Atlas uses to generate the Monthly P&L Report. It sums
+        the daily account balances for the period rather than the ledger itself.
         """
-
-        # Expense accounts (6000-6999)
-        expense_query = """
-            SELECT
-                coa.account_number,
-                coa.account_name,
-                COALESCE(SUM(
-                    CASE WHEN gle.debit_account_id IS NOT NULL THEN gle.amount
-                         WHEN gle.credit_account_id IS NOT NULL THEN -gle.amount
-                         ELSE 0 END
-                ), 0) as balance
-            FROM hq_chart_of_accounts coa
-            LEFT JOIN hq_general_ledger_entry gle ON (
-                gle.credit_account_id = coa.id OR gle.debit_account_id = coa.id
-            )
-            LEFT JOIN hq_journal_entry je ON gle.journal_entry_id = je.id
-            WHERE coa.account_type = 'expense'
-              AND je.status = 'posted'
-              AND je.transaction_date >= :start_date
-              AND je.transaction_date <= :end_date
-              {tenant_filter}
-            GROUP BY coa.id, coa.account_number, coa.account_name
-            ORDER BY coa.account_number
-        """
-
-        tenant_filter = ""
-        params = {"start_date": start_date, "end_date": end_date}
-        if tenant_id:
-            tenant_filter = "AND (je.tenant_id = :tenant_id OR gle.tenant_id = :tenant_id)"
-            params["tenant_id"] = tenant_id
-
-        # Execute queries
-        revenue_result = await self.db.execute(
-            text(revenue_query.format(tenant_filter=tenant_filter)), params
-        )
-        cogs_result = await self.db.execute(
-            text(cogs_query.format(tenant_filter=tenant_filter)), params
-        )
-        expense_result = await self.db.execute(
-            text(expense_query.format(tenant_filter=tenant_filter)), params
+        activity = await self._period_activity(start_date, end_date, tenant_id)
+        accounts = await self._accounts_of_type(
+            [AccountType.REVENUE, AccountType.COST_OF_REVENUE, AccountType.EXPENSE],
+            account_ids=list(activity),
         )
 
-        # Process results
-        revenue = {}
-        total_revenue = Decimal("0")
-        for row in revenue_result:
-            revenue[f"{row.account_number} - {row.account_name}"] = Decimal(str(row.balance))
-            total_revenue += Decimal(str(row.balance))
-
-        cost_of_revenue = {}
-        total_cogs = Decimal("0")
-        for row in cogs_result:
-            cost_of_revenue[f"{row.account_number} - {row.account_name}"] = Decimal(str(row.balance))
-            total_cogs += Decimal(str(row.balance))
-
-        expenses = {}
-        total_expenses = Decimal("0")
-        for row in expense_result:
-            expenses[f"{row.account_number} - {row.account_name}"] = Decimal(str(row.balance))
-            total_expenses += Decimal(str(row.balance))
+        sections: Dict[AccountType, Dict[str, Decimal]] = {
+            AccountType.REVENUE: {},
+            AccountType.COST_OF_REVENUE: {},
+            AccountType.EXPENSE: {},
+        }
+        for account in accounts:
+            debits, credits = activity[account.id]
+            balance = _normal_balance(account.account_type, debits, credits)
+            sections[account.account_type][f"{account.account_number} - {account.account_name}"] = balance
+
+        revenue = sections[AccountType.REVENUE]
+        cost_of_revenue = sections[AccountType.COST_OF_REVENUE]
+        expenses = sections[AccountType.EXPENSE]
+        total_revenue = sum(revenue.values(), Decimal("0"))
+        total_cogs = sum(cost_of_revenue.values(), Decimal("0"))
+        total_expenses = sum(expenses.values(), Decimal("0"))
 
         gross_profit = total_revenue - total_cogs
         net_income = gross_profit - total_expenses
@@ -614,76 +559,35 @@ class GeneralLedgerManager:
         )
 
     async def get_balance_sheet(self, as_of_date: date) -> BalanceSheetReport:
-        """Generate a Balance Sheet as of a specific date."""
-        # Assets query
-        assets_query = """
-            SELECT
-                coa.account_number,
-                coa.account_name,
-                coa.current_balance as balance
-            FROM hq_chart_of_accounts coa
-            WHERE coa.account_type = 'asset'
-              AND coa.is_active = true
-            ORDER BY coa.account_number
-        """
-
-        # Liabilities query
-        liabilities_query = """
-            SELECT
-                coa.account_number,
-                coa.account_name,
-                coa.current_balance as balance
-            FROM hq_chart_of_accounts coa
-            WHERE coa.account_type = 'liability'
-              AND coa.is_active = true
-            ORDER BY coa.account_number
-        """
+        """Generate a Balance Sheet as of the end of a specific date."""
+        accounts = await self._accounts_of_type(
+            [AccountType.ASSET, AccountType.LIABILITY, AccountType.EQUITY],
+            active_only=True,
+        )
+        totals = await self._cumulative_totals(as_of_date)
 
-        # Equity query
-        equity_query = """
-            SELECT
-                coa.account_number,
-                coa.account_name,
-                coa.current_balance as balance
-            FROM hq_chart_of_accounts coa
-            WHERE coa.account_type = 'equity'
-              AND coa.is_active = true
-            ORDER BY coa.account_number
-        """
+        sections: Dict[AccountType, Dict[str, Decimal]] = {
+            AccountType.ASSET: {},
+            AccountType.LIABILITY: {},
+            AccountType.EQUITY: {},
+        }
+        for account in accounts:
+            debits, credits = totals.get(account.id, (Decimal("0"), Decimal("0")))
+            balance = _normal_balance(account.account_type, debits, credits)
+            sections[account.account_type][f"{account.account_number} - {account.account_name}"] = balance
 
-        assets_result = await self.db.execute(text(assets_query))
-        liabilities_result = await self.db.execute(text(liabilities_query))
-        equity_result = await self.db.execute(text(equity_query))
-
-        assets = {}
-        total_assets = Decimal("0")
-        for row in assets_result:
-            balance = Decimal(str(row.balance)) if row.balance else Decimal("0")
-            assets[f"{row.account_number} - {row.account_name}"] = balance
-            total_assets += balance
-
-        liabilities = {}
-        total_liabilities = Decimal("0")
-        for row in liabilities_result:
-            balance = Decimal(str(row.balance)) if row.balance else Decimal("0")
-            liabilities[f"{row.account_number} - {row.account_name}"] = balance
-            total_liabilities += balance
-
-        equity = {}
-        total_equity = Decimal("0")
-        for row in equity_result:
-            balance = Decimal(str(row.balance)) if row.balance else Decimal("0")
-            equity[f"{row.account_number} - {row.account_name}"] = balance
-            total_equity += balance
+        assets = sections[AccountType.ASSET]
+        liabilities = sections[AccountType.LIABILITY]
+        equity = sections[AccountType.EQUITY]
 
         return BalanceSheetReport(
             as_of_date=as_of_date,
             assets=assets,
             liabilities=liabilities,
             equity=equity,
-            total_assets=total_assets,
-            total_liabilities=total_liabilities,
-            total_equity=total_equity,
+            total_assets=sum(assets.values(), Decimal("0")),
+            total_liabilities=sum(liabilities.values(), Decimal("0")),
+            total_equity=sum(equity.values(), Decimal("0")),
         )
 
     async def get_tenant_profit_margin(
@@ -700,40 +604,9 @@ class GeneralLedgerManager:
         - Attributed AI COGS
         - Gross Margin per Tenant
         """
-        query = """
-            SELECT
-                je.tenant_id,
-                t.name as tenant_name,
-                COALESCE(SUM(
-                    CASE WHEN coa.account_type = 'revenue'
-                         AND gle.credit_account_id IS NOT NULL
-                         THEN gle.amount ELSE 0 END
-                ), 0) as revenue,
-                COALESCE(SUM(
-                    CASE WHEN coa.account_type = 'cost_of_revenue'
-                         AND gle.debit_account_id IS NOT NULL
-                         THEN gle.amount ELSE 0 END
-                ), 0) as cogs
-            FROM hq_journal_entry je
-            JOIN hq_general_ledger_entry gle ON gle.journal_entry_id = je.id
-            JOIN hq_chart_of_accounts coa ON (
-                coa.id = gle.debit_account_id OR coa.id = gle.credit_account_id
-            )
-            LEFT JOIN hq_tenant t ON je.tenant_id = t.id
-            WHERE je.status = 'posted'
-              AND je.transaction_date >= :start_date
-              AND je.transaction_date <= :end_date
-              AND (je.tenant_id = :tenant_id OR gle.tenant_id = :tenant_id)
-            GROUP BY je.tenant_id, t.name
-        """
+        breakdown = await self._tenant_revenue_and_cogs(start_date, end_date, tenant_id=tenant_id)
 
-        result = await self.db.execute(
-            text(query),
-            {"tenant_id": tenant_id, "start_date": start_date, "end_date": end_date}
-        )
-        row = result.fetchone()
-
-        if not row:
+        if tenant_id not in breakdown:
             return {
                 "tenant_id": tenant_id,
                 "revenue": Decimal("0"),
@@ -742,14 +615,13 @@ class GeneralLedgerManager:
                 "gross_margin_percent": Decimal("0"),
             }
 
-        revenue = Decimal(str(row.revenue)) if row.revenue else Decimal("0")
-        cogs = Decimal(str(row.cogs)) if row.cogs else Decimal("0")
+        tenant_name, revenue, cogs = breakdown[tenant_id]
         gross_profit = revenue - cogs
         margin_percent = (gross_profit / revenue * 100) if revenue > 0 else Decimal("0")
 
         return {
             "tenant_id": tenant_id,
-            "tenant_name": row.tenant_name,
+            "tenant_name": tenant_name,
             "revenue": revenue,
             "cogs": cogs,
             "gross_profit": gross_profit,
@@ -819,37 +691,9 @@ class GeneralLedgerManager:
         if not account:
             raise ValueError(f"Account not found: {account_id}")
 
-        # Calculate running balance from posted entries
-        date_filter = ""
-        params = {"account_id": account_id}
-        if as_of_date:
-            date_filter = "AND je.transaction_date <= :as_of_date"
-            params["as_of_date"] = as_of_date
-
-        query = f"""
-            SELECT
-                COALESCE(SUM(CASE WHEN gle.debit_account_id = :account_id THEN gle.amount ELSE 0 END), 0) as debits,
-                COALESCE(SUM(CASE WHEN gle.credit_account_id = :account_id THEN gle.amount ELSE 0 END), 0) as credits
-            FROM hq_general_ledger_entry gle
-            JOIN hq_journal_entry je ON gle.journal_entry_id = je.id
-            WHERE (gle.debit_account_id = :account_id OR gle.credit_account_id = :account_id)
-              AND je.status = 'posted'
-              {date_filter}
-        """
-
-        balance_result = await self.db.execute(text(query), params)
-        row = balance_result.fetchone()
-
-        debit_total = Decimal(str(row.debits)) if row.debits else Decimal("0")
-        credit_total = Decimal(str(row.credits)) if row.credits else Decimal("0")
-
-        # Calculate balance based on account type
-        # Assets and Expenses have normal debit balances
-        # Liabilities, Equity, and Revenue have normal credit balances
-        if account.account_type in [AccountType.ASSET, AccountType.EXPENSE, AccountType.COST_OF_REVENUE]:
-            balance = debit_total - credit_total
-        else:
-            balance = credit_total - debit_total
+        totals = await self._cumulative_totals(as_of_date, account_ids=[account_id])
+        debit_total, credit_total = totals.get(account_id, (Decimal("0"), Decimal("0")))
+        balance = _normal_balance(account.account_type, debit_total, credit_total)
 
         return AccountBalance(
             account_id=account.id,
@@ -953,6 +797,58 @@ class GeneralLedgerManager:
             for row in result
         ]
 
+    # ========================================================================
+    # Period Close
+    # ========================================================================
+
+    async def close_period(self, period_end: date) -> int:
+        """
+        Snapshot every account's cumulative totals as of period_end.
+
+        Re-closing a period overwrites its snapshot. Returns the number of
+        accounts written; the caller commits.
+        """
+        totals = await self._cumulative_totals(period_end, snapshot_before=period_end)
+        result = await self.db.execute(select(HQChartOfAccounts.id))
+        rows = []
+        for account_id in result.scalars().all():
+            debits, credits = totals.get(account_id, (Decimal("0"), Decimal("0")))
+            rows.append({
+                "account_id": account_id,
+                "period_end": period_end,
+                "debit_total": debits,
+                "credit_total": credits,
+                "closed_at": datetime.utcnow(),
+            })
+        if not rows:
+            return 0
+
+        table = HQAccountPeriodSnapshot.__table__
+        await self.db.execute(
+            table.delete().where(table.c.period_end == period_end)
+        )
+        await self.db.execute(insert(table), rows)
+        return len(rows)
+
+    async def close_completed_periods(self, today: Optional[date] = None) -> List[date]:
+        """Close every month that has ended since the last close (or since the first activity)."""
+        today = today or datetime.utcnow().date()
+        last_closed = (await self.db.execute(select(func.max(HQAccountPeriodSnapshot.period_end)))).scalar()
+        if last_closed is not None:
+            period_end = _month_end(last_closed + timedelta(days=1))
+        else:
+            first_activity = (await self.db.execute(select(func.min(HQAccountPeriodBalance.period_date)))).scalar()
+            if first_activity is None:
+                return []
+            period_end = _month_end(first_activity)
+
+        closed = []
+        while period_end < today:
+            await self.close_period(period_end)
+            closed.append(period_end)
+            period_end = _month_end(period_end + timedelta(days=1))
+        return closed
+
     # ========================================================================
     # Private Helper Methods
     # ========================================================================
@@ -995,55 +891,120 @@ class GeneralLedgerManager:
 
         return account
 
-    async def _update_account_balances(self, journal_entry_id: str) -> None:
-        """Update account balances when posting a journal entry."""
+    async def _update_account_balances(self, entry: HQJournalEntry) -> None:
+        """Apply a journal entry being posted to current balances, daily balances and closed snapshots.
+
+        Runs in the posting transaction, with increments done in SQL so
+        concurrent postings to the same account don't overwrite each other.
+        """
         result = await self.db.execute(
-            select(HQGeneralLedgerEntry).where(
-                HQGeneralLedgerEntry.journal_entry_id == journal_entry_id
-            )
+            select(
+                HQGeneralLedgerEntry.debit_account_id,
+                HQGeneralLedgerEntry.credit_account_id,
+                HQGeneralLedgerEntry.tenant_id,
+                HQGeneralLedgerEntry.amount,
+            ).where(HQGeneralLedgerEntry.journal_entry_id == entry.id)
         )
-        entries = result.scalars().all()
 
-        for entry in entries:
-            if entry.debit_account_id:
-                await self._adjust_account_balance(
-                    entry.debit_account_id,
-                    entry.amount,
-                    is_debit=True
-                )
-            if entry.credit_account_id:
-                await self._adjust_account_balance(
-                    entry.credit_account_id,
-                    entry.amount,
-                    is_debit=False
-                )
+        by_tenant: Dict[Tuple[str, str], List[Decimal]] = {}
+        by_account: Dict[str, List[Decimal]] = {}
+        for row in result:
+            account_id = row.debit_account_id or row.credit_account_id
+            side = 0 if row.debit_account_id else 1
+            amount = Decimal(str(row.amount))
+            tenant_key = row.tenant_id or entry.tenant_id or ""
+            by_tenant.setdefault((account_id, tenant_key), [Decimal("0"), Decimal("0")])[side] += amount
+            by_account.setdefault(account_id, [Decimal("0"), Decimal("0")])[side] += amount
+        if not by_account:
+            return
 
-    async def _adjust_account_balance(
-        self,
-        account_id: str,
-        amount: Decimal,
-        is_debit: bool,
-    ) -> None:
-        """Adjust an account's balance based on debit/credit rules."""
-        result = await self.db.execute(
-            select(HQChartOfAccounts).where(HQChartOfAccounts.id == account_id)
+        types_result = await self.db.execute(
+            select(HQChartOfAccounts.id, HQChartOfAccounts.account_type).where(
+                HQChartOfAccounts.id.in_(list(by_account))
+            )
         )
-        account = result.scalar_one_or_none()
-        if not account:
+        deltas = {
+            account_id: _normal_balance(account_type, *by_account[account_id])
+            for account_id, account_type in types_result
+        }
+        if deltas:
+            await self.db.execute(
+                _add_to_current_balance,
+                [{"b_id": account_id, "b_delta": delta} for account_id, delta in deltas.items()],
+            )
+            # Keep accounts already loaded in this session in step without reloading them
+            for obj in list(self.db.identity_map.values()):
+                if isinstance(obj, HQChartOfAccounts) and obj.id in deltas:
+                    set_committed_value(obj, "current_balance", (obj.current_balance or Decimal("0")) + deltas[obj.id])
+
+        period_date = entry.transaction_date.date()
+        await self._upsert_add(
+            HQAccountPeriodBalance.__table__,
+            ["account_id", "period_date", "tenant_id"],
+            [
+                {
+                    "account_id": account_id,
+                    "period_date": period_date,
+                    "tenant_id": tenant_key,
+                    "debit_total": debits,
+                    "credit_total": credits,
+                }
+                for (account_id, tenant_key), (debits, credits) in by_tenant.items()
+            ],
+        )
+
+        # Backdated into a closed period: carry the change into every snapshot from there on
+        closed_result = await self.db.execute(
+            select(HQAccountPeriodSnapshot.period_end)
+            .where(HQAccountPeriodSnapshot.period_end >= period_date)
+            .distinct()
+        )
+        closed_periods = list(closed_result.scalars().all())
+        if closed_periods:
+            await self._upsert_add(
+                HQAccountPeriodSnapshot.__table__,
+                ["account_id", "period_end"],
+                [
+                    {
+                        "account_id": account_id,
+                        "period_end": period_end,
+                        "debit_total": debits,
+                        "credit_total": credits,
+                    }
+                    for period_end in closed_periods
+                    for account_id, (debits, credits) in by_account.items()
+                ],
+            )
+
+    async def _upsert_add(self, table: Table, key_columns: List[str], rows: List[Dict[str, Any]]) -> None:
+        """Insert total rows, or add their debit/credit totals to the existing row with the same key."""
+        dialect = self.db.bind.dialect.name if self.db.bind is not None else ""
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            for row in rows:
+                key = and_(*(table.c[column] == row[column] for column in key_columns))
+                updated = await self.db.execute(
+                    update(table).where(key).values(
+                        debit_total=table.c.debit_total + row["debit_total"],
+                        credit_total=table.c.credit_total + row["credit_total"],
+                    )
+                )
+                if not updated.rowcount:
+                    await self.db.execute(insert(table).values(**row))
             return
 
-        # Assets and Expenses increase with debits
-        # Liabilities, Equity, and Revenue increase with credits
-        if account.account_type in [AccountType.ASSET, AccountType.EXPENSE, AccountType.COST_OF_REVENUE]:
-            if is_debit:
-                account.current_balance += amount
-            else:
-                account.current_balance -= amount
-        else:  # LIABILITY, EQUITY, REVENUE
-            if is_debit:
-                account.current_balance -= amount
-            else:
-                account.current_balance += amount
+        stmt = dialect_insert(table)
+        set_ = {
+            "debit_total": table.c.debit_total + stmt.excluded.debit_total,
+            "credit_total": table.c.credit_total + stmt.excluded.credit_total,
+        }
+        if "updated_at" in table.c:
+            set_["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=key_columns, set_=set_)
+        await self.db.execute(stmt, rows)
 
     async def _create_reversing_entry(
         self,
@@ -1105,42 +1066,11 @@ class GeneralLedgerManager:
         end_date: date,
     ) -> Dict[str, Dict[str, Decimal]]:
         """Get P&L breakdown by tenant."""
-        query = """
-            SELECT
-                COALESCE(je.tenant_id, gle.tenant_id) as tenant_id,
-                t.name as tenant_name,
-                SUM(CASE
-                    WHEN coa.account_type = 'revenue' AND gle.credit_account_id IS NOT NULL
-                    THEN gle.amount ELSE 0 END
-                ) as revenue,
-                SUM(CASE
-                    WHEN coa.account_type = 'cost_of_revenue' AND gle.debit_account_id IS NOT NULL
-                    THEN gle.amount ELSE 0 END
-                ) as cogs
-            FROM hq_journal_entry je
-            JOIN hq_general_ledger_entry gle ON gle.journal_entry_id = je.id
-            JOIN hq_chart_of_accounts coa ON (
-                coa.id = gle.debit_account_id OR coa.id = gle.credit_account_id
-            )
-            LEFT JOIN hq_tenant t ON COALESCE(je.tenant_id, gle.tenant_id) = t.id
-            WHERE je.status = 'posted'
-              AND je.transaction_date >= :start_date
-              AND je.transaction_date <= :end_date
-              AND COALESCE(je.tenant_id, gle.tenant_id) IS NOT NULL
-            GROUP BY COALESCE(je.tenant_id, gle.tenant_id), t.name
-        """
-
-        result = await self.db.execute(
-            text(query),
-            {"start_date": start_date, "end_date": end_date}
-        )
-
         breakdown = {}
-        for row in result:
-            tenant_key = row.tenant_name or row.tenant_id
-            revenue = Decimal(str(row.revenue)) if row.revenue else Decimal("0")
-            cogs = Decimal(str(row.cogs)) if row.cogs else Decimal("0")
-            breakdown[tenant_key] = {
+        for tenant_id, (tenant_name, revenue, cogs) in (
+            await self._tenant_revenue_and_cogs(start_date, end_date)
+        ).items():
+            breakdown[tenant_name or tenant_id] = {
                 "revenue": revenue,
                 "cogs": cogs,
                 "gross_profit": revenue - cogs,
@@ -1149,6 +1079,139 @@ class GeneralLedgerManager:
 
         return breakdown
 
+    async def _tenant_revenue_and_cogs(
+        self,
+        start_date: date,
+        end_date: date,
+        tenant_id: Optional[str] = None,
+    ) -> Dict[str, Tuple[Optional[str], Decimal, Decimal]]:
+        """(tenant name, net revenue, net COGS) per tenant from the daily balances.
+
+        Net of debits to revenue / credits to COGS, so a voided entry and its
+        reversal cancel out.
+        """
+        revenue = func.sum(case(
+            (
+                HQChartOfAccounts.account_type == AccountType.REVENUE,
+                HQAccountPeriodBalance.credit_total - HQAccountPeriodBalance.debit_total,
+            ),
+            else_=0,
+        ))
+        cogs = func.sum(case(
+            (
+                HQChartOfAccounts.account_type == AccountType.COST_OF_REVENUE,
+                HQAccountPeriodBalance.debit_total - HQAccountPeriodBalance.credit_total,
+            ),
+            else_=0,
+        ))
+        query = (
+            select(HQAccountPeriodBalance.tenant_id, Company.name, revenue.label("revenue"), cogs.label("cogs"))
+            .join(HQChartOfAccounts, HQChartOfAccounts.id == HQAccountPeriodBalance.account_id)
+            .outerjoin(HQTenant, HQTenant.id == HQAccountPeriodBalance.tenant_id)
+            .outerjoin(Company, Company.id == HQTenant.company_id)
+            .where(
+                HQAccountPeriodBalance.period_date >= start_date,
+                HQAccountPeriodBalance.period_date <= end_date,
+                HQChartOfAccounts.account_type.in_([AccountType.REVENUE, AccountType.COST_OF_REVENUE]),
+            )
+            .group_by(HQAccountPeriodBalance.tenant_id, Company.name)
+        )
+        if tenant_id:
+            query = query.where(HQAccountPeriodBalance.tenant_id == tenant_id)
+        else:
+            query = query.where(HQAccountPeriodBalance.tenant_id != "")
+
+        result = await self.db.execute(query)
+        return {
+            row.tenant_id: (
+                row.name,
+                Decimal(str(row.revenue)) if row.revenue else Decimal("0"),
+                Decimal(str(row.cogs)) if row.cogs else Decimal("0"),
+            )
+            for row in result
+        }
+
+    async def _accounts_of_type(
+        self,
+        account_types: List[AccountType],
+        account_ids: Optional[List[str]] = None,
+        active_only: bool = False,
+    ) -> List[HQChartOfAccounts]:
+        query = select(HQChartOfAccounts).where(HQChartOfAccounts.account_type.in_(account_types))
+        if account_ids is not None:
+            if not account_ids:
+                return []
+            query = query.where(HQChartOfAccounts.id.in_(account_ids))
+        if active_only:
+            query = query.where(HQChartOfAccounts.is_active == True)
+        result = await self.db.execute(query.order_by(HQChartOfAccounts.account_number))
+        return list(result.scalars().all())
+
+    async def _period_activity(
+        self,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        tenant_id: Optional[str] = None,
+        account_ids: Optional[List[str]] = None,
+    ) -> Totals:
+        """Posted debits and credits per account for days in [start_date, end_date] (open-ended when None)."""
+        query = select(
+            HQAccountPeriodBalance.account_id,
+            func.sum(HQAccountPeriodBalance.debit_total).label("debits"),
+            func.sum(HQAccountPeriodBalance.credit_total).label("credits"),
+        ).group_by(HQAccountPeriodBalance.account_id)
+        if start_date is not None:
+            query = query.where(HQAccountPeriodBalance.period_date >= start_date)
+        if end_date is not None:
+            query = query.where(HQAccountPeriodBalance.period_date <= end_date)
+        if tenant_id:
+            query = query.where(HQAccountPeriodBalance.tenant_id == tenant_id)
+        if account_ids is not None:
+            query = query.where(HQAccountPeriodBalance.account_id.in_(account_ids))
+
+        result = await self.db.execute(query)
+        return {
+            row.account_id: (Decimal(str(row.debits or 0)), Decimal(str(row.credits or 0)))
+            for row in result
+        }
+
+    async def _cumulative_totals(
+        self,
+        as_of_date: Optional[date] = None,
+        account_ids: Optional[List[str]] = None,
+        snapshot_before: Optional[date] = None,
+    ) -> Totals:
+        """
+        All-time debits and credits per account through as_of_date: latest snapshot plus activity since.
+
+        snapshot_before limits which snapshot is used (re-closing a period must not start from itself).
+        """
+        latest_query = select(func.max(HQAccountPeriodSnapshot.period_end))
+        if as_of_date is not None:
+            latest_query = latest_query.where(HQAccountPeriodSnapshot.period_end <= as_of_date)
+        if snapshot_before is not None:
+            latest_query = latest_query.where(HQAccountPeriodSnapshot.period_end < snapshot_before)
+        snapshot_end = (await self.db.execute(latest_query)).scalar()
+
+        totals: Totals = {}
+        if snapshot_end is not None:
+            query = select(
+                HQAccountPeriodSnapshot.account_id,
+                HQAccountPeriodSnapshot.debit_total,
+                HQAccountPeriodSnapshot.credit_total,
+            ).where(HQAccountPeriodSnapshot.period_end == snapshot_end)
+            if account_ids is not None:
+                query = query.where(HQAccountPeriodSnapshot.account_id.in_(account_ids))
+            for row in await self.db.execute(query):
+                totals[row.account_id] = (Decimal(str(row.debit_total)), Decimal(str(row.credit_total)))
+
+        open_start = snapshot_end + timedelta(days=1) if snapshot_end is not None else None
+        activity = await self._period_activity(open_start, as_of_date, account_ids=account_ids)
+        for account_id, (debits, credits) in activity.items():
+            closed_debits, closed_credits = totals.get(account_id, (Decimal("0"), Decimal("0")))
+            totals[account_id] = (closed_debits + debits, closed_credits + credits)
+        return totals
+
 
 # ============================================================================
 # Singleton Instance
@@ -0,0 +1,219 @@
+"""
+Set-based MRR engine for HQ tenants.
+
+Tenant MRR is base subscription MRR (active / trialing HQ subscriptions) plus
+a fintech estimate (banking take rate on deposits MTD, a per-employee payroll
+fee). Both are SQL expressions over hq_tenant, so the whole tenant base is
+recomputed and written back with one UPDATE, and platform totals come from
+one grouped SELECT - no per-tenant queries.
+
+Platform totals are cached per process. Subscription and tenant changes
+invalidate the cache explicitly; hq_mrr_cache_ttl_seconds bounds staleness for
+changes made by other workers.
+
+The HQ dashboard's headline MRR is a different figure: billing subscription
+costs of active companies, the same basis as the dashboard's company counts.
+get_company_subscription_mrr() caches that sum for hq_mrr_cache_ttl_seconds.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.billing import Subscription
+from app.models.company import Company
+from app.models.hq_subscription import HQSubscription, HQSubscriptionStatus
+from app.models.hq_tenant import BankingStatus, HQTenant, PayrollStatus, TenantStatus
+
+settings = get_settings()
+
+DEFAULT_BANKING_TAKE_RATE = Decimal("0.0025")  # 0.25% of deposits
+PAYROLL_FEE_PER_EMPLOYEE = Decimal("5.00")  # Per active payroll employee per month
+
+# Tenants whose MRR the batch recalculation maintains
+MRR_TENANT_STATUSES = (TenantStatus.ACTIVE, TenantStatus.TRIAL)
+MRR_SUBSCRIPTION_STATUSES = (HQSubscriptionStatus.ACTIVE, HQSubscriptionStatus.TRIALING)
+
+
+@dataclass
+class TenantMRR:
+    tenant_id: str
+    subscription_mrr: Decimal
+    fintech_mrr: Decimal
+
+    @property
+    def total_mrr(self) -> Decimal:
+        return self.subscription_mrr + self.fintech_mrr
+
+
+@dataclass
+class PlatformMRR:
+    tenant_count: int
+    subscription_mrr: Decimal
+    fintech_mrr: Decimal
+    total_mrr: Decimal
+    computed_at: datetime
+
+
+def _fintech_mrr():
+    banking = case(
+        (
+            HQTenant.banking_status == BankingStatus.ACCOUNT_OPENED,
+            func.coalesce(HQTenant.total_deposits_mtd, 0)
+            * func.coalesce(HQTenant.fintech_take_rate, DEFAULT_BANKING_TAKE_RATE),
+        ),
+        else_=0,
+    )
+    payroll = case(
+        (
+            HQTenant.payroll_status == PayrollStatus.ACTIVE,
+            func.coalesce(HQTenant.active_employees_paid, 0) * PAYROLL_FEE_PER_EMPLOYEE,
+        ),
+        else_=0,
+    )
+    return banking + payroll
+
+
+def _subscription_totals():
+    """Base subscription MRR per tenant."""
+    return (
+        select(
+            HQSubscription.tenant_id,
+            func.sum(HQSubscription.monthly_rate).label("subscription_mrr"),
+        )
+        .where(HQSubscription.status.in_(MRR_SUBSCRIPTION_STATUSES))
+        .group_by(HQSubscription.tenant_id)
+        .subquery()
+    )
+
+
+def _correlated_subscription_mrr():
+    return (
+        select(func.coalesce(func.sum(HQSubscription.monthly_rate), 0))
+        .where(
+            HQSubscription.tenant_id == HQTenant.id,
+            HQSubscription.status.in_(MRR_SUBSCRIPTION_STATUSES),
+        )
+        .correlate(HQTenant)
+        .scalar_subquery()
+    )
+
+
+async def compute_tenant_mrr(db: AsyncSession, tenant_id: str) -> Optional[TenantMRR]:
+    """MRR components for one tenant (None if the tenant doesn't exist)."""
+    subscriptions = _subscription_totals()
+    row = (
+        await db.execute(
+            select(
+                HQTenant.id,
+                func.coalesce(subscriptions.c.subscription_mrr, 0).label("subscription_mrr"),
+                _fintech_mrr().label("fintech_mrr"),
+            )
+            .outerjoin(subscriptions, subscriptions.c.tenant_id == HQTenant.id)
+            .where(HQTenant.id == tenant_id)
+        )
+    ).one_or_none()
+    if row is None:
+        return None
+    return TenantMRR(
+        tenant_id=row.id,
+        subscription_mrr=Decimal(str(row.subscription_mrr or 0)),
+        fintech_mrr=Decimal(str(row.fintech_mrr or 0)),
+    )
+
+
+async def compute_platform_mrr(db: AsyncSession) -> PlatformMRR:
+    """Platform totals over every active / trial tenant in one grouped query."""
+    subscriptions = _subscription_totals()
+    subscription_mrr = func.coalesce(subscriptions.c.subscription_mrr, 0)
+    fintech_mrr = _fintech_mrr()
+    row = (
+        await db.execute(
+            select(
+                func.count(HQTenant.id).label("tenant_count"),
+                func.coalesce(func.sum(subscription_mrr), 0).label("subscription_mrr"),
+                func.coalesce(func.sum(fintech_mrr), 0).label("fintech_mrr"),
+            )
+            .outerjoin(subscriptions, subscriptions.c.tenant_id == HQTenant.id)
+            .where(HQTenant.status.in_(MRR_TENANT_STATUSES))
+        )
+    ).one()
+    subscription_total = Decimal(str(row.subscription_mrr))
+    fintech_total = Decimal(str(row.fintech_mrr))
+    return PlatformMRR(
+        tenant_count=row.tenant_count or 0,
+        subscription_mrr=subscription_total,
+        fintech_mrr=fintech_total,
+        total_mrr=subscription_total + fintech_total,
+        computed_at=datetime.utcnow(),
+    )
+
+
+async def refresh_all_tenant_mrr(db: AsyncSession) -> PlatformMRR:
+    """
+    Write mrr_amount for every active / trial tenant with one UPDATE and
+    return the platform totals. The caller commits.
+    """
+    await db.execute(
+        update(HQTenant)
+        .where(HQTenant.status.in_(MRR_TENANT_STATUSES))
+        .values(mrr_amount=_correlated_subscription_mrr() + _fintech_mrr())
+        .execution_options(synchronize_session=False)
+    )
+    platform = await compute_platform_mrr(db)
+    _cache_platform(platform)
+    return platform
+
+
+# Cached platform totals: (monotonic time cached, totals)
+_platform_cache: Optional[tuple] = None
+
+
+def _cache_platform(platform: PlatformMRR) -> None:
+    global _platform_cache
+    _platform_cache = (time.monotonic(), platform)
+
+
+def invalidate_platform_mrr() -> None:
+    """Drop the cached platform totals (subscription or tenant billing data changed)."""
+    global _platform_cache
+    _platform_cache = None
+
+
+async def get_platform_mrr(db: AsyncSession) -> PlatformMRR:
+    """Platform totals for the dashboard, from cache while fresh."""
+    cached = _platform_cache
+    if cached is not None and time.monotonic() - cached[0] < settings.hq_mrr_cache_ttl_seconds:
+        return cached[1]
+    platform = await compute_platform_mrr(db)
+    _cache_platform(platform)
+    return platform
+
+
+# Cached dashboard MRR: (monotonic time cached, total)
+_company_mrr_cache: Optional[tuple] = None
+
+
+async def get_company_subscription_mrr(db: AsyncSession) -> Decimal:
+    """Sum of billing subscription monthly costs over active companies, from cache while fresh."""
+    global _company_mrr_cache
+    cached = _company_mrr_cache
+    if cached is not None and time.monotonic() - cached[0] < settings.hq_mrr_cache_ttl_seconds:
+        return cached[1]
+    result = await db.execute(
+        select(func.coalesce(func.sum(Subscription.total_monthly_cost), 0))
+        .select_from(Subscription)
+        .join(Company, Company.id == Subscription.company_id)
+        .where(Company.isActive == True)
+    )
+    mrr = Decimal(str(result.scalar() or 0))
+    _company_mrr_cache = (time.monotonic(), mrr)
+    return mrr
@@ -16,10 +16,38 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.hq_presence import HQPresence
 from app.models.hq_employee import HQEmployee
 from app.schemas.presence import PresenceState, PresenceStatus
+from app.services.presence_engine import (
+    AUTO_AWAY_MINUTES,
+    AUTO_OFFLINE_MINUTES,
+    PresenceChange,
+    PresenceEngine,
+    table_writer,
+)
 
-# Auto-away thresholds
-AUTO_AWAY_MINUTES = 5
-AUTO_OFFLINE_MINUTES = 30
+# HQ presence is global per employee; the engine needs a scope, so all share one
+HQ_SCOPE = "hq"
+
+
+async def broadcast_hq_presence_changes(scope: str, states: List[PresenceState]) -> None:
+    """Send changed employees to connected HQ clients (same shape as the HQ socket's own updates)."""
+    from app.services.hq_websocket_manager import hq_manager
+
+    for state in states:
+        await hq_manager.broadcast_to_all({
+            "type": "presence_update",
+            "data": {
+                "employeeId": state.user_id,
+                "employeeName": state.user_name,
+                "status": state.status,
+                "lastSeen": state.last_seen_at.isoformat(),
+            }
+        })
+
+
+_write_hq_presence = table_writer(HQPresence.__table__, "employee_id")
+
+# HQ presence tracked by this process
+hq_presence_engine = PresenceEngine("hq", _write_hq_presence, broadcast_hq_presence_changes)
 
 
 class HQPresenceService:
@@ -78,7 +106,7 @@ class HQPresenceService:
         await self.db.refresh(record)
 
         employee_name = await self._get_employee_name(employee_id)
-        return PresenceState(
+        state = PresenceState(
             user_id=record.employee_id,
             user_name=employee_name,
             status=record.status,
@@ -86,13 +114,21 @@ class HQPresenceService:
             last_seen_at=record.updated_at,
             last_activity_at=record.last_activity_at,
         )
+        hq_presence_engine.track(HQ_SCOPE, state, record.status_set_manually)
+        return state
 
     async def update_activity(self, employee_id: str) -> Optional[PresenceState]:
         """Update last activity timestamp (heartbeat).
 
         Called periodically by clients to indicate activity.
         Also restores user to online if they were auto-away.
+        Employees tracked by this process are updated in memory and written
+        in the engine's next batch; others are loaded from the DB and tracked.
         """
+        state = hq_presence_engine.heartbeat(HQ_SCOPE, employee_id)
+        if state is not None:
+            return state
+
         now = datetime.utcnow()
         result = await self.db.execute(
             select(HQPresence).where(HQPresence.employee_id == employee_id)
@@ -113,7 +149,7 @@ class HQPresenceService:
         await self.db.refresh(record)
 
         employee_name = await self._get_employee_name(employee_id)
-        return PresenceState(
+        state = PresenceState(
             user_id=record.employee_id,
             user_name=employee_name,
             status=record.status,
@@ -121,6 +157,8 @@ class HQPresenceService:
             last_seen_at=record.updated_at,
             last_activity_at=record.last_activity_at,
         )
+        hq_presence_engine.track(HQ_SCOPE, state, record.status_set_manually)
+        return state
 
     async def set_away_message(
         self, employee_id: str, away_message: Optional[str]
@@ -139,7 +177,7 @@ class HQPresenceService:
         await self.db.refresh(record)
 
         employee_name = await self._get_employee_name(employee_id)
-        return PresenceState(
+        state = PresenceState(
             user_id=record.employee_id,
             user_name=employee_name,
             status=record.status,
@@ -147,6 +185,8 @@ class HQPresenceService:
             last_seen_at=record.updated_at,
             last_activity_at=record.last_activity_at,
         )
+        hq_presence_engine.track(HQ_SCOPE, state, record.status_set_manually)
+        return state
 
     async def mark_employee_offline(self, employee_id: str) -> Optional[PresenceState]:
         """Mark employee as offline (e.g., on disconnect)."""
@@ -164,7 +204,7 @@ class HQPresenceService:
         await self.db.refresh(record)
 
         employee_name = await self._get_employee_name(employee_id)
-        return PresenceState(
+        state = PresenceState(
             user_id=record.employee_id,
             user_name=employee_name,
             status=record.status,
@@ -172,66 +212,61 @@ class HQPresenceService:
             last_seen_at=record.updated_at,
             last_activity_at=record.last_activity_at,
         )
+        hq_presence_engine.track(HQ_SCOPE, state, record.status_set_manually)
+        return state
 
     async def check_idle_employees(self) -> List[PresenceState]:
-        """Check for idle employees and update their status.
+        """Move idle employees no running process tracks to away/offline.
 
-        Returns list of employees whose status changed.
+        Employees heartbeating against this process are handled by the
+        presence engine; this set-based sweep covers rows left behind by
+        restarted workers. Returns list of employees whose status changed.
         Called by scheduler job.
         """
         now = datetime.utcnow()
         away_threshold = now - timedelta(minutes=AUTO_AWAY_MINUTES)
         offline_threshold = now - timedelta(minutes=AUTO_OFFLINE_MINUTES)
 
-        # Get all online/away employees who haven't set status manually
         result = await self.db.execute(
-            select(HQPresence).where(
+            select(
+                HQPresence.employee_id,
+                HQPresence.status,
+                HQPresence.away_message,
+                HQPresence.last_activity_at,
+                HQEmployee.first_name,
+                HQEmployee.last_name,
+                HQEmployee.email,
+            )
+            .outerjoin(HQEmployee, HQEmployee.id == HQPresence.employee_id)
+            .where(
                 and_(
                     HQPresence.status.in_(["online", "away"]),
                     HQPresence.status_set_manually == False,
+                    HQPresence.last_activity_at < away_threshold,
                 )
             )
         )
-        records = result.scalars().all()
-
-        # Collect records that need updating (capture all attributes before any await)
-        to_update: List[tuple] = []
-        for record in records:
-            if not record.last_activity_at:
-                continue
 
-            new_status = None
-            if record.last_activity_at < offline_threshold:
-                new_status = "offline"
-            elif record.last_activity_at < away_threshold and record.status == "online":
-                new_status = "away"
-
-            if new_status and new_status != record.status:
-                # Capture all attributes NOW before any async operations
-                to_update.append((
-                    record,
-                    new_status,
-                    record.employee_id,
-                    record.away_message,
-                    record.last_activity_at,
-                ))
-
-        # Now process updates with async calls
+        changes: List[PresenceChange] = []
         changed: List[PresenceState] = []
-        for record, new_status, employee_id, away_message, last_activity_at in to_update:
-            record.status = new_status
-            employee_name = await self._get_employee_name(employee_id)
-            # Use current time instead of trying to get updated_at
+        for row in result.all():
+            if hq_presence_engine.tracked(HQ_SCOPE, row.employee_id):
+                continue
+            new_status = "offline" if row.last_activity_at < offline_threshold else "away"
+            if new_status == row.status:
+                continue
+            changes.append(PresenceChange(HQ_SCOPE, row.employee_id, "idle", row.last_activity_at, new_status))
             changed.append(PresenceState(
-                user_id=employee_id,
-                user_name=employee_name,
+                user_id=row.employee_id,
+                user_name=f"{row.first_name or ''} {row.last_name or ''}".strip() or row.email,
                 status=new_status,
-                away_message=away_message,
-                last_seen_at=datetime.utcnow(),  # FIX: Use current time
-                last_activity_at=last_activity_at,
+                away_message=row.away_message,
+                last_seen_at=now,
+                last_activity_at=row.last_activity_at,
             ))
 
-        if changed:
+        if changes:
+            await _write_hq_presence(self.db, changes)
             await self.db.commit()
 
         return changed
@@ -11,7 +11,6 @@ import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
-import httpx
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -21,6 +20,7 @@ from app.models.hq_knowledge_base import (
     HQKnowledgeChunk,
     KnowledgeCategory,
 )
+from app.services.outbound_http import outbound
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -93,7 +93,7 @@ async def generate_embedding_openai(text: str) -> Optional[List[float]]:
         return None
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("openai") as client:
             response = await client.post(
                 "https://api.openai.com/v1/embeddings",
                 headers={
@@ -132,7 +132,7 @@ async def generate_embedding_cohere(text: str) -> Optional[List[float]]:
         return None
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("cohere") as client:
             response = await client.post(
                 "https://api.cohere.ai/v1/embed",
                 headers={
@@ -173,7 +173,7 @@ async def generate_embedding_voyage(text: str) -> Optional[List[float]]:
         return None
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("voyage") as client:
             response = await client.post(
                 "https://api.voyageai.com/v1/embeddings",
                 headers={
@@ -212,7 +212,7 @@ async def generate_embedding_gemini(text: str) -> Optional[List[float]]:
         return None
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("gemini") as client:
             response = await client.post(
                 f"https://generativelanguage.googleapis.com/v1beta/models/embedding-001:embedContent?key={api_key}",
                 headers={"Content-Type": "application/json"},
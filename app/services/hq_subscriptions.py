@@ -15,6 +15,7 @@ from app.models.hq_subscription import (
 )
 from app.models.hq_tenant import HQTenant
 from app.models.hq_deal import HQDeal, DealStage
+from app.services.hq_mrr import invalidate_platform_mrr
 
 
 class HQSubscriptionsService:
@@ -119,6 +120,7 @@ class HQSubscriptionsService:
 
         self.db.add(subscription)
         await self.db.commit()
+        invalidate_platform_mrr()
         await self.db.refresh(subscription)
 
         return await self.get_subscription(subscription.id)
@@ -176,6 +178,7 @@ class HQSubscriptionsService:
         deal.subscription_id = subscription.id
 
         await self.db.commit()
+        invalidate_platform_mrr()
         await self.db.refresh(subscription)
 
         return await self.get_subscription(subscription.id)
@@ -244,6 +247,7 @@ class HQSubscriptionsService:
             self.db.add(rate_change)
 
         await self.db.commit()
+        invalidate_platform_mrr()
         return await self.get_subscription(subscription_id)
 
     async def pause_subscription(
@@ -265,6 +269,7 @@ class HQSubscriptionsService:
             subscription.notes = f"{subscription.notes or ''}\n\nPaused: {reason}".strip()
 
         await self.db.commit()
+        invalidate_platform_mrr()
         return await self.get_subscription(subscription_id)
 
     async def resume_subscription(
@@ -283,6 +288,7 @@ class HQSubscriptionsService:
         subscription.paused_at = None
 
         await self.db.commit()
+        invalidate_platform_mrr()
         return await self.get_subscription(subscription_id)
 
     async def cancel_subscription(
@@ -303,6 +309,7 @@ class HQSubscriptionsService:
         subscription.cancellation_reason = reason
 
         await self.db.commit()
+        invalidate_platform_mrr()
         return await self.get_subscription(subscription_id)
 
     async def get_mrr_summary(self) -> Dict[str, Any]:
@@ -3,9 +3,8 @@
 import csv
 import io
 import logging
-import uuid
 from datetime import date, datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from openpyxl import load_workbook
 from pydantic import ValidationError
@@ -14,8 +13,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.driver import Driver
 from app.models.equipment import Equipment
-from app.models.load import Load, LoadStop
-from app.models.worker import Worker, WorkerRole, WorkerStatus, WorkerType
 from app.schemas.imports import (
     DriverImportRow,
     EquipmentImportRow,
@@ -285,11 +282,11 @@ class ImportService:
 
         return None
 
-    def _parse_excel(self, file_bytes: bytes, filename: str, entity_type: str = None) -> List[Dict[str, Any]]:
-        """Parse Excel file and return list of row dictionaries with normalized field names."""
+    def _iter_excel_rows(self, file_bytes: bytes, entity_type: str = None) -> Iterator[Dict[str, Any]]:
+        """Stream rows from an Excel file as dictionaries with normalized field names."""
+        # Load workbook from bytes (read_only streams rows instead of materializing the sheet)
+        workbook = load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True)
         try:
-            # Load workbook from bytes
-            workbook = load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True)
             sheet = workbook.active
 
             # Get headers from first row
@@ -299,7 +296,6 @@ class ImportService:
                     headers.append(str(cell.value).strip())
 
             # Parse data rows
-            rows = []
             for row in sheet.iter_rows(min_row=2, values_only=True):
                 cleaned_row = {}
                 for i, value in enumerate(row):
@@ -325,11 +321,62 @@ class ImportService:
                         cleaned_row[field_name] = None
 
                 if cleaned_row:  # Only add non-empty rows
-                    rows.append(cleaned_row)
-
+                    yield cleaned_row
+        finally:
             workbook.close()
-            return rows
 
+    def _iter_csv_rows(self, file_bytes: bytes, entity_type: str = None) -> Iterator[Dict[str, Any]]:
+        """Stream rows from a CSV file as dictionaries with normalized field names."""
+        # Detect encoding - try utf-8-sig first to handle BOM
+        try:
+            content = file_bytes.decode("utf-8-sig")  # Handles BOM automatically
+        except UnicodeDecodeError:
+            try:
+                content = file_bytes.decode("utf-8")
+            except UnicodeDecodeError:
+                content = file_bytes.decode("latin-1")  # Fallback
+
+        reader = csv.DictReader(io.StringIO(content))
+        for row in reader:
+            cleaned_row = {}
+            for k, v in row.items():
+                if not k:
+                    continue
+                # Clean the field name - strip BOM if present
+                field_name = k.lstrip('\ufeff').strip().lower().replace(" ", "_")
+                # Normalize using field mappings if entity_type provided
+                if entity_type:
+                    field_name = self._normalize_field_name(field_name, entity_type)
+                # Clean the value
+                cleaned_row[field_name] = v.strip() if v else None
+            yield cleaned_row
+
+    def iter_rows(self, file_bytes: bytes, filename: str, entity_type: str = None) -> Iterator[Dict[str, Any]]:
+        """Stream CSV or Excel rows with normalized field names (used by the bulk import engine)."""
+        if filename.lower().endswith((".xlsx", ".xls")):
+            return self._iter_excel_rows(file_bytes, entity_type)
+        return self._iter_csv_rows(file_bytes, entity_type)
+
+    def count_rows(self, file_bytes: bytes, filename: str) -> int:
+        """Cheap row count (no normalization/validation) used to size import job progress."""
+        try:
+            if filename.lower().endswith((".xlsx", ".xls")):
+                workbook = load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True)
+                try:
+                    max_row = workbook.active.max_row
+                finally:
+                    workbook.close()
+                return max(0, (max_row or 1) - 1)
+
+            content = file_bytes.decode("utf-8-sig", errors="ignore")
+            return max(0, sum(1 for _ in csv.reader(io.StringIO(content))) - 1)
+        except Exception:
+            return 0
+
+    def _parse_excel(self, file_bytes: bytes, filename: str, entity_type: str = None) -> List[Dict[str, Any]]:
+        """Parse Excel file and return list of row dictionaries with normalized field names."""
+        try:
+            return list(self._iter_excel_rows(file_bytes, entity_type))
         except Exception as e:
             raise ValueError(f"Failed to parse Excel: {str(e)}")
 
@@ -342,37 +389,7 @@ class ImportService:
 
         # Otherwise parse as CSV
         try:
-            # Detect encoding - try utf-8-sig first to handle BOM
-            try:
-                content = file_bytes.decode("utf-8-sig")  # Handles BOM automatically
-            except UnicodeDecodeError:
-                try:
-                    content = file_bytes.decode("utf-8")
-                except UnicodeDecodeError:
-                    content = file_bytes.decode("latin-1")  # Fallback
-
-            # Parse CSV
-            csv_file = io.StringIO(content)
-            reader = csv.DictReader(csv_file)
-
-            # Convert to list and normalize field names
-            rows = []
-            for row in reader:
-                cleaned_row = {}
-                for k, v in row.items():
-                    if not k:
-                        continue
-                    # Clean the field name - strip BOM if present
-                    field_name = k.lstrip('\ufeff').strip().lower().replace(" ", "_")
-                    # Normalize using field mappings if entity_type provided
-                    if entity_type:
-                        field_name = self._normalize_field_name(field_name, entity_type)
-                    # Clean the value
-                    cleaned_row[field_name] = v.strip() if v else None
-                rows.append(cleaned_row)
-
-            return rows
-
+            return list(self._iter_csv_rows(file_bytes, entity_type))
         except Exception as e:
             raise ValueError(f"Failed to parse file: {str(e)}")
 
@@ -591,258 +608,18 @@ class ImportService:
     async def import_drivers(
         self, company_id: str, file_bytes: bytes, filename: str
     ) -> ImportResult:
-        """Import drivers from CSV file."""
-        try:
-            # Parse CSV with field name normalization
-            rows = self.parse_csv(file_bytes, filename, entity_type="drivers")
+        """Import drivers from CSV file (batched duplicate checks and inserts)."""
+        from app.services.bulk_import import BulkImportEngine
 
-            if not rows:
-                return ImportResult(
-                    total=0,
-                    successful=0,
-                    failed=0,
-                    errors=[],
-                    warnings=["CSV file is empty"],
-                )
-
-            # Validate headers
-            headers = list(rows[0].keys())
-            validation = self.validate_headers(headers, "drivers")
-
-            if not validation.valid:
-                return ImportResult(
-                    total=0,
-                    successful=0,
-                    failed=0,
-                    errors=[
-                        ImportError(row=0, error=err) for err in validation.errors
-                    ],
-                    warnings=validation.warnings,
-                )
-
-            # Import rows
-            successful_ids = []
-            errors = []
-            warnings = []
-            schema = self.SCHEMAS["drivers"]
-
-            for idx, row in enumerate(rows, start=1):
-                try:
-                    # Validate row
-                    is_valid, validation_errors, validated_data = self.validate_row(
-                        row, schema
-                    )
-
-                    if not is_valid:
-                        errors.append(
-                            ImportError(
-                                row=idx,
-                                error="; ".join(validation_errors),
-                            )
-                        )
-                        continue
-
-                    # Check for duplicates
-                    duplicate_id = await self.check_duplicate_driver(
-                        company_id,
-                        validated_data.email,
-                        validated_data.phone,
-                        validated_data.license_number,
-                    )
-
-                    if duplicate_id:
-                        warnings.append(
-                            f"Row {idx}: Driver with email '{validated_data.email}' already exists (skipped)"
-                        )
-                        continue
-
-                    # Parse dates
-                    license_expiry = self._parse_date(validated_data.license_expiry)
-                    hire_date = self._parse_date(validated_data.hire_date)
-
-                    # Create Worker record first (drivers are workers in the payroll system)
-                    worker_id = str(uuid.uuid4())
-                    worker = Worker(
-                        id=worker_id,
-                        company_id=company_id,
-                        type=WorkerType.EMPLOYEE,
-                        role=WorkerRole.DRIVER,
-                        first_name=validated_data.first_name,
-                        last_name=validated_data.last_name,
-                        email=validated_data.email.lower(),
-                        phone=validated_data.phone,
-                        status=WorkerStatus.ACTIVE,
-                    )
-                    self.db.add(worker)
-                    await self.db.flush()
-
-                    # Create driver record linked to worker
-                    driver_id = str(uuid.uuid4())
-                    driver_metadata = {}
-                    if validated_data.pay_rate:
-                        driver_metadata["pay_rate"] = validated_data.pay_rate
-                    if validated_data.pay_type:
-                        driver_metadata["pay_type"] = validated_data.pay_type
-                    if hire_date:
-                        driver_metadata["hire_date"] = hire_date.isoformat()
-                    if validated_data.address:
-                        driver_metadata["address"] = validated_data.address
-                    if validated_data.city:
-                        driver_metadata["city"] = validated_data.city
-                    if validated_data.state:
-                        driver_metadata["state"] = validated_data.state
-                    if validated_data.zip:
-                        driver_metadata["zip"] = validated_data.zip
-
-                    # Store license_state and employment_type in metadata since they're not direct fields
-                    if validated_data.license_state:
-                        driver_metadata["license_state"] = validated_data.license_state
-                    if validated_data.employment_type:
-                        driver_metadata["employment_type"] = validated_data.employment_type
-
-                    driver = Driver(
-                        id=driver_id,
-                        company_id=company_id,
-                        worker_id=worker_id,  # Link to worker
-                        first_name=validated_data.first_name,
-                        last_name=validated_data.last_name,
-                        email=validated_data.email,
-                        phone=validated_data.phone,
-                        cdl_number=validated_data.license_number,  # Map license_number to cdl_number
-                        cdl_expiration=license_expiry,
-                        profile_metadata=driver_metadata if driver_metadata else None,
-                    )
-
-                    self.db.add(driver)
-                    await self.db.flush()
-                    successful_ids.append(driver.id)
-
-                except Exception as e:
-                    errors.append(ImportError(row=idx, error=str(e)))
-
-            # Commit all changes
-            await self.db.commit()
-
-            return ImportResult(
-                total=len(rows),
-                successful=len(successful_ids),
-                failed=len(errors),
-                errors=errors,
-                created_ids=successful_ids,
-                warnings=warnings,
-            )
-
-        except Exception as e:
-            await self.db.rollback()
-            logger.exception("Driver import failed")
-            raise
+        return await BulkImportEngine(self.db, self).run(company_id, "drivers", file_bytes, filename)
 
     async def import_equipment(
         self, company_id: str, file_bytes: bytes, filename: str
     ) -> ImportResult:
-        """Import equipment from CSV file."""
-        try:
-            # Parse CSV with field name normalization
-            rows = self.parse_csv(file_bytes, filename, entity_type="equipment")
+        """Import equipment from CSV file (batched duplicate checks and inserts)."""
+        from app.services.bulk_import import BulkImportEngine
 
-            if not rows:
-                return ImportResult(
-                    total=0,
-                    successful=0,
-                    failed=0,
-                    errors=[],
-                    warnings=["CSV file is empty"],
-                )
-
-            # Validate headers
-            headers = list(rows[0].keys())
-            validation = self.validate_headers(headers, "equipment")
-
-            if not validation.valid:
-                return ImportResult(
-                    total=0,
-                    successful=0,
-                    failed=0,
-                    errors=[
-                        ImportError(row=0, error=err) for err in validation.errors
-                    ],
-                    warnings=validation.warnings,
-                )
-
-            # Import rows
-            successful_ids = []
-            errors = []
-            warnings = []
-            schema = self.SCHEMAS["equipment"]
-
-            for idx, row in enumerate(rows, start=1):
-                try:
-                    # Validate row
-                    is_valid, validation_errors, validated_data = self.validate_row(
-                        row, schema
-                    )
-
-                    if not is_valid:
-                        errors.append(
-                            ImportError(
-                                row=idx,
-                                error="; ".join(validation_errors),
-                            )
-                        )
-                        continue
-
-                    # Check for duplicates
-                    duplicate_id = await self.check_duplicate_equipment(
-                        company_id,
-                        validated_data.unit_number,
-                        validated_data.vin,
-                    )
-
-                    if duplicate_id:
-                        warnings.append(
-                            f"Row {idx}: Equipment with unit number '{validated_data.unit_number}' already exists (skipped)"
-                        )
-                        continue
-
-                    # Create equipment
-                    equipment = Equipment(
-                        id=str(uuid.uuid4()),
-                        company_id=company_id,
-                        unit_number=validated_data.unit_number,
-                        equipment_type=validated_data.equipment_type.upper(),
-                        status=validated_data.status or "ACTIVE",
-                        make=validated_data.make,
-                        model=validated_data.model,
-                        year=validated_data.year,
-                        vin=validated_data.vin,
-                        current_mileage=validated_data.current_mileage,
-                        gps_provider=validated_data.gps_provider,
-                        gps_device_id=validated_data.gps_device_id,
-                    )
-
-                    self.db.add(equipment)
-                    await self.db.flush()
-                    successful_ids.append(equipment.id)
-
-                except Exception as e:
-                    errors.append(ImportError(row=idx, error=str(e)))
-
-            # Commit all changes
-            await self.db.commit()
-
-            return ImportResult(
-                total=len(rows),
-                successful=len(successful_ids),
-                failed=len(errors),
-                errors=errors,
-                created_ids=successful_ids,
-                warnings=warnings,
-            )
-
-        except Exception as e:
-            await self.db.rollback()
-            logger.exception("Equipment import failed")
-            raise
+        return await BulkImportEngine(self.db, self).run(company_id, "equipment", file_bytes, filename)
 
     async def import_loads(
         self, company_id: str, file_bytes: bytes, filename: str
@@ -853,164 +630,8 @@ class ImportService:
         Note: This is a basic implementation. Full load creation would require:
         - Customer lookup/creation
         - Location geocoding
-        - Date/time parsing
         - More complex validation
         """
-        try:
-            # Parse CSV with field name normalization
-            rows = self.parse_csv(file_bytes, filename, entity_type="loads")
-
-            if not rows:
-                return ImportResult(
-                    total=0,
-                    successful=0,
-                    failed=0,
-                    errors=[],
-                    warnings=["CSV file is empty"],
-                )
-
-            # Validate headers
-            headers = list(rows[0].keys())
-            validation = self.validate_headers(headers, "loads")
-
-            if not validation.valid:
-                return ImportResult(
-                    total=0,
-                    successful=0,
-                    failed=0,
-                    errors=[
-                        ImportError(row=0, error=err) for err in validation.errors
-                    ],
-                    warnings=validation.warnings,
-                )
-
-            # Import rows
-            successful_ids = []
-            errors = []
-            warnings = []
-            schema = self.SCHEMAS["loads"]
-
-            for idx, row in enumerate(rows, start=1):
-                try:
-                    # Validate row
-                    is_valid, validation_errors, validated_data = self.validate_row(
-                        row, schema
-                    )
-
-                    if not is_valid:
-                        errors.append(
-                            ImportError(
-                                row=idx,
-                                error="; ".join(validation_errors),
-                            )
-                        )
-                        continue
-
-                    # Parse dates
-                    pickup_date = self._parse_date(validated_data.pickup_date)
-                    delivery_date = self._parse_date(validated_data.delivery_date)
-
-                    # Create load record
-                    load_id = str(uuid.uuid4())
-                    load_metadata = {}
-                    if validated_data.reference_number:
-                        load_metadata["reference_number"] = validated_data.reference_number
-                    if validated_data.weight:
-                        load_metadata["weight"] = validated_data.weight
-
-                    load = Load(
-                        id=load_id,
-                        company_id=company_id,
-                        customer_name=validated_data.customer_name,
-                        load_type="FTL",  # Default to Full Truckload
-                        commodity=validated_data.commodity,
-                        base_rate=validated_data.base_rate,
-                        notes=validated_data.special_instructions,
-                        status="PLANNED",
-                        metadata_json=load_metadata if load_metadata else None,
-                    )
-                    self.db.add(load)
-                    await self.db.flush()
-
-                    # Create pickup stop
-                    pickup_stop_id = str(uuid.uuid4())
-                    pickup_scheduled_at = None
-                    if pickup_date and validated_data.pickup_time:
-                        try:
-                            # Parse time (HH:MM format)
-                            time_parts = validated_data.pickup_time.strip().split(":")
-                            if len(time_parts) == 2:
-                                hour = int(time_parts[0])
-                                minute = int(time_parts[1])
-                                pickup_scheduled_at = datetime.combine(
-                                    pickup_date, datetime.min.time().replace(hour=hour, minute=minute)
-                                )
-                        except (ValueError, AttributeError):
-                            pass  # Silently skip invalid time format
-                    elif pickup_date:
-                        pickup_scheduled_at = datetime.combine(pickup_date, datetime.min.time())
-
-                    pickup_stop = LoadStop(
-                        id=pickup_stop_id,
-                        load_id=load.id,
-                        sequence=1,
-                        stop_type="PICKUP",
-                        city=validated_data.pickup_city,
-                        state=validated_data.pickup_state,
-                        postal_code=validated_data.pickup_zip,
-                        scheduled_at=pickup_scheduled_at,
-                    )
-                    self.db.add(pickup_stop)
-
-                    # Create delivery stop
-                    delivery_stop_id = str(uuid.uuid4())
-                    delivery_scheduled_at = None
-                    if delivery_date and validated_data.delivery_time:
-                        try:
-                            # Parse time (HH:MM format)
-                            time_parts = validated_data.delivery_time.strip().split(":")
-                            if len(time_parts) == 2:
-                                hour = int(time_parts[0])
-                                minute = int(time_parts[1])
-                                delivery_scheduled_at = datetime.combine(
-                                    delivery_date, datetime.min.time().replace(hour=hour, minute=minute)
-                                )
-                        except (ValueError, AttributeError):
-                            pass  # Silently skip invalid time format
-                    elif delivery_date:
-                        delivery_scheduled_at = datetime.combine(delivery_date, datetime.min.time())
-
-                    delivery_stop = LoadStop(
-                        id=delivery_stop_id,
-                        load_id=load.id,
-                        sequence=2,
-                        stop_type="DELIVERY",
-                        city=validated_data.delivery_city,
-                        state=validated_data.delivery_state,
-                        postal_code=validated_data.delivery_zip,
-                        scheduled_at=delivery_scheduled_at,
-                    )
-                    self.db.add(delivery_stop)
-
-                    await self.db.flush()
-                    successful_ids.append(load.id)
-
-                except Exception as e:
-                    errors.append(ImportError(row=idx, error=str(e)))
-
-            # Commit all changes
-            await self.db.commit()
+        from app.services.bulk_import import BulkImportEngine
 
-            return ImportResult(
-                total=len(rows),
-                successful=len(successful_ids),
-                failed=len(errors),
-                errors=errors,
-                created_ids=successful_ids,
-                warnings=warnings,
-            )
-
-        except Exception as e:
-            await self.db.rollback()
-            logger.exception("Load import failed")
-            raise
+        return await BulkImportEngine(self.db, self).run(company_id, "loads", file_bytes, filename)
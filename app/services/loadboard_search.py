@@ -0,0 +1,353 @@
+"""
+Aggregated load board search.
+
+One lane search fans out to every load board the company has connected (DAT,
+Truckstop, 123LoadBoard), each with its own deadline so a slow board can't
+hold up the others. Results are normalized to one shape, loads cross-posted
+on several boards are merged, and the list is ranked by effective rate per
+mile - the rate over loaded plus deadhead miles - so a high-paying load far
+from the truck doesn't outrank a slightly cheaper one next door.
+
+Each provider's answer for a lane is cached for loadboard_search_cache_ttl_seconds
+(dispatchers re-run the same lane while they work it), and search() yields
+provider results as they arrive so the endpoint can stream them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.db import AsyncSessionFactory
+from app.models.integration import CompanyIntegration, Integration
+from app.services.outbound_http import ProviderClient, outbound
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LOADBOARD_PROVIDERS = ("dat", "truckstop", "123loadboard")
+
+# Cap on cached lane answers per worker
+_CACHE_MAX_ENTRIES = 1000
+
+
+@dataclass
+class LoadBoardConnection:
+    provider: str
+    api_base_url: str
+    integration: CompanyIntegration
+
+
+@dataclass
+class ProviderResult:
+    provider: str
+    integration_id: str
+    status: str  # ok, cached, timeout, error
+    loads: List[Dict[str, Any]]
+    elapsed_ms: int
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "integration_id": self.integration_id,
+            "status": self.status,
+            "count": len(self.loads),
+            "elapsed_ms": self.elapsed_ms,
+            "error": self.error,
+        }
+
+
+def _api_key(company_integration: CompanyIntegration) -> Optional[str]:
+    return getattr(company_integration, "api_key", None) or (company_integration.credentials or {}).get("api_key")
+
+
+def loadboard_client(company_integration: CompanyIntegration, provider: str, base_url: str) -> ProviderClient:
+    """Authenticated client for a load board on the shared outbound gateway."""
+    headers = {
+        "Accept": "application/json",
+        "Content-Type": "application/json"
+    }
+    api_key = _api_key(company_integration)
+    if provider == "123loadboard":
+        # 123LoadBoard uses API Key in custom header
+        headers["X-API-Key"] = api_key
+    else:
+        # DAT uses an API key bearer token; Truckstop an OAuth2 token (API key placeholder for now)
+        headers["Authorization"] = f"Bearer {api_key}"
+    return outbound.client(provider, base_url=base_url, headers=headers, timeout=30.0)
+
+
+# ---------------------------------------------------------------------------
+# Normalization
+# ---------------------------------------------------------------------------
+
+
+def _pick(raw: Dict[str, Any], *paths: str) -> Any:
+    """First non-empty value among dotted paths ("origin.city") in a provider payload."""
+    for path in paths:
+        value: Any = raw
+        for part in path.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+            if value is None:
+                break
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _distance_miles(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle (haversine) distance."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * 3958.8 * math.asin(math.sqrt(a))
+
+
+def normalize_load(provider: str, raw: Dict[str, Any], search_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a provider's load payload onto one shape (fields a board doesn't send are None)."""
+    rate = _number(_pick(raw, "rate", "rate.amount", "rateUsd", "price", "pay", "total_rate"))
+    miles = _number(_pick(raw, "miles", "trip_miles", "tripMiles", "distance", "distance_miles", "length"))
+    origin_lat = _number(_pick(raw, "origin.lat", "origin.latitude", "origin_lat", "originLatitude"))
+    origin_lng = _number(_pick(raw, "origin.lng", "origin.lon", "origin.longitude", "origin_lng", "originLongitude"))
+
+    deadhead = _number(_pick(raw, "deadhead_miles", "deadheadMiles", "origin_deadhead", "originDeadheadMiles", "deadhead"))
+    truck_lat = _number(search_params.get("truck_lat"))
+    truck_lng = _number(search_params.get("truck_lng"))
+    if deadhead is None and None not in (origin_lat, origin_lng, truck_lat, truck_lng):
+        deadhead = round(_distance_miles(truck_lat, truck_lng, origin_lat, origin_lng), 1)
+
+    rate_per_mile = _number(_pick(raw, "rate_per_mile", "ratePerMile", "rpm"))
+    if rate_per_mile is None and rate and miles:
+        rate_per_mile = rate / miles
+    effective_rate_per_mile = None
+    if rate and miles:
+        effective_rate_per_mile = rate / (miles + (deadhead or 0))
+
+    return {
+        "provider": provider,
+        "provider_load_id": str(_pick(raw, "id", "load_id", "loadId", "posting_id", "postingId") or ""),
+        "origin_city": _pick(raw, "origin.city", "origin_city", "originCity"),
+        "origin_state": _pick(raw, "origin.state", "origin_state", "originState"),
+        "destination_city": _pick(raw, "destination.city", "destination_city", "destinationCity"),
+        "destination_state": _pick(raw, "destination.state", "destination_state", "destinationState"),
+        "pickup_date": _pick(raw, "pickup_date", "pickupDate", "available_date", "availableDate", "ship_date"),
+        "equipment_type": _pick(raw, "equipment_type", "equipmentType", "equipment"),
+        "weight_lbs": _number(_pick(raw, "weight", "weight_lbs", "weightLbs")),
+        "rate": rate,
+        "miles": miles,
+        "rate_per_mile": round(rate_per_mile, 2) if rate_per_mile is not None else None,
+        "deadhead_miles": deadhead,
+        "effective_rate_per_mile": round(effective_rate_per_mile, 2) if effective_rate_per_mile is not None else None,
+        "broker_name": _pick(raw, "broker.name", "broker_name", "brokerName", "company_name", "poster.name"),
+        "broker_mc": _pick(raw, "broker.mc", "broker_mc", "brokerMc", "mc_number"),
+        "contact_phone": _pick(raw, "contact.phone", "contact_phone", "phone"),
+        "sources": [provider],
+    }
+
+
+def _dedup_key(load: Dict[str, Any]) -> Tuple:
+    def text(value: Any) -> str:
+        return str(value or "").strip().lower()
+
+    return (
+        text(load["origin_city"]),
+        text(load["origin_state"]),
+        text(load["destination_city"]),
+        text(load["destination_state"]),
+        text(load["pickup_date"])[:10],
+        text(load["equipment_type"]),
+        text(load["broker_mc"] or load["broker_name"]),
+    )
+
+
+def _rank_key(load: Dict[str, Any]) -> Tuple:
+    effective = load["effective_rate_per_mile"]
+    deadhead = load["deadhead_miles"]
+    return (
+        effective is None,
+        -(effective or 0.0),
+        deadhead is None,
+        deadhead or 0.0,
+        -(load["rate"] or 0.0),
+    )
+
+
+def merge_results(results: List[ProviderResult]) -> List[Dict[str, Any]]:
+    """Merge loads cross-posted on several boards (keeping the best-paying copy) and rank them."""
+    merged: Dict[Tuple, Dict[str, Any]] = {}
+    unkeyed: List[Dict[str, Any]] = []
+    for result in results:
+        for load in result.loads:
+            key = _dedup_key(load)
+            if not any(key[:4]):
+                unkeyed.append(dict(load))  # Nothing to match on
+                continue
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = dict(load)
+                continue
+            best, other = (dict(load), existing) if _rank_key(load) < _rank_key(existing) else (existing, load)
+            for field, value in other.items():
+                if best.get(field) is None:
+                    best[field] = value  # e.g. deadhead only one board reported
+            if best["effective_rate_per_mile"] is not None and best["deadhead_miles"] is not None:
+                best["effective_rate_per_mile"] = round(best["rate"] / (best["miles"] + best["deadhead_miles"]), 2)
+            best["sources"] = sorted(set(existing["sources"]) | set(load["sources"]))
+            merged[key] = best
+    return sorted([*merged.values(), *unkeyed], key=_rank_key)
+
+
+# ---------------------------------------------------------------------------
+# Lane cache
+# ---------------------------------------------------------------------------
+
+# (integration id, lane hash) -> (monotonic time cached, normalized loads)
+_lane_cache: Dict[Tuple[str, str], Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+def _lane_hash(search_params: Dict[str, Any]) -> str:
+    canonical = {
+        key: (value.strip().lower() if isinstance(value, str) else value)
+        for key, value in search_params.items()
+        if value not in (None, "")
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _cached_lane(integration_id: str, lane: str) -> Optional[List[Dict[str, Any]]]:
+    entry = _lane_cache.get((integration_id, lane))
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] > settings.loadboard_search_cache_ttl_seconds:
+        _lane_cache.pop((integration_id, lane), None)
+        return None
+    return entry[1]
+
+
+def _cache_lane(integration_id: str, lane: str, loads: List[Dict[str, Any]]) -> None:
+    if len(_lane_cache) >= _CACHE_MAX_ENTRIES:
+        now = time.monotonic()
+        for key in [key for key, (cached_at, _) in _lane_cache.items() if now - cached_at > settings.loadboard_search_cache_ttl_seconds]:
+            del _lane_cache[key]
+        while len(_lane_cache) >= _CACHE_MAX_ENTRIES:
+            del _lane_cache[next(iter(_lane_cache))]
+    _lane_cache[(integration_id, lane)] = (time.monotonic(), loads)
+
+
+def invalidate_lane_cache(integration_id: Optional[str] = None) -> None:
+    """Drop cached lane answers (for one integration, e.g. on disconnect, or all)."""
+    if integration_id is None:
+        _lane_cache.clear()
+        return
+    for key in [key for key in _lane_cache if key[0] == integration_id]:
+        del _lane_cache[key]
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+
+async def connected_loadboards(db: AsyncSession, company_id: str) -> List[Tuple[str, CompanyIntegration]]:
+    """(provider, integration) for every active load board the company has connected."""
+    result = await db.execute(
+        select(Integration.integration_key, CompanyIntegration)
+        .join(Integration, Integration.id == CompanyIntegration.integration_id)
+        .where(
+            CompanyIntegration.company_id == company_id,
+            CompanyIntegration.status == "active",
+            Integration.integration_key.in_(LOADBOARD_PROVIDERS),
+        )
+    )
+    return [(provider, integration) for provider, integration in result.all()]
+
+
+async def _query_provider(connection: LoadBoardConnection, search_params: Dict[str, Any], lane: str) -> ProviderResult:
+    provider, company_integration = connection.provider, connection.integration
+    started = time.perf_counter()
+
+    def finish(status: str, loads: List[Dict[str, Any]], error: Optional[str] = None) -> ProviderResult:
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        return ProviderResult(provider, str(company_integration.id), status, loads, elapsed_ms, error)
+
+    cached = _cached_lane(str(company_integration.id), lane)
+    if cached is not None:
+        return finish("cached", cached)
+
+    client = loadboard_client(company_integration, provider, connection.api_base_url)
+    try:
+        # Placeholder path - actual endpoints vary by provider (see search_loads)
+        response = await asyncio.wait_for(
+            client.post("/loads/search", json=search_params),
+            timeout=settings.loadboard_provider_timeout_seconds,
+        )
+    except asyncio.TimeoutError:
+        return finish("timeout", [], f"No answer within {settings.loadboard_provider_timeout_seconds}s")
+    except Exception as exc:
+        return finish("error", [], str(exc))
+
+    if response.status_code != 200:
+        return finish("error", [], f"HTTP {response.status_code}")
+    try:
+        payload = response.json()
+    except ValueError:
+        return finish("error", [], "Invalid JSON response")
+    raw_loads = payload.get("results", []) if isinstance(payload, dict) else payload
+    loads = [normalize_load(provider, raw, search_params) for raw in raw_loads or [] if isinstance(raw, dict)]
+    _cache_lane(str(company_integration.id), lane, loads)
+    return finish("ok", loads)
+
+
+async def search(connections: List[LoadBoardConnection], search_params: Dict[str, Any]) -> AsyncIterator[ProviderResult]:
+    """Query every connected board concurrently, yielding each provider's result as it arrives."""
+    lane = _lane_hash(search_params)
+    tasks = [asyncio.create_task(_query_provider(connection, search_params, lane)) for connection in connections]
+    results: List[ProviderResult] = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            results.append(result)
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await _record_sync_status(results)
+
+
+async def _record_sync_status(results: List[ProviderResult]) -> None:
+    """Update last_sync_at / last_error_message on each queried integration (own session: the response may be streaming)."""
+    queried = [result for result in results if result.status != "cached"]
+    if not queried:
+        return
+    try:
+        async with AsyncSessionFactory() as db:
+            for result in queried:
+                values: Dict[str, Any] = {"last_error_message": None if result.status == "ok" else f"Search failed: {result.error}"}
+                if result.status == "ok":
+                    values["last_sync_at"] = datetime.utcnow()
+                await db.execute(
+                    update(CompanyIntegration).where(CompanyIntegration.id == result.integration_id).values(**values)
+                )
+            await db.commit()
+    except Exception:
+        logger.warning("loadboard_sync_status_failed", exc_info=True)
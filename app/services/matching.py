@@ -1,18 +1,44 @@
 from __future__ import annotations
 
-import math
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import List
+import heapq
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.driver import Driver, DriverIncident
 from app.models.load import Load
-from app.schemas.matching import MatchingReason, MatchingResponse, MatchingSuggestion
-from app.services.motive.matching.driver_matcher import MotiveDriverMatcher
+from app.schemas.matching import (
+    BatchAssignment,
+    BatchMatchingResponse,
+    MatchingReason,
+    MatchingResponse,
+    MatchingSuggestion,
+)
+from app.services.assignment_solver import solve_assignment
+from app.services.driver_features import (
+    DriverFeatures,
+    available_from,
+    compliance_bonus,
+    eta_for,
+    experience_bonus,
+    get_driver_features,
+    rating_bonus,
+)
+from app.services.motive.matching.driver_matcher import MotiveDriverMatcher, has_hos_available, hos_terms
+
+logger = logging.getLogger(__name__)
+
+# Loads the batch optimizer picks up when no ids are given
+OPEN_LOAD_STATUSES = ("draft", "booked", "confirmed")
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
 class MatchingService:
@@ -21,98 +47,31 @@ class MatchingService:
 
     async def suggest(self, company_id: str, load_id: str, limit: int = 5) -> MatchingResponse:
         load = await self._load(company_id, load_id)
-        drivers = await self._drivers(company_id)
-
-        suggestions: List[MatchingSuggestion] = []
-
-        for driver in drivers:
-            reasons: List[MatchingReason] = []
-            score = 50.0  # baseline
-
-            # Compliance + performance heuristics
-            if driver.compliance_score is not None:
-                compliance_bonus = (driver.compliance_score - 0.5) * 20
-                score += compliance_bonus
-                reasons.append(
-                    MatchingReason(
-                        label="Compliance score",
-                        detail=f"{driver.compliance_score:.2f}",
-                        weight=round(compliance_bonus, 2),
-                    )
-                )
-
-            if driver.average_rating is not None:
-                rating_bonus = (driver.average_rating - 4) * 10
-                score += rating_bonus
-                reasons.append(
-                    MatchingReason(label="Driver rating", detail=f"{driver.average_rating:.2f}", weight=round(rating_bonus, 2))
-                )
+        features = await get_driver_features(self.db, company_id)
 
-            if driver.total_completed_loads:
-                experience_bonus = min(driver.total_completed_loads, 500) / 25
-                score += experience_bonus
-                reasons.append(
-                    MatchingReason(
-                        label="Experience",
-                        detail=f"{int(driver.total_completed_loads)} loads completed",
-                        weight=round(experience_bonus, 2),
-                    )
-                )
+        preferred_drivers = set(getattr(load, "preferred_driver_ids", None) or [])
+        required_skills = set(getattr(load, "required_skills", []) or [])
+        required_mask = features.skills_mask(required_skills)
 
-            # Preferred driver boost
-            preferred_drivers = getattr(load, "preferred_driver_ids", None) or []
-            if driver.id in preferred_drivers:
+        # Score every driver from the precomputed feature columns
+        scores = [0.0] * len(features)
+        for index, (base, risk, bits, driver_id) in enumerate(
+            zip(features.base_score, features.incident_risk, features.skill_bits, features.ids)
+        ):
+            score = base - risk
+            if driver_id in preferred_drivers:
                 score += 15
-                reasons.append(MatchingReason(label="Preferred driver", detail="Listed on load preferences", weight=15))
-
-            # Required skills match vs penalty
-            required_skills = set(getattr(load, "required_skills", []) or [])
-            driver_skills = set(((driver.preference_profile or {}).get("skills") or []))
             if required_skills:
-                matched = required_skills & driver_skills
-                if matched:
-                    bonus = min(len(matched) * 5, 15)
-                    score += bonus
-                    reasons.append(MatchingReason(label="Skill match", detail=", ".join(sorted(matched)), weight=bonus))
-                else:
-                    score -= 20
-                    reasons.append(MatchingReason(label="Missing required skills", weight=-20))
-
-            # Incident penalties
-            incident_penalty = 0.0
-            for incident in driver.incidents or []:
-                months_ago = (datetime.utcnow() - incident.occurred_at).days / 30 if incident.occurred_at else 12
-                severity_penalty = {"LOW": 2, "MEDIUM": 5, "HIGH": 10, "CRITICAL": 15}.get(incident.severity.upper(), 5)
-                decay = max(0.2, 1 - months_ago / 24)
-                incident_penalty += severity_penalty * decay
-            if incident_penalty:
-                score -= incident_penalty
-                reasons.append(
-                    MatchingReason(
-                        label="Recent incidents",
-                        detail=f"-{incident_penalty:.1f} risk",
-                        weight=round(-incident_penalty, 1),
-                    )
-                )
+                matched = (bits & required_mask).bit_count()
+                score += min(matched * 5, 15) if matched else -20
+            scores[index] = max(0.0, min(100.0, score))
 
-            score = max(0.0, min(100.0, score))
-
-            suggestions.append(
-                MatchingSuggestion(
-                    driver_id=driver.id,
-                    driver_name=f"{driver.first_name} {driver.last_name}".strip(),
-                    truck_id=self._get_driver_truck(driver),
-                    score=round(score, 2),
-                    reasons=reasons,
-                    eta_available=self._eta(driver),
-                    compliance_score=driver.compliance_score,
-                    average_rating=driver.average_rating,
-                    completed_loads=int(driver.total_completed_loads) if driver.total_completed_loads is not None else None,
-                )
-            )
-
-        suggestions.sort(key=lambda suggestion: suggestion.score, reverse=True)
-        trimmed = suggestions[:limit]
+        # Reasons are only built for the drivers actually returned
+        top = heapq.nlargest(limit, range(len(scores)), key=scores.__getitem__)
+        trimmed = [
+            self._suggestion(features, index, scores[index], preferred_drivers, required_skills)
+            for index in top
+        ]
 
         # Enhance with Motive data if available
         try:
@@ -123,8 +82,6 @@ class MatchingService:
             trimmed = enhanced_suggestions
         except Exception as e:
             # Log but don't fail if Motive enhancement fails
-            import logging
-            logger = logging.getLogger(__name__)
             logger.warning(f"Motive matching enhancement failed: {e}")
 
         return MatchingResponse(
@@ -133,6 +90,134 @@ class MatchingService:
             suggestions=trimmed,
         )
 
+    async def assign_batch(
+        self,
+        company_id: str,
+        load_ids: Optional[List[str]] = None,
+        min_score: float = 0.0,
+    ) -> BatchMatchingResponse:
+        """
+        Assign drivers to many loads in one pass.
+
+        Builds a single load x driver score matrix from the cached driver
+        features (plus Motive HOS, fetched once for the batch) and solves it as
+        an assignment problem: each driver gets at most one load and the batch
+        total is maximised, instead of greedy per-load picks. Drivers missing a
+        load's required skills, out of HOS hours, available only after pickup,
+        or scoring below min_score are not eligible for that load.
+        """
+        loads = await self._open_loads(company_id, load_ids)
+        features = await get_driver_features(self.db, company_id)
+        try:
+            hos = await MotiveDriverMatcher(self.db).hos_availability(company_id)
+        except Exception as e:
+            logger.warning(f"Motive HOS lookup failed for batch matching: {e}")
+            hos = {}
+
+        # Driver-only terms, shared by every load
+        driver_scores: List[Optional[float]] = []
+        hos_reasons: Dict[int, List[MatchingReason]] = {}
+        for index, driver_id in enumerate(features.ids):
+            score = features.base_score[index] - features.incident_risk[index]
+            motive = hos.get(driver_id)
+            if motive:
+                if not has_hos_available(motive):
+                    driver_scores.append(None)
+                    continue
+                adjustment, reasons = hos_terms(motive)
+                score += adjustment
+                hos_reasons[index] = reasons
+            driver_scores.append(score)
+        ready_at = [_naive_utc(available_from(features, index)) for index in range(len(features))]
+
+        matrix: List[List[Optional[float]]] = []
+        load_terms = []
+        for load in loads:
+            preferred_drivers = set(load.preferred_driver_ids or [])
+            required_skills = set(load.required_skills or [])
+            required_mask = features.skills_mask(required_skills)
+            pickup_at = self._pickup_at(load)
+
+            row: List[Optional[float]] = []
+            for index, score in enumerate(driver_scores):
+                ready = ready_at[index]
+                if score is None or (pickup_at and ready and ready > pickup_at):
+                    row.append(None)
+                    continue
+                if features.ids[index] in preferred_drivers:
+                    score += 15
+                if required_skills:
+                    matched = (features.skill_bits[index] & required_mask).bit_count()
+                    if not matched:
+                        row.append(None)
+                        continue
+                    score += min(matched * 5, 15)
+                score = max(0.0, min(100.0, score))
+                row.append(score if score >= min_score else None)
+            matrix.append(row)
+            load_terms.append((preferred_drivers, required_skills))
+
+        chosen = solve_assignment(matrix)
+
+        assignments: List[BatchAssignment] = []
+        total_score = 0.0
+        for load, row, index, (preferred_drivers, required_skills) in zip(loads, matrix, chosen, load_terms):
+            if index is None:
+                if all(score is None for score in row):
+                    reason = "No eligible driver"
+                else:
+                    reason = "Eligible drivers assigned to other loads"
+                assignments.append(BatchAssignment(load_id=load.id, unassigned_reason=reason))
+                continue
+            suggestion = self._suggestion(features, index, row[index], preferred_drivers, required_skills)
+            suggestion.reasons.extend(hos_reasons.get(index, []))
+            total_score += suggestion.score
+            assignments.append(BatchAssignment(load_id=load.id, suggestion=suggestion))
+
+        assigned_count = sum(1 for assignment in assignments if assignment.suggestion)
+        logger.info(
+            "batch_matching_solved",
+            extra={
+                "company_id": company_id,
+                "loads": len(loads),
+                "drivers": len(features),
+                "assigned": assigned_count,
+            },
+        )
+        return BatchMatchingResponse(
+            generated_at=datetime.utcnow(),
+            assignments=assignments,
+            assigned_count=assigned_count,
+            total_score=round(total_score, 2),
+        )
+
+    async def _open_loads(self, company_id: str, load_ids: Optional[Iterable[str]]) -> List[Load]:
+        query = select(Load).where(Load.company_id == company_id).options(selectinload(Load.stops))
+        if load_ids:
+            load_ids = list(dict.fromkeys(load_ids))
+            query = query.where(Load.id.in_(load_ids))
+        else:
+            query = query.where(Load.driver_id.is_(None), Load.status.in_(OPEN_LOAD_STATUSES))
+        result = await self.db.execute(query)
+        loads = list(result.scalars().all())
+
+        if load_ids:
+            found = {load.id for load in loads}
+            missing = [load_id for load_id in load_ids if load_id not in found]
+            if missing:
+                raise ValueError(f"Loads not found: {', '.join(missing)}")
+            # Keep the caller's order
+            order = {load_id: position for position, load_id in enumerate(load_ids)}
+            loads.sort(key=lambda load: order[load.id])
+        return loads
+
+    @staticmethod
+    def _pickup_at(load: Load) -> Optional[datetime]:
+        for stop in load.stops or []:
+            if (stop.stop_type or "").lower() == "pickup" and stop.scheduled_at:
+                return _naive_utc(stop.scheduled_at)
+        return None
+
     async def _load(self, company_id: str, load_id: str) -> Load:
         result = await self.db.execute(
             select(Load)
@@ -144,26 +229,73 @@ class MatchingService:
             raise ValueError("Load not found")
         return load
 
-    async def _drivers(self, company_id: str) -> List[Driver]:
-        result = await self.db.execute(
-            select(Driver)
-            .where(Driver.company_id == company_id)
-            .options(selectinload(Driver.incidents))
-        )
-        return list(result.scalars().all())
+    def _suggestion(
+        self,
+        features: DriverFeatures,
+        index: int,
+        score: float,
+        preferred_drivers: Set[str],
+        required_skills: Set[str],
+    ) -> MatchingSuggestion:
+        reasons: List[MatchingReason] = []
+        compliance = features.compliance[index]
+        rating = features.rating[index]
+        completed = features.completed[index]
 
-    def _get_driver_truck(self, driver: Driver) -> str | None:
-        """Get the driver's assigned truck from their profile metadata."""
-        if driver.profile_metadata and "assigned_truck_id" in driver.profile_metadata:
-            return driver.profile_metadata.get("assigned_truck_id")
-        return None
+        # Compliance + performance heuristics
+        if compliance is not None:
+            reasons.append(
+                MatchingReason(
+                    label="Compliance score",
+                    detail=f"{compliance:.2f}",
+                    weight=round(compliance_bonus(compliance), 2),
+                )
+            )
+        if rating is not None:
+            reasons.append(
+                MatchingReason(label="Driver rating", detail=f"{rating:.2f}", weight=round(rating_bonus(rating), 2))
+            )
+        if completed:
+            reasons.append(
+                MatchingReason(
+                    label="Experience",
+                    detail=f"{int(completed)} loads completed",
+                    weight=round(experience_bonus(completed), 2),
+                )
+            )
 
-    def _eta(self, driver: Driver) -> datetime:
-        availability = (driver.preference_profile or {}).get("available_at")
-        if availability:
-            try:
-                return datetime.fromisoformat(availability)
-            except ValueError:
-                pass
-        return datetime.utcnow() + timedelta(hours=4)
+        # Preferred driver boost
+        if features.ids[index] in preferred_drivers:
+            reasons.append(MatchingReason(label="Preferred driver", detail="Listed on load preferences", weight=15))
 
+        # Required skills match vs penalty
+        if required_skills:
+            matched = required_skills & set(features.skills_for(features.skill_bits[index]))
+            if matched:
+                bonus = min(len(matched) * 5, 15)
+                reasons.append(MatchingReason(label="Skill match", detail=", ".join(sorted(matched)), weight=bonus))
+            else:
+                reasons.append(MatchingReason(label="Missing required skills", weight=-20))
+
+        # Incident penalties
+        incident_risk = features.incident_risk[index]
+        if incident_risk:
+            reasons.append(
+                MatchingReason(
+                    label="Recent incidents",
+                    detail=f"-{incident_risk:.1f} risk",
+                    weight=round(-incident_risk, 1),
+                )
+            )
+
+        return MatchingSuggestion(
+            driver_id=features.ids[index],
+            driver_name=features.names[index],
+            truck_id=features.truck_ids[index],
+            score=round(score, 2),
+            reasons=reasons,
+            eta_available=eta_for(features, index),
+            compliance_score=compliance,
+            average_rating=rating,
+            completed_loads=int(completed) if completed is not None else None,
+        )
@@ -2,7 +2,7 @@
 
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,6 +17,64 @@ from app.services.motive.motive_client import MotiveAPIClient
 logger = logging.getLogger(__name__)
 
 
+def hos_terms(driver_motive_data: Dict) -> Tuple[float, List[MatchingReason]]:
+    """Score adjustment and reasons from a driver's Motive HOS availability and violations."""
+    adjustment = 0.0
+    reasons: List[MatchingReason] = []
+
+    available_time = driver_motive_data.get("available_time")
+    if available_time:
+        available_seconds = available_time.get("available_time_seconds", 0)
+        if available_seconds > 0:
+            # Convert to hours
+            available_hours = available_seconds / 3600
+            # Bonus for having available time (up to 15 points)
+            hos_bonus = min(available_hours / 2, 15)
+            adjustment += hos_bonus
+            reasons.append(
+                MatchingReason(
+                    label="HOS Availability",
+                    detail=f"{available_hours:.1f} hours available",
+                    weight=round(hos_bonus, 2),
+                )
+            )
+        else:
+            # Penalty for no available time
+            adjustment -= 20
+            reasons.append(
+                MatchingReason(
+                    label="No HOS Availability",
+                    detail="Driver has no available hours",
+                    weight=-20,
+                )
+            )
+
+    hos_data = driver_motive_data.get("hos")
+    if hos_data:
+        violations = hos_data.get("hos_violations", [])
+        if violations:
+            violation_count = len(violations)
+            violation_penalty = min(violation_count * 5, 25)
+            adjustment -= violation_penalty
+            reasons.append(
+                MatchingReason(
+                    label="HOS Violations",
+                    detail=f"{violation_count} active violation(s)",
+                    weight=round(-violation_penalty, 2),
+                )
+            )
+
+    return adjustment, reasons
+
+
+def has_hos_available(driver_motive_data: Dict) -> bool:
+    """False only when Motive reports the driver has no drive time left."""
+    available_time = driver_motive_data.get("available_time")
+    if not available_time:
+        return True
+    return available_time.get("available_time_seconds", 0) > 0
+
+
 class MotiveDriverMatcher:
     """Enhanced driver matcher that uses Motive API data for better matching."""
 
@@ -95,6 +153,48 @@ class MotiveDriverMatcher:
             # Return original suggestions if Motive enhancement fails
             return driver_suggestions
 
+    async def hos_availability(self, company_id: str) -> Dict[str, Dict]:
+        """
+        Motive HOS data keyed by FreightOps driver id.
+
+        Used by batch assignment: one pair of Motive calls for the whole batch
+        instead of a full fetch per load.
+        """
+        client = await self.get_motive_client_for_company(company_id)
+        if not client:
+            return {}
+
+        try:
+            available_time_response = await client.get_drivers_with_available_time()
+            hos_response = await client.get_company_drivers_hos()
+        except Exception as e:
+            logger.error(f"Error fetching Motive HOS data: {e}", exc_info=True)
+            return {}
+
+        by_user: Dict[str, Dict] = {}
+        available_times = available_time_response.get("data", []) or available_time_response.get("drivers", [])
+        for driver_data in available_times:
+            user_id = driver_data.get("id") or driver_data.get("user_id")
+            if user_id:
+                by_user.setdefault(str(user_id), {})["available_time"] = driver_data
+        hos_data = hos_response.get("data", []) or hos_response.get("drivers", [])
+        for driver_data in hos_data:
+            user_id = driver_data.get("id") or driver_data.get("user_id")
+            if user_id:
+                by_user.setdefault(str(user_id), {})["hos"] = driver_data
+        if not by_user:
+            return {}
+
+        result = await self.db.execute(
+            select(Driver.id, Driver.profile_metadata).where(Driver.company_id == company_id)
+        )
+        data: Dict[str, Dict] = {}
+        for driver_id, metadata in result.all():
+            motive_user_id = metadata.get("motive_user_id") if isinstance(metadata, dict) else None
+            if motive_user_id and str(motive_user_id) in by_user:
+                data[driver_id] = by_user[str(motive_user_id)]
+        return data
+
     async def _fetch_motive_data(
         self, client: MotiveAPIClient, company_id: str, load: Load
     ) -> Dict[str, Dict]:
@@ -201,49 +301,10 @@ class MotiveDriverMatcher:
         new_score = suggestion.score
         new_reasons = list(suggestion.reasons) if suggestion.reasons else []
 
-        # HOS Availability Bonus
-        available_time = driver_motive_data.get("available_time")
-        if available_time:
-            available_seconds = available_time.get("available_time_seconds", 0)
-            if available_seconds > 0:
-                # Convert to hours
-                available_hours = available_seconds / 3600
-                # Bonus for having available time (up to 15 points)
-                hos_bonus = min(available_hours / 2, 15)
-                new_score += hos_bonus
-                new_reasons.append(
-                    MatchingReason(
-                        label="HOS Availability",
-                        detail=f"{available_hours:.1f} hours available",
-                        weight=round(hos_bonus, 2),
-                    )
-                )
-            else:
-                # Penalty for no available time
-                new_score -= 20
-                new_reasons.append(
-                    MatchingReason(
-                        label="No HOS Availability",
-                        detail="Driver has no available hours",
-                        weight=-20,
-                    )
-                )
-
-        # HOS Violations Penalty
-        hos_data = driver_motive_data.get("hos")
-        if hos_data:
-            violations = hos_data.get("hos_violations", [])
-            if violations:
-                violation_count = len(violations)
-                violation_penalty = min(violation_count * 5, 25)
-                new_score -= violation_penalty
-                new_reasons.append(
-                    MatchingReason(
-                        label="HOS Violations",
-                        detail=f"{violation_count} active violation(s)",
-                        weight=round(-violation_penalty, 2),
-                    )
-                )
+        # HOS availability bonus / violations penalty
+        hos_adjustment, hos_reasons = hos_terms(driver_motive_data)
+        new_score += hos_adjustment
+        new_reasons.extend(hos_reasons)
 
         # Performance Score Bonus
         performance_events = driver_motive_data.get("performance", [])
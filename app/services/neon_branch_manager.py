@@ -6,12 +6,13 @@ agents can test SQL queries before applying them to production.
 """
 
 import os
-import httpx
 import uuid
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy import text
 
+from app.services.outbound_http import outbound
+
 
 class NeonBranchManager:
     """
@@ -58,7 +59,7 @@ class NeonBranchManager:
         branch_name = f"agent_{agent_type}_{task_id[:8]}"
 
         # Call Neon API to create branch
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("neon") as client:
             response = await client.post(
                 f"{self.neon_api_url}/projects/{self.neon_project_id}/branches",
                 headers={
@@ -206,7 +207,7 @@ class NeonBranchManager:
         neon_branch_id = row[0]
 
         # Call Neon API to merge
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("neon") as client:
             await client.post(
                 f"{self.neon_api_url}/projects/{self.neon_project_id}/branches/{neon_branch_id}/merge",
                 headers={"Authorization": f"Bearer {self.neon_api_key}"},
@@ -244,7 +245,7 @@ class NeonBranchManager:
         neon_branch_id = row[0]
 
         # Call Neon API to delete
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("neon") as client:
             await client.delete(
                 f"{self.neon_api_url}/projects/{self.neon_project_id}/branches/{neon_branch_id}",
                 headers={"Authorization": f"Bearer {self.neon_api_key}"},
@@ -0,0 +1,252 @@
+"""
+Durable notification outbox.
+
+Automation alerts are written to notification_outbox before anything is sent,
+then delivered through the pooled channels in notifications.py:
+
+- Sends run concurrently, capped and paced per channel
+- Transient failures (dropped SMTP session, 429, 5xx) are retried in-process
+  with backoff; if they still fail the row goes back to PENDING with a later
+  next_attempt_at and the scheduler's outbox job picks it up
+- Rows left in SENDING by a crashed worker are reclaimed after a timeout
+- A NotificationLog row is written once a delivery is final (sent, or failed
+  for good)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.notification import NotificationLog, NotificationOutbox
+from app.services.notifications import NotificationResult, NotificationSender
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Rows claimed (and held SENDING) at once
+CLAIM_BATCH_SIZE = 500
+# Slowest single send: the SMTP socket timeout (HTTP providers time out sooner)
+MAX_SEND_SECONDS = 30
+
+
+def _stale_sending_after(batch_size: int = CLAIM_BATCH_SIZE) -> timedelta:
+    """
+    Age after which a SENDING row belongs to a worker that died mid-send.
+
+    Longer than the worst case for a live batch - every row timing out on every
+    inline retry, in waves of automation_send_concurrency, plus pacing - so a
+    slow batch is never reclaimed and sent twice.
+    """
+    attempts = max(1, settings.notification_inline_retries + 1)
+    backoff = sum(0.5 * 2 ** retry for retry in range(1, attempts))  # Upper bound of the inline jitter
+    waves = math.ceil(batch_size / max(1, settings.automation_send_concurrency))
+    worst = waves * (attempts * MAX_SEND_SECONDS + backoff)
+    if settings.automation_send_rate_per_second > 0:
+        worst += batch_size * attempts / settings.automation_send_rate_per_second
+    return timedelta(seconds=worst) + timedelta(minutes=10)
+
+
+@dataclass
+class OutboxMessage:
+    company_id: str
+    channel: str
+    recipient: str
+    subject: str
+    body: str
+    rule_id: Optional[str] = None
+
+
+@dataclass
+class DeliveryOutcome:
+    outbox_id: str
+    company_id: str
+    rule_id: Optional[str]
+    channel: str
+    recipient: str
+    result: NotificationResult
+    final: bool
+
+
+class _SendPool:
+    """Bounded, rate-limited concurrent sends - one concurrency cap and pace per channel."""
+
+    def __init__(self, concurrency: int, rate_per_second: float) -> None:
+        self.concurrency = max(1, concurrency)
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_slot: Dict[str, float] = {}
+
+    async def _pace(self, channel: str) -> None:
+        if not self.interval:
+            return
+        lock = self._locks.setdefault(channel, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(channel, now))
+            self._next_slot[channel] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def send(self, sender: NotificationSender, channel: str, recipient: str, subject: str, body: str) -> NotificationResult:
+        semaphore = self._semaphores.setdefault(channel, asyncio.Semaphore(self.concurrency))
+        async with semaphore:
+            await self._pace(channel)
+            try:
+                return await sender.send(recipient, subject, body)
+            except Exception as exc:
+                return NotificationResult(False, f"Send failure: {exc}", retryable=True)
+
+
+def _backoff_seconds(attempt: int, base: float) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, base * (2 ** max(0, attempt - 1)))
+
+
+class NotificationOutboxService:
+    def __init__(self, db: AsyncSession, channels: Dict[str, NotificationSender]) -> None:
+        self.db = db
+        self.channels = channels
+        self.pool = _SendPool(settings.automation_send_concurrency, settings.automation_send_rate_per_second)
+
+    async def enqueue(self, messages: List[OutboxMessage]) -> List[str]:
+        """Persist messages as PENDING (one bulk insert, committed). Returns their ids."""
+        if not messages:
+            return []
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "company_id": message.company_id,
+                "rule_id": message.rule_id,
+                "channel": message.channel,
+                "recipient": message.recipient,
+                "subject": message.subject,
+                "body": message.body,
+                "status": "PENDING",
+                "attempts": 0,
+                "next_attempt_at": now,
+            }
+            for message in messages
+        ]
+        await self.db.execute(insert(NotificationOutbox), rows)
+        await self.db.commit()
+        return [row["id"] for row in rows]
+
+    async def _claim(self, ids: Optional[List[str]] = None, limit: int = CLAIM_BATCH_SIZE) -> List[NotificationOutbox]:
+        """Mark due rows SENDING and return them."""
+        now = datetime.utcnow()
+        if ids is not None:
+            claimable = and_(NotificationOutbox.id.in_(ids), NotificationOutbox.status == "PENDING")
+            due = select(NotificationOutbox.id).where(claimable)
+        else:
+            claimable = or_(
+                and_(NotificationOutbox.status == "PENDING", NotificationOutbox.next_attempt_at <= now),
+                and_(
+                    NotificationOutbox.status == "SENDING",
+                    NotificationOutbox.updated_at <= now - _stale_sending_after(),
+                ),
+            )
+            due = select(NotificationOutbox.id).where(claimable).order_by(NotificationOutbox.next_attempt_at).limit(limit)
+        claim_ids = list((await self.db.execute(due)).scalars().all())
+        if not claim_ids:
+            return []
+
+        # Re-checking the condition keeps a concurrent drain (or send_now) from claiming the same row
+        claimed = await self.db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(claim_ids), claimable)
+            .values(status="SENDING", updated_at=now)
+            .returning(NotificationOutbox.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed_ids = list(claimed.scalars().all())
+        await self.db.commit()
+        if not claimed_ids:
+            return []
+        result = await self.db.execute(select(NotificationOutbox).where(NotificationOutbox.id.in_(claimed_ids)))
+        return list(result.scalars().all())
+
+    async def _deliver(self, row: NotificationOutbox) -> DeliveryOutcome:
+        sender = self.channels.get(row.channel)
+        attempts = row.attempts or 0
+        if sender is None:
+            result = NotificationResult(False, f"Unknown channel: {row.channel}")
+        else:
+            # In-process retries smooth over blips; longer outages fall back to the durable queue
+            for retry in range(max(1, settings.notification_inline_retries + 1)):
+                attempts += 1
+                result = await self.pool.send(sender, row.channel, row.recipient, row.subject, row.body)
+                if result.success or not result.retryable:
+                    break
+                if retry < settings.notification_inline_retries:
+                    await asyncio.sleep(_backoff_seconds(retry + 1, 0.5))
+
+        final = result.success or not result.retryable or attempts >= settings.notification_max_attempts
+        row.attempts = attempts
+        row.last_error = None if result.success else result.detail
+        if result.success:
+            row.status = "SENT"
+            row.sent_at = datetime.utcnow()
+        elif final:
+            row.status = "FAILED"
+        else:
+            row.status = "PENDING"
+            row.next_attempt_at = datetime.utcnow() + timedelta(
+                seconds=settings.notification_retry_base_seconds * (2 ** (attempts - 1))
+            )
+        return DeliveryOutcome(row.id, row.company_id, row.rule_id, row.channel, row.recipient, result, final)
+
+    async def _dispatch(self, rows: List[NotificationOutbox]) -> List[DeliveryOutcome]:
+        outcomes = list(await asyncio.gather(*(self._deliver(row) for row in rows)))
+        logs = [
+            {
+                "id": str(uuid.uuid4()),
+                "company_id": outcome.company_id,
+                "rule_id": outcome.rule_id,
+                "channel": outcome.channel,
+                "recipient": outcome.recipient,
+                "status": "sent" if outcome.result.success else "error",
+                "detail": outcome.result.detail,
+            }
+            for outcome in outcomes
+            if outcome.final and outcome.rule_id
+        ]
+        if logs:
+            await self.db.execute(insert(NotificationLog), logs)
+        await self.db.commit()
+        return outcomes
+
+    async def send_now(self, ids: List[str]) -> List[DeliveryOutcome]:
+        """Deliver freshly enqueued rows immediately (in claim-sized batches)."""
+        outcomes: List[DeliveryOutcome] = []
+        for start in range(0, len(ids), CLAIM_BATCH_SIZE):
+            outcomes.extend(await self._dispatch(await self._claim(ids=ids[start:start + CLAIM_BATCH_SIZE])))
+        return outcomes
+
+    async def deliver_pending(self, limit: int = CLAIM_BATCH_SIZE) -> List[DeliveryOutcome]:
+        """Deliver rows whose retry time has come (and reclaim abandoned SENDING rows)."""
+        outcomes = await self._dispatch(await self._claim(limit=limit))
+        if outcomes:
+            logger.info(
+                "notification_outbox_delivered",
+                extra={
+                    "total": len(outcomes),
+                    "sent": sum(1 for o in outcomes if o.result.success),
+                    "failed": sum(1 for o in outcomes if o.final and not o.result.success),
+                    "requeued": sum(1 for o in outcomes if not o.final),
+                },
+            )
+        return outcomes
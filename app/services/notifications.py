@@ -3,8 +3,9 @@ from __future__ import annotations
 import asyncio
 import logging
 import smtplib
+import time
 from email.message import EmailMessage
-from typing import Dict, Protocol
+from typing import Dict, List, Optional, Protocol
 
 import httpx
 
@@ -15,9 +16,11 @@ settings = get_settings()
 
 
 class NotificationResult:
-    def __init__(self, success: bool, detail: str = "") -> None:
+    def __init__(self, success: bool, detail: str = "", retryable: bool = False) -> None:
         self.success = success
         self.detail = detail
+        # Transient failure (connection drop, 429, 5xx) - safe to send again later
+        self.retryable = retryable
 
 
 class NotificationSender(Protocol):
@@ -25,6 +28,145 @@ class NotificationSender(Protocol):
         ...
 
 
+# ---------------------------------------------------------------------------
+# Shared transports
+# ---------------------------------------------------------------------------
+
+
+class _SmtpConnection:
+    def __init__(self) -> None:
+        self.server: Optional[smtplib.SMTP] = None
+        self.sent = 0
+        self.last_used = 0.0
+
+    def _open(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=30)
+        server.starttls()
+        server.login(settings.smtp_username, settings.smtp_password)
+        self.sent = 0
+        return server
+
+    def close(self) -> None:
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+        self.server = None
+
+    def send(self, message: EmailMessage) -> None:
+        """Send on the persistent session, reconnecting once if the server dropped it."""
+        stale = (
+            self.server is None
+            or self.sent >= settings.smtp_max_messages_per_connection
+            or time.monotonic() - self.last_used > settings.smtp_idle_timeout_seconds
+        )
+        if stale:
+            self.close()
+            self.server = self._open()
+        try:
+            self.server.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self.server = self._open()
+            self.server.send_message(message)
+        self.sent += 1
+        self.last_used = time.monotonic()
+
+
+class _SmtpPool:
+    """
+    Persistent SMTP sessions shared by every EmailSender.
+
+    Each session does STARTTLS + login once and then sends up to
+    smtp_max_messages_per_connection messages; smtp_pool_size sessions send in
+    parallel (smtplib is blocking, so each send runs in a worker thread).
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = max(1, size)
+        self._idle: Optional[asyncio.Queue[_SmtpConnection]] = None
+
+    def _queue(self) -> asyncio.Queue[_SmtpConnection]:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(_SmtpConnection())
+        return self._idle
+
+    async def send(self, message: EmailMessage) -> None:
+        idle = self._queue()
+        connection = await idle.get()
+        try:
+            await asyncio.to_thread(connection.send, message)
+        except Exception:
+            # Don't hand a broken session to the next sender
+            await asyncio.to_thread(connection.close)
+            raise
+        finally:
+            idle.put_nowait(connection)
+
+    async def close(self) -> None:
+        if self._idle is None:
+            return
+        connections: List[_SmtpConnection] = []
+        while not self._idle.empty():
+            connections.append(self._idle.get_nowait())
+        for connection in connections:
+            await asyncio.to_thread(connection.close)
+        self._idle = None
+
+
+_smtp_pool: Optional[_SmtpPool] = None
+_http_client: Optional[httpx.AsyncClient] = None
+_provider_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+def _get_smtp_pool() -> _SmtpPool:
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = _SmtpPool(settings.smtp_pool_size)
+    return _smtp_pool
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Keep-alive client shared by the Twilio and Slack senders."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+def _provider_limit(provider: str) -> asyncio.Semaphore:
+    if provider not in _provider_limits:
+        _provider_limits[provider] = asyncio.Semaphore(max(1, settings.notification_provider_concurrency))
+    return _provider_limits[provider]
+
+
+async def close_notification_channels() -> None:
+    """Close pooled SMTP sessions and the shared HTTP client (called on application shutdown)."""
+    global _smtp_pool, _http_client
+    if _smtp_pool is not None:
+        await _smtp_pool.close()
+        _smtp_pool = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _http_failure(provider: str, response: httpx.Response) -> NotificationResult:
+    retryable = response.status_code == 429 or response.status_code >= 500
+    return NotificationResult(False, f"{provider} failure: {response.text}", retryable=retryable)
+
+
+# ---------------------------------------------------------------------------
+# Channels
+# ---------------------------------------------------------------------------
+
+
 class EmailSender:
     async def send(self, recipient: str, subject: str, body: str) -> NotificationResult:
         if not settings.smtp_host or not settings.smtp_username or not settings.smtp_password:
@@ -36,18 +178,17 @@ class EmailSender:
         message["Subject"] = subject
         message.set_content(body)
 
-        def _send() -> NotificationResult:
-            try:
-                with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as server:
-                    server.starttls()
-                    server.login(settings.smtp_username, settings.smtp_password)
-                    server.send_message(message)
-                return NotificationResult(True, "Email delivered via SMTP")
-            except Exception as exc:
-                logger.exception("Failed to send SMTP email", extra={"recipient": recipient})
-                return NotificationResult(False, f"SMTP failure: {exc}")
-
-        return await asyncio.to_thread(_send)
+        try:
+            await _get_smtp_pool().send(message)
+            return NotificationResult(True, "Email delivered via SMTP")
+        except smtplib.SMTPRecipientsRefused as exc:
+            return NotificationResult(False, f"SMTP failure: {exc}")
+        except (smtplib.SMTPException, OSError) as exc:
+            logger.exception("Failed to send SMTP email", extra={"recipient": recipient})
+            # 4xx replies and dropped connections are transient
+            code = getattr(exc, "smtp_code", None)
+            retryable = code is None or 400 <= int(code) < 500
+            return NotificationResult(False, f"SMTP failure: {exc}", retryable=retryable)
 
 
 class SMSSender:
@@ -65,17 +206,19 @@ class SMSSender:
             "From": settings.sms_twilio_from_number,
             "Body": f"{subject}\n{body}".strip(),
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                data=data,
-                auth=(settings.sms_twilio_account_sid, settings.sms_twilio_auth_token),
-                timeout=10,
-            )
+        try:
+            async with _provider_limit("twilio"):
+                response = await _get_http_client().post(
+                    url,
+                    data=data,
+                    auth=(settings.sms_twilio_account_sid, settings.sms_twilio_auth_token),
+                )
+        except httpx.TransportError as exc:
+            return NotificationResult(False, f"Twilio failure: {exc}", retryable=True)
         if response.status_code in (200, 201):
             return NotificationResult(True, "SMS accepted by Twilio")
         logger.error("Twilio SMS failed", extra={"status": response.status_code, "body": response.text})
-        return NotificationResult(False, f"Twilio failure: {response.text}")
+        return _http_failure("Twilio", response)
 
 
 class SlackSender:
@@ -85,12 +228,15 @@ class SlackSender:
             return NotificationResult(False, "Slack webhook not configured")
 
         payload = {"text": f"*{subject}*\n{body}"}
-        async with httpx.AsyncClient() as client:
-            response = await client.post(webhook, json=payload, timeout=10)
+        try:
+            async with _provider_limit("slack"):
+                response = await _get_http_client().post(webhook, json=payload)
+        except httpx.TransportError as exc:
+            return NotificationResult(False, f"Slack failure: {exc}", retryable=True)
         if response.status_code in (200, 204):
             return NotificationResult(True, "Slack webhook accepted message")
         logger.error("Slack webhook failed", extra={"status": response.status_code, "body": response.text})
-        return NotificationResult(False, f"Slack failure: {response.text}")
+        return _http_failure("Slack", response)
 
 
 class InAppSender:
@@ -106,4 +252,4 @@ def build_channel_registry() -> Dict[str, NotificationSender]:
         "sms": SMSSender(),
         "slack": SlackSender(),
         "in_app": InAppSender(),
-    }
\ No newline at end of file
+    }
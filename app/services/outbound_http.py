@@ -0,0 +1,406 @@
+"""
+Outbound HTTP gateway for third-party integrations.
+
+Integration code used to open a throwaway httpx.AsyncClient per call, paying
+a TCP/TLS handshake every time, with no shared timeout, retry or rate-limit
+policy. Calls now go through one app-scoped gateway:
+
+- one keep-alive httpx.AsyncClient per provider (connections are pooled per
+  host inside it), built at application startup for the known providers
+  (start()), on first use for any other, and closed on shutdown;
+- a concurrency cap and request pacing per provider;
+- retries with exponential backoff and full jitter for transient failures:
+  connection failures for any method, and timeouts / 429 / 502-504 for
+  idempotent methods, honouring Retry-After. POST/PATCH only retry those when
+  the provider policy (retry_non_idempotent) or the call (idempotent=True)
+  says repeating the request is safe;
+- request timing and outcome counters per provider (stats()).
+
+Call sites keep the httpx request API:
+
+    async with outbound.client("atob") as client:
+        response = await client.get(url, headers=headers)
+
+Integrations that need their own cookie jar or transport (portal scrapers)
+use outbound.session(), which still goes through the provider's limits,
+retries and metrics but owns a dedicated client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import httpx
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Providers whose pools are built at startup
+KNOWN_PROVIDERS = (
+    "atob", "comdata", "efs", "geotab", "google_maps", "gusto", "neon", "openweathermap",
+    "quickbooks", "xero", "openai", "cohere", "voyage", "gemini", "dat", "truckstop", "123loadboard",
+)
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Request latency histogram bucket bounds, seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass(frozen=True)
+class ProviderPolicy:
+    concurrency: int
+    rate_per_second: float  # 0 = unpaced
+    timeout: float
+    max_retries: int
+    retry_non_idempotent: bool = False  # POST/PATCH calls have no side effects (e.g. embeddings)
+
+
+def _default_policy() -> ProviderPolicy:
+    return ProviderPolicy(
+        concurrency=settings.outbound_http_concurrency,
+        rate_per_second=settings.outbound_http_rate_per_second,
+        timeout=settings.outbound_http_timeout_seconds,
+        max_retries=settings.outbound_http_max_retries,
+    )
+
+
+# Per-provider policy overrides (anything unlisted gets the settings defaults).
+# These are app-wide: limits a provider applies per tenant/realm are the caller's concern.
+PROVIDER_OVERRIDES: Dict[str, Dict[str, Any]] = {
+    "neon": {"timeout": 60.0},  # Branch creation waits on compute start
+    # Embedding calls share the org-wide rate limit; they are pure POSTs, safe to repeat on 429
+    "openai": {"concurrency": 4, "retry_non_idempotent": True},
+    "cohere": {"concurrency": 4, "retry_non_idempotent": True},
+    "voyage": {"concurrency": 4, "retry_non_idempotent": True},
+    "gemini": {"concurrency": 4, "retry_non_idempotent": True},
+}
+
+
+@dataclass
+class ProviderStats:
+    requests: int = 0
+    retries: int = 0
+    transport_errors: int = 0
+    by_status_class: Dict[str, int] = field(default_factory=dict)
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    latency_buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def record(self, elapsed: float, status_code: Optional[int]) -> None:
+        self.requests += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if elapsed <= bound), len(LATENCY_BUCKETS))
+        self.latency_buckets[index] += 1
+        if status_code is None:
+            self.transport_errors += 1
+        else:
+            status_class = f"{status_code // 100}xx"
+            self.by_status_class[status_class] = self.by_status_class.get(status_class, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "transport_errors": self.transport_errors,
+            "by_status_class": dict(self.by_status_class),
+            "avg_ms": round(self.total_seconds / self.requests * 1000, 1) if self.requests else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 1),
+            "latency_buckets": {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets)},
+                "le_inf": self.latency_buckets[-1],
+            },
+        }
+
+
+class _Provider:
+    """Per-provider pool, limits and stats."""
+
+    def __init__(self, name: str, policy: ProviderPolicy) -> None:
+        self.name = name
+        self.policy = policy
+        self.interval = 1.0 / policy.rate_per_second if policy.rate_per_second > 0 else 0.0
+        self.semaphore = asyncio.Semaphore(max(1, policy.concurrency))
+        self.stats = ProviderStats()
+        self._pace_lock = asyncio.Lock()
+        self._next_slot = 0.0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = _build_client(self.policy.timeout)
+        return self._client
+
+    async def pace(self) -> None:
+        if not self.interval:
+            return
+        async with self._pace_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+def _build_client(timeout: float, **kwargs: Any) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=settings.outbound_http_max_connections,
+            max_keepalive_connections=settings.outbound_http_max_keepalive,
+            keepalive_expiry=settings.outbound_http_keepalive_expiry_seconds,
+        ),
+        **kwargs,
+    )
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    ceiling = settings.outbound_http_retry_base_seconds * (2 ** max(0, attempt - 1))
+    return random.uniform(0, min(ceiling, settings.outbound_http_retry_max_seconds))
+
+
+def _retryable_error(exc: httpx.TransportError, idempotent: bool) -> bool:
+    # Connection setup failures never reached the server, so any method can retry them
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    return idempotent and isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+
+
+def _retryable_status(status_code: int, idempotent: bool) -> bool:
+    # Even a 429 may have been applied by a misbehaving provider, so only idempotent requests repeat
+    return idempotent and status_code in RETRY_STATUSES
+
+
+class ProviderClient:
+    """
+    httpx-style client bound to one provider.
+
+    Supports `async with` and aclose() so it drops into code written for a
+    throwaway httpx.AsyncClient; for the shared pool both are no-ops.
+    """
+
+    def __init__(
+        self,
+        gateway: "OutboundGateway",
+        provider: str,
+        base_url: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        self.gateway = gateway
+        self.provider = provider
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self._own_client = http_client
+
+    async def __aenter__(self) -> "ProviderClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        """Close a dedicated session client; the shared provider pool stays open."""
+        if self._own_client is not None and not self._own_client.is_closed:
+            await self._own_client.aclose()
+
+    @property
+    def is_closed(self) -> bool:
+        return self._own_client is not None and self._own_client.is_closed
+
+    @property
+    def cookies(self) -> httpx.Cookies:
+        if self._own_client is None:
+            raise AttributeError("Shared provider pools keep no cookies; use outbound.session()")
+        return self._own_client.cookies
+
+    def _url(self, url: str) -> str:
+        if self.base_url and not url.startswith(("http://", "https://")):
+            return f"{self.base_url}/{url.lstrip('/')}"
+        return url
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        if self.headers:
+            kwargs["headers"] = {**self.headers, **(kwargs.get("headers") or {})}
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        return await self.gateway.request(self.provider, method, self._url(url), http_client=self._own_client, **kwargs)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def head(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("HEAD", url, **kwargs)
+
+    async def options(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("OPTIONS", url, **kwargs)
+
+
+class OutboundGateway:
+    def __init__(self) -> None:
+        self._providers: Dict[str, _Provider] = {}
+
+    def policy(self, provider: str) -> ProviderPolicy:
+        return replace(_default_policy(), **PROVIDER_OVERRIDES.get(provider, {}))
+
+    def _provider(self, name: str) -> _Provider:
+        provider = self._providers.get(name)
+        if provider is None:
+            provider = self._providers[name] = _Provider(name, self.policy(name))
+        return provider
+
+    def start(self, providers: Sequence[str] = KNOWN_PROVIDERS) -> None:
+        """Build the providers' pools up front (called on application startup)."""
+        for name in providers:
+            self._provider(name).client()
+        logger.info("outbound_http_started", extra={"providers": len(providers)})
+
+    def client(
+        self,
+        provider: str,
+        base_url: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> ProviderClient:
+        """Client on the provider's shared keep-alive pool, with optional base URL / default headers."""
+        return ProviderClient(self, provider, base_url=base_url, headers=headers, timeout=timeout)
+
+    def session(
+        self,
+        provider: str,
+        follow_redirects: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        timeout: Optional[float] = None,
+    ) -> ProviderClient:
+        """Client with its own connection pool and cookie jar; the caller closes it with aclose()."""
+        http_client = _build_client(
+            timeout if timeout is not None else self.policy(provider).timeout,
+            follow_redirects=follow_redirects,
+            transport=transport,
+        )
+        return ProviderClient(self, provider, http_client=http_client)
+
+    async def request(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        idempotent: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Send a request under the provider's limits and retry policy.
+
+        idempotent=True marks a POST/PATCH as safe to repeat (e.g. it carries an
+        idempotency key); by default only the idempotent HTTP methods, or any
+        method of a provider with retry_non_idempotent, are retried.
+        """
+        state = self._provider(provider)
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS or state.policy.retry_non_idempotent
+        attempt = 0
+        while True:
+            attempt += 1
+            client = http_client or state.client()
+            async with state.semaphore:
+                await state.pace()
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                except httpx.TransportError as exc:
+                    elapsed = time.perf_counter() - started
+                    state.stats.record(elapsed, None)
+                    self._log(provider, method, url, None, elapsed, attempt)
+                    if attempt > state.policy.max_retries or not _retryable_error(exc, idempotent):
+                        raise
+                    delay = _backoff_seconds(attempt)
+                else:
+                    elapsed = time.perf_counter() - started
+                    state.stats.record(elapsed, response.status_code)
+                    self._log(provider, method, url, response.status_code, elapsed, attempt)
+                    if attempt > state.policy.max_retries or not _retryable_status(response.status_code, idempotent):
+                        return response
+                    retry_after = _retry_after_seconds(response)
+                    delay = (
+                        min(retry_after, settings.outbound_http_retry_max_seconds)
+                        if retry_after is not None
+                        else _backoff_seconds(attempt)
+                    )
+                    await response.aclose()
+            state.stats.retries += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _log(provider: str, method: str, url: str, status_code: Optional[int], elapsed: float, attempt: int) -> None:
+        logger.debug(
+            "outbound_request",
+            extra={
+                "provider": provider,
+                "method": method,
+                "host": httpx.URL(url).host,
+                "status_code": status_code,
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "attempt": attempt,
+            },
+        )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Request counts and latency per provider since startup."""
+        return {name: provider.stats.as_dict() for name, provider in sorted(self._providers.items())}
+
+    async def close(self) -> None:
+        """Close every provider pool (called on application shutdown)."""
+        for provider in self._providers.values():
+            await provider.aclose()
+        logger.info("outbound_http_closed", extra={"providers": self.stats()})
+
+
+outbound = OutboundGateway()
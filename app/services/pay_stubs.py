@@ -0,0 +1,331 @@
+"""
+Settlement pay-stub PDFs.
+
+A stub is built from the settlement as plain data and rendered with PyMuPDF on
+the shared document render process pool, so generating hundreds of stubs on
+settlement day doesn't stall the event loop.
+
+Stubs are content addressed: the SHA-256 of the stub data (plus the template
+version) is its digest. Rendered bytes are kept in the render cache by digest,
+and the bulk job records the digest and storage key on the settlement
+(metadata["pay_stub"]), so a re-run only renders and uploads stubs whose
+settlement actually changed.
+
+start_pay_stub_job() renders every stub for a period in the background and
+reports progress over the WebSocket notification channel
+(settlement.pay_stub_job_progress).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.db import AsyncSessionFactory
+from app.models.accounting import Settlement
+from app.models.company import Company
+from app.models.driver import Driver
+from app.models.pay_stub_job import PayStubJob
+from app.services import document_rendering
+from app.services.event_dispatcher import EventType, emit_event
+from app.services.storage import StorageService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bump when the layout changes so every stub is rendered again
+PAY_STUB_TEMPLATE_VERSION = 1
+MAX_REPORTED_ERRORS = 200
+
+
+def _amount(value: Any) -> str:
+    return f"{Decimal(str(value or 0)):,.2f}"
+
+
+def pay_stub_data(settlement: Settlement, driver: Optional[Driver], company_name: str) -> Dict[str, Any]:
+    """Everything printed on a stub, as plain JSON-able data (picklable for the render pool)."""
+    breakdown = settlement.breakdown or {}
+    # Weekly settlements: settlement_date is the period end, paid three days later (see get_pay_stubs)
+    period_end = settlement.settlement_date
+    return {
+        "template_version": PAY_STUB_TEMPLATE_VERSION,
+        "company_name": company_name,
+        "settlement_id": settlement.id,
+        "driver_id": settlement.driver_id,
+        "driver_name": f"{driver.first_name} {driver.last_name}" if driver else settlement.driver_id,
+        "period_start": (period_end - timedelta(days=6)).isoformat(),
+        "period_end": period_end.isoformat(),
+        "pay_date": (period_end + timedelta(days=3)).isoformat(),
+        "gross": _amount(settlement.total_earnings),
+        "deductions": _amount(settlement.total_deductions),
+        "net": _amount(settlement.net_pay),
+        "total_loads": int(breakdown.get("total_loads", 0) or 0),
+        "total_miles": _amount(breakdown.get("total_miles", 0)),
+        "items": [
+            {
+                "description": str(item.get("description", "")),
+                "category": str(item.get("category", "earnings")),
+                "amount": _amount(item.get("amount", 0)),
+            }
+            for item in breakdown.get("items", [])
+        ],
+    }
+
+
+def pay_stub_digest(data: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def _render_pay_stub(data: Dict[str, Any]) -> bytes:
+    """Lay out one stub as a Letter-size PDF (runs inside the render pool)."""
+    import fitz  # PyMuPDF
+
+    width, height, margin = 612, 792, 54
+    doc = fitz.open()
+    page = doc.new_page(width=width, height=height)
+    y = margin
+
+    def line(text: str, x: float = margin, size: float = 10, bold: bool = False) -> None:
+        page.insert_text((x, y), text, fontsize=size, fontname="hebo" if bold else "helv")
+
+    def rule() -> None:
+        page.draw_line((margin, y - 8), (width - margin, y - 8), width=0.5)
+
+    line(data["company_name"], size=16, bold=True)
+    y += 22
+    line("Driver Pay Stub", size=12)
+    y += 28
+    line(f"Driver: {data['driver_name']}")
+    line(f"Pay date: {data['pay_date']}", x=360)
+    y += 14
+    line(f"Period: {data['period_start']} to {data['period_end']}")
+    line(f"Settlement: {data['settlement_id'][:8]}", x=360)
+    y += 14
+    line(f"Loads: {data['total_loads']}    Miles: {data['total_miles']}")
+    y += 30
+
+    line("Description", bold=True)
+    line("Category", x=360, bold=True)
+    line("Amount", x=480, bold=True)
+    y += 16
+    rule()
+    for item in data["items"]:
+        if y > height - margin - 90:
+            page = doc.new_page(width=width, height=height)
+            y = margin
+        line(item["description"][:60])
+        line(item["category"], x=360)
+        line(item["amount"], x=480)
+        y += 14
+
+    y += 16
+    rule()
+    for label, key in (("Gross pay", "gross"), ("Deductions", "deductions"), ("Net pay", "net")):
+        line(label, x=360, bold=key == "net")
+        line(data[key], x=480, bold=key == "net")
+        y += 14
+
+    try:
+        return doc.tobytes(garbage=3, deflate=True)
+    finally:
+        doc.close()
+
+
+async def render_pay_stub(data: Dict[str, Any]) -> Tuple[str, bytes]:
+    """(digest, PDF bytes) for a stub, rendering on the pool only on a cache miss."""
+    digest = pay_stub_digest(data)
+    cached = document_rendering.cache_get(digest, "pay_stub")
+    if cached is not None:
+        return digest, cached
+    pdf_bytes = await document_rendering.run_in_render_pool(_render_pay_stub, data)
+    document_rendering.cache_put(digest, "pay_stub", pdf_bytes)
+    return digest, pdf_bytes
+
+
+# ----------------------------------------------------------------------
+# Bulk job
+# ----------------------------------------------------------------------
+
+# Strong references so running jobs aren't garbage collected mid-flight
+_running_jobs: Set[asyncio.Task] = set()
+
+
+async def start_pay_stub_job(
+    db: AsyncSession,
+    *,
+    company_id: str,
+    period_start: date,
+    period_end: date,
+    user_id: Optional[str] = None,
+) -> PayStubJob:
+    """Create a PayStubJob and generate the period's stubs in the background. Returns immediately."""
+    if period_end < period_start:
+        raise ValueError("period_end must be on or after period_start")
+
+    job = PayStubJob(
+        id=str(uuid.uuid4()),
+        company_id=company_id,
+        user_id=user_id,
+        period_start=period_start,
+        period_end=period_end,
+        status="PENDING",
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    task = asyncio.create_task(_run_pay_stub_job(job.id))
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+    return job
+
+
+async def get_pay_stub_job(db: AsyncSession, company_id: str, job_id: str) -> Optional[PayStubJob]:
+    result = await db.execute(
+        select(PayStubJob).where(PayStubJob.id == job_id, PayStubJob.company_id == company_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _emit_progress(job: PayStubJob) -> None:
+    try:
+        await emit_event(
+            EventType.PAY_STUB_JOB_PROGRESS,
+            {
+                "job_id": job.id,
+                "status": job.status,
+                "total": job.total,
+                "processed": job.processed,
+                "rendered": job.rendered,
+                "unchanged": job.unchanged,
+                "failed": job.failed,
+            },
+            company_id=job.company_id,
+            target_user_id=job.user_id,
+        )
+    except Exception:
+        logger.warning("pay_stub_progress_emit_failed", extra={"job_id": job.id}, exc_info=True)
+
+
+async def _generate_stub(
+    storage: StorageService, settlement: Settlement, driver: Optional[Driver], company_name: str
+) -> Tuple[str, Optional[str]]:
+    """
+    Render and upload one stub unless it is unchanged.
+
+    Returns ("rendered" or "unchanged", storage key of the superseded rendition).
+    The caller deletes the superseded file once the new key is committed.
+    """
+    data = pay_stub_data(settlement, driver, company_name)
+    digest = pay_stub_digest(data)
+    stored = (settlement.metadata_json or {}).get("pay_stub") or {}
+    if stored.get("digest") == digest and stored.get("storage_key"):
+        return "unchanged", None
+
+    digest, pdf_bytes = await render_pay_stub(data)
+    storage_key = await storage.upload_file(
+        pdf_bytes,
+        f"paystub_{settlement.id}.pdf",
+        prefix=f"paystubs/{settlement.company_id}",
+        content_type="application/pdf",
+    )
+    settlement.metadata_json = {
+        **(settlement.metadata_json or {}),
+        "pay_stub": {"digest": digest, "storage_key": storage_key, "generated_at": datetime.utcnow().isoformat()},
+    }
+    return "rendered", stored.get("storage_key")
+
+
+async def _run_pay_stub_job(job_id: str) -> None:
+    async with AsyncSessionFactory() as session:
+        job = await session.get(PayStubJob, job_id)
+        if not job:
+            return
+
+        job.status = "RUNNING"
+        job.started_at = datetime.utcnow()
+        await session.commit()
+
+        try:
+            company = await session.get(Company, job.company_id)
+            company_name = company.name if company else ""
+            result = await session.execute(
+                select(Settlement, Driver)
+                .outerjoin(Driver, Driver.id == Settlement.driver_id)
+                .where(
+                    Settlement.company_id == job.company_id,
+                    Settlement.settlement_date >= job.period_start,
+                    Settlement.settlement_date <= job.period_end,
+                )
+                .order_by(Settlement.settlement_date, Settlement.id)
+            )
+            rows: List[Tuple[Settlement, Optional[Driver]]] = list(result.tuples().all())
+            job.total = len(rows)
+            await session.commit()
+            await _emit_progress(job)
+
+            storage = StorageService()
+            errors: List[Dict[str, str]] = []
+            batch_size = max(1, settings.pay_stub_job_batch_size)
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                outcomes = await asyncio.gather(
+                    *(_generate_stub(storage, settlement, driver, company_name) for settlement, driver in batch),
+                    return_exceptions=True,
+                )
+                superseded: List[str] = []
+                for (settlement, _), outcome in zip(batch, outcomes):
+                    if isinstance(outcome, BaseException):
+                        job.failed += 1
+                        if len(errors) < MAX_REPORTED_ERRORS:
+                            errors.append({"settlement_id": settlement.id, "error": str(outcome)})
+                        continue
+                    status, old_key = outcome
+                    if status == "rendered":
+                        job.rendered += 1
+                    else:
+                        job.unchanged += 1
+                    if old_key:
+                        superseded.append(old_key)
+                job.processed += len(batch)
+                job.errors = list(errors) or None
+                # Stub metadata and counters land together, so a crash never loses an uploaded stub's key
+                await session.commit()
+                # Only now is nothing pointing at the old renditions
+                await asyncio.gather(*(storage.delete_file(key) for key in superseded))
+                await _emit_progress(job)
+
+            job.status = "COMPLETED"
+        except Exception as exc:
+            logger.exception("pay_stub_job_failed", extra={"job_id": job_id})
+            await session.rollback()
+            job = await session.get(PayStubJob, job_id)
+            if not job:
+                return
+            job.status = "FAILED"
+            job.error_message = str(exc)
+
+        job.completed_at = datetime.utcnow()
+        await session.commit()
+        await _emit_progress(job)
+        logger.info(
+            "pay_stub_job_finished",
+            extra={
+                "job_id": job.id,
+                "status": job.status,
+                "total": job.total,
+                "rendered": job.rendered,
+                "unchanged": job.unchanged,
+                "failed": job.failed,
+            },
+        )
@@ -0,0 +1,301 @@
+"""
+Batched payroll preview.
+
+A preview prefetches everything the pay calculation needs for all workers in
+one query per entity type - pay rules (worker-specific and company defaults),
+driver loads in the period with their stop miles, active deductions, and
+owner-operator equipment - then computes every settlement in memory with
+Decimal arithmetic, rounded to cents per pay item. The query count is fixed
+no matter how large the fleet is.
+
+Driver loads are the loads of the driver profile linked to the worker
+(driver.worker_id) that were delivered or closed out (status delivered,
+completed, invoiced or paid, any case) and picked up in the period (pickup
+arrival, or creation when no arrival was recorded). Miles are the sum of the
+load's stop distances; revenue is the load's base rate.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.db import AsyncSessionFactory
+from app.models.driver import Driver
+from app.models.equipment import Equipment
+from app.models.load import Load, LoadStop
+from app.models.worker import Deduction, PayRule, PayRuleType, Worker
+from app.schemas.worker import (
+    PayItemDetail,
+    PayrollPreviewRequest,
+    PayrollPreviewResponse,
+    SettlementPreview,
+)
+
+settings = get_settings()
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0")
+DEFAULT_PERCENT = Decimal("0.70")
+PAYABLE_LOAD_STATUSES = ("DELIVERED", "COMPLETED", "INVOICED", "PAID")
+
+
+def _money(value: Decimal) -> Decimal:
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _decimal(value: Any) -> Decimal:
+    if value is None:
+        return ZERO
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+@dataclass
+class DriverLoad:
+    id: str
+    revenue: Decimal
+    miles: Decimal
+
+
+@dataclass
+class PreviewData:
+    """Everything a preview needs, keyed by worker ID."""
+
+    default_rules: List[PayRule] = field(default_factory=list)
+    rules: Dict[str, List[PayRule]] = field(default_factory=lambda: defaultdict(list))
+    loads: Dict[str, List[DriverLoad]] = field(default_factory=lambda: defaultdict(list))
+    deductions: Dict[str, List[Deduction]] = field(default_factory=lambda: defaultdict(list))
+    equipment: Dict[str, List[str]] = field(default_factory=lambda: defaultdict(list))
+
+    def rules_for(self, worker_id: str) -> List[PayRule]:
+        # Worker-specific rules replace the company defaults entirely
+        return self.rules.get(worker_id) or self.default_rules
+
+
+async def load_workers(db: AsyncSession, company_id: str, filters: Optional[Dict[str, Any]]) -> List[Worker]:
+    filters = filters or {}
+    worker_types = filters.get("types", ["employee", "contractor"])
+    worker_roles = filters.get("include", None)
+
+    query = select(Worker).where(Worker.company_id == company_id, Worker.status == "active")
+    if worker_types:
+        query = query.where(Worker.type.in_(worker_types))
+    if worker_roles:
+        query = query.where(Worker.role.in_(worker_roles))
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def load_preview_data(
+    db: AsyncSession,
+    company_id: str,
+    workers: Sequence[Worker],
+    period_start: date,
+    period_end: date,
+) -> PreviewData:
+    """Prefetch rules, loads, deductions and equipment for all workers (one query each)."""
+    data = PreviewData()
+    if not workers:
+        return data
+    worker_ids = [worker.id for worker in workers]
+    driver_ids = [worker.id for worker in workers if _enum_value(worker.role) == "driver"]
+    contractor_ids = [worker.id for worker in workers if _enum_value(worker.type) == "contractor"]
+
+    rules = await db.execute(
+        select(PayRule).where(
+            PayRule.company_id == company_id,
+            or_(PayRule.worker_id.in_(worker_ids), PayRule.worker_id.is_(None)),
+            or_(PayRule.effective_from.is_(None), PayRule.effective_from <= period_start),
+            or_(PayRule.effective_to.is_(None), PayRule.effective_to >= period_start),
+        )
+    )
+    for rule in rules.scalars():
+        if rule.worker_id is None:
+            data.default_rules.append(rule)
+        else:
+            data.rules[rule.worker_id].append(rule)
+
+    if driver_ids:
+        stop_miles = (
+            select(LoadStop.load_id, func.sum(LoadStop.distance_miles).label("miles"))
+            .group_by(LoadStop.load_id)
+            .subquery()
+        )
+        picked_up_at = func.coalesce(Load.pickup_arrival_time, Load.created_at)
+        loads = await db.execute(
+            select(Driver.worker_id, Load.id, Load.base_rate, stop_miles.c.miles)
+            .join(Driver, Driver.id == Load.driver_id)
+            .outerjoin(stop_miles, stop_miles.c.load_id == Load.id)
+            .where(
+                Load.company_id == company_id,
+                Driver.worker_id.in_(driver_ids),
+                picked_up_at >= datetime.combine(period_start, time.min),
+                picked_up_at < datetime.combine(period_end + timedelta(days=1), time.min),
+                func.upper(Load.status).in_(PAYABLE_LOAD_STATUSES),
+            )
+        )
+        for worker_id, load_id, base_rate, miles in loads.all():
+            data.loads[worker_id].append(DriverLoad(load_id, _decimal(base_rate), _decimal(miles)))
+
+    deductions = await db.execute(
+        select(Deduction).where(Deduction.worker_id.in_(worker_ids), Deduction.is_active == "true")
+    )
+    for deduction in deductions.scalars():
+        data.deductions[deduction.worker_id].append(deduction)
+
+    if contractor_ids:
+        equipment = await db.execute(
+            select(Equipment.owner_id, Equipment.id).where(Equipment.owner_id.in_(contractor_ids))
+        )
+        for owner_id, equipment_id in equipment.all():
+            data.equipment[owner_id].append(equipment_id)
+
+    return data
+
+
+def compute_settlement(worker: Worker, data: PreviewData) -> SettlementPreview:
+    """Calculate one worker's settlement from prefetched data (no I/O)."""
+    pay_items: List[PayItemDetail] = []
+    rules = {rule.rule_type: rule for rule in reversed(data.rules_for(worker.id))}  # First rule of a type wins
+
+    if _enum_value(worker.role) == "driver":
+        loads = data.loads.get(worker.id, [])
+
+        mileage_rule = rules.get(PayRuleType.MILEAGE)
+        if mileage_rule:
+            total_miles = sum((load.miles for load in loads), ZERO)
+            if total_miles > 0:
+                pay_items.append(
+                    PayItemDetail(
+                        type="miles",
+                        amount=_money(total_miles * _decimal(mileage_rule.rate)),
+                        meta={"miles": float(total_miles), "rate": float(mileage_rule.rate)},
+                    )
+                )
+
+        pct_rule = rules.get(PayRuleType.PERCENTAGE)
+        if pct_rule:
+            total_revenue = sum((load.revenue for load in loads), ZERO)
+            if total_revenue > 0:
+                percent = (pct_rule.additional or {}).get("percent")
+                percentage = _decimal(percent) if percent is not None else DEFAULT_PERCENT
+                pay_items.append(
+                    PayItemDetail(
+                        type="percentage",
+                        amount=_money(total_revenue * percentage),
+                        meta={
+                            "revenue": float(total_revenue),
+                            "percent": float(percentage),
+                            "load_ids": [load.id for load in loads],
+                        },
+                    )
+                )
+
+    hourly_rule = rules.get(PayRuleType.HOURLY)
+    if hourly_rule and worker.pay_default:
+        hours = _decimal(worker.pay_default.get("hours_worked", 0))
+        if hours > 0:
+            pay_items.append(
+                PayItemDetail(
+                    type="hours",
+                    amount=_money(hours * _decimal(hourly_rule.rate)),
+                    meta={"hours": float(hours), "rate": float(hourly_rule.rate)},
+                )
+            )
+
+    salary_rule = rules.get(PayRuleType.SALARY)
+    if salary_rule:
+        # Calculate pay based on pay frequency (assume biweekly for now)
+        pay_items.append(
+            PayItemDetail(
+                type="salary",
+                amount=_money(_decimal(salary_rule.rate)),
+                meta={"rate": float(salary_rule.rate), "frequency": "biweekly"},
+            )
+        )
+
+    gross = sum((item.amount for item in pay_items), ZERO)
+
+    deduction_items: List[PayItemDetail] = []
+    for deduction in data.deductions.get(worker.id, []):
+        if deduction.amount:
+            deduction_items.append(
+                PayItemDetail(
+                    type="deduction",
+                    amount=_money(_decimal(deduction.amount)),
+                    meta={"deduction_type": _enum_value(deduction.type), "frequency": _enum_value(deduction.frequency)},
+                )
+            )
+        elif deduction.percentage:
+            deduction_items.append(
+                PayItemDetail(
+                    type="deduction",
+                    amount=_money(gross * _decimal(deduction.percentage)),
+                    meta={"deduction_type": _enum_value(deduction.type), "percentage": float(deduction.percentage)},
+                )
+            )
+
+    total_deductions = sum((item.amount for item in deduction_items), ZERO)
+    net = max(gross - total_deductions, ZERO)
+
+    owned_equipment_ids = None
+    if _enum_value(worker.type) == "contractor":
+        owned_equipment_ids = data.equipment.get(worker.id) or None
+
+    return SettlementPreview(
+        worker_id=worker.id,
+        worker_name=f"{worker.first_name} {worker.last_name}",
+        worker_type=_enum_value(worker.type),
+        gross=gross,
+        total_deductions=total_deductions,
+        net=net,
+        details=pay_items + deduction_items,
+        owned_equipment_ids=owned_equipment_ids,
+    )
+
+
+async def preview_company(db: AsyncSession, company_id: str, request: PayrollPreviewRequest) -> PayrollPreviewResponse:
+    """Payroll preview for one company's active workers."""
+    workers = await load_workers(db, company_id, request.filters)
+    data = await load_preview_data(db, company_id, workers, request.period_start, request.period_end)
+    settlements = [compute_settlement(worker, data) for worker in workers]
+
+    return PayrollPreviewResponse(
+        company_id=company_id,
+        period_start=request.period_start,
+        period_end=request.period_end,
+        settlements=settlements,
+        totals={
+            "gross": float(sum((s.gross for s in settlements), ZERO)),
+            "deductions": float(sum((s.total_deductions for s in settlements), ZERO)),
+            "net": float(sum((s.net for s in settlements), ZERO)),
+            "worker_count": len(settlements),
+        },
+    )
+
+
+async def preview_companies(
+    company_ids: Sequence[str], request: PayrollPreviewRequest
+) -> Dict[str, PayrollPreviewResponse]:
+    """Previews for several companies in parallel, each on its own session."""
+    semaphore = asyncio.Semaphore(max(1, settings.payroll_preview_concurrency))
+
+    async def preview_one(company_id: str) -> PayrollPreviewResponse:
+        async with semaphore:
+            async with AsyncSessionFactory() as db:
+                return await preview_company(db, company_id, request)
+
+    previews = await asyncio.gather(*(preview_one(company_id) for company_id in company_ids))
+    return dict(zip(company_ids, previews))
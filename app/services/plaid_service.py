@@ -19,7 +19,6 @@ from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUse
 from plaid.model.products import Products
 from plaid.model.country_code import CountryCode
 from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-from plaid.model.transactions_sync_request import TransactionsSyncRequest
 from plaid.model.accounts_get_request import AccountsGetRequest
 from plaid.model.item_get_request import ItemGetRequest
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -27,6 +26,7 @@ from sqlalchemy import select, update
 from cryptography.fernet import Fernet
 
 from app.core.config import get_settings
+from app.services import plaid_sync
 
 settings = get_settings()
 
@@ -106,7 +106,7 @@ class PlaidService:
             webhook='https://api.freightops.com/api/webhooks/plaid',  # Update with your domain
         )
 
-        response = self.client.link_token_create(request)
+        response = await plaid_sync.run_sdk(self.client.link_token_create, request)
 
         return {
             "link_token": response['link_token'],
@@ -141,7 +141,7 @@ class PlaidService:
         exchange_request = ItemPublicTokenExchangeRequest(
             public_token=public_token
         )
-        exchange_response = self.client.item_public_token_exchange(exchange_request)
+        exchange_response = await plaid_sync.run_sdk(self.client.item_public_token_exchange, exchange_request)
 
         access_token = exchange_response['access_token']
         item_id = exchange_response['item_id']
@@ -152,7 +152,7 @@ class PlaidService:
         # Get institution details if not provided
         if not institution_name:
             item_request = ItemGetRequest(access_token=access_token)
-            item_response = self.client.item_get(item_request)
+            item_response = await plaid_sync.run_sdk(self.client.item_get, item_request)
             institution_id = item_response['item']['institution_id']
             # Could call /institutions/get_by_id for full name
             institution_name = institution_id  # Placeholder
@@ -228,7 +228,7 @@ class PlaidService:
 
         # Fetch accounts from Plaid
         accounts_request = AccountsGetRequest(access_token=access_token)
-        accounts_response = self.client.accounts_get(accounts_request)
+        accounts_response = await plaid_sync.run_sdk(self.client.accounts_get, accounts_request)
 
         plaid_account_ids = []
 
@@ -311,6 +311,8 @@ class PlaidService:
 
         This is more efficient than the legacy /transactions/get endpoint
         as it only fetches new/modified transactions since last sync.
+        Pages until Plaid has nothing more (see app.services.plaid_sync);
+        each page is committed on its own session.
 
         Args:
             db: Database session
@@ -326,174 +328,7 @@ class PlaidService:
                 "has_more": false
             }
         """
-        # Get access token and cursor
-        result = await db.execute(
-            "SELECT access_token, sync_cursor, company_id FROM plaid_item WHERE id = :id",
-            {"id": plaid_item_id}
-        )
-        row = result.fetchone()
-        if not row:
-            raise ValueError(f"PlaidItem {plaid_item_id} not found")
-
-        encrypted_token = row[0]
-        stored_cursor = row[1] if not cursor else cursor
-        company_id = row[2]
-
-        # Decrypt access token
-        access_token = self.cipher.decrypt(encrypted_token.encode()).decode()
-
-        # Sync transactions
-        sync_request = TransactionsSyncRequest(
-            access_token=access_token,
-            cursor=stored_cursor,
-        )
-
-        sync_response = self.client.transactions_sync(sync_request)
-
-        added_count = 0
-        modified_count = 0
-        removed_count = 0
-
-        # Process added transactions
-        for transaction in sync_response['added']:
-            await self._store_transaction(db, company_id, plaid_item_id, transaction)
-            added_count += 1
-
-        # Process modified transactions
-        for transaction in sync_response['modified']:
-            await self._update_transaction(db, transaction)
-            modified_count += 1
-
-        # Process removed transactions
-        for transaction_id in sync_response['removed']:
-            await db.execute(
-                "DELETE FROM plaid_transaction WHERE transaction_id = :id",
-                {"id": transaction_id}
-            )
-            removed_count += 1
-
-        # Update cursor
-        next_cursor = sync_response['next_cursor']
-        await db.execute(
-            """
-            UPDATE plaid_item
-            SET sync_cursor = :cursor, last_synced_at = :now
-            WHERE id = :id
-            """,
-            {
-                "cursor": next_cursor,
-                "now": datetime.utcnow(),
-                "id": plaid_item_id,
-            }
-        )
-
-        await db.commit()
-
-        return {
-            "added": added_count,
-            "modified": modified_count,
-            "removed": removed_count,
-            "next_cursor": next_cursor,
-            "has_more": sync_response['has_more'],
-        }
-
-    async def _store_transaction(
-        self,
-        db: AsyncSession,
-        company_id: str,
-        item_id: str,
-        transaction: Dict[str, Any]
-    ):
-        """Store a new Plaid transaction."""
-        # Get plaid_account_id from account_id
-        result = await db.execute(
-            "SELECT id FROM plaid_account WHERE account_id = :account_id",
-            {"account_id": transaction['account_id']}
-        )
-        row = result.fetchone()
-        if not row:
-            return  # Account not synced yet
-
-        plaid_account_id = row[0]
-
-        import uuid
-        plaid_transaction_id = str(uuid.uuid4())
-
-        # Extract location if available
-        location = transaction.get('location', {})
-
-        await db.execute(
-            """
-            INSERT INTO plaid_transaction (
-                id, company_id, account_id, transaction_id,
-                amount, currency_code, description, merchant_name,
-                category_primary, category_detailed, category_id,
-                date, authorized_date, posted_date,
-                pending, transaction_type, payment_channel, payment_method,
-                location_address, location_city, location_state, location_zip,
-                reconciled, created_at, updated_at
-            ) VALUES (
-                :id, :company_id, :account_id, :transaction_id,
-                :amount, :currency_code, :description, :merchant_name,
-                :category_primary, :category_detailed, :category_id,
-                :date, :authorized_date, :posted_date,
-                :pending, :transaction_type, :payment_channel, :payment_method,
-                :location_address, :location_city, :location_state, :location_zip,
-                false, :now, :now
-            )
-            """,
-            {
-                "id": plaid_transaction_id,
-                "company_id": company_id,
-                "account_id": plaid_account_id,
-                "transaction_id": transaction['transaction_id'],
-                "amount": transaction['amount'],
-                "currency_code": transaction.get('iso_currency_code', 'USD'),
-                "description": transaction.get('name'),
-                "merchant_name": transaction.get('merchant_name'),
-                "category_primary": transaction.get('personal_finance_category', {}).get('primary'),
-                "category_detailed": transaction.get('personal_finance_category', {}).get('detailed'),
-                "category_id": None,  # Legacy field
-                "date": transaction['date'],
-                "authorized_date": transaction.get('authorized_date'),
-                "posted_date": transaction.get('date'),  # Use date as posted_date
-                "pending": transaction['pending'],
-                "transaction_type": transaction.get('transaction_type'),
-                "payment_channel": transaction.get('payment_channel'),
-                "payment_method": None,  # Not provided by Plaid
-                "location_address": location.get('address'),
-                "location_city": location.get('city'),
-                "location_state": location.get('region'),
-                "location_zip": location.get('postal_code'),
-                "now": datetime.utcnow(),
-            }
-        )
-
-    async def _update_transaction(
-        self,
-        db: AsyncSession,
-        transaction: Dict[str, Any]
-    ):
-        """Update an existing Plaid transaction."""
-        await db.execute(
-            """
-            UPDATE plaid_transaction
-            SET amount = :amount,
-                description = :description,
-                merchant_name = :merchant_name,
-                pending = :pending,
-                updated_at = :now
-            WHERE transaction_id = :transaction_id
-            """,
-            {
-                "amount": transaction['amount'],
-                "description": transaction.get('name'),
-                "merchant_name": transaction.get('merchant_name'),
-                "pending": transaction['pending'],
-                "transaction_id": transaction['transaction_id'],
-                "now": datetime.utcnow(),
-            }
-        )
+        return await plaid_sync.sync_item(self, plaid_item_id, cursor)
 
     async def get_connected_banks(
         self,
@@ -0,0 +1,318 @@
+"""
+Plaid transaction sync engine.
+
+The Plaid SDK is synchronous, so every /transactions/sync call runs on a small
+dedicated thread pool instead of the event loop. An item is synced by paging
+from its stored cursor until has_more is false; each page is applied in one
+transaction - added and modified transactions as one bulk upsert keyed on
+Plaid's transaction_id, removed ones as one DELETE - together with the cursor
+advance, so an interrupted sync resumes from the last applied page.
+
+If Plaid reports the data changed mid-pagination, the loop restarts from the
+cursor it started with (as Plaid requires); the upserts make replaying pages
+harmless. sync_items() syncs many items concurrently under
+plaid_sync_concurrency.
+
+Syncs of one item are coalesced per process: a call that arrives while the
+item is syncing asks for one more pass and waits for it, so a burst of
+SYNC_UPDATES_AVAILABLE notifications collapses into a single running sync
+instead of several paging the same cursor concurrently.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.db import AsyncSessionFactory
+
+if TYPE_CHECKING:
+    from app.services.plaid_service import PlaidService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Restarts after TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION before giving up
+_MAX_PAGINATION_RESTARTS = 3
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Item syncs running in this process, and items asked to sync again once they finish
+_inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+_resync_requested: Set[str] = set()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, settings.plaid_sync_threads), thread_name_prefix="plaid")
+    return _executor
+
+
+def shutdown_plaid_pool() -> None:
+    """Shut down the Plaid SDK thread pool (called on application shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_sdk(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking Plaid SDK call off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+def _as_dict(obj: Any) -> Dict[str, Any]:
+    return obj.to_dict() if hasattr(obj, "to_dict") else obj
+
+
+def _plaid_error_code(exc: Exception) -> Optional[str]:
+    body = getattr(exc, "body", None)
+    if not body:
+        return None
+    try:
+        return json.loads(body).get("error_code")
+    except (TypeError, ValueError):
+        return None
+
+
+_UPSERT_TRANSACTION = text(
+    """
+    INSERT INTO plaid_transaction (
+        id, company_id, account_id, transaction_id,
+        amount, currency_code, description, merchant_name,
+        category_primary, category_detailed, category_id,
+        date, authorized_date, posted_date,
+        pending, transaction_type, payment_channel, payment_method,
+        location_address, location_city, location_state, location_zip,
+        reconciled, created_at, updated_at
+    ) VALUES (
+        :id, :company_id, :account_id, :transaction_id,
+        :amount, :currency_code, :description, :merchant_name,
+        :category_primary, :category_detailed, :category_id,
+        :date, :authorized_date, :posted_date,
+        :pending, :transaction_type, :payment_channel, :payment_method,
+        :location_address, :location_city, :location_state, :location_zip,
+        false, :now, :now
+    )
+    ON CONFLICT (transaction_id) DO UPDATE SET
+        account_id = excluded.account_id,
+        amount = excluded.amount,
+        currency_code = excluded.currency_code,
+        description = excluded.description,
+        merchant_name = excluded.merchant_name,
+        category_primary = excluded.category_primary,
+        category_detailed = excluded.category_detailed,
+        date = excluded.date,
+        authorized_date = excluded.authorized_date,
+        posted_date = excluded.posted_date,
+        pending = excluded.pending,
+        transaction_type = excluded.transaction_type,
+        payment_channel = excluded.payment_channel,
+        location_address = excluded.location_address,
+        location_city = excluded.location_city,
+        location_state = excluded.location_state,
+        location_zip = excluded.location_zip,
+        updated_at = excluded.updated_at
+    """
+)
+
+_DELETE_TRANSACTIONS = text(
+    "DELETE FROM plaid_transaction WHERE transaction_id IN :transaction_ids"
+).bindparams(bindparam("transaction_ids", expanding=True))
+
+_ACCOUNT_IDS = text(
+    "SELECT account_id, id FROM plaid_account WHERE account_id IN :account_ids"
+).bindparams(bindparam("account_ids", expanding=True))
+
+
+def _transaction_row(company_id: str, plaid_account_id: str, transaction: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    location = transaction.get("location") or {}
+    category = transaction.get("personal_finance_category") or {}
+    return {
+        "id": str(uuid.uuid4()),
+        "company_id": company_id,
+        "account_id": plaid_account_id,
+        "transaction_id": transaction["transaction_id"],
+        "amount": transaction["amount"],
+        "currency_code": transaction.get("iso_currency_code") or "USD",
+        "description": transaction.get("name"),
+        "merchant_name": transaction.get("merchant_name"),
+        "category_primary": category.get("primary"),
+        "category_detailed": category.get("detailed"),
+        "category_id": None,  # Legacy field
+        "date": transaction["date"],
+        "authorized_date": transaction.get("authorized_date"),
+        "posted_date": transaction.get("date"),  # Use date as posted_date
+        "pending": transaction["pending"],
+        "transaction_type": transaction.get("transaction_type"),
+        "payment_channel": transaction.get("payment_channel"),
+        "payment_method": None,  # Not provided by Plaid
+        "location_address": location.get("address"),
+        "location_city": location.get("city"),
+        "location_state": location.get("region"),
+        "location_zip": location.get("postal_code"),
+        "now": now,
+    }
+
+
+async def apply_page(
+    db: AsyncSession,
+    company_id: str,
+    plaid_item_id: str,
+    page: Dict[str, Any],
+) -> Dict[str, int]:
+    """Apply one /transactions/sync page and advance the item's cursor (caller commits)."""
+    changed = [*page.get("added", []), *page.get("modified", [])]
+    removed = [
+        entry["transaction_id"] if isinstance(entry, dict) else entry
+        for entry in page.get("removed", [])
+    ]
+    now = datetime.utcnow()
+
+    account_map: Dict[str, str] = {}
+    plaid_account_ids = sorted({transaction["account_id"] for transaction in changed})
+    if plaid_account_ids:
+        result = await db.execute(_ACCOUNT_IDS, {"account_ids": plaid_account_ids})
+        account_map = {account_id: row_id for account_id, row_id in result.all()}
+
+    rows = [
+        _transaction_row(company_id, account_map[transaction["account_id"]], transaction, now)
+        for transaction in changed
+        if transaction["account_id"] in account_map  # Account not synced yet
+    ]
+    if rows:
+        await db.execute(_UPSERT_TRANSACTION, rows)
+    if removed:
+        await db.execute(_DELETE_TRANSACTIONS, {"transaction_ids": removed})
+
+    await db.execute(
+        text("UPDATE plaid_item SET sync_cursor = :cursor, last_synced_at = :now WHERE id = :id"),
+        {"cursor": page["next_cursor"], "now": now, "id": plaid_item_id},
+    )
+    return {
+        "added": len(page.get("added", [])),
+        "modified": len(page.get("modified", [])),
+        "removed": len(removed),
+        "skipped": len(changed) - len(rows),
+    }
+
+
+async def sync_item(service: "PlaidService", plaid_item_id: str, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Sync an item's transactions to the end of Plaid's stream.
+
+    If the item is already syncing in this process, request one more pass
+    and wait for the running sync instead of starting a second one.
+    """
+    task = _inflight.get(plaid_item_id)
+    if task is not None and not task.done():
+        _resync_requested.add(plaid_item_id)
+        return await asyncio.shield(task)
+    task = asyncio.create_task(_sync_until_settled(service, plaid_item_id, cursor))
+    _inflight[plaid_item_id] = task
+    # Shielded so a cancelled caller doesn't abort the sync other callers wait on
+    return await asyncio.shield(task)
+
+
+async def _sync_until_settled(service: "PlaidService", plaid_item_id: str, cursor: Optional[str]) -> Dict[str, Any]:
+    """Sync, then sync again from the stored cursor while more calls arrived mid-sync."""
+    try:
+        totals = await _sync_to_end(service, plaid_item_id, cursor)
+        while plaid_item_id in _resync_requested:
+            _resync_requested.discard(plaid_item_id)
+            rerun = await _sync_to_end(service, plaid_item_id)
+            for key in ("added", "modified", "removed", "skipped", "pages"):
+                totals[key] += rerun[key]
+            totals["next_cursor"] = rerun["next_cursor"]
+        return totals
+    finally:
+        _resync_requested.discard(plaid_item_id)
+        _inflight.pop(plaid_item_id, None)
+
+
+async def _sync_to_end(service: "PlaidService", plaid_item_id: str, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Page from the cursor until has_more is false."""
+    from plaid.model.transactions_sync_request import TransactionsSyncRequest
+
+    async with AsyncSessionFactory() as db:
+        row = (
+            await db.execute(
+                text("SELECT access_token, sync_cursor, company_id FROM plaid_item WHERE id = :id"),
+                {"id": plaid_item_id},
+            )
+        ).first()
+    if not row:
+        raise ValueError(f"PlaidItem {plaid_item_id} not found")
+
+    access_token = service.cipher.decrypt(row[0].encode()).decode()
+    start_cursor = cursor or row[1]
+    company_id = row[2]
+
+    totals = {"added": 0, "modified": 0, "removed": 0, "skipped": 0, "pages": 0}
+    next_cursor = start_cursor
+    restarts = 0
+    has_more = True
+    while has_more:
+        request_args: Dict[str, Any] = {"access_token": access_token, "count": settings.plaid_sync_page_size}
+        if next_cursor:
+            request_args["cursor"] = next_cursor
+        try:
+            response = await run_sdk(service.client.transactions_sync, TransactionsSyncRequest(**request_args))
+        except Exception as exc:
+            if _plaid_error_code(exc) != "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION" or restarts >= _MAX_PAGINATION_RESTARTS:
+                raise
+            restarts += 1
+            next_cursor = start_cursor
+            logger.info("plaid_sync_pagination_restarted", extra={"plaid_item_id": plaid_item_id, "restarts": restarts})
+            continue
+
+        page = _as_dict(response)
+        async with AsyncSessionFactory() as db:
+            counts = await apply_page(db, company_id, plaid_item_id, page)
+            await db.commit()
+        for key, value in counts.items():
+            totals[key] += value
+        totals["pages"] += 1
+        next_cursor = page["next_cursor"]
+        has_more = page["has_more"]
+
+    logger.info("plaid_item_synced", extra={"plaid_item_id": plaid_item_id, **totals})
+    return {**totals, "next_cursor": next_cursor, "has_more": False}
+
+
+async def sync_items(service: "PlaidService", plaid_item_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Sync many items concurrently; a failing item is reported, not raised."""
+    semaphore = asyncio.Semaphore(max(1, settings.plaid_sync_concurrency))
+
+    async def sync_one(plaid_item_id: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return {"status": "synced", **await sync_item(service, plaid_item_id)}
+            except Exception as exc:
+                logger.warning("plaid_item_sync_failed", extra={"plaid_item_id": plaid_item_id, "error": str(exc)})
+                return {"status": "failed", "error": str(exc)}
+
+    results = await asyncio.gather(*(sync_one(plaid_item_id) for plaid_item_id in plaid_item_ids))
+    return dict(zip(plaid_item_ids, results))
+
+
+async def sync_company(service: "PlaidService", company_id: str) -> Dict[str, Dict[str, Any]]:
+    """Sync every active item a company has connected."""
+    async with AsyncSessionFactory() as db:
+        result = await db.execute(
+            text("SELECT id FROM plaid_item WHERE company_id = :company_id AND status = 'active'"),
+            {"company_id": company_id},
+        )
+        plaid_item_ids: List[str] = list(result.scalars())
+    return await sync_items(service, plaid_item_ids)
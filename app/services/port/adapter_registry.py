@@ -0,0 +1,213 @@
+"""
+Per-(tenant, port) registry of live port adapters.
+
+Adapters cache their OAuth tokens / portal sessions on the instance and, via
+PortAdapter._http(), hold a keep-alive HTTP client with its cookie jar. Creating
+a fresh adapter per call throws all of that away and repeats the login round
+trip on every lookup. The registry keeps one adapter per tenant, port and
+credential set alive between calls:
+
+- Credentials changes (new integration config) produce a new key, so stale
+  sessions are never reused with new credentials
+- Adapters idle longer than port_adapter_idle_ttl_seconds are closed and
+  dropped; the LRU is bounded by port_adapter_registry_size
+- An authentication failure discards the adapter so the next call logs in fresh
+- Callers hold an adapter through lease() (or acquire()/release()); an adapter
+  evicted or discarded while leased is only closed once its last lease ends,
+  so no request has its HTTP client closed underneath it
+- Per-terminal semaphores cap concurrent requests against one terminal
+
+Tests can pass an httpx transport (e.g. httpx.MockTransport replaying recorded
+responses) which is installed on every adapter the registry creates.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import get_settings
+from app.models.port import PortIntegration
+from app.services.port.adapters.base_adapter import PortAdapter
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RegistryKey = Tuple[str, str, str, str]
+
+
+@dataclass
+class _Entry:
+    adapter: PortAdapter
+    last_used: float
+    leases: int = 0
+    retired: bool = False  # Out of the LRU; closed when the last lease ends
+
+
+def _credentials_digest(integration: Optional[PortIntegration]) -> str:
+    if not integration:
+        return ""
+    payload = json.dumps(
+        [integration.credentials_json or {}, integration.config_json or {}],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AdapterRegistry:
+    """LRU of live adapters keyed by (company, port, adapter class, credentials digest)."""
+
+    def __init__(
+        self,
+        idle_ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        terminal_concurrency: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.idle_ttl_seconds = idle_ttl_seconds or settings.port_adapter_idle_ttl_seconds
+        self.max_entries = max_entries or settings.port_adapter_registry_size
+        self.terminal_concurrency = max(1, terminal_concurrency or settings.port_tracking_terminal_concurrency)
+        self.transport = transport
+        self._entries: "OrderedDict[RegistryKey, _Entry]" = OrderedDict()
+        self._leased: Dict[int, _Entry] = {}  # id(adapter) -> entry, while leased
+        self._terminal_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @staticmethod
+    def key_for(
+        adapter_class: type[PortAdapter], port_code: str, integration: Optional[PortIntegration]
+    ) -> RegistryKey:
+        # Adapters without tenant credentials hold no tenant state and can be shared
+        company_id = integration.company_id if integration else "*"
+        return (company_id, port_code.upper(), adapter_class.__name__, _credentials_digest(integration))
+
+    async def acquire(
+        self, adapter_class: type[PortAdapter], port_code: str, integration: Optional[PortIntegration] = None
+    ) -> PortAdapter:
+        """
+        Lease the live adapter for a tenant's port integration, creating it on first use.
+
+        Every acquire() must be paired with release(); prefer lease().
+        """
+        now = time.monotonic()
+        # No awaits until the lease is registered, so concurrent callers never create the same key twice
+        retired = self._expire(now)
+        key = self.key_for(adapter_class, port_code, integration)
+        entry = self._entries.get(key)
+        if entry is None:
+            retired.extend(self._make_room())
+            adapter = adapter_class(
+                credentials=integration.credentials_json if integration else None,
+                config=integration.config_json if integration else None,
+            )
+            adapter.use_transport(self.transport)
+            entry = self._entries[key] = _Entry(adapter=adapter, last_used=now)
+            logger.debug("port_adapter_created", extra={"port_code": key[1], "adapter": key[2]})
+        entry.last_used = now
+        entry.leases += 1
+        self._leased[id(entry.adapter)] = entry
+        self._entries.move_to_end(key)
+        await self._retire(retired)
+        return entry.adapter
+
+    async def release(self, adapter: PortAdapter) -> None:
+        """End a lease; a retired adapter is closed when its last lease ends."""
+        entry = self._leased.get(id(adapter))
+        if entry is None:
+            return
+        entry.leases -= 1
+        entry.last_used = time.monotonic()
+        if entry.leases <= 0:
+            del self._leased[id(adapter)]
+            if entry.retired:
+                await self._close([adapter])
+
+    @asynccontextmanager
+    async def lease(
+        self, adapter_class: type[PortAdapter], port_code: str, integration: Optional[PortIntegration] = None
+    ) -> AsyncIterator[PortAdapter]:
+        """Hold an adapter for the duration of a block."""
+        adapter = await self.acquire(adapter_class, port_code, integration)
+        try:
+            yield adapter
+        finally:
+            await self.release(adapter)
+
+    async def discard(self, adapter: PortAdapter) -> None:
+        """Drop an adapter (e.g. after an authentication failure) so the next call starts a new session."""
+        for key, entry in list(self._entries.items()):
+            if entry.adapter is adapter:
+                await self._retire([self._entries.pop(key)])
+
+    def _expire(self, now: float) -> List[_Entry]:
+        """Remove adapters idle longer than the TTL (leased ones are in use, not idle)."""
+        return [
+            self._entries.pop(key)
+            for key, entry in list(self._entries.items())
+            if not entry.leases and now - entry.last_used > self.idle_ttl_seconds
+        ]
+
+    def _make_room(self) -> List[_Entry]:
+        """Remove least recently used adapters before a new key is added."""
+        evicted: List[_Entry] = []
+        while self._entries and len(self._entries) >= self.max_entries:
+            evicted.append(self._entries.popitem(last=False)[1])
+        return evicted
+
+    async def _retire(self, entries: List[_Entry]) -> None:
+        """Close unleased adapters now; leased ones are closed by their last release()."""
+        idle: List[PortAdapter] = []
+        for entry in entries:
+            entry.retired = True
+            if not entry.leases:
+                idle.append(entry.adapter)
+        await self._close(idle)
+
+    async def _close(self, adapters: List[PortAdapter]) -> None:
+        for adapter in adapters:
+            try:
+                await adapter.aclose()
+            except Exception as exc:  # pragma: no cover - defensive logging
+                logger.warning("port_adapter_close_failed", extra={"error": str(exc)})
+
+    def terminal_limit(self, port_code: str, terminal: Optional[str]) -> asyncio.Semaphore:
+        """Semaphore capping concurrent requests against one terminal (across tenants)."""
+        key = f"{port_code.upper()}:{(terminal or '*').upper()}"
+        if key not in self._terminal_limits:
+            self._terminal_limits[key] = asyncio.Semaphore(self.terminal_concurrency)
+        return self._terminal_limits[key]
+
+    async def close(self) -> None:
+        adapters = {id(entry.adapter): entry.adapter for entry in self._entries.values()}
+        adapters.update({id(entry.adapter): entry.adapter for entry in self._leased.values()})
+        self._entries.clear()
+        self._leased.clear()
+        await self._close(list(adapters.values()))
+
+
+_registry: Optional[AdapterRegistry] = None
+
+
+def get_adapter_registry() -> AdapterRegistry:
+    """Process-wide adapter registry."""
+    global _registry
+    if _registry is None:
+        _registry = AdapterRegistry()
+    return _registry
+
+
+async def close_adapter_registry() -> None:
+    """Close every live adapter (called on application shutdown)."""
+    global _registry
+    if _registry is not None:
+        await _registry.close()
+        _registry = None
@@ -66,7 +66,7 @@ class APMTerminalsAdapter(PortAdapter):
         if not self.client_id or not self.client_secret:
             raise PortAuthenticationError("APM Terminals credentials (client_id, client_secret) are required")
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     self.TOKEN_URL,
@@ -95,7 +95,7 @@ class APMTerminalsAdapter(PortAdapter):
         token = await self._get_access_token()
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.get(
                     f"{self.BASE_URL}{endpoint}",
@@ -121,7 +121,7 @@ class APMTerminalsAdapter(PortAdapter):
         token = await self._get_access_token()
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     f"{self.BASE_URL}{endpoint}",
@@ -148,7 +148,7 @@ class APMTerminalsAdapter(PortAdapter):
         token = await self._get_access_token()
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.delete(
                     f"{self.BASE_URL}{endpoint}",
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 
+import httpx
+
+from app.services.outbound_http import ProviderClient, outbound
 from app.schemas.port import (
     ContainerCharges,
     ContainerDates,
@@ -15,6 +19,9 @@ from app.schemas.port import (
 class PortAdapter(ABC):
     """Abstract base class for port adapters."""
 
+    # Whether the shared HTTP client follows redirects (portal scrapers need this)
+    FOLLOW_REDIRECTS = False
+
     def __init__(self, credentials: Optional[dict] = None, config: Optional[dict] = None):
         """
         Initialize adapter with credentials and configuration.
@@ -25,6 +32,36 @@ class PortAdapter(ABC):
         """
         self.credentials = credentials or {}
         self.config = config or {}
+        self._http_client: Optional[ProviderClient] = None
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+
+    def use_transport(self, transport: Optional[httpx.AsyncBaseTransport]) -> None:
+        """Route this adapter's requests through a custom transport (e.g. recorded fixtures)."""
+        self._transport = transport
+
+    @asynccontextmanager
+    async def _http(self) -> AsyncIterator[ProviderClient]:
+        """
+        Keep-alive HTTP session for this adapter.
+
+        A dedicated outbound gateway session (own connection pool and cookie
+        jar, shared retry policy and metrics under "port:<adapter>"). It is not
+        closed on exit, so connections and session cookies survive across
+        requests for as long as the adapter lives (see AdapterRegistry).
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = outbound.session(
+                f"port:{type(self).__name__}",
+                follow_redirects=self.FOLLOW_REDIRECTS,
+                transport=self._transport,
+            )
+        yield self._http_client
+
+    async def aclose(self) -> None:
+        """Close the keep-alive session."""
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        self._http_client = None
 
     @abstractmethod
     async def track_container(self, container_number: str, port_code: str) -> ContainerTrackingResponse:
@@ -69,7 +69,7 @@ class BNSFAdapter(PortAdapter):
         if not self.client_id or not self.client_secret:
             raise PortAuthenticationError("BNSF credentials (client_id, client_secret) are required")
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     self.TOKEN_URL,
@@ -101,7 +101,7 @@ class BNSFAdapter(PortAdapter):
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     f"{self.BASE_URL}{endpoint}",
@@ -104,7 +104,7 @@ class EModalAdapter(PortAdapter):
         if self.api_key:
             headers["X-API-KEY"] = self.api_key
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 if method == "GET":
                     response = await client.get(url, headers=headers, timeout=30.0)
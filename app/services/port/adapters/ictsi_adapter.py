@@ -94,7 +94,7 @@ class ICTSIAdapter(PortAdapter):
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     f"{self.base_url}{endpoint}",
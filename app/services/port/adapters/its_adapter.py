@@ -69,7 +69,7 @@ class ITSAdapter(PortAdapter):
         if not self.username or not self.password:
             raise PortAuthenticationError("ITS credentials (username, password) are required")
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     self.LOGIN_URL,
@@ -105,7 +105,7 @@ class ITSAdapter(PortAdapter):
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     f"{self.BASE_URL}{endpoint}",
@@ -184,7 +184,7 @@ class LALBAdapter(PortAdapter):
         creds = self._get_terminal_credentials(terminal_code)
         base_url = terminal_config.get("api_base_url", "")
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     f"{base_url}/oauth/token",
@@ -241,7 +241,7 @@ class LALBAdapter(PortAdapter):
                 raise PortAuthenticationError(f"API key required for {terminal_code}")
             headers["X-API-Key"] = api_key
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 url = f"{base_url}{endpoint}"
 
@@ -66,7 +66,7 @@ class LBCTAdapter(PortAdapter):
         """Make GET API request."""
         url = self._get_url(endpoint)
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.get(url, params=params, timeout=30.0)
                 response.raise_for_status()
@@ -144,7 +144,7 @@ class NYNJAdapter(PortAdapter):
         creds = self._get_terminal_credentials(terminal_code)
         base_url = terminal_config.get("api_base_url", "")
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 # MTOS login endpoint
                 response = await client.post(
@@ -199,7 +199,7 @@ class NYNJAdapter(PortAdapter):
                 raise PortAuthenticationError(f"API key required for {terminal_code}")
             headers["X-API-Key"] = api_key
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 url = f"{base_url}{endpoint}"
 
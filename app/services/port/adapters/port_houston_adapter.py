@@ -53,7 +53,7 @@ class PortHoustonAdapter(PortAdapter):
         if not self.client_id or not self.client_secret:
             raise PortAuthenticationError("Port Houston credentials (client_id, client_secret) are required")
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     self.TOKEN_URL,
@@ -82,7 +82,7 @@ class PortHoustonAdapter(PortAdapter):
         token = await self._get_access_token()
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.get(
                     f"{self.BASE_URL}{endpoint}",
@@ -108,7 +108,7 @@ class PortHoustonAdapter(PortAdapter):
         token = await self._get_access_token()
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     f"{self.BASE_URL}{endpoint}",
@@ -135,7 +135,7 @@ class PortHoustonAdapter(PortAdapter):
         token = await self._get_access_token()
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.delete(
                     f"{self.BASE_URL}{endpoint}",
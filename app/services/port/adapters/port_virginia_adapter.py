@@ -34,7 +34,7 @@ class PortVirginiaAdapter(PortAdapter):
 
         headers = {"X-API-Key": self.api_key, "Content-Type": "application/json"}
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.get(
                     f"{self.BASE_URL}{endpoint}",
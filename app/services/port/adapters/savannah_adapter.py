@@ -101,7 +101,7 @@ class SavannahAdapter(PortAdapter):
                 "Contact GPA for N4 EVP API access."
             )
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     self.TOKEN_URL,
@@ -131,7 +131,7 @@ class SavannahAdapter(PortAdapter):
         token = await self._get_access_token()
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.get(
                     f"{self.BASE_URL}{endpoint}",
@@ -161,7 +161,7 @@ class SavannahAdapter(PortAdapter):
         token = await self._get_access_token()
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     f"{self.BASE_URL}{endpoint}",
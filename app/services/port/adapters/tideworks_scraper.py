@@ -132,6 +132,9 @@ class TideworksScraper(PortAdapter):
         "USPEF": ["PET"],  # Port Everglades, Florida
     }
 
+    # Portal pages redirect to the login / results pages
+    FOLLOW_REDIRECTS = True
+
     def __init__(self, credentials: Optional[dict] = None, config: Optional[dict] = None):
         super().__init__(credentials, config)
         # Some terminals require login
@@ -152,7 +155,7 @@ class TideworksScraper(PortAdapter):
         container_numbers: List[str],
     ) -> str:
         """Fetch container search results from Tideworks."""
-        async with httpx.AsyncClient(follow_redirects=True) as client:
+        async with self._http() as client:
             try:
                 # First get the search page to get any CSRF tokens
                 search_url = f"{terminal_url}/default.do"
@@ -397,7 +400,7 @@ class TideworksScraper(PortAdapter):
             # Try first terminal
             first_terminal = list(self.TERMINAL_URLS.keys())[0]
             url = self.TERMINAL_URLS[first_terminal]
-            async with httpx.AsyncClient() as client:
+            async with self._http() as client:
                 response = await client.get(f"{url}/default.do", timeout=10.0)
                 return response.status_code == 200
         except Exception:
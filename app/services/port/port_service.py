@@ -1,6 +1,7 @@
 import uuid
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,7 +9,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.load import Load
 from app.models.port import ContainerTracking, ContainerTrackingEvent, Port, PortIntegration
 from app.schemas.port import ContainerTrackingResponse
-from app.services.port.adapters.base_adapter import PortAdapter, PortAdapterError
+from app.services.port.adapter_registry import get_adapter_registry
+from app.services.port.adapters.base_adapter import PortAdapter, PortAdapterError, PortAuthenticationError
 from app.services.port.adapters.apm_terminals_adapter import APMTerminalsAdapter
 from app.services.port.adapters.la_lb_adapter import LALBAdapter
 from app.services.port.adapters.ny_nj_adapter import NYNJAdapter
@@ -63,18 +65,23 @@ class PortService:
         )
         return integration_result.scalar_one_or_none()
 
-    async def _create_adapter(
+    @asynccontextmanager
+    async def _adapter(
         self, port_code: str, integration: Optional[PortIntegration] = None
-    ) -> Optional[PortAdapter]:
-        """Create adapter instance for a port."""
+    ) -> AsyncIterator[Optional[PortAdapter]]:
+        """
+        Lease the adapter for a port for the duration of a block (None if unsupported).
+
+        Adapters come from the shared registry, so a tenant's login session and
+        keep-alive connections are reused across calls.
+        """
         adapter_class = self._get_adapter_class(port_code)
         if not adapter_class:
-            return None
+            yield None
+            return
 
-        credentials = integration.credentials_json if integration else None
-        config = integration.config_json if integration else None
-
-        return adapter_class(credentials=credentials, config=config)
+        async with get_adapter_registry().lease(adapter_class, port_code, integration) as adapter:
+            yield adapter
 
     async def track_container(
         self,
@@ -98,13 +105,18 @@ class PortService:
         # Get or create port integration
         integration = await self._get_port_integration(company_id, port_code)
 
-        # Create adapter
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        # Lease adapter
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        # Track container
-        tracking_response = await adapter.track_container(container_number, port_code)
+            # Track container
+            try:
+                tracking_response = await adapter.track_container(container_number, port_code)
+            except PortAuthenticationError:
+                # Session may have been revoked - next call logs in again
+                await get_adapter_registry().discard(adapter)
+                raise
 
         # Store tracking data
         await self._store_tracking_data(
@@ -139,21 +151,7 @@ class PortService:
         existing = result.scalar_one_or_none()
 
         # Prepare tracking data
-        tracking_data = {
-            "container_number": container_number,
-            "port_code": port_code.upper(),
-            "terminal": tracking_response.terminal,
-            "status": tracking_response.status,
-            "location": tracking_response.location.model_dump() if tracking_response.location else None,
-            "vessel": tracking_response.vessel.model_dump() if tracking_response.vessel else None,
-            "dates": tracking_response.dates.model_dump() if tracking_response.dates else None,
-            "container_details": tracking_response.container_details.model_dump()
-            if tracking_response.container_details
-            else None,
-            "holds": tracking_response.holds,
-            "charges": tracking_response.charges.model_dump() if tracking_response.charges else None,
-            "last_updated_at": datetime.utcnow(),
-        }
+        tracking_data = self.tracking_fields(container_number, port_code, tracking_response)
 
         if existing:
             # Update existing record
@@ -177,45 +175,93 @@ class PortService:
 
         # Get events from adapter and store them
         if integration:
-            adapter = await self._create_adapter(port_code, integration)
-            if adapter:
-                try:
-                    events = await adapter.get_container_events(container_number, port_code)
-                    await self._store_events(tracking_record.id, events)
-                except Exception:
-                    # Don't fail if events can't be retrieved
-                    pass
+            async with self._adapter(port_code, integration) as adapter:
+                if adapter:
+                    try:
+                        events = await adapter.get_container_events(container_number, port_code)
+                        await self._store_events(tracking_record.id, events, commit=False)
+                    except Exception:
+                        # Don't fail if events can't be retrieved
+                        pass
 
         await self.db.commit()
         await self.db.refresh(tracking_record)
         return tracking_record
 
-    async def _store_events(self, tracking_id: str, events: List[dict]) -> None:
-        """Store container tracking events."""
+    @staticmethod
+    def tracking_fields(
+        container_number: str, port_code: str, tracking_response: ContainerTrackingResponse
+    ) -> Dict[str, Any]:
+        """Column values for a ContainerTracking row from an adapter response."""
+
+        def _dump(value: Any) -> Optional[dict]:
+            # JSON mode so datetimes are stored as ISO strings
+            return value.model_dump(mode="json") if value else None
+
+        return {
+            "container_number": container_number,
+            "port_code": port_code.upper(),
+            "terminal": tracking_response.terminal,
+            "status": tracking_response.status,
+            "location": _dump(tracking_response.location),
+            "vessel": _dump(tracking_response.vessel),
+            "dates": _dump(tracking_response.dates),
+            "container_details": _dump(tracking_response.container_details),
+            "holds": tracking_response.holds,
+            "charges": _dump(tracking_response.charges),
+            "last_updated_at": datetime.utcnow(),
+        }
+
+    @staticmethod
+    def _naive_utc(timestamp: Optional[datetime]) -> Optional[datetime]:
+        """Adapters parse aware timestamps; event_timestamp is stored as naive UTC."""
+        if timestamp is not None and timestamp.tzinfo is not None:
+            return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        return timestamp
+
+    async def _store_events(self, tracking_id: str, events: List[dict], commit: bool = True) -> int:
+        """
+        Store container tracking events, skipping ones already recorded.
+
+        Incoming events are deduplicated on (event_type, timestamp) in memory and
+        checked against existing rows with a single query. Timestamps are
+        normalized to naive UTC first so they compare equal to the stored ones.
+        Returns the number of events added.
+        """
+        incoming: Dict[tuple, dict] = {}
         for event_data in events:
-            # Check if event already exists
-            result = await self.db.execute(
-                select(ContainerTrackingEvent).where(
-                    ContainerTrackingEvent.container_tracking_id == tracking_id,
-                    ContainerTrackingEvent.event_type == event_data.get("event_type"),
-                    ContainerTrackingEvent.event_timestamp == event_data.get("timestamp"),
-                )
-            )
-            existing = result.scalar_one_or_none()
+            key = (event_data.get("event_type", "UNKNOWN"), self._naive_utc(event_data.get("timestamp")))
+            incoming.setdefault(key, event_data)
+        if not incoming:
+            return 0
 
-            if not existing:
-                event = ContainerTrackingEvent(
+        result = await self.db.execute(
+            select(ContainerTrackingEvent.event_type, ContainerTrackingEvent.event_timestamp).where(
+                ContainerTrackingEvent.container_tracking_id == tracking_id
+            )
+        )
+        existing = {(row.event_type, row.event_timestamp) for row in result.all()}
+
+        added = 0
+        for (event_type, timestamp), event_data in incoming.items():
+            if timestamp is not None and (event_type, timestamp) in existing:
+                continue
+            self.db.add(
+                ContainerTrackingEvent(
                     id=str(uuid.uuid4()),
                     container_tracking_id=tracking_id,
-                    event_type=event_data.get("event_type", "UNKNOWN"),
-                    event_timestamp=event_data.get("timestamp") or datetime.utcnow(),
+                    event_type=event_type,
+                    event_timestamp=timestamp or datetime.utcnow(),
                     location=event_data.get("location"),
                     description=event_data.get("description"),
                     event_metadata=event_data.get("metadata"),
                 )
-                self.db.add(event)
+            )
+            added += 1
 
-        await self.db.commit()
+        if commit:
+            await self.db.commit()
+        return added
 
     async def get_container_tracking_history(
         self, company_id: str, container_number: str, port_code: Optional[str] = None
@@ -290,15 +336,15 @@ class PortService:
     ) -> List[Dict[str, Any]]:
         """Get vessel schedule for a port."""
         integration = await self._get_port_integration(company_id, port_code)
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        # Check if adapter supports vessel schedules
-        if not hasattr(adapter, "get_vessel_schedule"):
-            raise PortAdapterError(f"Port {port_code} does not support vessel schedules")
+            # Check if adapter supports vessel schedules
+            if not hasattr(adapter, "get_vessel_schedule"):
+                raise PortAdapterError(f"Port {port_code} does not support vessel schedules")
 
-        return await adapter.get_vessel_schedule(vessel_name=vessel_name)
+            return await adapter.get_vessel_schedule(vessel_name=vessel_name)
 
     async def get_active_vessel_visits(
         self,
@@ -307,14 +353,14 @@ class PortService:
     ) -> List[Dict[str, Any]]:
         """Get active vessel visits at a port."""
         integration = await self._get_port_integration(company_id, port_code)
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        if not hasattr(adapter, "get_active_vessel_visits"):
-            raise PortAdapterError(f"Port {port_code} does not support active vessel visits")
+            if not hasattr(adapter, "get_active_vessel_visits"):
+                raise PortAdapterError(f"Port {port_code} does not support active vessel visits")
 
-        return await adapter.get_active_vessel_visits()
+            return await adapter.get_active_vessel_visits()
 
     # ==================== APPOINTMENT OPERATIONS ====================
 
@@ -327,17 +373,17 @@ class PortService:
     ) -> List[Dict[str, Any]]:
         """Get gate appointments."""
         integration = await self._get_port_integration(company_id, port_code)
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        if not hasattr(adapter, "get_gate_appointments"):
-            raise PortAdapterError(f"Port {port_code} does not support gate appointments")
+            if not hasattr(adapter, "get_gate_appointments"):
+                raise PortAdapterError(f"Port {port_code} does not support gate appointments")
 
-        return await adapter.get_gate_appointments(
-            container_number=container_number,
-            appointment_date=appointment_date,
-        )
+            return await adapter.get_gate_appointments(
+                container_number=container_number,
+                appointment_date=appointment_date,
+            )
 
     async def create_gate_appointment(
         self,
@@ -358,21 +404,21 @@ class PortService:
                 "Please configure your port credentials."
             )
 
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        if not hasattr(adapter, "create_gate_appointment"):
-            raise PortAdapterError(f"Port {port_code} does not support creating appointments")
+            if not hasattr(adapter, "create_gate_appointment"):
+                raise PortAdapterError(f"Port {port_code} does not support creating appointments")
 
-        return await adapter.create_gate_appointment(
-            container_number=container_number,
-            transaction_type=transaction_type,
-            appointment_time=appointment_time,
-            trucking_company=trucking_company,
-            driver_license=driver_license,
-            truck_license=truck_license,
-        )
+            return await adapter.create_gate_appointment(
+                container_number=container_number,
+                transaction_type=transaction_type,
+                appointment_time=appointment_time,
+                trucking_company=trucking_company,
+                driver_license=driver_license,
+                truck_license=truck_license,
+            )
 
     async def cancel_gate_appointment(
         self,
@@ -388,14 +434,14 @@ class PortService:
                 "Please configure your port credentials."
             )
 
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        if not hasattr(adapter, "cancel_gate_appointment"):
-            raise PortAdapterError(f"Port {port_code} does not support canceling appointments")
+            if not hasattr(adapter, "cancel_gate_appointment"):
+                raise PortAdapterError(f"Port {port_code} does not support canceling appointments")
 
-        return await adapter.cancel_gate_appointment(appointment_id=appointment_id)
+            return await adapter.cancel_gate_appointment(appointment_id=appointment_id)
 
     # ==================== GATE/TRUCK OPERATIONS ====================
 
@@ -408,17 +454,17 @@ class PortService:
     ) -> List[Dict[str, Any]]:
         """Get gate transaction history."""
         integration = await self._get_port_integration(company_id, port_code)
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        if not hasattr(adapter, "get_gate_transactions"):
-            raise PortAdapterError(f"Port {port_code} does not support gate transactions")
+            if not hasattr(adapter, "get_gate_transactions"):
+                raise PortAdapterError(f"Port {port_code} does not support gate transactions")
 
-        return await adapter.get_gate_transactions(
-            container_number=container_number,
-            since=since,
-        )
+            return await adapter.get_gate_transactions(
+                container_number=container_number,
+                since=since,
+            )
 
     async def get_truck_visits(
         self,
@@ -429,17 +475,17 @@ class PortService:
     ) -> List[Dict[str, Any]]:
         """Get truck visit information."""
         integration = await self._get_port_integration(company_id, port_code)
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        if not hasattr(adapter, "get_truck_visits"):
-            raise PortAdapterError(f"Port {port_code} does not support truck visits")
+            if not hasattr(adapter, "get_truck_visits"):
+                raise PortAdapterError(f"Port {port_code} does not support truck visits")
 
-        return await adapter.get_truck_visits(
-            truck_license=truck_license,
-            since=since,
-        )
+            return await adapter.get_truck_visits(
+                truck_license=truck_license,
+                since=since,
+            )
 
     # ==================== BOOKING/ORDER OPERATIONS ====================
 
@@ -452,17 +498,17 @@ class PortService:
     ) -> List[Dict[str, Any]]:
         """Get booking information."""
         integration = await self._get_port_integration(company_id, port_code)
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        if not hasattr(adapter, "get_bookings"):
-            raise PortAdapterError(f"Port {port_code} does not support bookings")
+            if not hasattr(adapter, "get_bookings"):
+                raise PortAdapterError(f"Port {port_code} does not support bookings")
 
-        return await adapter.get_bookings(
-            booking_number=booking_number,
-            vessel_visit=vessel_visit,
-        )
+            return await adapter.get_bookings(
+                booking_number=booking_number,
+                vessel_visit=vessel_visit,
+            )
 
     async def get_service_orders(
         self,
@@ -473,17 +519,17 @@ class PortService:
     ) -> List[Dict[str, Any]]:
         """Get service orders."""
         integration = await self._get_port_integration(company_id, port_code)
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        if not hasattr(adapter, "get_service_orders"):
-            raise PortAdapterError(f"Port {port_code} does not support service orders")
+            if not hasattr(adapter, "get_service_orders"):
+                raise PortAdapterError(f"Port {port_code} does not support service orders")
 
-        return await adapter.get_service_orders(
-            container_number=container_number,
-            order_type=order_type,
-        )
+            return await adapter.get_service_orders(
+                container_number=container_number,
+                order_type=order_type,
+            )
 
     # ==================== BILLING OPERATIONS ====================
 
@@ -496,15 +542,15 @@ class PortService:
     ) -> List[Dict[str, Any]]:
         """Get billable events for containers."""
         integration = await self._get_port_integration(company_id, port_code)
-        adapter = await self._create_adapter(port_code, integration)
-        if not adapter:
-            raise PortAdapterError(f"No adapter available for port code: {port_code}")
+        async with self._adapter(port_code, integration) as adapter:
+            if not adapter:
+                raise PortAdapterError(f"No adapter available for port code: {port_code}")
 
-        if not hasattr(adapter, "get_billable_events"):
-            raise PortAdapterError(f"Port {port_code} does not support billable events")
+            if not hasattr(adapter, "get_billable_events"):
+                raise PortAdapterError(f"Port {port_code} does not support billable events")
 
-        return await adapter.get_billable_events(
-            container_number=container_number,
-            since=since,
-        )
+            return await adapter.get_billable_events(
+                container_number=container_number,
+                since=since,
+            )
 
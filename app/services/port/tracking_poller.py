@@ -0,0 +1,413 @@
+"""
+Adaptive container tracking poller.
+
+Refreshes ContainerTracking rows for active loads on a schedule instead of only
+when someone calls PortService.track_container. Each cycle:
+
+1. Selects tracked containers on open loads whose next_poll_at is due
+2. Ranks them by risk - LFD proximity, holds, recent change activity - and
+   keeps the most urgent port_tracking_max_per_cycle
+3. Polls the port adapters concurrently, bounded per terminal (semaphore) and
+   per port (token bucket), reusing the registry's adapter per (company, port)
+4. Writes the results in one transaction, fetching events only for
+   containers whose status/holds/dates actually changed
+
+Containers that keep coming back unchanged are polled progressively less often;
+anything close to its LFD or under a hold stays on a short interval.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.load import Load
+from app.models.port import ContainerTracking, Port, PortIntegration
+from app.schemas.port import ContainerTrackingResponse
+from app.services.port.adapter_registry import AdapterRegistry, get_adapter_registry
+from app.services.port.adapters.base_adapter import PortAdapter, PortAuthenticationError
+from app.services.port.port_service import PortService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Loads in these statuses no longer need live container data
+CLOSED_LOAD_STATUSES = ("delivered", "completed", "cancelled")
+
+# Container statuses where the box has left the terminal - poll rarely
+OFF_TERMINAL_STATUSES = {"GATED_OUT", "OUTGATED", "DELIVERED", "RETURNED", "EMPTY_RETURNED"}
+
+# Poll intervals (minutes) by LFD proximity
+INTERVAL_OVERDUE = 30
+INTERVAL_LFD_24H = 15
+INTERVAL_LFD_72H = 60
+INTERVAL_DEFAULT = 240
+INTERVAL_ON_HOLD = 30
+INTERVAL_OFF_TERMINAL = 720
+INTERVAL_NO_ADAPTER = 720
+
+# Cap for urgent containers no matter how often they come back unchanged
+MAX_URGENT_INTERVAL = 60
+MAX_INTERVAL = 720
+
+
+@dataclass(order=True)
+class PollItem:
+    """A tracked container queued for a poll. Lower priority = more urgent."""
+
+    priority: float
+    tracking_id: str = field(compare=False)
+    company_id: str = field(compare=False)
+    container_number: str = field(compare=False)
+    port_code: str = field(compare=False)
+    terminal: Optional[str] = field(compare=False)
+    fingerprint: str = field(compare=False)
+    unchanged_polls: int = field(compare=False)
+    hours_to_lfd: Optional[float] = field(compare=False)
+    has_holds: bool = field(compare=False)
+    status: str = field(compare=False)
+
+
+@dataclass
+class PollResult:
+    item: PollItem
+    response: Optional[ContainerTrackingResponse] = None
+    fingerprint: Optional[str] = None
+    events: List[dict] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class PollCycleStats:
+    due: int = 0
+    polled: int = 0
+    changed: int = 0
+    failed: int = 0
+    deferred: int = 0
+    events_added: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class _RateBudget:
+    """Token bucket: at most `per_minute` requests per minute, with bursts up to that size."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = max(1, per_minute)
+        self.tokens = float(self.capacity)
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# Budgets outlive a cycle so back-to-back cycles can't exceed a port's rate
+_rate_budgets: Dict[str, _RateBudget] = {}
+
+
+def _rate_budget(port_code: str, rate_limits: Optional[dict]) -> _RateBudget:
+    per_minute = (rate_limits or {}).get("requests_per_minute") or settings.port_api_rate_limit_per_minute
+    budget = _rate_budgets.get(port_code)
+    if budget is None or budget.capacity != max(1, int(per_minute)):
+        budget = _rate_budgets[port_code] = _RateBudget(int(per_minute))
+    return budget
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            return None
+    return None
+
+
+def fingerprint(status: Optional[str], holds: Any, dates: Any, location: Any) -> str:
+    """Stable digest of the fields that make a poll "changed"."""
+    gate_status = (location or {}).get("gate_status") if isinstance(location, dict) else None
+    return json.dumps(
+        [status, sorted(holds or []), dates or {}, gate_status],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def poll_interval(hours_to_lfd: Optional[float], has_holds: bool, status: str, unchanged_polls: int) -> int:
+    """Minutes until the next poll for a container."""
+    if status.upper() in OFF_TERMINAL_STATUSES:
+        return INTERVAL_OFF_TERMINAL
+
+    if hours_to_lfd is None:
+        interval = INTERVAL_DEFAULT
+    elif hours_to_lfd < 0:
+        interval = INTERVAL_OVERDUE
+    elif hours_to_lfd < 24:
+        interval = INTERVAL_LFD_24H
+    elif hours_to_lfd < 72:
+        interval = INTERVAL_LFD_72H
+    else:
+        interval = INTERVAL_DEFAULT
+    if has_holds:
+        interval = min(interval, INTERVAL_ON_HOLD)
+
+    # Back off on containers nothing changes on: x2 every 4 unchanged polls, up to x8
+    interval *= 2 ** min(unchanged_polls // 4, 3)
+
+    urgent = has_holds or (hours_to_lfd is not None and hours_to_lfd < 24)
+    return min(interval, MAX_URGENT_INTERVAL if urgent else MAX_INTERVAL)
+
+
+def poll_priority(
+    hours_to_lfd: Optional[float],
+    has_holds: bool,
+    status: str,
+    unchanged_polls: int,
+    last_changed_at: Optional[datetime],
+    now: datetime,
+) -> float:
+    """Risk score - hours of slack before money is at stake, adjusted for holds and churn."""
+    if status.upper() in OFF_TERMINAL_STATUSES:
+        return 10_000.0
+    priority = hours_to_lfd if hours_to_lfd is not None else 1_000.0
+    if has_holds:
+        priority -= 12
+    if last_changed_at and now - last_changed_at < timedelta(hours=6):
+        # Containers that are moving tend to keep moving
+        priority -= 6
+    return priority + min(unchanged_polls, 24)
+
+
+class ContainerTrackingPoller:
+    """Runs one adaptive polling cycle over every tenant's tracked containers."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        max_per_cycle: Optional[int] = None,
+        registry: Optional[AdapterRegistry] = None,
+    ) -> None:
+        self.db = db
+        self.port_service = PortService(db)
+        self.max_per_cycle = max_per_cycle or settings.port_tracking_max_per_cycle
+        self.registry = registry or get_adapter_registry()
+
+    async def _due_items(self, now: datetime) -> List[PollItem]:
+        result = await self.db.execute(
+            select(
+                ContainerTracking.id,
+                ContainerTracking.company_id,
+                ContainerTracking.container_number,
+                ContainerTracking.port_code,
+                ContainerTracking.terminal,
+                ContainerTracking.status,
+                ContainerTracking.location,
+                ContainerTracking.dates,
+                ContainerTracking.holds,
+                ContainerTracking.unchanged_polls,
+                ContainerTracking.last_changed_at,
+            )
+            .join(Load, Load.id == ContainerTracking.load_id)
+            .where(
+                Load.status.notin_(CLOSED_LOAD_STATUSES),
+                or_(ContainerTracking.next_poll_at.is_(None), ContainerTracking.next_poll_at <= now),
+            )
+        )
+
+        items: List[PollItem] = []
+        for row in result.all():
+            lfd = _parse_datetime((row.dates or {}).get("last_free_day") if isinstance(row.dates, dict) else None)
+            hours_to_lfd = (lfd - now).total_seconds() / 3600 if lfd else None
+            has_holds = bool(row.holds)
+            status = row.status or ""
+            unchanged = row.unchanged_polls or 0
+            items.append(
+                PollItem(
+                    priority=poll_priority(hours_to_lfd, has_holds, status, unchanged, row.last_changed_at, now),
+                    tracking_id=row.id,
+                    company_id=row.company_id,
+                    container_number=row.container_number,
+                    port_code=row.port_code.upper(),
+                    terminal=row.terminal,
+                    fingerprint=fingerprint(row.status, row.holds, row.dates, row.location),
+                    unchanged_polls=unchanged,
+                    hours_to_lfd=hours_to_lfd,
+                    has_holds=has_holds,
+                    status=status,
+                )
+            )
+        return items
+
+    async def _load_integrations(
+        self, groups: List[Tuple[str, str]]
+    ) -> Tuple[Dict[Tuple[str, str], PortIntegration], Dict[str, Optional[dict]]]:
+        """Active integrations per (company, port) and rate limits per port - two queries total."""
+        company_ids = {company_id for company_id, _ in groups}
+        port_codes = {port_code for _, port_code in groups}
+
+        port_result = await self.db.execute(
+            select(Port.port_code, Port.rate_limits).where(Port.port_code.in_(port_codes))
+        )
+        rate_limits = {row.port_code.upper(): row.rate_limits for row in port_result.all()}
+
+        integration_result = await self.db.execute(
+            select(PortIntegration, Port.port_code)
+            .join(Port, Port.id == PortIntegration.port_id)
+            .where(
+                PortIntegration.company_id.in_(company_ids),
+                Port.port_code.in_(port_codes),
+                Port.is_active == "true",
+                PortIntegration.status == "active",
+            )
+        )
+        integrations = {
+            (integration.company_id, port_code.upper()): integration
+            for integration, port_code in integration_result.all()
+        }
+        return integrations, rate_limits
+
+    async def _poll(
+        self,
+        item: PollItem,
+        adapter: PortAdapter,
+        budget: _RateBudget,
+        fetch_events: bool,
+    ) -> PollResult:
+        result = PollResult(item=item)
+        async with self.registry.terminal_limit(item.port_code, item.terminal):
+            try:
+                await budget.acquire()
+                response = await adapter.track_container(item.container_number, item.port_code)
+                fields = PortService.tracking_fields(item.container_number, item.port_code, response)
+                result.response = response
+                result.fingerprint = fingerprint(fields["status"], fields["holds"], fields["dates"], fields["location"])
+                if fetch_events and result.fingerprint != item.fingerprint:
+                    await budget.acquire()
+                    result.events = await adapter.get_container_events(item.container_number, item.port_code)
+            except PortAuthenticationError as exc:
+                await self.registry.discard(adapter)
+                result.error = str(exc)
+            except Exception as exc:
+                result.error = str(exc)
+        return result
+
+    async def run_cycle(self) -> PollCycleStats:
+        now = datetime.utcnow()
+        stats = PollCycleStats()
+
+        due = await self._due_items(now)
+        stats.due = len(due)
+        if not due:
+            return stats
+
+        # Most urgent first; the rest stay due and are picked up next cycle
+        selected = heapq.nsmallest(self.max_per_cycle, due)
+        stats.deferred = len(due) - len(selected)
+
+        groups: Dict[Tuple[str, str], List[PollItem]] = {}
+        for item in selected:
+            groups.setdefault((item.company_id, item.port_code), []).append(item)
+        integrations, rate_limits = await self._load_integrations(list(groups))
+
+        tasks = []
+        leased: List[PortAdapter] = []
+        no_adapter: List[PollItem] = []
+        try:
+            for (company_id, port_code), items in groups.items():
+                integration = integrations.get((company_id, port_code))
+                adapter_class = self.port_service._get_adapter_class(port_code)
+                if not adapter_class:
+                    no_adapter.extend(items)
+                    continue
+                adapter = await self.registry.acquire(adapter_class, port_code, integration)
+                leased.append(adapter)
+                budget = _rate_budget(port_code, rate_limits.get(port_code))
+                tasks.extend(self._poll(item, adapter, budget, fetch_events=integration is not None) for item in items)
+
+            results: List[PollResult] = list(await asyncio.gather(*tasks))
+        finally:
+            for adapter in leased:
+                await self.registry.release(adapter)
+        await self._apply(results, no_adapter, now, stats)
+        return stats
+
+    async def _apply(
+        self,
+        results: List[PollResult],
+        no_adapter: List[PollItem],
+        now: datetime,
+        stats: PollCycleStats,
+    ) -> None:
+        """Write every poll outcome in one transaction."""
+        ids = [r.item.tracking_id for r in results] + [item.tracking_id for item in no_adapter]
+        if not ids:
+            return
+        rows = await self.db.execute(select(ContainerTracking).where(ContainerTracking.id.in_(ids)))
+        records = {record.id: record for record in rows.scalars().all()}
+
+        for item in no_adapter:
+            record = records.get(item.tracking_id)
+            if record:
+                record.next_poll_at = now + timedelta(minutes=INTERVAL_NO_ADAPTER)
+
+        for result in results:
+            item = result.item
+            record = records.get(item.tracking_id)
+            if not record:
+                continue
+
+            if result.error or not result.response:
+                stats.failed += 1
+                # Retry on the container's normal cadence - don't grow the backoff on errors
+                interval = poll_interval(item.hours_to_lfd, item.has_holds, item.status, item.unchanged_polls)
+                record.next_poll_at = now + timedelta(minutes=interval)
+                logger.warning(
+                    "container_tracking_poll_failed",
+                    extra={"tracking_id": item.tracking_id, "port_code": item.port_code, "error": result.error},
+                )
+                continue
+
+            stats.polled += 1
+            fields = PortService.tracking_fields(item.container_number, item.port_code, result.response)
+            for key, value in fields.items():
+                setattr(record, key, value)
+
+            if result.fingerprint != item.fingerprint:
+                stats.changed += 1
+                record.unchanged_polls = 0
+                record.last_changed_at = now
+                if result.events:
+                    stats.events_added += await self.port_service._store_events(
+                        record.id, result.events, commit=False
+                    )
+            else:
+                record.unchanged_polls = (record.unchanged_polls or 0) + 1
+
+            lfd = _parse_datetime((fields["dates"] or {}).get("last_free_day"))
+            hours_to_lfd = (lfd - now).total_seconds() / 3600 if lfd else None
+            interval = poll_interval(hours_to_lfd, bool(fields["holds"]), fields["status"] or "", record.unchanged_polls)
+            record.next_poll_at = now + timedelta(minutes=interval)
+
+        await self.db.commit()
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import logging
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,10 +11,39 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.collaboration import Presence
 from app.models.user import User
 from app.schemas.presence import PresenceState, PresenceStatus
+from app.services.presence_engine import (
+    AUTO_AWAY_MINUTES,
+    AUTO_OFFLINE_MINUTES,
+    PresenceChange,
+    PresenceEngine,
+    table_writer,
+)
 
-# Auto-away thresholds
-AUTO_AWAY_MINUTES = 5
-AUTO_OFFLINE_MINUTES = 30
+logger = logging.getLogger(__name__)
+
+
+async def broadcast_presence_changes(channel_id: str, states: List[PresenceState]) -> None:
+    """Send the channel's full presence list (the channel "presence" message) after idle transitions."""
+    from app.core.db import AsyncSessionFactory
+    from app.websocket.hub import channel_hub
+
+    async with AsyncSessionFactory() as db:
+        current = {state.user_id: state for state in await PresenceService(db).current_presence(channel_id)}
+    # Transitions not yet flushed (including users the engine just dropped as offline) win over the DB
+    for state in states:
+        if state.user_id in current and current[state.user_id].user_name:
+            state = state.model_copy(update={"user_name": current[state.user_id].user_name})
+        current[state.user_id] = state
+    await channel_hub.broadcast(
+        channel_id,
+        {"type": "presence", "data": [state.model_dump(mode="json") for state in current.values()]},
+    )
+
+
+_write_presence = table_writer(Presence.__table__, "user_id", scope_column="channel_id")
+
+# Channel presence tracked by this process (scope = channel_id)
+channel_presence = PresenceEngine("collab", _write_presence, broadcast_presence_changes)
 
 
 class PresenceService:
@@ -73,7 +103,7 @@ class PresenceService:
         await self.db.refresh(record)
 
         user_name = await self._get_user_name(user_id)
-        return PresenceState(
+        state = PresenceState(
             user_id=record.user_id,
             user_name=user_name,
             status=record.status,
@@ -81,13 +111,21 @@ class PresenceService:
             last_seen_at=record.last_seen_at,
             last_activity_at=record.last_activity_at,
         )
+        channel_presence.track(channel_id, state, record.status_set_manually)
+        return state
 
     async def update_activity(self, channel_id: str, user_id: str) -> Optional[PresenceState]:
         """Update last activity timestamp (heartbeat).
 
         Called periodically by clients to indicate activity.
         Also restores user to online if they were auto-away.
+        Users tracked by this process are updated in memory and written in
+        the engine's next batch; others are loaded from the DB and tracked.
         """
+        state = channel_presence.heartbeat(channel_id, user_id)
+        if state is not None:
+            return state
+
         now = datetime.utcnow()
         result = await self.db.execute(
             select(Presence).where(Presence.channel_id == channel_id, Presence.user_id == user_id)
@@ -108,7 +146,7 @@ class PresenceService:
         await self.db.refresh(record)
 
         user_name = await self._get_user_name(user_id)
-        return PresenceState(
+        state = PresenceState(
             user_id=record.user_id,
             user_name=user_name,
             status=record.status,
@@ -116,6 +154,8 @@ class PresenceService:
             last_seen_at=record.last_seen_at,
             last_activity_at=record.last_activity_at,
         )
+        channel_presence.track(channel_id, state, record.status_set_manually)
+        return state
 
     async def set_away_message(
         self, channel_id: str, user_id: str, away_message: Optional[str]
@@ -134,7 +174,7 @@ class PresenceService:
         await self.db.refresh(record)
 
         user_name = await self._get_user_name(user_id)
-        return PresenceState(
+        state = PresenceState(
             user_id=record.user_id,
             user_name=user_name,
             status=record.status,
@@ -142,6 +182,8 @@ class PresenceService:
             last_seen_at=record.last_seen_at,
             last_activity_at=record.last_activity_at,
         )
+        channel_presence.track(channel_id, state, record.status_set_manually)
+        return state
 
     async def mark_user_offline(self, channel_id: str, user_id: str) -> Optional[PresenceState]:
         """Mark user as offline (e.g., on disconnect)."""
@@ -156,6 +198,7 @@ class PresenceService:
         record.status = "offline"
         record.status_set_manually = False
         await self.db.commit()
+        channel_presence.forget(channel_id, user_id)
         await self.db.refresh(record)
 
         user_name = await self._get_user_name(user_id)
@@ -168,106 +211,84 @@ class PresenceService:
             last_activity_at=record.last_activity_at,
         )
 
-    async def check_idle_users(self, channel_id: str) -> List[PresenceState]:
-        """Check for idle users and update their status.
+    async def sweep_idle_users(self) -> Dict[str, List[PresenceState]]:
+        """Move idle users no running process tracks to away/offline.
 
-        Returns list of users whose status changed.
+        Users with a live connection are handled by the presence engine as
+        their deadlines pass; this set-based sweep covers rows left behind
+        by restarted workers. Returns the changed states per channel.
         Called by scheduler job.
         """
-        import logging
-        logger = logging.getLogger(__name__)
-
         now = datetime.utcnow()
         away_threshold = now - timedelta(minutes=AUTO_AWAY_MINUTES)
         offline_threshold = now - timedelta(minutes=AUTO_OFFLINE_MINUTES)
 
-        # Get all online/away users who haven't set status manually
         result = await self.db.execute(
-            select(Presence).where(
+            select(
+                Presence.channel_id,
+                Presence.user_id,
+                Presence.status,
+                Presence.away_message,
+                Presence.last_activity_at,
+            ).where(
                 and_(
-                    Presence.channel_id == channel_id,
                     Presence.status.in_(["online", "away"]),
                     Presence.status_set_manually == False,
+                    Presence.last_activity_at < away_threshold,
                 )
             )
         )
-        records = result.scalars().all()
 
-        # Collect records that need updating (capture all attributes before any await)
-        to_update: List[tuple] = []
-        for record in records:
-            try:
-                if not record.last_activity_at:
-                    continue
-
-                new_status = None
-                if record.last_activity_at < offline_threshold:
-                    new_status = "offline"
-                elif record.last_activity_at < away_threshold and record.status == "online":
-                    new_status = "away"
-
-                if new_status and new_status != record.status:
-                    # Capture all attributes NOW before any async operations
-                    to_update.append((
-                        record,
-                        new_status,
-                        record.user_id,
-                        record.away_message,
-                        record.last_activity_at,
-                        record.last_seen_at,
-                    ))
-            except Exception as exc:
-                # Log but don't fail entire check due to one bad record
-                logger.warning(
-                    f"Failed to process presence record during idle check: {exc}",
-                    extra={"error": str(exc), "presence_id": getattr(record, 'id', None), "channel_id": channel_id}
-                )
+        changes: List[PresenceChange] = []
+        rows = []
+        for row in result.all():
+            if channel_presence.tracked(row.channel_id, row.user_id):
                 continue
-
-        # Now process updates with async calls
-        changed: List[PresenceState] = []
-        for record, new_status, user_id, away_message, last_activity_at, last_seen_at in to_update:
-            try:
-                record.status = new_status
-
-                # Safely get user name - handle case where user may be deleted
-                try:
-                    user_name = await self._get_user_name(user_id)
-                except Exception as exc:
-                    logger.warning(
-                        f"Failed to get user name for presence check: user_id={user_id}",
-                        extra={"error": str(exc), "user_id": user_id, "channel_id": channel_id}
-                    )
-                    user_name = None
-
-                changed.append(PresenceState(
-                    user_id=user_id,
-                    user_name=user_name,
-                    status=new_status,
-                    away_message=away_message,
-                    last_seen_at=last_seen_at,
-                    last_activity_at=last_activity_at,
-                ))
-            except Exception as exc:
-                logger.warning(
-                    f"Failed to update presence state: {exc}",
-                    extra={"error": str(exc), "user_id": user_id, "channel_id": channel_id}
-                )
+            new_status = "offline" if row.last_activity_at < offline_threshold else "away"
+            if new_status == row.status:
                 continue
+            changes.append(PresenceChange(row.channel_id, row.user_id, "idle", row.last_activity_at, new_status))
+            rows.append((row, new_status))
 
-        if changed:
-            try:
-                await self.db.commit()
-            except Exception as exc:
-                logger.error(
-                    f"Failed to commit presence changes: {exc}",
-                    extra={"error": str(exc), "channel_id": channel_id, "changed_count": len(changed)}
-                )
-                await self.db.rollback()
-                raise
+        if not changes:
+            return {}
 
+        try:
+            await _write_presence(self.db, changes)
+            await self.db.commit()
+        except Exception as exc:
+            logger.error(
+                f"Failed to commit presence changes: {exc}",
+                extra={"error": str(exc), "changed_count": len(changes)}
+            )
+            await self.db.rollback()
+            raise
+
+        names = await self._get_user_names({row.user_id for row, _ in rows})
+        changed: Dict[str, List[PresenceState]] = {}
+        for row, new_status in rows:
+            changed.setdefault(row.channel_id, []).append(PresenceState(
+                user_id=row.user_id,
+                user_name=names.get(row.user_id),
+                status=new_status,
+                away_message=row.away_message,
+                last_seen_at=now,
+                last_activity_at=row.last_activity_at,
+            ))
         return changed
 
+    async def _get_user_names(self, user_ids: set) -> Dict[str, Optional[str]]:
+        """Resolve user names for many users in one query."""
+        if not user_ids:
+            return {}
+        result = await self.db.execute(
+            select(User.id, User.first_name, User.last_name, User.email).where(User.id.in_(user_ids))
+        )
+        return {
+            row.id: f"{row.first_name or ''} {row.last_name or ''}".strip() or row.email
+            for row in result.all()
+        }
+
     async def cleanup_orphaned_records(self) -> int:
         """Remove presence records for deleted users or channels.
 
@@ -345,15 +366,24 @@ class PresenceService:
         return orphaned_count
 
     async def current_presence(self, channel_id: str) -> List[PresenceState]:
-        """Get current presence for all users in a channel."""
+        """Get current presence for all users in a channel.
+
+        Users tracked by this process report their in-memory state, which is
+        ahead of the table until the engine's next batched write.
+        """
         result = await self.db.execute(select(Presence).where(Presence.channel_id == channel_id))
+        records = result.scalars().all()
+        names = await self._get_user_names({record.user_id for record in records})
 
         states = []
-        for record in result.scalars().all():
-            user_name = await self._get_user_name(record.user_id)
+        for record in records:
+            tracked = channel_presence.get(channel_id, record.user_id)
+            if tracked is not None:
+                states.append(tracked.model_copy(update={"user_name": names.get(record.user_id) or tracked.user_name}))
+                continue
             states.append(PresenceState(
                 user_id=record.user_id,
-                user_name=user_name,
+                user_name=names.get(record.user_id),
                 status=record.status,
                 away_message=record.away_message,
                 last_seen_at=record.last_seen_at,
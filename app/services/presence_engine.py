@@ -0,0 +1,261 @@
+"""
+In-process presence engine.
+
+Heartbeats update presence in memory. Every tracked user has an idle deadline
+in a heap, and one task per engine sleeps until the earliest deadline, moves
+users online -> away -> offline and reports only the users that changed.
+Changes are written through to the DB in batches every
+presence_flush_interval_seconds using guarded UPDATEs:
+
+- activity only moves last_activity_at forward (and restores auto-away)
+- an idle transition only applies while the row's last_activity_at is not
+  newer than the one this worker saw, so a heartbeat recorded by another
+  worker wins
+
+The DB is the state shared between workers; the scheduler's idle sweep covers
+rows no running worker tracks (e.g. after a restart).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, and_, bindparam, case, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.db import AsyncSessionFactory
+from app.schemas.presence import PresenceState
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Auto-away thresholds
+AUTO_AWAY_MINUTES = 5
+AUTO_OFFLINE_MINUTES = 30
+
+Key = Tuple[str, str]  # (scope, user_id)
+
+
+@dataclass
+class PresenceChange:
+    """A pending DB write: new activity, or an idle status transition."""
+
+    scope: str
+    user_id: str
+    kind: str  # activity | idle
+    last_activity_at: datetime
+    status: Optional[str] = None  # New status for idle transitions
+
+
+PresenceWriter = Callable[[AsyncSession, List[PresenceChange]], Awaitable[None]]
+PresenceListener = Callable[[str, List[PresenceState]], Awaitable[None]]
+
+
+def table_writer(table: Table, user_column: str, scope_column: Optional[str] = None) -> PresenceWriter:
+    """Batched guarded UPDATEs for a presence table keyed by (scope column, user column)."""
+
+    def keyed(stmt):
+        stmt = stmt.where(table.c[user_column] == bindparam("b_user"))
+        if scope_column:
+            stmt = stmt.where(table.c[scope_column] == bindparam("b_scope"))
+        return stmt
+
+    activity_stmt = keyed(update(table)).where(
+        or_(table.c.last_activity_at.is_(None), table.c.last_activity_at < bindparam("b_at"))
+    ).values(
+        last_activity_at=bindparam("b_at"),
+        status=case(
+            (and_(table.c.status == "away", table.c.status_set_manually == False), "online"),
+            else_=table.c.status,
+        ),
+    )
+    idle_stmt = keyed(update(table)).where(
+        # No IN (...): expanding parameters can't be used with executemany
+        or_(table.c.status == "online", table.c.status == "away"),
+        table.c.status_set_manually == False,
+        table.c.last_activity_at <= bindparam("b_at"),
+    ).values(status=bindparam("b_status"), last_activity_at=bindparam("b_at"))
+
+    async def write(db: AsyncSession, changes: List[PresenceChange]) -> None:
+        activity = [
+            {"b_scope": c.scope, "b_user": c.user_id, "b_at": c.last_activity_at}
+            for c in changes
+            if c.kind == "activity"
+        ]
+        idle = [
+            {"b_scope": c.scope, "b_user": c.user_id, "b_at": c.last_activity_at, "b_status": c.status}
+            for c in changes
+            if c.kind == "idle"
+        ]
+        if activity:
+            await db.execute(activity_stmt, activity)
+        if idle:
+            await db.execute(idle_stmt, idle)
+
+    return write
+
+
+@dataclass
+class _Entry:
+    state: PresenceState
+    manual: bool
+    activity_clock: float  # time.monotonic() of last_activity_at
+    version: int = 0
+
+
+class PresenceEngine:
+    def __init__(self, name: str, writer: PresenceWriter, listener: Optional[PresenceListener] = None) -> None:
+        self.name = name
+        self._writer = writer
+        self._listener = listener
+        self._entries: Dict[Key, _Entry] = {}
+        self._deadlines: List[Tuple[float, int, Key]] = []
+        self._dirty: Dict[Key, PresenceChange] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._broadcasts: set = set()
+        self._seq = 0  # Deadline versions; global so a re-tracked user never matches old deadlines
+
+    def tracked(self, scope: str, user_id: str) -> bool:
+        return (scope, user_id) in self._entries
+
+    def get(self, scope: str, user_id: str) -> Optional[PresenceState]:
+        entry = self._entries.get((scope, user_id))
+        return entry.state.model_copy() if entry else None
+
+    def track(self, scope: str, state: PresenceState, manual: bool) -> None:
+        """Start or refresh tracking from a state just written to the DB."""
+        key = (scope, state.user_id)
+        if state.status == "offline":
+            self.forget(scope, state.user_id)
+            return
+        idle_for = (datetime.utcnow() - state.last_activity_at).total_seconds() if state.last_activity_at else 0.0
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(state.model_copy(), manual, time.monotonic() - max(0.0, idle_for))
+        else:
+            entry.state = state.model_copy()
+            entry.manual = manual
+            entry.activity_clock = time.monotonic() - max(0.0, idle_for)
+        self._schedule(key, entry)
+
+    def heartbeat(self, scope: str, user_id: str) -> Optional[PresenceState]:
+        """Record activity for a tracked user; None when the user isn't tracked here."""
+        key = (scope, user_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = datetime.utcnow()
+        entry.state.last_activity_at = now
+        entry.state.last_seen_at = now
+        entry.activity_clock = time.monotonic()
+        self._dirty[key] = PresenceChange(scope, user_id, "activity", now)
+        if entry.state.status == "away" and not entry.manual:
+            entry.state.status = "online"
+            self._emit({scope: [entry.state.model_copy()]})
+        self._schedule(key, entry)
+        return entry.state.model_copy()
+
+    def forget(self, scope: str, user_id: str) -> None:
+        """Stop tracking (explicit offline); pending heap entries go stale."""
+        self._entries.pop((scope, user_id), None)
+        self._dirty.pop((scope, user_id), None)
+
+    def _schedule(self, key: Key, entry: _Entry) -> None:
+        self._seq += 1
+        entry.version = self._seq
+        if entry.manual or entry.state.status not in ("online", "away"):
+            return
+        idle_minutes = AUTO_AWAY_MINUTES if entry.state.status == "online" else AUTO_OFFLINE_MINUTES
+        heapq.heappush(self._deadlines, (entry.activity_clock + idle_minutes * 60, entry.version, key))
+        if len(self._deadlines) > 64 and len(self._deadlines) > 4 * len(self._entries):
+            # Heartbeats leave superseded deadlines behind; drop them in one pass
+            self._deadlines = [d for d in self._deadlines if self._current(d)]
+            heapq.heapify(self._deadlines)
+        self._ensure_running()
+
+    def _current(self, deadline: Tuple[float, int, Key]) -> bool:
+        entry = self._entries.get(deadline[2])
+        return entry is not None and entry.version == deadline[1]
+
+    def expire(self, clock: Optional[float] = None) -> Dict[str, List[PresenceState]]:
+        """Apply idle transitions whose deadline has passed; returns the changes per scope."""
+        clock = time.monotonic() if clock is None else clock
+        changed: Dict[str, List[PresenceState]] = {}
+        while self._deadlines and self._deadlines[0][0] <= clock:
+            deadline = heapq.heappop(self._deadlines)
+            if not self._current(deadline):
+                continue
+            key = deadline[2]
+            entry = self._entries[key]
+            new_status = "away" if entry.state.status == "online" else "offline"
+            entry.state.status = new_status
+            entry.state.last_seen_at = datetime.utcnow()
+            self._dirty[key] = PresenceChange(key[0], key[1], "idle", entry.state.last_activity_at, new_status)
+            changed.setdefault(key[0], []).append(entry.state.model_copy())
+            if new_status == "offline":
+                self._entries.pop(key)
+            else:
+                self._schedule(key, entry)
+        return changed
+
+    def _emit(self, changed: Dict[str, List[PresenceState]]) -> None:
+        if self._listener is None or not changed:
+            return
+        for scope, states in changed.items():
+            task = asyncio.ensure_future(self._listener(scope, states))
+            self._broadcasts.add(task)
+            task.add_done_callback(self._broadcast_done)
+
+    def _broadcast_done(self, task: asyncio.Future) -> None:
+        self._broadcasts.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("presence_broadcast_failed", extra={"engine": self.name, "error": str(task.exception())})
+
+    async def flush(self) -> int:
+        """Write pending changes in one transaction; returns how many were written."""
+        if not self._dirty:
+            return 0
+        batch, self._dirty = self._dirty, {}
+        try:
+            async with AsyncSessionFactory() as session:
+                await self._writer(session, list(batch.values()))
+                await session.commit()
+        except Exception as exc:
+            # Keep newer changes recorded while the write was in flight
+            for key, change in batch.items():
+                self._dirty.setdefault(key, change)
+            logger.warning("presence_flush_failed", extra={"engine": self.name, "error": str(exc)})
+            return 0
+        return len(batch)
+
+    def _ensure_running(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        except RuntimeError:
+            # No loop (scripts); deadlines are applied by the next running engine or the sweep
+            self._task = None
+
+    async def _run(self) -> None:
+        flush_every = max(1, settings.presence_flush_interval_seconds)
+        next_flush = time.monotonic() + flush_every
+        while True:
+            try:
+                self._emit(self.expire())
+                if time.monotonic() >= next_flush:
+                    await self.flush()
+                    next_flush = time.monotonic() + flush_every
+            except Exception:
+                logger.exception("presence_engine_tick_failed", extra={"engine": self.name})
+            wake_at = next_flush
+            if self._deadlines:
+                wake_at = min(wake_at, self._deadlines[0][0])
+            await asyncio.sleep(max(0.0, wake_at - time.monotonic()))
@@ -11,6 +11,8 @@ import httpx
 from intuitlib.client import AuthClient
 from intuitlib.exceptions import AuthClientError
 
+from app.services.outbound_http import outbound
+
 logger = logging.getLogger(__name__)
 
 
@@ -147,7 +149,7 @@ class QuickBooksAPIClient:
         if minor_version:
             params["minorversion"] = minor_version
 
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("quickbooks") as client:
             try:
                 response = await client.request(
                     method,
@@ -1223,7 +1225,7 @@ class QuickBooksAPIClient:
         token = self._get_access_token()
         url = f"{self.api_base_url}/invoice/{invoice_id}/pdf"
 
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("quickbooks") as client:
             try:
                 response = await client.get(
                     url,
@@ -1244,7 +1246,7 @@ class QuickBooksAPIClient:
         token = self._get_access_token()
         url = f"{self.api_base_url}/estimate/{estimate_id}/pdf"
 
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("quickbooks") as client:
             try:
                 response = await client.get(
                     url,
@@ -1265,7 +1267,7 @@ class QuickBooksAPIClient:
         token = self._get_access_token()
         url = f"{self.api_base_url}/bill/{bill_id}/pdf"
 
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("quickbooks") as client:
             try:
                 response = await client.get(
                     url,
@@ -1375,7 +1377,7 @@ class QuickBooksAPIClient:
             ],
         }
 
-        async with httpx.AsyncClient() as client:
+        async with outbound.client("quickbooks") as client:
             try:
                 response = await client.post(
                     url,
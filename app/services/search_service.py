@@ -1,10 +1,20 @@
-"""Global search service for searching across multiple entities."""
+"""
+Global search service for searching across multiple entities.
 
+On PostgreSQL every searched column has a pg_trgm GIN index on lower(col)
+(migration 20261018_000005), so the substring LIKE filters are index scans;
+results are ranked by trigram similarity and the four entity queries run
+concurrently on their own sessions. SQLite (tests) runs the same queries in
+turn on the request session without trigram ranking in SQL.
+"""
+
+import asyncio
 import logging
+import re
 import time
-from typing import List
+from typing import Awaitable, Callable, List, Optional, Sequence
 
-from sqlalchemy import or_, select, func
+from sqlalchemy import func, literal, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.accounting import Customer
@@ -15,12 +25,47 @@ from app.schemas.search import SearchResult
 
 logger = logging.getLogger(__name__)
 
+# Searched columns per entity (each has a trigram index - keep in sync with the migration)
+LOAD_SEARCH_COLUMNS = (Load.load_number, Load.customer_name, Load.commodity)
+DRIVER_SEARCH_COLUMNS = (Driver.first_name, Driver.last_name, Driver.email, Driver.phone, Driver.cdl_number)
+EQUIPMENT_SEARCH_COLUMNS = (Equipment.unit_number, Equipment.vin, Equipment.make, Equipment.model)
+CUSTOMER_SEARCH_COLUMNS = (Customer.name, Customer.primary_contact_email, Customer.primary_contact_phone)
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _trigrams(value: str) -> set:
+    """pg_trgm-style trigrams: lowercased words padded with two leading and one trailing blank."""
+    grams = set()
+    for word in _WORD.findall(value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def trigram_similarity(left: Optional[str], right: str) -> float:
+    """Same measure as pg_trgm similarity(): shared trigrams / all trigrams."""
+    if not left:
+        return 0.0
+    a, b = _trigrams(left), _trigrams(right)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _best_similarity(values: Sequence[Optional[str]], query: str) -> float:
+    return max((trigram_similarity(value, query) for value in values), default=0.0)
+
+
+SearchFn = Callable[[AsyncSession, str, str, int], Awaitable[List[SearchResult]]]
+
 
 class SearchService:
     """Service for global search across multiple entities."""
 
     def __init__(self, db: AsyncSession):
         self.db = db
+        self._postgres = db.bind is not None and db.bind.dialect.name == "postgresql"
 
     async def search(
         self, company_id: str, query: str, limit: int = 20
@@ -42,23 +87,22 @@ class SearchService:
             return [], 0
 
         query = query.strip()
-        results: List[SearchResult] = []
-
-        # Search loads
-        load_results = await self._search_loads(company_id, query, limit)
-        results.extend(load_results)
-
-        # Search drivers
-        driver_results = await self._search_drivers(company_id, query, limit)
-        results.extend(driver_results)
-
-        # Search equipment
-        equipment_results = await self._search_equipment(company_id, query, limit)
-        results.extend(equipment_results)
+        searches: List[SearchFn] = [
+            self._search_loads,
+            self._search_drivers,
+            self._search_equipment,
+            self._search_customers,
+        ]
+
+        if self._postgres:
+            # Independent index scans - one session (connection) each
+            batches = await asyncio.gather(
+                *(self._run_isolated(search, company_id, query, limit) for search in searches)
+            )
+        else:
+            batches = [await search(self.db, company_id, query, limit) for search in searches]
 
-        # Search customers
-        customer_results = await self._search_customers(company_id, query, limit)
-        results.extend(customer_results)
+        results: List[SearchResult] = [result for batch in batches for result in batch]
 
         # Sort by relevance score (descending)
         results.sort(key=lambda x: x.score, reverse=True)
@@ -69,33 +113,46 @@ class SearchService:
         elapsed_ms = int((time.time() - start_time) * 1000)
         return results, elapsed_ms
 
+    async def _run_isolated(
+        self, search: SearchFn, company_id: str, query: str, limit: int
+    ) -> List[SearchResult]:
+        async with AsyncSession(bind=self.db.bind, expire_on_commit=False) as session:
+            return await search(session, company_id, query, limit)
+
+    def _matches(self, columns: Sequence, query: str):
+        """Substring match on any column (served by the lower(col) trigram indexes)."""
+        escaped = query.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        return or_(*(func.lower(column).like(pattern, escape="\\") for column in columns))
+
+    def _ranked(self, stmt, columns: Sequence, query: str, limit: int):
+        """Keep the most similar rows when there are more matches than the limit."""
+        if self._postgres:
+            needle = literal(query.lower())
+            rank = func.greatest(*(func.similarity(func.lower(column), needle) for column in columns))
+            stmt = stmt.order_by(rank.desc())
+        return stmt.limit(limit)
+
     async def _search_loads(
-        self, company_id: str, query: str, limit: int
+        self, db: AsyncSession, company_id: str, query: str, limit: int
     ) -> List[SearchResult]:
         """Search loads by load number, customer name, origin/destination."""
         try:
-            query_lower = f"%{query.lower()}%"
-
             stmt = (
-                select(Load)
+                select(Load.id, *LOAD_SEARCH_COLUMNS)
                 .where(Load.company_id == company_id)
-                .where(
-                    or_(
-                        func.lower(Load.load_number).like(query_lower),
-                        func.lower(Load.customer_name).like(query_lower),
-                        func.lower(Load.commodity).like(query_lower),
-                    )
-                )
-                .limit(limit)
+                .where(self._matches(LOAD_SEARCH_COLUMNS, query))
             )
 
-            result = await self.db.execute(stmt)
-            loads = result.scalars().all()
+            result = await db.execute(self._ranked(stmt, LOAD_SEARCH_COLUMNS, query, limit))
+            loads = result.all()
 
             search_results = []
             for load in loads:
-                # Calculate simple relevance score
-                score = 1.0
+                # Relevance: best trigram similarity across the matched fields
+                score = 1.0 + _best_similarity(
+                    (load.load_number, load.customer_name, load.commodity), query
+                )
                 if load.load_number and query.lower() in load.load_number.lower():
                     score += 2.0  # Boost exact load number matches
 
@@ -125,41 +182,32 @@ class SearchService:
             return []
 
     async def _search_drivers(
-        self, company_id: str, query: str, limit: int
+        self, db: AsyncSession, company_id: str, query: str, limit: int
     ) -> List[SearchResult]:
         """Search drivers by name, email, phone, license number."""
         try:
-            query_lower = f"%{query.lower()}%"
-
             stmt = (
-                select(Driver)
+                select(Driver.id, *DRIVER_SEARCH_COLUMNS)
                 .where(Driver.company_id == company_id)
-                .where(
-                    or_(
-                        func.lower(Driver.first_name).like(query_lower),
-                        func.lower(Driver.last_name).like(query_lower),
-                        func.lower(Driver.email).like(query_lower),
-                        func.lower(Driver.phone).like(query_lower),
-                        func.lower(Driver.cdl_number).like(query_lower),
-                    )
-                )
-                .limit(limit)
+                .where(self._matches(DRIVER_SEARCH_COLUMNS, query))
             )
 
-            result = await self.db.execute(stmt)
-            drivers = result.scalars().all()
+            result = await db.execute(self._ranked(stmt, DRIVER_SEARCH_COLUMNS, query, limit))
+            drivers = result.all()
 
             search_results = []
             for driver in drivers:
-                score = 1.0
                 full_name = f"{driver.first_name} {driver.last_name}"
+                score = 1.0 + _best_similarity(
+                    (full_name, driver.email, driver.phone, driver.cdl_number), query
+                )
 
-                # Build subtitle with CDL and status info
+                # Build subtitle with CDL and contact info
                 subtitle_parts = []
                 if driver.cdl_number:
                     subtitle_parts.append(f"CDL: {driver.cdl_number}")
-                if driver.employment_type:
-                    subtitle_parts.append(driver.employment_type.replace("_", " ").title())
+                if driver.phone:
+                    subtitle_parts.append(driver.phone)
                 subtitle = " • ".join(subtitle_parts) if subtitle_parts else None
 
                 search_results.append(
@@ -180,32 +228,24 @@ class SearchService:
             return []
 
     async def _search_equipment(
-        self, company_id: str, query: str, limit: int
+        self, db: AsyncSession, company_id: str, query: str, limit: int
     ) -> List[SearchResult]:
         """Search equipment by unit number, VIN, make, model."""
         try:
-            query_lower = f"%{query.lower()}%"
-
             stmt = (
-                select(Equipment)
+                select(Equipment.id, *EQUIPMENT_SEARCH_COLUMNS, Equipment.equipment_type)
                 .where(Equipment.company_id == company_id)
-                .where(
-                    or_(
-                        func.lower(Equipment.unit_number).like(query_lower),
-                        func.lower(Equipment.vin).like(query_lower),
-                        func.lower(Equipment.make).like(query_lower),
-                        func.lower(Equipment.model).like(query_lower),
-                    )
-                )
-                .limit(limit)
+                .where(self._matches(EQUIPMENT_SEARCH_COLUMNS, query))
             )
 
-            result = await self.db.execute(stmt)
-            equipment_list = result.scalars().all()
+            result = await db.execute(self._ranked(stmt, EQUIPMENT_SEARCH_COLUMNS, query, limit))
+            equipment_list = result.all()
 
             search_results = []
             for equip in equipment_list:
-                score = 1.0
+                score = 1.0 + _best_similarity(
+                    (equip.unit_number, equip.vin, equip.make, equip.model), query
+                )
                 if equip.unit_number and query.lower() in equip.unit_number.lower():
                     score += 2.0  # Boost exact unit number matches
 
@@ -237,38 +277,31 @@ class SearchService:
             return []
 
     async def _search_customers(
-        self, company_id: str, query: str, limit: int
+        self, db: AsyncSession, company_id: str, query: str, limit: int
     ) -> List[SearchResult]:
         """Search customers by name, contact info."""
         try:
-            query_lower = f"%{query.lower()}%"
-
             stmt = (
-                select(Customer)
+                select(Customer.id, *CUSTOMER_SEARCH_COLUMNS, Customer.status)
                 .where(Customer.company_id == company_id)
-                .where(
-                    or_(
-                        func.lower(Customer.name).like(query_lower),
-                        func.lower(Customer.email).like(query_lower),
-                        func.lower(Customer.phone).like(query_lower),
-                    )
-                )
-                .limit(limit)
+                .where(self._matches(CUSTOMER_SEARCH_COLUMNS, query))
             )
 
-            result = await self.db.execute(stmt)
-            customers = result.scalars().all()
+            result = await db.execute(self._ranked(stmt, CUSTOMER_SEARCH_COLUMNS, query, limit))
+            customers = result.all()
 
             search_results = []
             for customer in customers:
-                score = 1.0
+                score = 1.0 + _best_similarity(
+                    (customer.name, customer.primary_contact_email, customer.primary_contact_phone), query
+                )
 
                 # Build subtitle with contact info
                 subtitle_parts = []
                 if customer.status:
                     subtitle_parts.append(customer.status.title())
-                if customer.email:
-                    subtitle_parts.append(customer.email)
+                if customer.primary_contact_email:
+                    subtitle_parts.append(customer.primary_contact_email)
                 subtitle = " • ".join(subtitle_parts) if subtitle_parts else None
 
                 search_results.append(
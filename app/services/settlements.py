@@ -10,8 +10,10 @@ from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.accounting import Settlement
+from app.models.company import Company
 from app.models.driver import Driver
 from app.models.load import Load
+from app.services import pay_stubs
 from app.schemas.settlements import (
     SettlementResponse,
     SettlementBreakdownItem,
@@ -307,10 +309,9 @@ class SettlementsService:
         driver_result = await self.db.execute(driver_query)
         driver = driver_result.scalar_one_or_none()
 
-        # Generate a simple text-based receipt (in production, use a proper PDF library)
-        # For now, return a placeholder - would integrate with reportlab or weasyprint
-        logger.info(f"Generating pay stub PDF for settlement {settlement_id}")
+        company = await self.db.get(Company, company_id)
 
-        # Return None to indicate PDF generation not yet implemented
-        # In production, this would return actual PDF bytes
-        return None
+        logger.info(f"Generating pay stub PDF for settlement {settlement_id}")
+        data = pay_stubs.pay_stub_data(settlement, driver, company.name if company else "")
+        _, pdf_bytes = await pay_stubs.render_pay_stub(data)
+        return pdf_bytes
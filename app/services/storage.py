@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
 from datetime import datetime, timedelta
 from typing import Optional
@@ -92,7 +93,9 @@ class StorageService:
             content_type = self._infer_content_type(filename)
 
         try:
-            self.client.put_object(
+            # boto3 is blocking; keep the upload off the event loop
+            await asyncio.to_thread(
+                self.client.put_object,
                 Bucket=self._bucket_name,
                 Key=key,
                 Body=file_content,
@@ -113,7 +116,7 @@ class StorageService:
             True if deletion was successful, False otherwise
         """
         try:
-            self.client.delete_object(Bucket=self._bucket_name, Key=key)
+            await asyncio.to_thread(self.client.delete_object, Bucket=self._bucket_name, Key=key)
             return True
         except ClientError:
             return False
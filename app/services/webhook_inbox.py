@@ -0,0 +1,259 @@
+"""
+Durable inbox for provider webhooks.
+
+Webhook endpoints verify the signature, write the raw event to webhook_event
+and acknowledge straight away - Motive wants a reply within 3 seconds, and
+slow replies make every provider redeliver. Processing happens here:
+
+- Duplicate deliveries hit the (provider, idempotency_key) unique constraint
+  and are dropped at insert. Providers without an event id are keyed on the
+  body digest plus its receive-time window, since their bodies repeat
+  byte-for-byte across distinct notifications
+- Events are processed concurrently (webhook_worker_concurrency), each on its
+  own session, by the processor registered for the provider
+- A processor that raises is retried with backoff until webhook_max_attempts,
+  then the event is marked FAILED
+- Rows left PROCESSING by a crashed worker are reclaimed after a timeout, and
+  the scheduler drains the inbox every minute in case nothing kicked it
+- Processed rows are purged daily: DONE after webhook_retention_days, FAILED
+  after the longer webhook_failed_retention_days so they stay inspectable
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.db import AsyncSessionFactory
+from app.models.webhook_event import WebhookEvent
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# A PROCESSING row older than this belongs to a worker that died mid-event
+STALE_PROCESSING_AFTER = timedelta(minutes=10)
+
+WebhookProcessor = Callable[[AsyncSession, WebhookEvent], Awaitable[None]]
+_processors: Dict[str, WebhookProcessor] = {}
+
+
+def webhook_processor(provider: str) -> Callable[[WebhookProcessor], WebhookProcessor]:
+    """Register the function that processes stored events of a provider."""
+
+    def register(func: WebhookProcessor) -> WebhookProcessor:
+        _processors[provider] = func
+        return func
+
+    return register
+
+
+def idempotency_key(body: bytes, event_id: Optional[Any] = None) -> str:
+    """
+    Provider event id when there is one, otherwise a digest of the raw body and
+    the webhook_body_dedupe_window_seconds window it arrived in.
+
+    Only redeliveries within the window are dropped; a later notification with
+    an identical body (Plaid's SYNC_UPDATES_AVAILABLE) is a new event.
+    """
+    if event_id:
+        return str(event_id)
+    window = int(time.time() // max(1, settings.webhook_body_dedupe_window_seconds))
+    return f"{hashlib.sha256(body).hexdigest()}:{window}"
+
+
+async def record_webhook_event(
+    db: AsyncSession,
+    provider: str,
+    key: str,
+    payload: Any,
+    event_type: Optional[str] = None,
+    company_id: Optional[str] = None,
+    company_integration_id: Optional[str] = None,
+) -> bool:
+    """Persist an inbound event (committed). Returns False when it was already received."""
+    values = {
+        "id": str(uuid.uuid4()),
+        "provider": provider,
+        "idempotency_key": key,
+        "event_type": event_type,
+        "company_id": company_id,
+        "company_integration_id": company_integration_id,
+        "payload": payload,
+        "status": "PENDING",
+        "attempts": 0,
+        "next_attempt_at": datetime.utcnow(),
+    }
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        dialect_insert = None
+
+    if dialect_insert is not None:
+        stmt = dialect_insert(WebhookEvent).values(**values).on_conflict_do_nothing(
+            index_elements=["provider", "idempotency_key"]
+        )
+        result = await db.execute(stmt)
+        await db.commit()
+        inserted = bool(result.rowcount)
+    else:
+        existing = await db.execute(
+            select(WebhookEvent.id).where(WebhookEvent.provider == provider, WebhookEvent.idempotency_key == key)
+        )
+        inserted = existing.first() is None
+        if inserted:
+            await db.execute(insert(WebhookEvent).values(**values))
+            await db.commit()
+
+    if not inserted:
+        logger.info("webhook_event_duplicate", extra={"provider": provider, "idempotency_key": key})
+    return inserted
+
+
+class WebhookInboxWorker:
+    def __init__(self, concurrency: Optional[int] = None) -> None:
+        self.concurrency = max(1, concurrency or settings.webhook_worker_concurrency)
+
+    async def _claim(self, limit: int) -> List[str]:
+        """Mark due events PROCESSING and return their ids."""
+        now = datetime.utcnow()
+        claimable = or_(
+            and_(WebhookEvent.status == "PENDING", WebhookEvent.next_attempt_at <= now),
+            and_(WebhookEvent.status == "PROCESSING", WebhookEvent.updated_at <= now - STALE_PROCESSING_AFTER),
+        )
+        async with AsyncSessionFactory() as session:
+            due = await session.execute(
+                select(WebhookEvent.id).where(claimable).order_by(WebhookEvent.next_attempt_at).limit(limit)
+            )
+            ids = list(due.scalars().all())
+            if not ids:
+                return []
+            # Re-checking the condition keeps two workers from claiming the same row
+            claimed = await session.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id.in_(ids), claimable)
+                .values(status="PROCESSING", attempts=WebhookEvent.attempts + 1, updated_at=now)
+                .returning(WebhookEvent.id)
+                .execution_options(synchronize_session=False)
+            )
+            claimed_ids = list(claimed.scalars().all())
+            await session.commit()
+            return claimed_ids
+
+    async def _process(self, event_id: str) -> bool:
+        async with AsyncSessionFactory() as session:
+            event = await session.get(WebhookEvent, event_id)
+            if event is None:
+                return False
+            processor = _processors.get(event.provider)
+            try:
+                if processor is None:
+                    raise LookupError(f"No webhook processor registered for {event.provider}")
+                await processor(session, event)
+            except Exception as exc:
+                await session.rollback()
+                event = await session.get(WebhookEvent, event_id)
+                attempts = event.attempts  # Counted when the event was claimed
+                event.last_error = str(exc)[:2000]
+                if attempts >= settings.webhook_max_attempts:
+                    event.status = "FAILED"
+                    logger.error(
+                        "webhook_event_failed",
+                        extra={"event_id": event_id, "provider": event.provider, "attempts": attempts, "error": str(exc)},
+                    )
+                else:
+                    event.status = "PENDING"
+                    event.next_attempt_at = datetime.utcnow() + timedelta(
+                        seconds=settings.webhook_retry_base_seconds * (2 ** (attempts - 1))
+                    )
+                await session.commit()
+                return False
+
+            event.status = "DONE"
+            event.last_error = None
+            event.processed_at = datetime.utcnow()
+            await session.commit()
+            return True
+
+    async def drain(self, batch_size: int = 200) -> Dict[str, int]:
+        """Process every due event; returns counts of processed and failed attempts."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(event_id: str) -> bool:
+            async with semaphore:
+                try:
+                    return await self._process(event_id)
+                except Exception:
+                    logger.exception("webhook_event_processing_error", extra={"event_id": event_id})
+                    return False
+
+        processed = failed = 0
+        while True:
+            ids = await self._claim(batch_size)
+            if not ids:
+                break
+            for ok in await asyncio.gather(*(run(event_id) for event_id in ids)):
+                if ok:
+                    processed += 1
+                else:
+                    failed += 1
+
+        if processed or failed:
+            logger.info("webhook_inbox_drained", extra={"processed": processed, "failed": failed})
+        return {"processed": processed, "failed": failed}
+
+
+_drain_task: Optional[asyncio.Task] = None
+_drain_again = False
+
+
+async def _drain_loop() -> None:
+    global _drain_again
+    while True:
+        _drain_again = False
+        try:
+            await WebhookInboxWorker().drain()
+        except Exception:
+            logger.exception("Webhook inbox drain failed")
+        if not _drain_again:
+            return
+
+
+def kick_webhook_worker() -> None:
+    """Drain the inbox in the background; a burst of deliveries shares one drain loop."""
+    global _drain_task, _drain_again
+    if _drain_task is not None and not _drain_task.done():
+        _drain_again = True
+        return
+    _drain_task = asyncio.create_task(_drain_loop())
+
+
+async def purge_processed_events() -> Dict[str, int]:
+    """Delete DONE and FAILED events past their retention; returns rows removed per status."""
+    now = datetime.utcnow()
+    retention = {
+        "DONE": now - timedelta(days=settings.webhook_retention_days),
+        "FAILED": now - timedelta(days=settings.webhook_failed_retention_days),
+    }
+    removed: Dict[str, int] = {}
+    async with AsyncSessionFactory() as session:
+        for status, cutoff in retention.items():
+            result = await session.execute(
+                delete(WebhookEvent)
+                .where(WebhookEvent.status == status, WebhookEvent.updated_at < cutoff)
+                .execution_options(synchronize_session=False)
+            )
+            removed[status] = result.rowcount or 0
+        await session.commit()
+    return removed
@@ -255,6 +255,9 @@ def register_websocket_handlers() -> None:
     subscribe(EventType.NOTIFICATION_CREATED, handle_notification_event)
     subscribe(EventType.NOTIFICATION_BROADCAST, handle_notification_event)
 
+    # Settlement events
+    subscribe(EventType.PAY_STUB_JOB_PROGRESS, handle_pay_stub_job_event)
+
     logger.info("WebSocket event handlers registered")
 
 
@@ -318,3 +321,23 @@ async def handle_notification_event(event: Event) -> None:
     elif company_id:
         await manager.send_company_message(message, company_id)
         logger.debug(f"Broadcast notification to company {company_id}")
+
+
+async def handle_pay_stub_job_event(event: Event) -> None:
+    """Handle pay-stub job progress - push to the user who started it (or the company)."""
+    data = event.data
+    user_id = event.target_user_id or data.get("user_id")
+    company_id = event.company_id or data.get("company_id")
+
+    message = {
+        "type": "pay_stub_job",
+        "data": {
+            **data,
+            "timestamp": event.timestamp,
+        }
+    }
+
+    if user_id:
+        await manager.send_personal_message(message, user_id)
+    elif company_id:
+        await manager.send_company_message(message, company_id)
@@ -0,0 +1,72 @@
+"""
+Static interval tree.
+
+Built once from a list of half-open [start, end) intervals and queried for
+the intervals overlapping a point or a range in O(log n + k). Nodes are laid
+out implicitly over the start-sorted array (the middle element is the root of
+each slice) and carry the largest end in their subtree, so whole subtrees that
+end before the query are skipped.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Generic, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class IntervalTree(Generic[T]):
+    def __init__(self, intervals: Sequence[Tuple[Any, Any, T]]) -> None:
+        """intervals: (start, end, value) tuples; empty intervals (end <= start) are ignored."""
+        self._items: List[Tuple[Any, Any, T]] = sorted(
+            (item for item in intervals if item[1] > item[0]), key=lambda item: item[0]
+        )
+        self._max_end: List[Any] = [None] * len(self._items)
+        self._build(0, len(self._items))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _build(self, lo: int, hi: int) -> Any:
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        max_end = self._items[mid][1]
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > max_end:
+                max_end = child
+        self._max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start: Any, end: Any) -> List[Tuple[Any, Any, T]]:
+        """Intervals overlapping [start, end) (containing start when start == end), in start order."""
+        found: List[int] = []
+        self._search(0, len(self._items), start, end, found)
+        return [self._items[index] for index in found]
+
+    def at(self, point: Any) -> List[Tuple[Any, Any, T]]:
+        """Intervals containing point."""
+        return self.overlapping(point, point)
+
+    def _search(self, lo: int, hi: int, start: Any, end: Any, found: List[int]) -> None:
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] <= start:
+            return  # Everything in this subtree ends before the query begins
+        self._search(lo, mid, start, end, found)
+        item_start, item_end, _ = self._items[mid]
+        if item_start > end or (item_start == end and start != end):
+            return  # This node and its right subtree start after the query ends
+        if item_end > start:
+            found.append(mid)
+        self._search(mid + 1, hi, start, end, found)
+
+    def conflicts(self) -> List[Tuple[Tuple[Any, Any, T], Tuple[Any, Any, T]]]:
+        """Pairs of stored intervals that overlap each other, each pair reported once."""
+        pairs = []
+        for index, item in enumerate(self._items):
+            found: List[int] = []
+            self._search(0, len(self._items), item[0], item[1], found)
+            pairs.extend((item, self._items[other]) for other in found if other > index)
+        return pairs
@@ -0,0 +1,141 @@
+"""
+Per-request overhead of the security middleware stack.
+
+Drives the ASGI app directly (no server or HTTP client in the measurement)
+and compares a bare endpoint, the former BaseHTTPMiddleware implementation
+and the current pure-ASGI middleware, for a plain JSON response and a
+streamed one.
+
+Run with: python scripts/tests/bench_middleware.py [requests]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///bench_middleware.db")
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse, StreamingResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.middleware.security import (  # noqa: E402
+    AuditLoggingMiddleware,
+    SecurityHeadersMiddleware,
+    get_client_ip,
+)
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware version this benchmark compares against."""
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
+        response.headers["Content-Security-Policy"] = (
+            "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
+            "style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; "
+            "connect-src 'self' https:; frame-ancestors 'none';"
+        )
+        return response
+
+
+class LegacyAuditLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_id = str(uuid.uuid4())[:8]
+        start_time = time.time()
+        request.state.request_id = request_id
+        get_client_ip(request)
+        response = await call_next(request)
+        int((time.time() - start_time) * 1000)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping(request: Request):
+        return JSONResponse({"ok": True})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(20):
+                yield b"x" * 1024
+
+        return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+    for cls in middleware:
+        app.add_middleware(cls)
+    return app
+
+
+async def call(app, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Like a server: nothing more arrives until the client disconnects
+        await asyncio.Event().wait()
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app, path: str, requests: int) -> float:
+    for _ in range(200):
+        await call(app, path)
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await call(app, path)
+        samples.append((time.perf_counter() - start) / requests * 1e6)
+    return statistics.median(samples)
+
+
+async def main(requests: int) -> None:
+    stacks = {
+        "bare": [],
+        "BaseHTTPMiddleware": [LegacySecurityHeadersMiddleware, LegacyAuditLoggingMiddleware],
+        "pure ASGI": [SecurityHeadersMiddleware, AuditLoggingMiddleware],
+    }
+    for path in ("/ping", "/stream"):
+        results = {name: await measure(build_app(mw), path, requests) for name, mw in stacks.items()}
+        bare = results["bare"]
+        print(f"{path}")
+        for name, micros in results.items():
+            print(f"  {name:<20} {micros:8.1f} us/request   overhead {micros - bare:7.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))